@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark for batched early-warning scoring across active patients.
+
+Loads synthetic vitals for N patients into a VitalsTimeSeriesStore and times
+the batched pass (snapshot + vectorized scoring) against scoring each patient
+on its own with plain Python band lookups.
+
+Usage:
+    python dev/bench_deterioration.py --patients 10000 --readings 12
+"""
+
+import argparse
+import bisect
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+src_dir = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from ems_copilot.domain.services.deterioration_scorer import DeteriorationScorer, NEWS2_BANDS, SCORED_METRICS
+from ems_copilot.infrastructure.database.vitals_timeseries import VitalsTimeSeriesStore
+
+VITALS = [("rr", 16, 4), ("o2", 95, 3), ("hr", 90, 20), ("temp", 98.6, 1.5)]
+
+
+def make_store(patients, readings):
+    store = VitalsTimeSeriesStore(max_patients=patients)
+    start = datetime(2024, 1, 1, 10, 0, 0)
+    rng = random.Random(42)
+    for p in range(patients):
+        name = f"Patient {p}"
+        records = []
+        for r in range(readings):
+            timestamp = (start + timedelta(minutes=5 * r)).isoformat()
+            for vitals_name, mean, spread in VITALS:
+                value = rng.gauss(mean, spread)
+                records.append({"vitals_name": vitals_name, "vitals_value": f"{value:.1f}",
+                                "patient_name": name, "timestamp": timestamp})
+            records.append({"vitals_name": "bp", "vitals_value": f"{int(rng.gauss(125, 20))}/{int(rng.gauss(80, 10))}",
+                            "patient_name": name, "timestamp": timestamp})
+        store.load_patient(name, records)
+    return store
+
+
+def score_one_by_one(store, names):
+    totals = {}
+    for name in names:
+        total = 0
+        for metric in SCORED_METRICS:
+            series = store.series(name, metric)
+            if not series:
+                continue
+            value = series.values[-1]
+            if metric == "temperature":
+                value = (value - 32.0) * 5.0 / 9.0
+            edges, scores = NEWS2_BANDS[metric]
+            total += scores[bisect.bisect_left(edges, value)]
+        totals[name] = total
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched deterioration scoring benchmark")
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--readings", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = make_store(args.patients, args.readings)
+    print(f"🚑 Loaded {args.patients} patients x {args.readings} readings in {time.perf_counter() - started:.1f}s")
+
+    scorer = DeteriorationScorer()
+    names = store.snapshot(SCORED_METRICS)["patients"]
+
+    timings = {"snapshot": [], "vectorized scoring": [], "summaries": [], "per-patient python": []}
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        snapshot = store.snapshot(SCORED_METRICS)
+        timings["snapshot"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        components = scorer.band_scores(snapshot["latest"])
+        scorer.risk_levels(components.sum(axis=1), components)
+        timings["vectorized scoring"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        summaries = scorer.assess(snapshot)
+        timings["summaries"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        expected = score_one_by_one(store, names)
+        timings["per-patient python"].append(time.perf_counter() - started)
+
+    assert all(expected[summary.patient_name] == summary.score for summary in summaries)
+    high = sum(summary.risk == "high" for summary in summaries)
+    print(f"{high} patients at high risk")
+    for label, values in timings.items():
+        print(f"{label:>20}: {min(values) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+CPU latency, import time and memory benchmark for the embedding backends.
+
+Each backend runs in a fresh subprocess so import time (torch vs
+onnxruntime), model load time and peak RSS are measured independently.
+Reports per-text latency for single-text encodes (the live query path) and
+batched encodes (bulk inserts), plus parity of the ONNX embeddings against
+the PyTorch ones on the same texts.
+
+Usage:
+    python dev/bench_embedding_backends.py [--backends torch,onnx] [--texts 256] [--batch-size 32]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+src_dir = backend_dir / "src"
+sys.path.insert(0, str(src_dir))
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def make_texts(count):
+    return [f"Patient {i} heart rate {60 + i % 80}, BP {100 + i % 60}/{60 + i % 30}, "
+            f"complains of {['chest pain', 'dizziness', 'shortness of breath', 'headache'][i % 4]}"
+            for i in range(count)]
+
+
+def run_backend(backend, count, batch_size, vectors_path):
+    """Measure one backend in this process and print a JSON result."""
+    started = time.perf_counter()
+    from ems_copilot.infrastructure.database.embedding_model import get_embedding_model
+    model = get_embedding_model(backend=backend)
+    load_s = time.perf_counter() - started
+
+    texts = make_texts(count)
+    model.encode(texts[:8], batch_size=8)  # warm up
+    single = []
+    for text in texts[:64]:
+        t0 = time.perf_counter()
+        model.encode([text], batch_size=1)
+        single.append((time.perf_counter() - t0) * 1000)
+    t0 = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size)
+    batched_ms = (time.perf_counter() - t0) * 1000 / count
+
+    import numpy as np
+    np.save(vectors_path, np.asarray(vectors, dtype=np.float32))
+    single.sort()
+    print(json.dumps({
+        "load_s": load_s,
+        "single_p50_ms": single[len(single) // 2],
+        "batched_ms_per_text": batched_ms,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend benchmark")
+    parser.add_argument("--backends", default="torch,onnx")
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_backend(args.run, args.texts, args.batch_size, args.vectors)
+        return
+
+    import tempfile
+    import numpy as np
+    from ems_copilot.infrastructure.database.embedding_model import embedding_parity
+
+    print(f"🚑 Embedding backends ({args.texts} texts, batch size {args.batch_size}, {os.cpu_count()} CPUs)")
+    print(f"{'backend':>8} {'import+load s':>14} {'single p50 ms':>14} {'batched ms/text':>16} {'peak RSS MB':>12}")
+    vectors = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in args.backends.split(","):
+            vectors_path = os.path.join(directory, f"{backend}.npy")
+            completed = subprocess.run(
+                [sys.executable, __file__, "--run", backend, "--texts", str(args.texts),
+                 "--batch-size", str(args.batch_size), "--vectors", vectors_path],
+                capture_output=True, text=True, env={**os.environ, "PYTHONPATH": str(src_dir)}
+            )
+            if completed.returncode != 0:
+                print(f"{backend:>8} failed: {completed.stderr.strip().splitlines()[-1] if completed.stderr else '?'}")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            vectors[backend] = np.load(vectors_path)
+            print(f"{backend:>8} {result['load_s']:>14.2f} {result['single_p50_ms']:>14.2f} "
+                  f"{result['batched_ms_per_text']:>16.2f} {result['peak_rss_mb']:>12.0f}")
+
+    if "torch" in vectors and "onnx" in vectors:
+        parity = embedding_parity(vectors["torch"], vectors["onnx"])
+        print(f"\nParity: mean cosine {parity['mean_cosine']:.4f}, min {parity['min_cosine']:.4f}, "
+              f"top-5 neighbor overlap {parity['topk_overlap']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
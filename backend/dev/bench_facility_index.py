@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the facility spatial index.
+
+Builds synthetic facility datasets scattered over a region, then times k-nearest
+and within-radius queries (with and without capability filters) through the
+grid index against a brute-force scan of every facility.
+
+Usage:
+    python dev/bench_facility_index.py [--sizes 1000,10000,100000] [--queries 2000] [--cell 0.1]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir / "src"))
+
+from ems_copilot.infrastructure.database.facility_index import (
+    CAPABILITIES, Facility, FacilityIndex, haversine_km
+)
+
+
+def synthetic_facilities(count, rng):
+    # Roughly New York State
+    facilities = []
+    for number in range(count):
+        trauma_level = rng.choice([None, None, None, 1, 2, 3])
+        facilities.append(Facility(
+            str(number), f"Facility {number}", rng.uniform(40.5, 45.0), rng.uniform(-79.8, -71.8),
+            capabilities=rng.sample(CAPABILITIES[1:], rng.randint(0, 3)), trauma_level=trauma_level
+        ))
+    return facilities
+
+
+def brute_nearest(facilities, latitude, longitude, k, capabilities):
+    required = set(capabilities)
+    matches = [(haversine_km(latitude, longitude, f.latitude, f.longitude), f)
+               for f in facilities if f.matches(required)]
+    matches.sort(key=lambda match: match[0])
+    return matches[:k]
+
+
+def brute_within(facilities, latitude, longitude, radius_km, capabilities):
+    required = set(capabilities)
+    return [f for f in facilities if f.matches(required)
+            and haversine_km(latitude, longitude, f.latitude, f.longitude) <= radius_km]
+
+
+def time_us(fn, points):
+    timings = []
+    for point in points:
+        started = time.perf_counter()
+        fn(*point)
+        timings.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(timings), sorted(timings)[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Facility spatial index benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--brute-queries", type=int, default=50, help="brute-force scans are slow; time fewer")
+    parser.add_argument("--cell", type=float, default=0.1, help="grid cell size in degrees")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"🚑 Facility index benchmark ({args.queries} queries, {args.cell}° cells)")
+    for size in (int(value) for value in args.sizes.split(",")):
+        facilities = synthetic_facilities(size, rng)
+        started = time.perf_counter()
+        index = FacilityIndex(facilities, cell_degrees=args.cell)
+        build_ms = (time.perf_counter() - started) * 1000
+        points = [(rng.uniform(40.5, 45.0), rng.uniform(-79.8, -71.8)) for _ in range(args.queries)]
+        few = points[:args.brute_queries]
+        print(f"\n  {size:,} facilities, built in {build_ms:.0f} ms ({index.stats()['cells']} cells)")
+
+        cases = [
+            ("3 nearest", lambda lat, lng: index.nearest(lat, lng, k=3),
+             lambda lat, lng: brute_nearest(facilities, lat, lng, 3, ())),
+            ("3 nearest stroke", lambda lat, lng: index.nearest(lat, lng, k=3, capabilities=["stroke"]),
+             lambda lat, lng: brute_nearest(facilities, lat, lng, 3, ["stroke"])),
+            ("within 15 km", lambda lat, lng: index.within(lat, lng, 15),
+             lambda lat, lng: brute_within(facilities, lat, lng, 15, ())),
+        ]
+        for label, indexed, brute in cases:
+            p50, p99 = time_us(indexed, points)
+            brute_p50, _ = time_us(brute, few)
+            print(f"    {label:<17} index p50 {p50:8.1f} µs  p99 {p99:8.1f} µs   "
+                  f"brute force p50 {brute_p50:10.1f} µs  ({brute_p50 / p50:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for conversation history inserts.
+
+Compares one-at-a-time add_conversation against add_conversations_bulk at
+1, 100 and 10k exchanges, reporting exchanges per second. Every run uses a
+fresh Chroma directory and a fresh embedding cache so cache hits do not skew
+the numbers. The per-item baseline is skipped above --max-single items.
+
+Usage:
+    python dev/bench_history_bulk.py --sizes 1 100 10000 --batch-size 64
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+src_dir = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from ems_copilot.infrastructure.database.conversation_history import ConversationHistory
+from ems_copilot.infrastructure.database.embedding_cache import EmbeddingCache
+
+
+def make_exchanges(count):
+    return [
+        (f"Patient {i} heart rate {60 + i % 80}, BP {100 + i % 60}/{60 + i % 30}",
+         f"Recorded vitals for patient {i}.")
+        for i in range(count)
+    ]
+
+
+def fresh_history(persist_directory):
+    history = ConversationHistory(
+        persist_directory,
+        embedding_cache=EmbeddingCache(max_entries=100_000),
+        write_behind=False
+    )
+    history.warm_up()
+    return history
+
+
+def time_single(exchanges):
+    with tempfile.TemporaryDirectory() as persist_directory:
+        history = fresh_history(persist_directory)
+        started = time.perf_counter()
+        for user_query, agent_response in exchanges:
+            history.add_conversation(user_query, agent_response)
+        return time.perf_counter() - started
+
+
+def time_bulk(exchanges, batch_size):
+    with tempfile.TemporaryDirectory() as persist_directory:
+        history = fresh_history(persist_directory)
+        started = time.perf_counter()
+        history.add_conversations_bulk(exchanges, batch_size=batch_size)
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversation history insert throughput")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-single", type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(f"🚑 History insert throughput (batch size {args.batch_size})")
+    print(f"{'items':>7} {'single ex/s':>12} {'bulk ex/s':>11} {'speedup':>8}")
+    for size in args.sizes:
+        exchanges = make_exchanges(size)
+        bulk_rate = size / time_bulk(exchanges, args.batch_size)
+        if size <= args.max_single:
+            single_rate = size / time_single(exchanges)
+            print(f"{size:>7} {single_rate:>12.1f} {bulk_rate:>11.1f} {bulk_rate / single_rate:>7.1f}x")
+        else:
+            print(f"{size:>7} {'skipped':>12} {bulk_rate:>11.1f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
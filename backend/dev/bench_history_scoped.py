@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Search latency benchmark for scoped conversation history.
+
+Grows a Chroma history to each size in --sizes (spread over --sessions
+sessions and a few hundred patients), then times the same session's search
+three ways: unscoped over everything, filtered with a `where` clause on the
+full collection, and against the session's partition. The partition and
+filtered timings should stay roughly flat as the total grows; the unscoped
+search also returns other crews' exchanges.
+
+A hashing encoder stands in for the SentenceTransformer so the numbers
+measure Chroma, not the model.
+
+Usage:
+    python dev/bench_history_scoped.py [--sizes 1000,10000,100000] [--sessions 200] [--queries 50]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+src_dir = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from ems_copilot.infrastructure.database.conversation_history import ConversationHistory
+from ems_copilot.infrastructure.database.embedding_cache import EmbeddingCache
+
+
+class HashingEncoder:
+    """Bag-of-words stand-in with the SentenceTransformer encode() signature."""
+
+    def __init__(self, dimensions=384):
+        self.dimensions = dimensions
+
+    def encode(self, texts, batch_size=32):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-9)
+
+
+def exchange(i, sessions):
+    patient = f"Patient {i % 300}"
+    return (f"session-{i % sessions}", patient,
+            f"{patient} heart rate {60 + i % 80}, BP {100 + i % 60}/{60 + i % 30}, complains of pain level {i % 10}",
+            f"Recorded vitals for {patient}.")
+
+
+def grow(history, start, end, sessions, chunk=5000):
+    for low in range(start, end, chunk):
+        records = []
+        for i in range(low, min(end, low + chunk)):
+            session_id, patient, user_query, agent_response = exchange(i, sessions)
+            records.append(history.new_record(user_query, agent_response, session_id, patient))
+        history.write_records(records, batch_size=256)
+
+
+def time_ms(search, queries):
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoped conversation history search latency")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    queries = [f"how is patient {i} doing, heart rate trend" for i in range(args.queries)]
+    print(f"🚑 Scoped history search ({args.sessions} sessions, median of {args.queries} queries)")
+    print(f"{'exchanges':>10} {'unscoped ms':>12} {'where ms':>9} {'partition ms':>13}")
+    with tempfile.TemporaryDirectory() as persist_directory:
+        history = ConversationHistory(
+            persist_directory,
+            embedding_model=HashingEncoder(),
+            embedding_cache=EmbeddingCache(max_entries=10_000),
+            write_behind=False,
+            partition_by_session=True
+        )
+        stored = 0
+        for size in (int(value) for value in args.sizes.split(",")):
+            grow(history, stored, size, args.sessions)
+            stored = size
+            unscoped = time_ms(lambda q: history.search_conversations(q), queries)
+            history.partition_by_session = False
+            filtered = time_ms(lambda q: history.search_conversations(q, session_id="session-7"), queries)
+            history.partition_by_session = True
+            partitioned = time_ms(lambda q: history.search_conversations(q, session_id="session-7"), queries)
+            print(f"{size:>10} {unscoped:>12.2f} {filtered:>9.2f} {partitioned:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
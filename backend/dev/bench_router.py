@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Accuracy and latency report for the local fast-path query router.
+
+Runs every query in a labeled corpus (JSONL with "query" and "agent") through
+QueryRouter and reports coverage (share dispatched without Gemini), precision on
+dispatched queries and per-query routing latency. With --classifier, a
+CentroidClassifier trained on every other corpus example is used as the second
+stage and the held-out half is reported separately.
+
+Usage:
+    python dev/bench_router.py [--corpus dev/data/router_corpus.jsonl] [--classifier]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir / "src"))
+
+from ems_copilot.domain.services.query_router import CentroidClassifier, QueryRouter
+
+
+def load_corpus(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(router, corpus, repeats=200):
+    dispatched = correct = 0
+    per_agent = defaultdict(lambda: [0, 0])
+    latencies = []
+    for example in corpus:
+        started = time.perf_counter()
+        for _ in range(repeats):
+            decision = router.route(example["query"])
+        latencies.append((time.perf_counter() - started) / repeats)
+        per_agent[example["agent"]][1] += 1
+        if decision.is_confident():
+            dispatched += 1
+            if decision.agent == example["agent"]:
+                correct += 1
+                per_agent[example["agent"]][0] += 1
+            else:
+                print(f"  ✗ {example['query']!r}: expected {example['agent']}, got {decision}")
+    return {
+        "total": len(corpus),
+        "coverage": dispatched / len(corpus),
+        "precision": correct / dispatched if dispatched else 0.0,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "max_us": max(latencies) * 1e6,
+        "per_agent": dict(per_agent),
+    }
+
+
+def report(title, result):
+    print(f"\n{title}")
+    print(f"  queries:   {result['total']}")
+    print(f"  coverage:  {result['coverage']:.1%} dispatched without Gemini")
+    print(f"  precision: {result['precision']:.1%} of dispatched queries routed correctly")
+    print(f"  latency:   p50 {result['p50_us']:.1f} µs, max {result['max_us']:.1f} µs")
+    for agent, (hits, total) in sorted(result["per_agent"].items()):
+        print(f"    {agent:<13} {hits}/{total} dispatched correctly")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast-path router accuracy and latency")
+    parser.add_argument("--corpus", default=str(backend_dir / "dev" / "data" / "router_corpus.jsonl"))
+    parser.add_argument("--classifier", action="store_true", help="add an embedding centroid classifier stage")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    report("🚑 Rules only", evaluate(QueryRouter(), corpus))
+
+    if args.classifier:
+        from ems_copilot.infrastructure.database.conversation_history import get_conversation_history
+        history = get_conversation_history()
+        train, held_out = corpus[::2], corpus[1::2]
+        examples = defaultdict(list)
+        for example in train:
+            examples[example["agent"]].append(example["query"])
+        router = QueryRouter(classifier=CentroidClassifier(history.embed_many, examples))
+        report("🚑 Rules + centroid classifier (held-out half)", evaluate(router, held_out, repeats=5))
+
+
+if __name__ == "__main__":
+    main()
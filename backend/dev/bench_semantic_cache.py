@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Replay benchmark for the semantic (paraphrase) response cache.
+
+Replays a labeled query log (JSONL with "query", "agent" and "intent"; queries
+with the same intent should get the same answer) through a ResponseCache with
+a SemanticCache tier, once per similarity threshold. Every miss is charged a
+simulated agent round trip of --llm-ms. Reports the hit rate, false hits
+(answers served for a different intent), lookup overhead and the latency
+saved.
+
+The default embedder is the conversation history's SentenceTransformer. Use
+--embedder words for a dependency-free bag-of-words stand-in when only the
+cache mechanics need exercising; its similarities are not representative.
+
+Usage:
+    python dev/bench_semantic_cache.py [--corpus dev/data/semantic_replay.jsonl]
+        [--thresholds 0.75,0.8,0.85,0.9] [--llm-ms 900] [--embedder model|words]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+import zlib
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir / "src"))
+
+from ems_copilot.infrastructure.utils.response_cache import ResponseCache
+from ems_copilot.infrastructure.utils.semantic_cache import SemanticCache
+
+
+def load_corpus(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def words_embedder(dimensions=512):
+    def embed(texts):
+        vectors = []
+        for text in texts:
+            vector = [0.0] * dimensions
+            for word in re.findall(r"[a-z0-9]+", text.lower()):
+                vector[zlib.crc32(word.encode()) % dimensions] += 1.0
+            vectors.append(vector)
+        return vectors
+    return embed
+
+
+def model_embedder():
+    from ems_copilot.infrastructure.database.conversation_history import get_conversation_history
+    return get_conversation_history().embed_many
+
+
+def replay(corpus, embed, threshold, llm_ms):
+    semantic = SemanticCache(embed, threshold=threshold, agents=("gps_agent",))
+    cache = ResponseCache(ttls={"gps_agent": 3600, "triage_agent": 60}, semantic=semantic)
+    exact_hits = semantic_hits = false_hits = 0
+    lookups_ms = []
+    for example in corpus:
+        agent, query = example["agent"], example["query"]
+        before = semantic.hits
+        started = time.perf_counter()
+        answer = cache.get(agent, query)
+        lookups_ms.append((time.perf_counter() - started) * 1000)
+        if answer is None:
+            # The "answer" records which intent produced it, to detect false hits
+            cache.put(agent, query, f"answer for {example['intent']}")
+            continue
+        if semantic.hits > before:
+            semantic_hits += 1
+        else:
+            exact_hits += 1
+        if answer != f"answer for {example['intent']}":
+            false_hits += 1
+            print(f"    ✗ {query!r} answered with {answer!r}")
+    hits = exact_hits + semantic_hits
+    overhead_ms = sum(lookups_ms)
+    return {
+        "threshold": threshold,
+        "hits": hits,
+        "exact_hits": exact_hits,
+        "semantic_hits": semantic_hits,
+        "false_hits": false_hits,
+        "hit_rate": hits / len(corpus),
+        "lookup_p50_ms": statistics.median(lookups_ms),
+        "saved_ms": hits * llm_ms - overhead_ms,
+        "baseline_ms": len(corpus) * llm_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic response cache replay")
+    parser.add_argument("--corpus", default=str(backend_dir / "dev" / "data" / "semantic_replay.jsonl"))
+    parser.add_argument("--thresholds", default="0.75,0.8,0.85,0.9")
+    parser.add_argument("--llm-ms", type=float, default=900.0, help="simulated agent round trip per miss")
+    parser.add_argument("--embedder", choices=("model", "words"), default="model")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    embed = model_embedder() if args.embedder == "model" else words_embedder()
+    embed([corpus[0]["query"]])  # load the model outside the timings
+
+    print(f"🚑 Replaying {len(corpus)} queries ({args.embedder} embedder, {args.llm_ms:.0f} ms per agent call)")
+    for threshold in (float(value) for value in args.thresholds.split(",")):
+        result = replay(corpus, embed, threshold, args.llm_ms)
+        print(f"  threshold {threshold:.2f}: hit rate {result['hit_rate']:5.1%} "
+              f"({result['exact_hits']} exact, {result['semantic_hits']} semantic), "
+              f"{result['false_hits']} false hits, lookup p50 {result['lookup_p50_ms']:.2f} ms, "
+              f"saved {result['saved_ms'] / 1000:.1f} s of {result['baseline_ms'] / 1000:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Startup-time and RSS benchmark for the conversation history service.
+
+Compares the old layout (orchestrator, vitals and triage agents each building
+their own ConversationHistory with its own SentenceTransformer and Chroma client)
+against the shared, lazily initialized instance. Each mode runs in a fresh
+subprocess so model loading and peak RSS are measured independently.
+
+Usage:
+    python dev/bench_shared_history.py
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+src_dir = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+AGENT_COUNT = 3
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_mode(mode, persist_directory):
+    """Build AGENT_COUNT history services in this process and report cost."""
+    from ems_copilot.infrastructure.database.conversation_history import (
+        ConversationHistory,
+        get_conversation_history,
+    )
+
+    baseline_rss = peak_rss_mb()
+    started = time.perf_counter()
+    histories = []
+    for _ in range(AGENT_COUNT):
+        if mode == "separate":
+            from sentence_transformers import SentenceTransformer
+            history = ConversationHistory(
+                persist_directory,
+                embedding_model=SentenceTransformer("all-MiniLM-L6-v2"),
+            )
+        else:
+            history = get_conversation_history(persist_directory)
+        history.warm_up()
+        histories.append(history)
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "mode": mode,
+        "startup_s": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_delta_mb": peak_rss_mb() - baseline_rss,
+        "embedding_models": len({id(h.embedding_model) for h in histories}),
+        "chroma_clients": len({id(h.client) for h in histories}),
+    }))
+
+
+def main():
+    if len(sys.argv) == 3:
+        run_mode(sys.argv[1], sys.argv[2])
+        return
+
+    results = []
+    for mode in ("separate", "shared"):
+        with tempfile.TemporaryDirectory() as persist_directory:
+            output = subprocess.run(
+                [sys.executable, __file__, mode, persist_directory],
+                check=True, capture_output=True, text=True,
+                env={**os.environ, "TOKENIZERS_PARALLELISM": "false"},
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"🚑 ConversationHistory startup for {AGENT_COUNT} agents")
+    print(f"{'mode':>9} {'startup s':>10} {'peak RSS MB':>12} {'models':>7} {'clients':>8}")
+    for r in results:
+        print(
+            f"{r['mode']:>9} {r['startup_s']:>10.2f} {r['peak_rss_mb']:>12.1f} "
+            f"{r['embedding_models']:>7} {r['chroma_clients']:>8}"
+        )
+    separate, shared = results
+    print(f"Startup speedup: {separate['startup_s'] / shared['startup_s']:.1f}x, "
+          f"RSS saved: {separate['peak_rss_mb'] - shared['peak_rss_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
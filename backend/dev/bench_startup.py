@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for the API server.
+
+Imports the API module in fresh subprocesses with `python -X importtime`,
+reports the import wall time and the slowest imports, and checks the import
+against a time budget and against the heavy SDKs (chromadb, torch, Firebase,
+Gemini, Text-to-Speech) that must only load in the lifespan hook or on first
+use. Exits with status 1 when a check fails, so it can gate a CI job.
+
+With --agents, the subprocess also builds the orchestrator (as the lifespan
+hook does) and reports how long that takes; this needs the usual Gemini and
+Firestore settings.
+
+Usage:
+    python dev/bench_startup.py [--module ems_copilot.infrastructure.api.main] [--runs 5]
+        [--budget-ms 1500] [--top 15] [--report importtime.txt] [--agents]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+src_dir = backend_dir / "src"
+sys.path.insert(0, str(src_dir))
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)\s*$")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+import_ms = (time.perf_counter() - started) * 1000
+from ems_copilot.infrastructure.utils.startup import loaded_heavy_modules
+result = {{"import_ms": import_ms, "heavy": loaded_heavy_modules()}}
+if {agents}:
+    started = time.perf_counter()
+    {module}.get_orchestrator()
+    result["agents_ms"] = (time.perf_counter() - started) * 1000
+    result["heavy_after_agents"] = loaded_heavy_modules()
+print(json.dumps(result))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output into (module, self_ms, cumulative_ms, depth) tuples.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us) / 1000, int(cumulative_us) / 1000, (len(indent) - 1) // 2))
+    return imports
+
+
+def format_report(imports, top):
+    """
+    The top-level imports and the individual modules that cost the most.
+    """
+    lines = [f"{'cumulative ms':>14}  top-level import"]
+    for module, _, cumulative_ms, _ in sorted((i for i in imports if i[3] == 0), key=lambda i: -i[2])[:top]:
+        lines.append(f"{cumulative_ms:>14.1f}  {module}")
+    lines.append("")
+    lines.append(f"{'self ms':>14}  module")
+    for module, self_ms, _, _ in sorted(imports, key=lambda i: -i[1])[:top]:
+        lines.append(f"{self_ms:>14.1f}  {module}")
+    return "\n".join(lines)
+
+
+def run_probe(module, agents):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, agents=agents)],
+        capture_output=True, text=True, env={**os.environ, "PYTHONPATH": str(src_dir)}
+    )
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(errors[-1] if errors else f"exit status {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), parse_importtime(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API server cold start benchmark")
+    parser.add_argument("--module", default="ems_copilot.infrastructure.api.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0,
+                        help="Fail when the median import time exceeds this")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--report", help="Also write the import-time report to this file")
+    parser.add_argument("--agents", action="store_true", help="Also time building the orchestrator")
+    args = parser.parse_args()
+
+    print(f"🚑 Cold start: import {args.module} ({args.runs} fresh processes)")
+    results = []
+    for _ in range(args.runs):
+        try:
+            result, imports = run_probe(args.module, args.agents)
+        except RuntimeError as e:
+            print(f"Import failed: {e}")
+            sys.exit(1)
+        results.append(result)
+
+    import_ms = statistics.median(result["import_ms"] for result in results)
+    importtime_total_ms = sum(cumulative_ms for _, _, cumulative_ms, depth in imports if depth == 0)
+    print(f"Import wall time: median {import_ms:.0f} ms, min {min(r['import_ms'] for r in results):.0f} ms, "
+          f"max {max(r['import_ms'] for r in results):.0f} ms")
+    print(f"Sum of top-level imports under -X importtime (last run, incl. site): {importtime_total_ms:.0f} ms")
+    if args.agents:
+        agents_ms = statistics.median(result["agents_ms"] for result in results)
+        print(f"Orchestrator build: median {agents_ms:.0f} ms "
+              f"(loads {', '.join(results[-1]['heavy_after_agents']) or 'no heavy modules'})")
+
+    report = format_report(imports, args.top)
+    print()
+    print(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(report + "\n")
+        print(f"\nReport written to {args.report}")
+
+    failures = []
+    heavy = results[-1]["heavy"]
+    if heavy:
+        failures.append(f"heavy modules imported at import time: {', '.join(heavy)}")
+    if import_ms > args.budget_ms:
+        failures.append(f"median import time {import_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print(f"✅ Import within {args.budget_ms:.0f} ms and no heavy modules loaded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-token benchmark for streamed answers.
+
+Sends the same query to /query (whole answer) and /query/stream (Server-Sent
+Events) on a running server and compares how long the medic waits before
+seeing any text: full-response latency vs. time to the first "delta" event.
+
+Usage:
+    python dev/bench_ttft.py --url http://127.0.0.1:8000 --requests 10
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import requests
+
+
+def time_full(session, url, query):
+    started = time.perf_counter()
+    response = session.post(f"{url}/query", json={"query": query}, timeout=120)
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+def time_stream(session, url, query):
+    """Returns (seconds to first delta, seconds to done, server-reported ttft ms)."""
+    started = time.perf_counter()
+    first_delta = None
+    server_ttft = None
+    with session.post(f"{url}/query/stream", json={"query": query}, stream=True, timeout=120) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event["type"] == "delta" and first_delta is None:
+                first_delta = time.perf_counter() - started
+            elif event["type"] == "done":
+                server_ttft = event.get("ttft_ms")
+    return first_delta, time.perf_counter() - started, server_ttft
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first token: /query vs /query/stream")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--query", default="Assess patient John Smith with chest pain")
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    full, first, done, server = [], [], [], []
+    for _ in range(args.requests):
+        full.append(time_full(session, args.url, args.query) * 1000)
+        first_delta, total, server_ttft = time_stream(session, args.url, args.query)
+        first.append(first_delta * 1000)
+        done.append(total * 1000)
+        if server_ttft is not None:
+            server.append(server_ttft)
+
+    print(f"🚑 {args.requests} requests: {args.query!r}")
+    print(f"{'/query full response':>28}: p50 {statistics.median(full):8.1f} ms")
+    print(f"{'/query/stream first delta':>28}: p50 {statistics.median(first):8.1f} ms")
+    print(f"{'/query/stream done':>28}: p50 {statistics.median(done):8.1f} ms")
+    if server:
+        print(f"{'server-side ttft':>28}: p50 {statistics.median(server):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Insert and query latency benchmark for the vector store backends.
+
+For each size in --sizes, inserts random unit vectors (384 dimensions, like
+all-MiniLM-L6-v2) in batches and times top-5 queries against:
+
+    brute   local backend, memory-mapped matrix scanned with one dot product
+    hnsw    local backend with its HNSW index (requires hnswlib)
+    chroma  Chroma persistent client (requires chromadb)
+
+Each run uses a fresh temporary directory. At 1M vectors the matrix alone
+is ~1.5 GB and the HNSW and Chroma builds take minutes.
+
+Usage:
+    python dev/bench_vector_store.py [--sizes 1000,100000,1000000] [--backends brute,hnsw,chroma]
+        [--dimensions 384] [--queries 200] [--batch 5000]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir / "src"))
+
+from ems_copilot.infrastructure.database.local_vector_store import LocalVectorStore
+from ems_copilot.infrastructure.database.vector_store import ChromaVectorStore
+
+
+def unit_vectors(rng, count, dimensions):
+    vectors = rng.standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def open_collection(backend, directory, size):
+    if backend == "chroma":
+        return ChromaVectorStore(directory).get_or_create_collection("bench")
+    threshold = 0 if backend == "hnsw" else size + 1
+    return LocalVectorStore(directory, hnsw_threshold=threshold).get_or_create_collection("bench")
+
+
+def run(backend, size, args, rng):
+    with tempfile.TemporaryDirectory() as directory:
+        collection = open_collection(backend, directory, size)
+        started = time.perf_counter()
+        for start in range(0, size, args.batch):
+            count = min(args.batch, size - start)
+            collection.add(
+                ids=[f"id{i}" for i in range(start, start + count)],
+                embeddings=unit_vectors(rng, count, args.dimensions),
+                metadatas=[{"session_id": f"s{i % 100}"} for i in range(start, start + count)]
+            )
+        insert_s = time.perf_counter() - started
+
+        queries = unit_vectors(rng, args.queries, args.dimensions)
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            collection.query(query_embeddings=[query.tolist()], n_results=5)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return size / insert_s, statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store backend benchmark")
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--backends", default="brute,hnsw,chroma")
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"🚑 Vector store benchmark ({args.dimensions} dims, top-5 of {args.queries} queries)")
+    print(f"{'backend':>8} {'vectors':>10} {'insert vec/s':>13} {'query p50 ms':>13} {'query p99 ms':>13}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        for backend in args.backends.split(","):
+            try:
+                rate, p50, p99 = run(backend, size, args, rng)
+            except ImportError as e:
+                print(f"{backend:>8} {size:>10} skipped ({e})")
+                continue
+            print(f"{backend:>8} {size:>10} {rate:>13,.0f} {p50:>13.3f} {p99:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the local vitals parser.
+
+Parses every utterance in dev/data/vitals_golden.jsonl repeatedly and reports
+the per-utterance latency and how many utterances skip the Gemini call.
+
+Usage:
+    python dev/bench_vitals_parser.py --iterations 1000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+src_dir = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from ems_copilot.domain.services.vitals_parser import VitalsParser
+
+GOLDEN_PATH = Path(__file__).resolve().parent / "data" / "vitals_golden.jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local vitals parser latency")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    with open(GOLDEN_PATH) as f:
+        utterances = [json.loads(line)["input"] for line in f if line.strip()]
+
+    vitals_parser = VitalsParser()
+    resolved = sum(vitals_parser.parse(text).fully_resolved for text in utterances)
+
+    latencies = []
+    for _ in range(args.iterations):
+        for text in utterances:
+            started = time.perf_counter()
+            vitals_parser.parse(text)
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+
+    latencies.sort()
+    print(f"🚑 Local vitals parser ({len(utterances)} utterances x {args.iterations})")
+    print(f"Resolved locally: {resolved}/{len(utterances)}")
+    print(f"p50 {statistics.median(latencies):.1f}us  "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:.1f}us  "
+          f"max {latencies[-1]:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Export the history embedding model to ONNX, quantize it to int8 and check parity.
+
+Writes model.onnx, model_quantized.onnx (dynamic int8 weights) and
+tokenizer.json to --out, then embeds a sample corpus with both the PyTorch
+SentenceTransformer and the quantized model and compares them. Exits with
+status 1 if the mean cosine similarity or the top-k neighbor overlap falls
+below the given minimums. Point EMBEDDING_ONNX_DIR at --out and set
+EMBEDDING_BACKEND=onnx to serve from the export.
+
+Needs torch, transformers and sentence-transformers (for the export and the
+reference) plus onnxruntime and tokenizers; only the last two are needed at
+serving time.
+
+Usage:
+    python dev/export_onnx_embedding.py [--model all-MiniLM-L6-v2] [--out models/all-MiniLM-L6-v2-onnx-int8]
+        [--corpus dev/data/semantic_replay.jsonl] [--min-cosine 0.98] [--min-overlap 0.8]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir / "src"))
+
+from ems_copilot.infrastructure.database.embedding_model import (
+    DEFAULT_EMBEDDING_MODEL, OnnxEmbeddingModel, embedding_parity
+)
+
+# Field phrasing beyond the replay corpus: vitals, triage and history lookups
+SAMPLE_TEXTS = [
+    "Patient John Smith has O2 of 93 and sugar of 120",
+    "Hank Smith heart rate 110, BP 140/90",
+    "patient sustained head trauma to the back of the head",
+    "what's wrong with the patient",
+    "assess patient, chest pain radiating to left arm, diaphoretic",
+    "blood pressure dropping 88/50, HR 130, suspect hemorrhagic shock",
+    "GCS 9, pupils unequal, possible TBI",
+    "pediatric patient, 4 years old, febrile seizure, now postictal",
+    "User: O2 dropped to 89 for Jane Doe\nAgent: Recorded O2 89 for Jane Doe.",
+    "how far is the closest level 1 trauma center",
+]
+
+
+def load_corpus(path):
+    texts = list(SAMPLE_TEXTS)
+    if path and Path(path).exists():
+        with open(path) as f:
+            texts.extend(json.loads(line)["query"] for line in f if line.strip())
+    return texts
+
+
+def export(model_name, out_dir, opset):
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(repo)
+    tokenizer.save_pretrained(out_dir)
+    model = AutoModel.from_pretrained(repo).eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(model, tuple(sample[name] for name in names), str(out_dir / "model.onnx"),
+                          input_names=names, output_names=["last_hidden_state"], dynamic_axes=axes,
+                          opset_version=opset)
+    quantize_dynamic(str(out_dir / "model.onnx"), str(out_dir / "model_quantized.onnx"), weight_type=QuantType.QInt8)
+    for name in ("model.onnx", "model_quantized.onnx"):
+        print(f"  {name}: {(out_dir / name).stat().st_size / 1e6:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and check the int8 ONNX embedding model")
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--out", default=None, help="defaults to models/<model>-onnx-int8")
+    parser.add_argument("--corpus", default=str(backend_dir / "dev" / "data" / "semantic_replay.jsonl"))
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    parser.add_argument("--min-overlap", type=float, default=0.8)
+    parser.add_argument("--skip-export", action="store_true", help="only run the parity check")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out or Path("models") / f"{args.model}-onnx-int8")
+    if not args.skip_export:
+        print(f"🚑 Exporting {args.model} to {out_dir}")
+        export(args.model, out_dir, args.opset)
+
+    from sentence_transformers import SentenceTransformer
+    texts = load_corpus(args.corpus)
+    reference = SentenceTransformer(args.model).encode(texts, batch_size=32)
+    candidate = OnnxEmbeddingModel(str(out_dir)).encode(texts, batch_size=32)
+    parity = embedding_parity(reference, candidate, k=5)
+    print(f"Parity over {len(texts)} texts: mean cosine {parity['mean_cosine']:.4f}, "
+          f"min cosine {parity['min_cosine']:.4f}, top-5 neighbor overlap {parity['topk_overlap']:.2%}")
+    if parity["mean_cosine"] < args.min_cosine or parity["topk_overlap"] < args.min_overlap:
+        print("❌ Quantized embeddings drift too far from the PyTorch model")
+        sys.exit(1)
+    print("✅ Quantized embeddings match the PyTorch model")
+
+
+if __name__ == "__main__":
+    main()
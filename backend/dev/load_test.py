@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Load test for the /query endpoint.
+
+Fires the same query at a running server with increasing concurrency and reports
+throughput, so you can check that concurrent requests actually overlap
+(throughput should scale with concurrency until Gemini or the I/O pool saturates).
+
+Point GEMINI_BASE_URL at a fake Gemini server (see test_gemini_client_pool.py)
+to measure the server itself rather than upstream latency.
+
+Usage:
+    python dev/load_test.py --url http://127.0.0.1:8000 --requests 64 --concurrency 1 4 16
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def run_level(session_factory, url, query, total_requests, concurrency):
+    """Send total_requests queries with the given concurrency and time them."""
+    latencies = []
+    errors = 0
+
+    def one_request(_):
+        session = session_factory()
+        started = time.perf_counter()
+        response = session.post(f"{url}/query", json={"query": query}, timeout=120)
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency, status_code in executor.map(one_request, range(total_requests)):
+            latencies.append(latency)
+            if status_code != 200:
+                errors += 1
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "wall_s": wall,
+        "throughput_rps": total_requests / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency load test for /query")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--query", default="Assess patient John Smith with chest pain")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    sessions = {}
+
+    def session_factory():
+        # One keep-alive session per worker thread
+        key = threading.get_ident()
+        if key not in sessions:
+            sessions[key] = requests.Session()
+        return sessions[key]
+
+    print(f"🚑 Load testing {args.url}/query with {args.requests} requests per level")
+    print(f"{'conc':>5} {'rps':>8} {'speedup':>8} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+
+    baseline = None
+    for concurrency in args.concurrency:
+        result = run_level(session_factory, args.url, args.query, args.requests, concurrency)
+        if baseline is None:
+            baseline = result["throughput_rps"]
+        print(
+            f"{result['concurrency']:>5} {result['throughput_rps']:>8.2f} "
+            f"{result['throughput_rps'] / baseline:>7.2f}x {result['p50_ms']:>9.1f} "
+            f"{result['p95_ms']:>9.1f} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
-import requests
 import json
-from google import genai
-from google.genai import types
 import os
+from ems_copilot.infrastructure.utils.gemini_client_pool import get_gemini_client_pool
+from ems_copilot.infrastructure.utils.stream_metrics import StreamTimer
 
 
 class BaseAgent:
@@ -18,22 +17,23 @@ class BaseAgent:
         self.gemini_api_key = gemini_api_key
         self.gemini_model = os.getenv("GEMINI_MODEL")
         os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "false"
+        # Shared, process-wide client pool so agents reuse warm HTTP connections
+        self.client_pool = get_gemini_client_pool(gemini_api_key)
 
-    def call_gemini(self, user_prompt=None, system_prompt=None, functions=None, return_text=False):
+    def build_gemini_request(self, user_prompt=None, system_prompt=None, functions=None):
         """
-        Call the Gemini API with optional user prompt, system prompt, and functions.
+        Build the contents and config for a Gemini API call.
 
         Args:
             user_prompt (str): The user prompt to include in the API call.
             system_prompt (str): The system prompt to include in the API call.
             functions (list): A list of function declarations to include in the API call.
-            return_text (bool): If True, return parsed text content instead of raw response.
 
         Returns:
-            dict or str: The response from the Gemini API or parsed text content.
+            tuple: (contents, config) where config is None when no functions are given.
         """
-        # Initialize the client
-        client = genai.Client(api_key=self.gemini_api_key)
+        # Imported on first use so importing the agents does not load the SDK
+        from google.genai import types
 
         # Setup config and tools only if functions are provided
         config = None
@@ -70,19 +70,31 @@ class BaseAgent:
                 )
             )
 
+        return contents, config
+
+    def call_gemini(self, user_prompt=None, system_prompt=None, functions=None, return_text=False):
+        """
+        Call the Gemini API with optional user prompt, system prompt, and functions.
+
+        Args:
+            user_prompt (str): The user prompt to include in the API call.
+            system_prompt (str): The system prompt to include in the API call.
+            functions (list): A list of function declarations to include in the API call.
+            return_text (bool): If True, return parsed text content instead of raw response.
+
+        Returns:
+            dict or str: The response from the Gemini API or parsed text content.
+        """
+        contents, config = self.build_gemini_request(user_prompt, system_prompt, functions)
+
         # Make the API call
         try:
-            if config:
+            with self.client_pool.client() as client:
                 response = client.models.generate_content(
                     model=self.gemini_model,
                     config=config,
                     contents=contents
                 )
-            else:
-                response = client.models.generate_content(
-                    model=self.gemini_model,
-                    contents=contents
-                )
 
             print("Response received from Gemini API.")
             # Print the response
@@ -98,6 +110,105 @@ class BaseAgent:
             print(f"Error calling Gemini API: {e}")
             return str(e)
 
+    async def call_gemini_async(self, user_prompt=None, system_prompt=None, functions=None, return_text=False):
+        """
+        Async version of call_gemini. Uses the non-blocking genai client so the
+        event loop keeps serving other requests while Gemini is generating.
+
+        Args:
+            user_prompt (str): The user prompt to include in the API call.
+            system_prompt (str): The system prompt to include in the API call.
+            functions (list): A list of function declarations to include in the API call.
+            return_text (bool): If True, return parsed text content instead of raw response.
+
+        Returns:
+            dict or str: The response from the Gemini API or parsed text content.
+        """
+        contents, config = self.build_gemini_request(user_prompt, system_prompt, functions)
+
+        try:
+            async with self.client_pool.async_client() as client:
+                response = await client.aio.models.generate_content(
+                    model=self.gemini_model,
+                    config=config,
+                    contents=contents
+                )
+
+            print("Response received from Gemini API.")
+
+            if return_text:
+                return self.parse_gemini_response(response)
+            else:
+                return response
+
+        except Exception as e:
+            print(f"Error calling Gemini API: {e}")
+            return str(e)
+
+    def stream_gemini(self, user_prompt=None, system_prompt=None):
+        """
+        Stream a text completion from Gemini, yielding text chunks as they arrive.
+        Time to first token is recorded under the agent's name.
+
+        Args:
+            user_prompt (str): The user prompt to include in the API call.
+            system_prompt (str): The system prompt to include in the API call.
+
+        Yields:
+            str: Text chunks of the completion
+        """
+        contents, config = self.build_gemini_request(user_prompt, system_prompt)
+        timer = StreamTimer(getattr(self, "name", type(self).__name__))
+        error = False
+        try:
+            with self.client_pool.client() as client:
+                for chunk in client.models.generate_content_stream(
+                    model=self.gemini_model,
+                    config=config,
+                    contents=contents
+                ):
+                    text = chunk.text
+                    timer.mark(text)
+                    if text:
+                        yield text
+        except Exception as e:
+            error = True
+            print(f"Error streaming from Gemini API: {e}")
+            yield f"Error calling Gemini API: {e}"
+        finally:
+            measurement = timer.finish(error)
+            print(f"Gemini stream finished: {measurement}")
+
+    async def stream_gemini_async(self, user_prompt=None, system_prompt=None):
+        """
+        Async version of stream_gemini using the non-blocking genai client.
+
+        Yields:
+            str: Text chunks of the completion
+        """
+        contents, config = self.build_gemini_request(user_prompt, system_prompt)
+        timer = StreamTimer(getattr(self, "name", type(self).__name__))
+        error = False
+        try:
+            async with self.client_pool.async_client() as client:
+                stream = await client.aio.models.generate_content_stream(
+                    model=self.gemini_model,
+                    config=config,
+                    contents=contents
+                )
+                async for chunk in stream:
+                    text = chunk.text
+                    timer.mark(text)
+                    if text:
+                        yield text
+        except Exception as e:
+            error = True
+            print(f"Error streaming from Gemini API: {e}")
+            yield f"Error calling Gemini API: {e}"
+        finally:
+            measurement = timer.finish(error)
+            print(f"Gemini stream finished: {measurement}")
+
     def parse_gemini_response(self, response):
         """
         Parse a Gemini response object and extract the text content.
@@ -0,0 +1,197 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# NEWS2-style bands per metric: a reading v scores SCORES[i] where i is the
+# number of upper-inclusive EDGES below v (np.searchsorted(..., side="left")).
+# Temperature is stored in Fahrenheit and converted to Celsius before scoring.
+NEWS2_BANDS = {
+    "respiratory_rate": ([8, 11, 20, 24], [3, 1, 0, 2, 3]),
+    "spo2": ([91, 93, 95], [3, 2, 1, 0]),
+    "bp_systolic": ([90, 100, 110, 219], [3, 2, 1, 0, 3]),
+    "heart_rate": ([40, 50, 90, 110, 130], [3, 1, 0, 1, 2, 3]),
+    "temperature": ([35.0, 36.0, 38.0, 39.0], [3, 1, 0, 1, 2]),
+}
+SCORED_METRICS = list(NEWS2_BANDS)
+
+# Short labels for prompt summaries
+_SHORT_LABELS = {
+    "respiratory_rate": "RR",
+    "spo2": "SpO2",
+    "bp_systolic": "SBP",
+    "heart_rate": "HR",
+    "temperature": "Temp",
+}
+
+
+class PatientRiskSummary:
+    """
+    Early-warning assessment for one patient.
+    """
+
+    def __init__(self, patient_name: str, score: int, risk: str, components: Dict[str, int],
+                 crossings: List[str], rates: Dict[str, float], missing: List[str]):
+        """
+        Args:
+            patient_name: Patient the assessment is for
+            score: Aggregate NEWS2-style score over the metrics that were available
+            risk: 'low', 'low-medium', 'medium' or 'high'
+            components: Per-metric band score
+            crossings: Metrics whose latest reading moved into a worse band
+            rates: Per-metric rate of change (units per minute) between the last two readings
+            missing: Scored metrics with no reading
+        """
+        self.patient_name = patient_name
+        self.score = score
+        self.risk = risk
+        self.components = components
+        self.crossings = crossings
+        self.rates = rates
+        self.missing = missing
+
+    def to_dict(self):
+        return {
+            "patient_name": self.patient_name,
+            "score": self.score,
+            "risk": self.risk,
+            "components": self.components,
+            "crossings": self.crossings,
+            "rates": self.rates,
+            "missing": self.missing,
+        }
+
+    def summary_text(self) -> str:
+        """
+        One compact line for the triage prompt.
+        """
+        parts = [f"Early warning score {self.score} ({self.risk} risk)"]
+        scored = [f"{_SHORT_LABELS[metric]} {score}" for metric, score in self.components.items() if score]
+        if scored:
+            parts.append("from " + ", ".join(scored))
+        if self.crossings:
+            parts.append("worsened: " + ", ".join(_SHORT_LABELS[metric] for metric in self.crossings))
+        if self.rates:
+            parts.append("rate: " + ", ".join(f"{_SHORT_LABELS[metric]} {rate:+.1f}/min"
+                                              for metric, rate in self.rates.items()))
+        if self.missing:
+            parts.append("not recorded: " + ", ".join(_SHORT_LABELS[metric] for metric in self.missing))
+        return "; ".join(parts)
+
+    def __str__(self) -> str:
+        return f"PatientRiskSummary(patient_name='{self.patient_name}', score={self.score}, risk='{self.risk}')"
+
+
+class DeteriorationScorer:
+    """
+    Vectorized NEWS2-style early-warning scoring over many patients at once.
+
+    Works on the dense latest/previous matrices from
+    VitalsTimeSeriesStore.snapshot(SCORED_METRICS): band scores, aggregate
+    scores, threshold crossings and rates of change are computed for every
+    patient in one pass of array operations.
+    """
+
+    def __init__(self, min_rate_interval_min: float = 0.5, rate_threshold: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            min_rate_interval_min: Readings closer together than this (minutes) are not used for rates
+            rate_threshold: Per-metric |rate| (units/min) worth reporting; smaller changes are omitted
+        """
+        self.min_rate_interval_min = min_rate_interval_min
+        self.rate_threshold = rate_threshold or {
+            "respiratory_rate": 0.5,
+            "spo2": 0.3,
+            "bp_systolic": 1.0,
+            "heart_rate": 1.0,
+            "temperature": 0.05,
+        }
+
+    @staticmethod
+    def band_scores(values: np.ndarray) -> np.ndarray:
+        """
+        Per-metric band scores for a (n_patients, len(SCORED_METRICS)) matrix.
+        Missing (NaN) readings score 0.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        scores = np.zeros(values.shape, dtype=np.int8)
+        for column, metric in enumerate(SCORED_METRICS):
+            edges, band_score = NEWS2_BANDS[metric]
+            readings = values[:, column]
+            if metric == "temperature":
+                readings = (readings - 32.0) * 5.0 / 9.0
+            present = ~np.isnan(readings)
+            bands = np.searchsorted(edges, readings[present], side="left")
+            scores[present, column] = np.asarray(band_score, dtype=np.int8)[bands]
+        return scores
+
+    @staticmethod
+    def risk_levels(totals: np.ndarray, components: np.ndarray) -> np.ndarray:
+        """
+        NEWS2 clinical risk: high >= 7, medium 5-6, low-medium for any single 3, else low.
+        """
+        return np.select(
+            [totals >= 7, totals >= 5, (components >= 3).any(axis=1)],
+            ["high", "medium", "low-medium"],
+            default="low"
+        )
+
+    def assess(self, snapshot: Dict, limit: Optional[int] = None) -> List[PatientRiskSummary]:
+        """
+        Score every patient in a snapshot.
+
+        Args:
+            snapshot: VitalsTimeSeriesStore.snapshot(SCORED_METRICS)
+            limit: Only build summaries for the limit highest-scoring patients
+
+        Returns:
+            PatientRiskSummary per patient, highest score first
+        """
+        names = snapshot["patients"]
+        if not names:
+            return []
+        latest, previous = snapshot["latest"], snapshot["previous"]
+
+        components = self.band_scores(latest)
+        previous_components = self.band_scores(previous)
+        totals = components.sum(axis=1, dtype=np.int32)
+        risks = self.risk_levels(totals, components)
+
+        # Worse band than the previous reading (only where both readings exist)
+        crossed = (components > previous_components) & ~np.isnan(previous)
+
+        minutes = (snapshot["latest_time"] - snapshot["previous_time"]) / 60.0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates = np.where(minutes >= self.min_rate_interval_min, (latest - previous) / minutes, np.nan)
+        thresholds = np.array([self.rate_threshold[metric] for metric in SCORED_METRICS])
+        notable = ~np.isnan(rates) & (np.abs(np.nan_to_num(rates)) >= thresholds)
+        missing = np.isnan(latest)
+
+        order = np.argsort(-totals, kind="stable")[:limit]
+        # Plain lists make the per-patient packaging below much cheaper than numpy scalar indexing
+        components, crossed, notable, missing = (
+            array[order].tolist() for array in (components, crossed, notable, missing)
+        )
+        rates = np.round(rates[order], 2).tolist()
+        totals, risks = totals[order].tolist(), risks[order].tolist()
+
+        summaries = []
+        for i, row in enumerate(order.tolist()):
+            metrics = list(zip(SCORED_METRICS, components[i], crossed[i], notable[i], missing[i], rates[i]))
+            summaries.append(PatientRiskSummary(
+                patient_name=names[row],
+                score=totals[i],
+                risk=risks[i],
+                components={metric: score for metric, score, _, _, absent, _ in metrics if not absent},
+                crossings=[metric for metric, _, worse, _, _, _ in metrics if worse],
+                rates={metric: rate for metric, _, _, shown, _, rate in metrics if shown},
+                missing=[metric for metric, _, _, _, absent, _ in metrics if absent],
+            ))
+        return summaries
+
+    def assess_store(self, store, patient_names: Optional[List[str]] = None,
+                     limit: Optional[int] = None) -> List[PatientRiskSummary]:
+        """
+        Score the active patients of a VitalsTimeSeriesStore (or only patient_names).
+        """
+        return self.assess(store.snapshot(SCORED_METRICS, patient_names), limit)
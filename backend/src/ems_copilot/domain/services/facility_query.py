@@ -0,0 +1,84 @@
+import re
+from typing import List, Optional
+
+
+# Phrases that ask for a receiving facility rather than a route to a known place
+_DESTINATION = re.compile(
+    r"\b(?:nearest|closest|nearby|near me|close by|where can i take|where should i take|which hospital)\b"
+)
+_FACILITY = re.compile(
+    r"\b(?:hospitals?|trauma|centers?|centres?|er|ed|emergency(?: room| department)?|facilit(?:y|ies)|units?|"
+    r"stroke|cath lab|pci|burn|pediatric|children'?s|peds)\b"
+)
+
+# Capability -> phrases that request it
+_CAPABILITY_PATTERNS = [
+    ("trauma", re.compile(r"\btrauma\b")),
+    ("stroke", re.compile(r"\b(?:stroke|cva|tpa|thrombectomy)\b")),
+    ("cardiac", re.compile(r"\b(?:cardiac|cath(?:eterization)? lab|pci|stemi|heart)\b")),
+    ("burn", re.compile(r"\bburns?\b")),
+    ("pediatric", re.compile(r"\b(?:pediatric|paediatric|children'?s|kids|peds)\b")),
+    ("obstetrics", re.compile(r"\b(?:obstetric(?:s)?|ob|labor|labour|l&d|maternity)\b")),
+    ("psychiatric", re.compile(r"\b(?:psych(?:iatric)?|behavioral health|mental health)\b")),
+]
+_TRAUMA_LEVEL = re.compile(r"\blevel\s*(1|2|3|4|5|i{1,3}|iv|v|one|two|three)\b")
+_LEVELS = {"1": 1, "2": 2, "3": 3, "4": 4, "5": 5, "i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5,
+           "one": 1, "two": 2, "three": 3}
+_RADIUS = re.compile(r"\bwithin\s+(\d+(?:\.\d+)?)\s*(km|kilometers?|kilometres?|mi|miles?)\b")
+_COUNT = re.compile(r"\b(\d+|two|three|four|five)\s+(?:nearest|closest)\b")
+_COUNTS = {"two": 2, "three": 3, "four": 4, "five": 5}
+
+
+class FacilityQuery:
+    """
+    A structured "nearest facility" request extracted from a GPS question.
+    """
+
+    def __init__(self, capabilities: List[str], max_trauma_level: Optional[int] = None,
+                 k: int = 3, radius_km: Optional[float] = None):
+        """
+        Args:
+            capabilities: Capabilities every facility must have
+            max_trauma_level: Trauma level required (1 is best), if any
+            k: Number of facilities to return
+            radius_km: Only facilities within this distance, if given
+        """
+        self.capabilities = capabilities
+        self.max_trauma_level = max_trauma_level
+        self.k = k
+        self.radius_km = radius_km
+
+    def __str__(self) -> str:
+        return (f"FacilityQuery(capabilities={self.capabilities}, max_trauma_level={self.max_trauma_level}, "
+                f"k={self.k}, radius_km={self.radius_km})")
+
+
+def parse_facility_query(question: str) -> Optional[FacilityQuery]:
+    """
+    Parse a GPS question into a FacilityQuery, or None if it is not a facility search
+    (e.g. directions to a named place).
+    """
+    text = (question or "").lower()
+    if not (_DESTINATION.search(text) and _FACILITY.search(text)):
+        return None
+
+    capabilities = [capability for capability, pattern in _CAPABILITY_PATTERNS if pattern.search(text)]
+    max_trauma_level = None
+    level = _TRAUMA_LEVEL.search(text)
+    if level:
+        max_trauma_level = _LEVELS[level.group(1)]
+        if "trauma" not in capabilities:
+            capabilities.insert(0, "trauma")
+
+    radius_km = None
+    radius = _RADIUS.search(text)
+    if radius:
+        radius_km = float(radius.group(1))
+        if radius.group(2).startswith("mi"):
+            radius_km *= 1.609344
+
+    k = 3
+    count = _COUNT.search(text)
+    if count:
+        k = int(_COUNTS.get(count.group(1), count.group(1)))
+    return FacilityQuery(capabilities, max_trauma_level, k=max(1, min(k, 10)), radius_km=radius_km)
@@ -1,13 +1,16 @@
 import sys
 import os
 import json
-import requests
+import re
 from pathlib import Path
 curr_dir = Path(os.getcwd())
 root_dir = Path(curr_dir.parents[0])
 sys.path.append(str(root_dir))
 
 from ems_copilot.domain.services.base_agent import BaseAgent
+from ems_copilot.domain.services.facility_query import parse_facility_query
+from ems_copilot.infrastructure.database.facility_index import get_facility_index
+from ems_copilot.infrastructure.utils.location_provider import get_location_provider
 
 
 class GPSAgent(BaseAgent):
@@ -16,43 +19,145 @@ class GPSAgent(BaseAgent):
     Inherits from BaseAgent to handle Gemini API calls.
     """
 
-    def __init__(self, gemini_api_key, google_maps_api_key):
+    def __init__(self, gemini_api_key, google_maps_api_key, location_provider=None, facility_index=None):
         """
         Initialize the GPSAgent with the API key and Gemini API URL.
+        The current location comes from location_provider (the shared cached
+        provider by default), so most questions skip the geolocation round trip.
+        "Nearest trauma center"-style questions are answered from facility_index
+        (the FACILITIES_PATH dataset by default) and Gemini only phrases the result.
         """
         super().__init__(gemini_api_key)  # Initialize BaseAgent
         self.name = "GPSAgent"
         self.description = "An agent that provides GPS-related functionalities."
         self.gemini_api_key = gemini_api_key
         self.google_maps_api_key = google_maps_api_key
+        self.location_provider = location_provider or get_location_provider(google_maps_api_key)
+        self.facility_index = facility_index if facility_index is not None else get_facility_index()
         self.system_prompt = "You are a GPS agent. You can provide directions, ETA, and address" \
         "You will be given a question, you will need to answer it given the info you are given in the prompt." \
         "Be concise with your answer. No need to remind this user that you are a non emergency agent."
-    def call_gps(self, question):
+    def call_gps(self, question, current_location=None, session_id=None):
         """
         Orchestrate the interaction by analyzing the user prompt and routing it to the appropriate agent.
+        current_location is looked up for session_id (the crew/unit asking) when not given.
         """
         # Define the system prompt
 
-        current_location = self.get_current_location()
+        if current_location is None:
+            current_location = self.get_current_location(session_id)
         # Call the Gemini API with functions
-        gps_user_prompt = f"Current location: {current_location}. Question: {question}"
+        gps_user_prompt = self.build_gps_prompt(question, current_location)
         print(f"GPS User Prompt: {gps_user_prompt}")
         response = self.call_gemini(user_prompt=gps_user_prompt, system_prompt=self.system_prompt, functions=None, return_text=True)
         return response
 
-    def get_current_location(self):
-        url = f"https://www.googleapis.com/geolocation/v1/geolocate?key={self.google_maps_api_key}"
-        response = requests.post(url)
-        
-        if response.status_code == 200:
-
-            location = response.json()['location']
-            lat = location['lat']
-            lng = location['lng']
-            response_str = f"Latitude: {lat}, Longitude: {lng}"
-            return response_str
-        else:
-            raise Exception(f"Error: {response.text}")
-
-    
\ No newline at end of file
+    async def call_gps_async(self, question, current_location=None, session_id=None):
+        """
+        Async version of call_gps. A geolocation lookup, when needed, runs in the I/O executor.
+        """
+        if current_location is None:
+            current_location = await self.get_current_location_async(session_id)
+        gps_user_prompt = self.build_gps_prompt(question, current_location)
+        print(f"GPS User Prompt: {gps_user_prompt}")
+        return await self.call_gemini_async(user_prompt=gps_user_prompt, system_prompt=self.system_prompt, functions=None, return_text=True)
+
+    async def call_gps_stream(self, question, current_location=None, session_id=None):
+        """
+        Streaming version of call_gps_async, yielding the answer in text chunks.
+        """
+        if current_location is None:
+            current_location = await self.get_current_location_async(session_id)
+        gps_user_prompt = self.build_gps_prompt(question, current_location)
+        print(f"GPS User Prompt: {gps_user_prompt}")
+        async for text in self.stream_gemini_async(user_prompt=gps_user_prompt, system_prompt=self.system_prompt):
+            yield text
+
+    def build_gps_prompt(self, question, current_location):
+        """
+        GPS prompt for a question. Facility searches are answered from the local
+        index and the matches are handed to Gemini to phrase, not to search.
+        """
+        prompt = f"Current location: {current_location}. Question: {question}"
+        facilities = self.find_facilities(question, current_location)
+        if facilities is None:
+            return prompt
+        if not facilities:
+            return (f"{prompt}\n\nThe local facility database has no facility matching this request "
+                    "near the current location. Say so briefly.")
+        lines = [f"{number}. {facility.describe()} - {distance:.1f} km ({distance / 1.609344:.1f} mi) straight-line"
+                 for number, (facility, distance) in enumerate(facilities, start=1)]
+        return (f"{prompt}\n\nMatching facilities from the local facility database, closest first:\n"
+                + "\n".join(lines)
+                + "\nAnswer using only these facilities and distances; do not suggest others.")
+
+    def find_facilities(self, question, current_location):
+        """
+        Look up the facilities a question asks for.
+
+        Returns:
+            List of (Facility, distance_km), or None if the question is not a
+            facility search or no facility dataset is loaded
+        """
+        if self.facility_index is None:
+            return None
+        request = parse_facility_query(question)
+        coordinates = self.parse_coordinates(current_location)
+        if request is None or coordinates is None:
+            return None
+        print(f"Facility search: {request}")
+        if request.radius_km is not None:
+            matches = self.facility_index.within(*coordinates, request.radius_km, request.capabilities,
+                                                 request.max_trauma_level)
+            return matches[:request.k]
+        return self.facility_index.nearest(*coordinates, k=request.k, capabilities=request.capabilities,
+                                           max_trauma_level=request.max_trauma_level)
+
+    @staticmethod
+    def parse_coordinates(current_location):
+        """
+        (latitude, longitude) from a "Latitude: x, Longitude: y" location, or None.
+        """
+        coordinates = re.findall(r"-?\d+(?:\.\d+)?", str(current_location or ""))
+        if len(coordinates) < 2:
+            return None
+        return float(coordinates[0]), float(coordinates[1])
+
+    def get_current_location(self, session_id=None):
+        """
+        Current location of a session's unit as "Latitude: x, Longitude: y": its
+        own device-pushed fix while fresh, otherwise the geolocation lookup.
+        """
+        return str(self.location_provider.locate(session_id))
+
+    async def get_current_location_async(self, session_id=None):
+        """
+        Async version of get_current_location.
+        """
+        return str(await self.location_provider.locate_async(session_id))
+
+    @staticmethod
+    def location_cell(current_location, precision=2):
+        """
+        Coarse grid cell for a "Latitude: x, Longitude: y" location (2 decimals is
+        roughly 1 km), so answers can be shared while the unit stays nearby.
+        """
+        coordinates = GPSAgent.parse_coordinates(current_location)
+        if coordinates is None:
+            return str(current_location or "")
+        return ",".join(f"{value:.{precision}f}" for value in coordinates)
+
+    def location_context(self, session_id=None):
+        """
+        (grid cell, current location) for a session's unit, as the response cache
+        context for its GPS answers.
+        """
+        current_location = self.get_current_location(session_id)
+        return self.location_cell(current_location), current_location
+
+    async def location_context_async(self, session_id=None):
+        """
+        Async version of location_context.
+        """
+        current_location = await self.get_current_location_async(session_id)
+        return self.location_cell(current_location), current_location
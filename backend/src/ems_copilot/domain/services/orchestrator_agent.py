@@ -1,10 +1,94 @@
 import os
 import json
 from ems_copilot.domain.services.base_agent import BaseAgent
+from ems_copilot.domain.services.facility_query import parse_facility_query
 from ems_copilot.domain.services.gps_agent import GPSAgent
 from ems_copilot.domain.services.vitals_agent import VitalsAgent
 from ems_copilot.domain.services.triage_agent import TriageAgent
-from ems_copilot.infrastructure.database.conversation_history import ConversationHistory
+from ems_copilot.domain.services.query_router import QueryRouter
+from ems_copilot.infrastructure.database.conversation_history import get_conversation_history
+from ems_copilot.infrastructure.database.history_filters import normalize_patient
+from ems_copilot.infrastructure.database.session_store import DEFAULT_SESSION, get_session_store
+from ems_copilot.infrastructure.utils.response_cache import get_response_cache
+from ems_copilot.infrastructure.utils.stream_metrics import StreamTimer
+
+
+ORCHESTRATOR_FUNCTIONS = [
+    {
+        "name": "gps_agent",
+        "description": "Get directions and ETA to a location. Find locations that best match description to user query. This agent has access to current user locaiton.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "question": {
+                    "type": "string",
+                    "description": "The destination or description of destination a user would like to get to."
+                }
+            },
+            "required": ["question"]
+        }
+    },
+    {
+        "name": "weather_agent",
+        "description": "Get current weather for a location.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "The location to get weather for."
+                }
+            },
+            "required": ["location"]
+        }
+    },
+    {
+        "name": "sql_agent",
+        "description": "Search hospital databases with SQL.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "The SQL query to run."
+                }
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "vitals_agent",
+        "description": """Record patient information and vitals. Use this agent when the user wants to RECORD or WRITE DOWN patient information.
+        Examples: 'record patient vitals', 'write down patient allergies', 'note that patient has a laceration', 'patient has O2 of 95'.
+        This agent writes data to the database but does not provide medical assessments or recommendations.""",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "input": {
+                    "type": "string",
+                    "description": "What functionality needs to be performed"
+                }
+            },
+            "required": ["input"]
+        }
+    },
+    {
+        "name": "triage_agent",
+        "description": "Provide medical assessments and recommendations. Use this agent when the user wants an ASSESSMENT, DIAGNOSIS, or MEDICAL OPINION about a patient's condition. Examples: 'assess this patient', 'what's wrong with the patient', 'should I be concerned about these symptoms', 'what priority level is this patient'.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "user_query": {
+                    "type": "string",
+                    "description": "The user query to be processed by the triage agent. This should simply be exactly what the user asked."
+                }
+            },
+            "required": ["user_query"]
+        }
+    }
+]
+
+NO_ROUTE_MESSAGE = "I understand your query, but I need to route it to a specific agent. Please try asking about: patient vitals (e.g., 'record heart rate'), GPS directions (e.g., 'get directions to hospital'), weather (e.g., 'what's the weather'), database queries, or patient triage (e.g., 'patient has chest pain')."
 
 
 class OrchestratorAgent(BaseAgent):
@@ -13,9 +97,17 @@ class OrchestratorAgent(BaseAgent):
     Inherits from BaseAgent to handle Gemini API calls.
     """
 
-    def __init__(self, gemini_api_key, firebase_credentials_path=None):
+    def __init__(self, gemini_api_key, firebase_credentials_path=None, conversation_history=None, router=None,
+                 response_cache=None, session_store=None):
         """
         Initialize the OrchestratorAgent with the API key and Gemini API URL.
+        A single conversation history service (the shared one by default) is
+        passed to every sub-agent. Unless FAST_ROUTER_ENABLED is false, a local
+        QueryRouter (or the given router) dispatches obvious queries without Gemini.
+        Repeated GPS and triage questions are answered from the response cache
+        (the shared one by default) until their TTL or a vitals write expires them.
+        Conversation turns are kept per session (crew/unit) in a bounded session
+        store (the shared one by default).
         """
         super().__init__(gemini_api_key)  # Initialize BaseAgent
         self.name = "OrchestratorAgent"
@@ -30,14 +122,23 @@ class OrchestratorAgent(BaseAgent):
             
         google_maps_api_key = os.getenv("GOOGLE_MAPS_API_KEY")
 
+        self.conversation_history = conversation_history or get_conversation_history()
+        self.response_cache = response_cache or get_response_cache()
+        self.sessions = session_store or get_session_store()
+
         # Initialize agents
         self.gps_agent = GPSAgent(gemini_api_key, google_maps_api_key)
-        self.vitals_agent = VitalsAgent(gemini_api_key, self.firebase_credentials_path)
-        self.triage_agent = TriageAgent(gemini_api_key, self.firebase_credentials_path)
+        self.vitals_agent = VitalsAgent(gemini_api_key, self.firebase_credentials_path, conversation_history=self.conversation_history,
+                                        response_cache=self.response_cache, session_store=self.sessions)
+        self.triage_agent = TriageAgent(gemini_api_key, self.firebase_credentials_path, conversation_history=self.conversation_history,
+                                        session_store=self.sessions)
         #update this system prompt to stop
         self.system_prompt = "You are an orchestrator agent for an EMS system. You MUST ALWAYS use a function call to route user queries to the appropriate agent. Never respond with text directly. Use gps_agent for location/direction queries, vitals_agent for patient vitals, weather_agent for weather queries, sql_agent for database queries, and triage_agent for patient symptoms or contextual assessments (like 'what's wrong', 'assess patient', etc.). ALWAYS call one of these functions."
-        self.memory = []
-        self.conversation_history = ConversationHistory()
+
+        # Local fast-path router; Gemini function calling is only used when it is unsure
+        if router is None and os.getenv("FAST_ROUTER_ENABLED", "true").lower() in ("1", "true", "yes"):
+            router = QueryRouter()
+        self.router = router
 
         # Initalize task Queue, responsible for managing which agents need to be executed
         self.task_queue = []
@@ -66,164 +167,375 @@ class OrchestratorAgent(BaseAgent):
                     break
                 self.orchestrate(user_prompt)
 
-    def orchestrate(self, user_prompt):
+    def orchestrate(self, user_prompt, session_id=None):
         """
         Orchestrate the interaction by analyzing the user prompt and routing it to the appropriate agent.
+        session_id identifies the crew/unit the conversation belongs to.
         """
-        self.memory.append(user_prompt)
-        functions = [
-            {
-                "name": "gps_agent",
-                "description": "Get directions and ETA to a location. Find locations that best match description to user query. This agent has access to current user locaiton.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "question": {
-                            "type": "string",
-                            "description": "The destination or description of destination a user would like to get to."
-                        }
-                    },
-                    "required": ["question"]
-                }
-            },
-            {
-                "name": "weather_agent",
-                "description": "Get current weather for a location.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "location": {
-                            "type": "string",
-                            "description": "The location to get weather for."
-                        }
-                    },
-                    "required": ["location"]
-                }
-            },
-            {
-                "name": "sql_agent",
-                "description": "Search hospital databases with SQL.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "The SQL query to run."
-                        }
-                    },
-                    "required": ["query"]
-                }
-            },
-            {
-                "name": "vitals_agent",
-                "description": """Record patient information and vitals. Use this agent when the user wants to RECORD or WRITE DOWN patient information.
-                Examples: 'record patient vitals', 'write down patient allergies', 'note that patient has a laceration', 'patient has O2 of 95'.
-                This agent writes data to the database but does not provide medical assessments or recommendations.""",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "input": {
-                            "type": "string",
-                            "description": "What functionality needs to be performed"
-                        }
-                    },
-                    "required": ["input"]
-                }
-            },
-            {
-                "name": "triage_agent",
-                "description": "Provide medical assessments and recommendations. Use this agent when the user wants an ASSESSMENT, DIAGNOSIS, or MEDICAL OPINION about a patient's condition. Examples: 'assess this patient', 'what's wrong with the patient', 'should I be concerned about these symptoms', 'what priority level is this patient'.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "user_query": {
-                            "type": "string",
-                            "description": "The user query to be processed by the triage agent. This should simply be exactly what the user asked."
-                        }
-                    },
-                    "required": ["user_query"]
-                }
-            }
-        ]
+        self.sessions.append(session_id, "user", user_prompt)
 
-        # Call the Gemini API with functions
-        try:
-            # Combine system prompt with user prompt for better clarity
-            combined_prompt = f"{self.system_prompt}\n\nUser query: {user_prompt}"
-            response = self.call_gemini(combined_prompt, functions=functions)
+        decision = self.route_locally(user_prompt, session_id)
+        if decision:
+            agent_response = self.dispatch_cached(user_prompt, decision.agent, decision.parameters, session_id)
+        else:
+            # Call the Gemini API with functions
+            try:
+                # Combine system prompt with user prompt for better clarity
+                combined_prompt = f"{self.system_prompt}\n\nUser query: {user_prompt}"
+                response = self.call_gemini(combined_prompt, functions=ORCHESTRATOR_FUNCTIONS)
+
+            except Exception as e:
+                print(f"Error calling Gemini API: {e}")
+                return None
+                
+            # Handle the response
+            agent_response = self.get_agent_response(response, user_prompt, session_id)
+        response_text = self.remember_response(agent_response, session_id)
+
+        self.conversation_history.add_conversation(
+            user_query=user_prompt,
+            agent_response=response_text,
+            session_id=session_id
+        )
+
+        return response_text
+
+    async def orchestrate_async(self, user_prompt, session_id=None):
+        """
+        Async version of orchestrate. Every Gemini, Firestore, Chroma and embedding
+        call on this path is awaited or run in the I/O executor, so concurrent
+        requests overlap instead of queueing behind each other on the event loop.
+        """
+        self.sessions.append(session_id, "user", user_prompt)
+
+        decision = self.route_locally(user_prompt, session_id)
+        if decision:
+            agent_response = await self.dispatch_cached_async(user_prompt, decision.agent, decision.parameters, session_id)
+        else:
+            try:
+                combined_prompt = f"{self.system_prompt}\n\nUser query: {user_prompt}"
+                response = await self.call_gemini_async(combined_prompt, functions=ORCHESTRATOR_FUNCTIONS)
+
+            except Exception as e:
+                print(f"Error calling Gemini API: {e}")
+                return None
+
+            agent_response = await self.get_agent_response_async(response, user_prompt, session_id)
+        response_text = self.remember_response(agent_response, session_id)
+
+        await self.conversation_history.add_conversation_async(
+            user_query=user_prompt,
+            agent_response=response_text,
+            session_id=session_id
+        )
+
+        return response_text
+
+    async def orchestrate_stream(self, user_prompt, session_id=None):
+        """
+        Streaming version of orchestrate_async.
+
+        Triage and GPS answers are streamed from Gemini as they are generated; other
+        agents produce their whole response at once. End-to-end time to first token
+        is recorded under "orchestrator".
+
+        Yields:
+            dict: {"type": "route", "agent": ...} once routing is decided, then
+            {"type": "delta", "text": ...} chunks, then
+            {"type": "done", "response": full text, "agent": ..., "ttft_ms": ...}
+        """
+        timer = StreamTimer("orchestrator")
+        self.sessions.append(session_id, "user", user_prompt)
+
+        decision = self.route_locally(user_prompt, session_id)
+        if decision:
+            agent_name, parameters = decision.agent, decision.parameters
+        else:
+            try:
+                combined_prompt = f"{self.system_prompt}\n\nUser query: {user_prompt}"
+                response = await self.call_gemini_async(combined_prompt, functions=ORCHESTRATOR_FUNCTIONS)
+            except Exception as e:
+                print(f"Error calling Gemini API: {e}")
+                response = None
+            function_call = self.extract_function_call(response)
+            agent_name, parameters = function_call if function_call else (None, None)
+        yield {"type": "route", "agent": agent_name}
 
+        cached, cache_slot = None, None
+        if agent_name is not None:
+            cached, cache_slot, parameters = await self.lookup_cached_async(user_prompt, agent_name, parameters, session_id)
+
+        chunks = []
+        try:
+            if cached is not None:
+                agent_response = cached
+            elif agent_name in ("triage_agent", "gps_agent"):
+                if agent_name == "triage_agent":
+                    stream = self.triage_agent.perform_triage_stream(parameters["user_query"], session_id)
+                else:
+                    stream = self.gps_agent.call_gps_stream(parameters["question"], parameters.get("current_location"), session_id)
+                async for text in stream:
+                    timer.mark(text)
+                    chunks.append(text)
+                    yield {"type": "delta", "text": text}
+                agent_response = "".join(chunks)
+            elif agent_name is None:
+                print("No function call found in response")
+                agent_response = NO_ROUTE_MESSAGE
+            else:
+                agent_response = await self.dispatch_agent_async(agent_name, parameters, session_id)
         except Exception as e:
-            print(f"Error calling Gemini API: {e}")
+            print(f"Error in orchestrate_stream: {e}")
+            agent_response = f"Sorry, I encountered an error processing your request: {str(e)}"
+
+        response_text = self.remember_response(agent_response, session_id)
+        if cache_slot is not None:
+            self.store_cached(user_prompt, agent_name, response_text, cache_slot)
+        if not chunks:
+            timer.mark(response_text)
+            yield {"type": "delta", "text": response_text}
+        measurement = timer.finish()
+
+        await self.conversation_history.add_conversation_async(
+            user_query=user_prompt,
+            agent_response=response_text,
+            session_id=session_id
+        )
+
+        yield {"type": "done", "response": response_text, "agent": agent_name, "ttft_ms": measurement["ttft_ms"]}
+
+    def route_locally(self, user_prompt, session_id=None):
+        """
+        Try the local fast-path router. The session's current patient counts as
+        known, so readings for them can skip Gemini.
+
+        Returns:
+            RouteDecision if the query can be dispatched without Gemini, else None
+        """
+        if self.router is None:
             return None
-            
-        # Handle the response
-        agent_response = self.get_agent_response(response)
-        
-        # Store response in memory and conversation history
+        decision = self.router.route(user_prompt, known_patients=[self.sessions.current_patient(session_id)])
+        print(f"Fast-path routing: {decision}")
+        return decision if decision.is_confident() else None
+
+    def remember_response(self, agent_response, session_id=None):
+        """
+        Convert an agent response to text and append it to the session's memory.
+        """
         if hasattr(agent_response, 'text'):
             response_text = agent_response.text
         else:
             response_text = str(agent_response)
-            
-        self.memory.append({"role": "agent", "content": response_text})
-        self.conversation_history.add_conversation(
-            user_query=user_prompt,
-            agent_response=response_text
-        )
 
+        self.sessions.append(session_id, "agent", response_text)
         return response_text
-    
-    def get_agent_response(self, response):
+
+    def extract_function_call(self, response):
+        """
+        Pull the routed agent name and its arguments out of a Gemini response.
+
+        Returns:
+            tuple: (agent_name, parameters), or None if the response has no function call
+        """
+        if (not response or 
+            not hasattr(response, 'candidates') or
+            not response.candidates or 
+            not response.candidates[0] or 
+            not response.candidates[0].content or 
+            not response.candidates[0].content.parts or 
+            not response.candidates[0].content.parts[0] or 
+            not response.candidates[0].content.parts[0].function_call):
+            return None
+
+        function_call = response.candidates[0].content.parts[0].function_call
+        return function_call.name, function_call.args
+
+    def get_agent_response(self, response, user_prompt=None, session_id=None):
         """
         Get the response from the specified agent with the given parameters.
         Response should always follow the agent_response model.
+        With user_prompt, the response cache is consulted first.
         """
+        function_call = self.extract_function_call(response)
+        if function_call is None:
+            print("No function call found in response")
+            return NO_ROUTE_MESSAGE
+        return self.dispatch_cached(user_prompt, *function_call, session_id)
 
-        
+    async def get_agent_response_async(self, response, user_prompt=None, session_id=None):
+        """
+        Async version of get_agent_response.
+        """
+        function_call = self.extract_function_call(response)
+        if function_call is None:
+            print("No function call found in response")
+            return NO_ROUTE_MESSAGE
+        return await self.dispatch_cached_async(user_prompt, *function_call, session_id)
+
+    def response_cache_context(self, agent_name, parameters, session_id=None):
+        """
+        Context fingerprint that a cached answer must match, the scope it is
+        invalidated under, and the parameters to dispatch with. GPS answers depend
+        on where the asking unit is and on the facility asked for, so its location
+        is looked up once here and passed on to the agent, and the context combines
+        the grid cell with the parsed facility request (a "nearest hospital" answer
+        must not serve "nearest stroke center" from the same cell). Triage answers depend on the crew
+        and on the patient's recorded vitals, so they are keyed on the session and
+        the patient the question is about, and scoped to that patient so only a
+        vitals write for them (VitalsAgent invalidates per patient) expires them.
+
+        Returns:
+            tuple: (context, scope or None, parameters)
+        """
+        if agent_name == "gps_agent":
+            cell, current_location = self.gps_agent.location_context(session_id)
+            return self._gps_context(cell, parameters), None, {**parameters, "current_location": current_location}
+        return self._context_without_location(agent_name, parameters, session_id)
+
+    async def response_cache_context_async(self, agent_name, parameters, session_id=None):
+        """
+        Async version of response_cache_context.
+        """
+        if agent_name == "gps_agent":
+            cell, current_location = await self.gps_agent.location_context_async(session_id)
+            return self._gps_context(cell, parameters), None, {**parameters, "current_location": current_location}
+        return self._context_without_location(agent_name, parameters, session_id)
+
+    @staticmethod
+    def _gps_context(cell, parameters):
+        request = parse_facility_query(parameters.get("question"))
+        if request is None:
+            return cell
+        capabilities = ",".join(sorted(request.capabilities))
+        return f"{cell}\x1f{capabilities}\x1f{request.max_trauma_level or ''}\x1f{request.k}"
+
+    def _context_without_location(self, agent_name, parameters, session_id):
+        if agent_name == "triage_agent":
+            patient = normalize_patient(self.triage_agent.resolve_patient(parameters.get("user_query"), session_id))
+            return f"{session_id or DEFAULT_SESSION}\x1f{patient or ''}", patient, parameters
+        return "", None, parameters
+
+    def lookup_cached(self, user_prompt, agent_name, parameters, session_id=None):
+        """
+        Look up a cached answer for a routed query.
+
+        Returns:
+            tuple: (cached answer or None, slot to pass to store_cached or None when
+            the answer must not be cached, parameters to dispatch with)
+        """
+        cache = self.response_cache
+        if cache is None or user_prompt is None or not cache.caches(agent_name):
+            return None, None, parameters
+        try:
+            context, scope, parameters = self.response_cache_context(agent_name, parameters, session_id)
+        except Exception as e:
+            print(f"Error building response cache context: {e}")
+            return None, None, parameters
+        # Read the generation first so a vitals write during generation discards the answer
+        generation = cache.generation(agent_name, scope)
+        cached = cache.get(agent_name, user_prompt, context, scope)
+        return self._lookup_result(agent_name, cached, (context, generation, scope), parameters)
+
+    async def lookup_cached_async(self, user_prompt, agent_name, parameters, session_id=None):
+        """
+        Async version of lookup_cached.
+        """
+        cache = self.response_cache
+        if cache is None or user_prompt is None or not cache.caches(agent_name):
+            return None, None, parameters
+        try:
+            context, scope, parameters = await self.response_cache_context_async(agent_name, parameters, session_id)
+        except Exception as e:
+            print(f"Error building response cache context: {e}")
+            return None, None, parameters
+        generation = cache.generation(agent_name, scope)
+        cached = await cache.get_async(agent_name, user_prompt, context, scope)
+        return self._lookup_result(agent_name, cached, (context, generation, scope), parameters)
+
+    @staticmethod
+    def _lookup_result(agent_name, cached, cache_slot, parameters):
+        if cached is not None:
+            print(f"Response cache hit for {agent_name}")
+            return cached, None, parameters
+        return None, cache_slot, parameters
+
+    def store_cached(self, user_prompt, agent_name, agent_response, cache_slot):
+        """
+        Cache a freshly generated answer under the slot returned by lookup_cached.
+        """
+        context, generation, scope = cache_slot
+        response_text = getattr(agent_response, "text", agent_response)
+        self.response_cache.put(agent_name, user_prompt, response_text, context, generation, scope)
+
+    def dispatch_cached(self, user_prompt, agent_name, parameters, session_id=None):
+        """
+        dispatch_agent through the response cache.
+        """
+        cached, cache_slot, parameters = self.lookup_cached(user_prompt, agent_name, parameters, session_id)
+        if cached is not None:
+            return cached
+        agent_response = self.dispatch_agent(agent_name, parameters, session_id)
+        if cache_slot is not None:
+            self.store_cached(user_prompt, agent_name, agent_response, cache_slot)
+        return agent_response
+
+    async def dispatch_cached_async(self, user_prompt, agent_name, parameters, session_id=None):
+        """
+        Async version of dispatch_cached.
+        """
+        cached, cache_slot, parameters = await self.lookup_cached_async(user_prompt, agent_name, parameters, session_id)
+        if cached is not None:
+            return cached
+        agent_response = await self.dispatch_agent_async(agent_name, parameters, session_id)
+        if cache_slot is not None:
+            self.store_cached(user_prompt, agent_name, agent_response, cache_slot)
+        return agent_response
+
+    def dispatch_agent(self, agent_name, parameters, session_id=None):
+        """
+        Call the named agent with function-call style parameters. Vitals and triage
+        history is stored and searched under session_id.
+        """
         try:
-            # Check if response has the expected structure and function call
-            if (not response or 
-                not response.candidates or 
-                not response.candidates[0] or 
-                not response.candidates[0].content or 
-                not response.candidates[0].content.parts or 
-                not response.candidates[0].content.parts[0] or 
-                not response.candidates[0].content.parts[0].function_call):
-                
-                print("No function call found in response")
-                return "I understand your query, but I need to route it to a specific agent. Please try asking about: patient vitals (e.g., 'record heart rate'), GPS directions (e.g., 'get directions to hospital'), weather (e.g., 'what's the weather'), database queries, or patient triage (e.g., 'patient has chest pain')."
-            
-            agent_name = response.candidates[0].content.parts[0].function_call.name
-            parameters = response.candidates[0].content.parts[0].function_call.args
-            
             if agent_name == "gps_agent":
-                question = parameters["question"]
-                # Call the GPS agent - now returns AgentResponse
-                agent_response = self.gps_agent.call_gps(question)
-                if agent_response.is_success():
-                    return agent_response.text
-                else:
-                    return f"GPS Error: {agent_response.text}"
+                return self.gps_agent.call_gps(parameters["question"], parameters.get("current_location"), session_id)
             elif agent_name == "vitals_agent":
-                input_data = parameters["input"]
-                # Call the Vitals agent - now returns AgentResponse
-                return self.vitals_agent.call_vitals_agent(input_data)
-            elif agent_name == "weather_agent":
-                location = parameters["location"]
-                return f"Weather agent would get weather for: {location}"
-            elif agent_name == "sql_agent":
-                query = parameters["query"]
-                return f"SQL agent would execute: {query}"
+                # Call the Vitals agent - returns AgentResponse
+                return self.vitals_agent.call_vitals_agent(parameters["input"], session_id)
             elif agent_name == "triage_agent":
-                user_query = parameters["user_query"]
-                # Call the Triage agent - now returns AgentResponse
-                return self.triage_agent.call_triage_agent(user_query)
+                return self.triage_agent.call_triage_agent(parameters["user_query"], session_id)
             else:
-                return f"Unknown agent: {agent_name}"
+                return self.get_stub_agent_response(agent_name, parameters)
                 
         except Exception as e:
             print(f"Error in get_agent_response: {e}")
             return f"Sorry, I encountered an error processing your request: {str(e)}"
-    
 
-   
+    async def dispatch_agent_async(self, agent_name, parameters, session_id=None):
+        """
+        Async version of dispatch_agent.
+        """
+        try:
+            if agent_name == "gps_agent":
+                return await self.gps_agent.call_gps_async(parameters["question"], parameters.get("current_location"), session_id)
+            elif agent_name == "vitals_agent":
+                return await self.vitals_agent.call_vitals_agent_async(parameters["input"], session_id)
+            elif agent_name == "triage_agent":
+                return await self.triage_agent.call_triage_agent_async(parameters["user_query"], session_id)
+            else:
+                return self.get_stub_agent_response(agent_name, parameters)
+
+        except Exception as e:
+            print(f"Error in get_agent_response: {e}")
+            return f"Sorry, I encountered an error processing your request: {str(e)}"
+
+    def get_stub_agent_response(self, agent_name, parameters):
+        """
+        Responses for agents that are declared to Gemini but not implemented yet.
+        """
+        if agent_name == "weather_agent":
+            return f"Weather agent would get weather for: {parameters['location']}"
+        elif agent_name == "sql_agent":
+            return f"SQL agent would execute: {parameters['query']}"
+        else:
+            return f"Unknown agent: {agent_name}"
@@ -0,0 +1,220 @@
+import math
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ems_copilot.domain.services.vitals_parser import VitalsParser
+
+
+# Parameter name each agent's function declaration expects for the raw query
+AGENT_QUERY_PARAMETERS = {
+    "gps_agent": "question",
+    "vitals_agent": "input",
+    "triage_agent": "user_query",
+}
+
+_VITAL_NAMES = (
+    r"hr|heart\s*rate|pulse|o2|spo2|sp\s*o2|sat(?:s|uration)?|oxygen|sugar|glucose|bgl|bg|"
+    r"temp(?:erature)?|resp(?:iratory)?\s*rate|rr|resps|bp|blood\s*pressure|gcs|pain\s*(?:score|scale)"
+)
+
+_PLACES = r"hospital|trauma\s*cent(?:er|re)|er|emergency\s*room|clinic|stroke\s*cent(?:er|re)|cath\s*lab"
+
+# Requests for a clinical opinion, including questions about a reading ("is his O2
+# of 85 concerning", "GCS 8, should we intubate?"), which must not be logged as vitals
+_TRIAGE_REQUEST = re.compile(
+    r"\b(?:assess(?:ment)?|triage|what(?:'s|\s+is)\s+wrong|priority|concern(?:ed|ing)|worr(?:ied|ying|isome)|"
+    r"diagnos\w*|differential|what\s+should\s+(?:i|we)\s+do|should\s+(?:i|we)\b|"
+    r"(?:do|can|could)\s+(?:i|we)\s+(?:give|treat|start|push|repeat|need)|"
+    r"treatment|recommend\w*|intubat\w*|unresponsive|unconscious|"
+    r"is\s+(?:this|that|it|his|her|their|the)\b[^?]*\b(?:serious|critical|normal|ok(?:ay)?|bad|dangerous|high|low)|"
+    r"(?:another|next|repeat)\s+dose|how\s+(?:much|many|often)|before\s+giving)\b", re.I)
+
+# (agent, weight, pattern). Scores for each agent are summed over matching rules;
+# a negative weight pushes an agent back when its patterns match incidentally.
+ROUTING_RULES = [
+    # Vitals: a vital name followed by a number, or a blood-pressure style reading
+    ("vitals_agent", 3.0, re.compile(rf"\b(?:{_VITAL_NAMES})\b\s*(?:is|of|at|was|now|dropped\s*to|increased\s*to|:|=)?\s*\d", re.I)),
+    ("vitals_agent", 2.0, re.compile(r"\b\d{2,3}\s*/\s*\d{2,3}\b")),
+    ("vitals_agent", 1.5, re.compile(r"\b(?:record|log|write\s*down|document|chart|note\s*that|add\s*a\s*note)\b", re.I)),
+    ("vitals_agent", 1.0, re.compile(r"\b(?:allerg(?:y|ies|ic)|medications?|laceration|injur(?:y|ies))\b", re.I)),
+    # A reading inside a clinical question is context for triage, not a value to record
+    ("vitals_agent", -2.5, _TRIAGE_REQUEST),
+    # Triage: explicit requests for an assessment or medical opinion
+    ("triage_agent", 3.0, _TRIAGE_REQUEST),
+    ("triage_agent", 1.0, re.compile(
+        r"\b(?:chest\s*pain|short(?:ness)?\s*of\s*breath|sob|seiz\w*|"
+        r"stroke(?!\s*cent)|bleeding|syncope|fainted|overdose|anaphyla\w*)\b", re.I)),
+    # GPS: navigation and destination questions ("how long to" only with somewhere to go)
+    ("gps_agent", 3.0, re.compile(
+        rf"\b(?:directions?|navigate|route\s+to|eta|how\s+far|"
+        rf"how\s+long\s+(?:to|until|till)\s+(?:(?:get|drive|reach|arrive)\b|(?:the\s+)?(?:\w+\s+){{0,3}}(?:{_PLACES})\b)|"
+        rf"take\s+me\s+to|drive\s+to|get\s+to|nearest|closest|nearby|near\s+me|where\s+is|where(?:'s|\s+am\s+i)|"
+        rf"address\s+of|current\s+location)\b", re.I)),
+    ("gps_agent", 1.0, re.compile(rf"\b(?:{_PLACES})\b", re.I)),
+]
+
+
+class RouteDecision:
+    """
+    Result of a local routing attempt.
+    """
+
+    def __init__(self, agent: Optional[str], confidence: float, parameters: Optional[Dict] = None,
+                 source: str = "rules", scores: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            agent: Agent function name to dispatch to, or None to fall back to Gemini
+            confidence: Confidence in [0, 1] for the chosen (or best) agent
+            parameters: Function-call arguments for the agent
+            source: 'rules', 'classifier' or 'fallback'
+            scores: Raw per-agent rule scores (useful for debugging routing)
+        """
+        self.agent = agent
+        self.confidence = confidence
+        self.parameters = parameters or {}
+        self.source = source
+        self.scores = scores or {}
+
+    def is_confident(self) -> bool:
+        """True when the router picked an agent and Gemini can be skipped."""
+        return self.agent is not None
+
+    def __str__(self) -> str:
+        return f"RouteDecision(agent='{self.agent}', confidence={self.confidence:.2f}, source='{self.source}')"
+
+
+class QueryRouter:
+    """
+    Deterministic pre-router in front of the Gemini orchestrator call.
+
+    Keyword, regex and vital-pattern rules score every agent; when one agent
+    clearly wins the query is dispatched directly, otherwise an optional local
+    classifier gets a chance before falling back to Gemini function calling.
+    A reading in an utterance is not enough to skip Gemini for the vitals agent:
+    the utterance must be a plain recording that VitalsParser fully resolves,
+    with no question or other clause ("HR 40 and dropping, what do I do").
+    """
+
+    def __init__(self,
+                 confidence_threshold: float = 0.75,
+                 classifier: Optional[Callable[[str], Tuple[str, float]]] = None,
+                 classifier_threshold: float = 0.8,
+                 rules=None,
+                 vitals_parser: Optional[VitalsParser] = None):
+        """
+        Args:
+            confidence_threshold: Minimum rule confidence needed to skip Gemini
+            classifier: Optional callable returning (agent_name, probability) for a query
+            classifier_threshold: Minimum classifier probability needed to skip Gemini
+            rules: Override for ROUTING_RULES
+            vitals_parser: Parser a vitals utterance must fully resolve under to skip Gemini
+        """
+        self.confidence_threshold = confidence_threshold
+        self.classifier = classifier
+        self.classifier_threshold = classifier_threshold
+        self.rules = rules if rules is not None else ROUTING_RULES
+        self.vitals_parser = vitals_parser or VitalsParser()
+
+    def score(self, query: str) -> Dict[str, float]:
+        """
+        Sum rule weights per agent for the query.
+        """
+        scores = {agent: 0.0 for agent in AGENT_QUERY_PARAMETERS}
+        for agent, weight, pattern in self.rules:
+            if pattern.search(query):
+                scores[agent] += weight
+        return {agent: max(score, 0.0) for agent, score in scores.items()}
+
+    def route(self, query: str, known_patients: Optional[Iterable[str]] = None) -> RouteDecision:
+        """
+        Decide which agent should handle the query.
+
+        Confidence is the winning score relative to the runner-up plus a small
+        prior, so a single strong rule (e.g. 'BP 140/90') is enough on its own while
+        weak or conflicting signals fall through to Gemini.
+
+        Args:
+            query: The user prompt
+            known_patients: Patients a vitals reading may name without saying "patient"
+
+        Returns:
+            RouteDecision: agent is None when the query should go to Gemini
+        """
+        query = (query or "").strip()
+        scores = self.score(query)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        (best_agent, best), (_, runner_up) = ranked[0], ranked[1]
+        confidence = best / (best + runner_up + 0.5) if best > 0 else 0.0
+
+        if confidence >= self.confidence_threshold:
+            if self.dispatchable(best_agent, query, known_patients):
+                return RouteDecision(best_agent, confidence, self.parameters_for(best_agent, query), "rules", scores)
+            return RouteDecision(None, confidence, source="fallback", scores=scores)
+
+        if self.classifier is not None and query:
+            agent, probability = self.classifier(query)
+            if (agent in AGENT_QUERY_PARAMETERS and probability >= self.classifier_threshold
+                    and self.dispatchable(agent, query, known_patients)):
+                return RouteDecision(agent, probability, self.parameters_for(agent, query), "classifier", scores)
+
+        return RouteDecision(None, confidence, source="fallback", scores=scores)
+
+    def dispatchable(self, agent: str, query: str, known_patients: Optional[Iterable[str]] = None) -> bool:
+        """
+        Whether the query may go to agent without Gemini. Anything sent to the
+        vitals agent is recorded, so it must be a plain vitals utterance: no
+        question, and fully resolved by the parser (every word accounted for, and
+        the patient named as such or already known).
+        """
+        if agent != "vitals_agent":
+            return True
+        return "?" not in query and self.vitals_parser.parse(query, known_patients=known_patients).fully_resolved
+
+    @staticmethod
+    def parameters_for(agent: str, query: str) -> Dict:
+        """
+        Function-call arguments matching the orchestrator's declaration for agent.
+        """
+        return {AGENT_QUERY_PARAMETERS[agent]: query}
+
+
+class CentroidClassifier:
+    """
+    Small local nearest-centroid classifier over sentence embeddings.
+
+    Intended as the optional second stage of QueryRouter: it reuses the shared
+    embedding model, so it adds no new dependencies or model downloads.
+    """
+
+    def __init__(self, embed: Callable[[List[str]], List[List[float]]], examples: Dict[str, List[str]],
+                 temperature: float = 0.05):
+        """
+        Args:
+            embed: Callable embedding a list of texts (e.g. ConversationHistory.embed_many)
+            examples: Labeled example queries per agent name
+            temperature: Softmax temperature applied to cosine similarities
+        """
+        self.embed = embed
+        self.temperature = temperature
+        self.centroids = {}
+        for agent, texts in examples.items():
+            vectors = embed(texts)
+            centroid = [sum(values) / len(vectors) for values in zip(*vectors)]
+            self.centroids[agent] = self._normalize(centroid)
+
+    @staticmethod
+    def _normalize(vector):
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def __call__(self, query: str) -> Tuple[str, float]:
+        vector = self._normalize(self.embed([query])[0])
+        similarities = {
+            agent: sum(a * b for a, b in zip(vector, centroid))
+            for agent, centroid in self.centroids.items()
+        }
+        peak = max(similarities.values())
+        weights = {agent: math.exp((sim - peak) / self.temperature) for agent, sim in similarities.items()}
+        total = sum(weights.values())
+        agent = max(weights, key=weights.get)
+        return agent, weights[agent] / total
@@ -1,10 +1,15 @@
 import os
 import json
 import re
+import time
 from typing import Dict, List, Optional, Any
 from ems_copilot.domain.services.base_agent import BaseAgent
+from ems_copilot.domain.services.vitals_parser import VitalsParser
+from ems_copilot.domain.services.deterioration_scorer import DeteriorationScorer
 from ems_copilot.infrastructure.database.firestore_db import FirestoreDB
-from ems_copilot.infrastructure.database.conversation_history import ConversationHistory
+from ems_copilot.infrastructure.database.conversation_history import ConversationHistory, get_conversation_history
+from ems_copilot.infrastructure.database.session_store import SessionStore, get_session_store
+from ems_copilot.infrastructure.utils.async_utils import run_blocking
 
 
 class TriageAgent(BaseAgent):
@@ -13,13 +18,17 @@ class TriageAgent(BaseAgent):
     and patient data from Firestore.
     """
     
-    def __init__(self, gemini_api_key: str, firebase_credentials_path: str = None):
+    def __init__(self, gemini_api_key: str, firebase_credentials_path: str = None,
+                 conversation_history: Optional[ConversationHistory] = None,
+                 session_store: Optional[SessionStore] = None):
         """
         Initialize the TriageAgent.
         
         Args:
             gemini_api_key: API key for Gemini
             firebase_credentials_path: Path to Firebase credentials
+            conversation_history: History service to use (defaults to the shared instance)
+            session_store: Remembers each session's current patient (defaults to the shared store)
         """
         super().__init__(gemini_api_key)
         self.name = "TriageAgent"
@@ -30,8 +39,16 @@ class TriageAgent(BaseAgent):
             firebase_credentials_path = os.getenv("FIRESTORE_CREDENTIALS_PATH")
         self.firestore_db = FirestoreDB(firebase_credentials_path)
         
-        # Initialize conversation history
-        self.conversation_history = ConversationHistory()
+        # Use the shared conversation history unless one is injected
+        self.conversation_history = conversation_history or get_conversation_history()
+        self.sessions = session_store or get_session_store()
+
+        # Used only to pick the patient name out of the query for trend lookups
+        # and history scoping
+        self.vitals_parser = VitalsParser()
+        # History searches only look this far back (0 searches all of it)
+        self.history_window_hours = float(os.getenv("HISTORY_SEARCH_WINDOW_HOURS", "12"))
+        self.deterioration_scorer = DeteriorationScorer()
         
         # Triage system prompt
         self.system_prompt = """You are an expert EMS triage agent. Your role is to:
@@ -61,24 +78,88 @@ You will be given a result from a vector database. This will be relevant convers
 Try to be relatively concise in your response. If you notice something severe, you should escalate care."""
     
     
-    def perform_triage(self, user_query: str) -> str:
+    def resolve_patient(self, user_query: str, session_id: Optional[str] = None) -> Optional[str]:
+        """
+        The patient a query is about: the one it names (remembered as the session's
+        current patient), else the session's current patient, else None.
+        """
+        patient_name = self.vitals_parser.parse(user_query or "").patient_name
+        if patient_name:
+            self.sessions.remember_patient(session_id, patient_name)
+            return patient_name
+        return self.sessions.current_patient(session_id)
+
+    def history_scope(self, user_query: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Filters for the history search: the caller's session, the patient the query
+        is about (if known) and the recent time window, so other crews' and other
+        patients' exchanges stay out of the prompt.
+
+        Returns:
+            Keyword arguments for search_conversations
+        """
+        scope = {
+            "session_id": session_id,
+            "patient_name": self.resolve_patient(user_query, session_id),
+        }
+        if self.history_window_hours > 0:
+            scope["since"] = time.time() - self.history_window_hours * 3600
+        return scope
+
+    def get_vitals_trends(self, patient_name: Optional[str]) -> str:
+        """
+        Compact vitals summary (early warning score, then per-metric trends) for a
+        patient. Without a patient nothing is included, so a triage prompt never
+        carries another crew's patient.
+
+        Returns:
+            Prompt-ready trend lines, or an empty string if no vitals are known
+        """
+        if not patient_name:
+            return ""
+        try:
+            self.firestore_db.get_vitals_trends("vitals", patient_name)
+            vitals_series = self.firestore_db.vitals_series
+            trends = vitals_series.trend_summary_text(patient_name)
+            if not trends:
+                return ""
+            risk = self.deterioration_scorer.assess_store(vitals_series, [patient_name])
+            if risk:
+                trends = f"{risk[0].summary_text()}\n{trends}"
+            return f"Patient {patient_name}:\n{trends}"
+        except Exception as e:
+            print(f"Error getting vitals trends: {e}")
+            return ""
+
+    def build_triage_prompt(self, user_query: str, history, trends: str) -> str:
+        """
+        Build the triage prompt from conversation history and vitals trends.
+        """
+        prompt = f"""Here is the relevant conversation history: {history}.
+            please ferform a triage of the patient.
+            Here is the user query: {user_query}"""
+        if trends:
+            prompt += f"\n\nVital sign trends (oldest to newest):\n{trends}"
+        return prompt
+
+    def perform_triage(self, user_query: str, session_id: Optional[str] = None) -> str:
         """
         Perform triage assessment.
         
         Args:
             user_query: the user query to be processed by the triage agent. This should simply be exactly what the user asked.
+            session_id: Session (crew/unit) whose history is searched
             
         Returns:
             Triage assessment and recommendations
         """
         try:
             # Get relevant patient history
-            self.conversation_history.search_conversations(user_query)
+            scope = self.history_scope(user_query, session_id)
+            history = self.conversation_history.search_conversations(user_query, **scope)
 
             # Build simple prompt
-            prompt = f"""Here is the relevant conversation history: {self.conversation_history.search_conversations(user_query)}.
-            please ferform a triage of the patient.
-            Here is the user query: {user_query}"""
+            prompt = self.build_triage_prompt(user_query, history, self.get_vitals_trends(scope["patient_name"]))
             
             # Call Gemini for triage assessment
             response = self.call_gemini(
@@ -90,7 +171,9 @@ Try to be relatively concise in your response. If you notice something severe, y
             # Store conversation in history
             self.conversation_history.add_conversation(
                 user_query=user_query,
-                agent_response=response
+                agent_response=response,
+                session_id=session_id,
+                patient_name=scope["patient_name"]
             )
             
             return response
@@ -104,15 +187,99 @@ Try to be relatively concise in your response. If you notice something severe, y
     
    
     
-    def call_triage_agent(self, user_query: str = None) -> str:
+    async def perform_triage_async(self, user_query: str, session_id: Optional[str] = None) -> str:
+        """
+        Async version of perform_triage. The history search and insert run in the
+        I/O executor and the Gemini call is non-blocking.
+        
+        Args:
+            user_query: the user query to be processed by the triage agent.
+            session_id: Session (crew/unit) whose history is searched
+            
+        Returns:
+            Triage assessment and recommendations
+        """
+        try:
+            scope = self.history_scope(user_query, session_id)
+            history = await self.conversation_history.search_conversations_async(user_query, **scope)
+            trends = await run_blocking(self.get_vitals_trends, scope["patient_name"])
+
+            prompt = self.build_triage_prompt(user_query, history, trends)
+            
+            response = await self.call_gemini_async(
+                user_prompt=prompt,
+                system_prompt=self.system_prompt,
+                return_text=True
+            )
+            
+            await self.conversation_history.add_conversation_async(
+                user_query=user_query,
+                agent_response=response,
+                session_id=session_id,
+                patient_name=scope["patient_name"]
+            )
+            
+            return response
+            
+        except Exception as e:
+            error_msg = f"Error performing triage: {str(e)}"
+            print(error_msg)
+            return error_msg
+    
+    async def perform_triage_stream(self, user_query: str, session_id: Optional[str] = None):
+        """
+        Streaming version of perform_triage_async. Yields the assessment in text
+        chunks as Gemini generates it; the full text is stored in history at the end.
+        
+        Args:
+            user_query: the user query to be processed by the triage agent.
+            session_id: Session (crew/unit) whose history is searched
+            
+        Yields:
+            str: Chunks of the triage assessment
+        """
+        try:
+            scope = self.history_scope(user_query, session_id)
+            history = await self.conversation_history.search_conversations_async(user_query, **scope)
+            trends = await run_blocking(self.get_vitals_trends, scope["patient_name"])
+            prompt = self.build_triage_prompt(user_query, history, trends)
+        except Exception as e:
+            error_msg = f"Error performing triage: {str(e)}"
+            print(error_msg)
+            yield error_msg
+            return
+
+        chunks = []
+        async for text in self.stream_gemini_async(user_prompt=prompt, system_prompt=self.system_prompt):
+            chunks.append(text)
+            yield text
+
+        try:
+            await self.conversation_history.add_conversation_async(
+                user_query=user_query,
+                agent_response="".join(chunks),
+                session_id=session_id,
+                patient_name=scope["patient_name"]
+            )
+        except Exception as e:
+            print(f"Error storing triage conversation: {e}")
+
+    def call_triage_agent(self, user_query: str = None, session_id: Optional[str] = None) -> str:
         """
         Main method to call the triage agent (for compatibility with orchestrator).
         Now supports both explicit symptoms and contextual assessment.
         
         Args:
             user_query: Optional patient symptoms (if None, performs contextual assessment)
+            session_id: Session (crew/unit) whose history is searched
             
         Returns:
             Triage assessment
         """
-        return self.perform_triage(user_query)
+        return self.perform_triage(user_query, session_id)
+
+    async def call_triage_agent_async(self, user_query: str = None, session_id: Optional[str] = None) -> str:
+        """
+        Async version of call_triage_agent.
+        """
+        return await self.perform_triage_async(user_query, session_id)
@@ -1,12 +1,95 @@
 import os
 import json
-import requests
 from pathlib import Path
 from ems_copilot.infrastructure.database.firestore_db import FirestoreDB
-from ems_copilot.infrastructure.database.conversation_history import ConversationHistory
+from ems_copilot.infrastructure.database.conversation_history import get_conversation_history
+from ems_copilot.infrastructure.database.history_filters import normalize_patient
+from ems_copilot.infrastructure.database.session_store import get_session_store
 from ems_copilot.infrastructure.utils.general_utils import *
 from ems_copilot.domain.services.base_agent import BaseAgent
 from ems_copilot.domain.models.agent_response import AgentResponse
+from ems_copilot.domain.services.vitals_parser import VitalsParser
+from ems_copilot.infrastructure.utils.async_utils import run_blocking
+from ems_copilot.infrastructure.utils.response_cache import get_response_cache
+
+# Agents whose cached answers depend on recorded vitals
+VITALS_DEPENDENT_AGENTS = ("triage_agent",)
+
+
+VITALS_FUNCTIONS = [
+    {
+        "name": "write_multiple_vitals",
+        "description": "Write a single vital sign data to Firestore. Call this function once for each vital sign found in the input.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "vitals_name": {
+                    "type": "string",
+                    "description": "The type of vital being recorded (heart rate, bp, o2, glucose, sugar, blood pressure, temperature, etc.)."
+                },
+                "vitals_value": {
+                    "type": "string",
+                    "description": "The value of the vital being recorded."
+                },
+                "patient_name": {
+                    "type": "string",
+                    "description": "The name of the patient."
+                },
+                "timestamp": {
+                    "type": "string",
+                    "description": "The timestamp of the vitals data in ISO 8601 format. The timestamp should be the current time if not specified."
+                }
+            },
+            "required": [ "vitals_name", "vitals_value", "timestamp"]
+        }
+    },
+    {
+        "name": "error",
+        "description": """
+            Return an error message back to the orchestrator agent. If you think the user is asking 
+            for something that is not a vital sign, return an error message. Or you have missing 
+            information, return an error message. This can be used at your discretion
+        """,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "error_message": {
+                    "type": "string",
+                    "description": "The error message to return to the orchestrator agent."
+                }
+            },
+            "required": ["error_message"]
+        }
+    },
+    {
+        "name": "get_vitals",
+        "description": "Retrieve vitals data for a specific patient from Firestore.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "patient_id": {
+                    "type": "string",
+                    "description": "The ID of the patient whose vitals data is to be retrieved."
+                }
+            },
+            "required": ["patient_id"]
+        }
+    },
+    {
+        "name": "get_vitals_by_patient_name",
+        "description": "Retrieve vitals data for a specific patient from Firestore.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "patient_name": {
+                    "type": "string",
+                    "description": "The name of the patient whose vitals data is to be retrieved."
+                }
+            },
+            "required": ["patient_name"]
+        }
+    }
+]
 
 
 class VitalsAgent(BaseAgent):
@@ -15,18 +98,30 @@ class VitalsAgent(BaseAgent):
     This agent will be used to track trending patient vitals and provide information about them.
     """
 
-    def __init__(self, gemini_api_key, firebase_credentials_path, firebase_collection_name="vitals"):
+    def __init__(self, gemini_api_key, firebase_credentials_path, firebase_collection_name="vitals", conversation_history=None,
+                 response_cache=None, session_store=None):
 
         """
         Initialize the Vitals_Agent with the API key and Gemini API URL.
         This agent will be used to track trending patient vitals and provide information about them.
+        The conversation history, response cache and session store default to the
+        shared process-wide instances.
         """
 
         super().__init__(gemini_api_key)  # Initialize BaseAgent
         self.name = "Vitals_Agent"
         self.description = "An agent that provides vitals related functionalities."
         self.firestore_db = FirestoreDB(firebase_credentials_path)
-        self.conversation_history = ConversationHistory()
+        self.conversation_history = conversation_history or get_conversation_history()
+        # Cached triage answers are stale once new vitals are written
+        self.response_cache = response_cache or get_response_cache()
+        # The patient vitals are recorded for becomes the session's current patient
+        self.sessions = session_store or get_session_store()
+        # Regular "HR 110, BP 140/90 for Hank Smith" utterances are extracted locally
+        # and only ambiguous input goes to Gemini
+        self.vitals_parser = None
+        if os.getenv("VITALS_LOCAL_PARSER", "true").lower() in ("1", "true", "yes"):
+            self.vitals_parser = VitalsParser()
 
         self.gemini_api_key = gemini_api_key
         self.system_prompt = (
@@ -40,141 +135,156 @@ class VitalsAgent(BaseAgent):
             "However, if you detect missing required information (like patient name, vital sign type, or vital sign value), use the 'error' function to return an error message. "
         )
     
-    def call_vitals_agent(self, input):
+    def call_vitals_agent(self, input, session_id=None):
         """
         Call the Vitals agent with the given input.
         This method will be used to call the Vitals agent with the given input.
+        The exchange is stored in history under session_id and the patient named.
         """
-        functions = [
-        {
-            "name": "write_multiple_vitals",
-            "description": "Write a single vital sign data to Firestore. Call this function once for each vital sign found in the input.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "vitals_name": {
-                        "type": "string",
-                        "description": "The type of vital being recorded (heart rate, bp, o2, glucose, sugar, blood pressure, temperature, etc.)."
-                    },
-                    "vitals_value": {
-                        "type": "string",
-                        "description": "The value of the vital being recorded."
-                    },
-                    "patient_name": {
-                        "type": "string",
-                        "description": "The name of the patient."
-                    },
-                    "timestamp": {
-                        "type": "string",
-                        "description": "The timestamp of the vitals data in ISO 8601 format. The timestamp should be the current time if not specified."
-                    }
-                },
-                "required": [ "vitals_name", "vitals_value", "timestamp"]
-            }
-        },
-        {
-            "name": "error",
-            "description": """
-                Return an error message back to the orchestrator agent. If you think the user is asking 
-                for something that is not a vital sign, return an error message. Or you have missing 
-                information, return an error message. This can be used at your discretion
-            """,
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "error_message": {
-                        "type": "string",
-                        "description": "The error message to return to the orchestrator agent."
-                    }
-                },
-                "required": ["error_message"]
-            }
-        },
-        {
-            "name": "get_vitals",
-            "description": "Retrieve vitals data for a specific patient from Firestore.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "patient_id": {
-                        "type": "string",
-                        "description": "The ID of the patient whose vitals data is to be retrieved."
-                    }
-                },
-                "required": ["patient_id"]
-            }
-        },
-        {
-            "name": "get_vitals_by_patient_name",
-            "description": "Retrieve vitals data for a specific patient from Firestore.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "patient_name": {
-                        "type": "string",
-                        "description": "The name of the patient whose vitals data is to be retrieved."
-                    }
-                },
-                "required": ["patient_name"]
-            }
-        }
-    ]
-
-        # Get current time: 
         try:
-            current_time = get_time()
-        except Exception as e:
-            print(f"Error getting current time: {e}")
+            parsed = self.parse_locally(input, session_id)
+            if parsed is not None:
+                agent_response = self.aggregate_write_results(self.write_vitals_batch(parsed.entries))
+                self.sessions.remember_patient(session_id, parsed.patient_name)
+                self.conversation_history.add_conversation(user_query=input, agent_response=str(agent_response),
+                                                           session_id=session_id, patient_name=parsed.patient_name)
+                return agent_response
+
+            raw_response = self.call_gemini(system_prompt=self.system_prompt, user_prompt=self.build_user_prompt(input), functions=VITALS_FUNCTIONS)
+            agent_response, history_text = self.process_gemini_response(raw_response)
+            patient_name = self.mentioned_patient(input)
+            self.sessions.remember_patient(session_id, patient_name)
 
-        try:
-            user_prompt = f"Perform the following action: {input}. \n The current time is {current_time}."
-            # First get the raw response to handle function calls
-            raw_response = self.call_gemini( system_prompt=self.system_prompt, user_prompt=user_prompt, functions=functions)
-            handle_response = self.handle_response(response=raw_response)
-            
-            # If we have a structured response from handle_response, return it
-            if handle_response:
-                # Store conversation in history - convert response to string
-                response_str = str(handle_response) if handle_response else "No response"
-                self.conversation_history.add_conversation(
-                    user_query=input,
-                    agent_response=response_str
-                )
-                
-                return handle_response
-            
-            # Otherwise, return the parsed text response as an AgentResponse
-            parsed_response = self.parse_gemini_response(raw_response)
-            
             # Store conversation in history
             self.conversation_history.add_conversation(
                 user_query=input,
-                agent_response=parsed_response
-            )
-            
-            # Convert text response to AgentResponse
-            return AgentResponse(
-                status="success",
-                text=parsed_response,
-                reason="",
-                data={"parsed_response": parsed_response},
-                metadata={
-                    "agent": "vitals_agent",
-                    "operation": "call_vitals_agent"
-                }
+                agent_response=history_text,
+                session_id=session_id,
+                patient_name=patient_name
             )
+
+            return agent_response
         except Exception as e:
             print(f"Error calling Vitals agent: {e}")
-            return AgentResponse(
-                status="fail",
-                text=f"Sorry, I encountered an error processing your request: {str(e)}",
-                reason=str(e),
-                data={"error": str(e)},
-                metadata={
-                    "agent": "vitals_agent",
-                    "operation": "call_vitals_agent"
-                }
+            return self.agent_error_response(e)
+
+    async def call_vitals_agent_async(self, input, session_id=None):
+        """
+        Async version of call_vitals_agent. Firestore writes and the history insert
+        run in the I/O executor so the event loop is never blocked.
+        """
+        try:
+            parsed = self.parse_locally(input, session_id)
+            if parsed is not None:
+                results = await run_blocking(self.write_vitals_batch, parsed.entries)
+                agent_response = self.aggregate_write_results(results)
+                self.sessions.remember_patient(session_id, parsed.patient_name)
+                await self.conversation_history.add_conversation_async(user_query=input, agent_response=str(agent_response),
+                                                                       session_id=session_id, patient_name=parsed.patient_name)
+                return agent_response
+
+            raw_response = await self.call_gemini_async(system_prompt=self.system_prompt, user_prompt=self.build_user_prompt(input), functions=VITALS_FUNCTIONS)
+            agent_response, history_text = await run_blocking(self.process_gemini_response, raw_response)
+            patient_name = self.mentioned_patient(input)
+            self.sessions.remember_patient(session_id, patient_name)
+
+            await self.conversation_history.add_conversation_async(
+                user_query=input,
+                agent_response=history_text,
+                session_id=session_id,
+                patient_name=patient_name
             )
+
+            return agent_response
+        except Exception as e:
+            print(f"Error calling Vitals agent: {e}")
+            return self.agent_error_response(e)
+
+    def mentioned_patient(self, input):
+        """
+        Patient named in the input, for tagging the history exchange (None if unclear).
+        """
+        parser = self.vitals_parser or VitalsParser()
+        return parser.parse(input or "").patient_name
+
+    def parse_locally(self, input, session_id=None):
+        """
+        Extract vitals from input without calling Gemini. A patient named only by
+        position ("HR 88 for Hank Smith") must be the session's current patient.
+
+        Returns:
+            VitalsParseResult if every part of the input was understood, otherwise
+            None (the input should go to Gemini)
+        """
+        if self.vitals_parser is None:
+            return None
+        try:
+            current_time = get_time()
+        except Exception as e:
+            print(f"Error getting current time: {e}")
+            return None
+
+        parsed = self.vitals_parser.parse(input, timestamp=current_time,
+                                          known_patients=[self.sessions.current_patient(session_id)])
+        if not parsed.fully_resolved:
+            return None
+        print(f"Vitals parsed locally: {parsed}")
+        return parsed
+
+    def build_user_prompt(self, input):
+        """
+        Build the Gemini user prompt for a vitals utterance, stamped with the current time.
+        """
+        # Get current time: 
+        try:
+            current_time = get_time()
+        except Exception as e:
+            print(f"Error getting current time: {e}")
+            current_time = "unknown"
+
+        return f"Perform the following action: {input}. \n The current time is {current_time}."
+
+    def process_gemini_response(self, raw_response):
+        """
+        Execute any function calls in the Gemini response and build the agent response.
+
+        Returns:
+            tuple: (AgentResponse, text to store in conversation history)
+        """
+        # First handle function calls
+        handle_response = self.handle_response(response=raw_response)
+
+        # If we have a structured response from handle_response, return it
+        if handle_response:
+            return handle_response, str(handle_response)
+
+        # Otherwise, return the parsed text response as an AgentResponse
+        parsed_response = self.parse_gemini_response(raw_response)
+        return AgentResponse(
+            status="success",
+            text=parsed_response,
+            reason="",
+            data={"parsed_response": parsed_response},
+            metadata={
+                "agent": "vitals_agent",
+                "operation": "call_vitals_agent"
+            }
+        ), parsed_response
+
+    def agent_error_response(self, error):
+        """
+        Build the failure AgentResponse returned when the vitals agent itself errors.
+        """
+        return AgentResponse(
+            status="fail",
+            text=f"Sorry, I encountered an error processing your request: {str(error)}",
+            reason=str(error),
+            data={"error": str(error)},
+            metadata={
+                "agent": "vitals_agent",
+                "operation": "call_vitals_agent"
+            }
+        )
     
     def write_vitals(self, json_vitals_data):
         """
@@ -183,36 +293,96 @@ class VitalsAgent(BaseAgent):
         try:
             # Write the vitals data to the Firestore 'vitals' collection
             self.firestore_db.write_vitals("vitals", json_vitals_data)
+            self.invalidate_cached_answers([json_vitals_data])
 
             # Return success response
-            return AgentResponse(
-                status="success",
-                text=f"{json_vitals_data.get('vitals_name').capitalize()} recorded successfully.",
-                reason="",
-                data={
-                    "entry": {
-                        "type": json_vitals_data.get("vitals_name"),
-                        "value": json_vitals_data.get("vitals_value"),
-                        "timestamp": json_vitals_data.get("timestamp")
-                    }
-                },
-                metadata={
-                    "agent": "vitals_agent",
-                    "operation": "write_vitals"
-                }
-            )
+            return self.vitals_written_response(json_vitals_data)
         except Exception as e:
             print(f"Error writing vitals: {e}")
-            return AgentResponse(
-                status="fail",
-                text=f"Failed to record {json_vitals_data.get('vitals_name')}. Error: {str(e)}",
-                reason=str(e),
-                data={"error": str(e)},
-                metadata={
-                    "agent": "vitals_agent",
-                    "operation": "write_vitals"
+            return self.vitals_failed_response(json_vitals_data, e)
+
+    def write_vitals_batch(self, vitals_entries):
+        """
+        Write several vitals in one atomic Firestore batch.
+
+        Every entry is committed or none is, so the per-entry results are either
+        all successes or all failures carrying the batch error.
+
+        Returns:
+            List of AgentResponse, one per entry in input order
+        """
+        vitals_entries = [dict(vitals_data) for vitals_data in vitals_entries]
+        if not vitals_entries:
+            return []
+        if len(vitals_entries) == 1:
+            return [self.write_vitals(vitals_entries[0])]
+        try:
+            doc_ids = self.firestore_db.write_vitals_batch("vitals", vitals_entries)
+            self.invalidate_cached_answers(vitals_entries)
+            return [self.vitals_written_response(vitals_data, doc_id)
+                    for vitals_data, doc_id in zip(vitals_entries, doc_ids)]
+        except Exception as e:
+            print(f"Error writing vitals batch: {e}")
+            return [self.vitals_failed_response(vitals_data, e) for vitals_data in vitals_entries]
+
+    def invalidate_cached_answers(self, vitals_entries):
+        """
+        Drop cached answers that were based on the written patients' vitals before
+        this write. Other patients' answers stay cached; an entry without a patient
+        name expires every answer. Nothing is invalidated when nothing was written.
+        """
+        if self.response_cache is None or not vitals_entries:
+            return
+        patients = {normalize_patient(vitals_data.get("patient_name")) for vitals_data in vitals_entries}
+        if None in patients:
+            self.response_cache.invalidate(VITALS_DEPENDENT_AGENTS)
+            return
+        for patient in patients:
+            self.response_cache.invalidate(VITALS_DEPENDENT_AGENTS, scope=patient)
+
+    def vitals_written_response(self, json_vitals_data, doc_id=None):
+        """
+        AgentResponse for a vital that was written successfully.
+        """
+        entry = {
+            "type": json_vitals_data.get("vitals_name"),
+            "value": json_vitals_data.get("vitals_value"),
+            "timestamp": json_vitals_data.get("timestamp")
+        }
+        if doc_id:
+            entry["id"] = doc_id
+        return AgentResponse(
+            status="success",
+            text=f"{json_vitals_data.get('vitals_name').capitalize()} recorded successfully.",
+            reason="",
+            data={"entry": entry},
+            metadata={
+                "agent": "vitals_agent",
+                "operation": "write_vitals"
+            }
+        )
+
+    def vitals_failed_response(self, json_vitals_data, error):
+        """
+        AgentResponse for a vital that could not be written.
+        """
+        return AgentResponse(
+            status="fail",
+            text=f"Failed to record {json_vitals_data.get('vitals_name')}. Error: {str(error)}",
+            reason=str(error),
+            data={
+                "error": str(error),
+                "entry": {
+                    "type": json_vitals_data.get("vitals_name"),
+                    "value": json_vitals_data.get("vitals_value"),
+                    "timestamp": json_vitals_data.get("timestamp")
                 }
-            )
+            },
+            metadata={
+                "agent": "vitals_agent",
+                "operation": "write_vitals"
+            }
+        )
     
     def return_error(self, error_message):
         """
@@ -335,17 +505,18 @@ class VitalsAgent(BaseAgent):
                 print("No function calls detected in the response.")
                 return None
             
-            # Process all function calls
+            # Write every vital from this response in a single atomic batch
+            vitals_entries = [function_call.args for function_call in function_calls
+                              if function_call.name == "write_multiple_vitals"]
+            vitals_results = iter(self.write_vitals_batch(vitals_entries))
+
+            # Process all function calls, keeping results in call order
             results = []
             for function_call in function_calls:
                 if function_call.name == "write_multiple_vitals":
-                    # Extract arguments for the write_multiple_vitals function
-                    vitals_data = function_call.args
-                    
-                    # Execute the write_vitals function
-                    result = self.write_vitals(vitals_data)
+                    result = next(vitals_results)
                     results.append(result)
-                    print(f"Vitals data written successfully: {vitals_data}")
+                    print(f"Vitals data written: {function_call.args} ({result.status})")
                 elif function_call.name == "error":
                     # Extract arguments for the error function
                     error_message = function_call.args.get("error_message")
@@ -356,25 +527,48 @@ class VitalsAgent(BaseAgent):
                     print(f"Error returned: {error_message}")
             
             # Return comprehensive response
-            if len(results) == 1:
-                return results[0]  # This is already an AgentResponse from write_vitals
-            else:
-                # Multiple vitals recorded
-                successful_results = [result for result in results if result.is_success()]
-                return AgentResponse(
-                    status="success",
-                    text=f"Successfully recorded {len(successful_results)} vital signs.",
-                    reason="",
-                    data={
-                        "entries": [result.data.get("entry", {}) for result in successful_results],
-                        "total_recorded": len(successful_results)
-                    },
-                    metadata={
-                        "agent": "vitals_agent",
-                        "operation": "write_multiple_vitals"
-                    }
-                )
+            return self.aggregate_write_results(results)
                 
         except Exception as e:
             print(f"Error handling response: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def aggregate_write_results(self, results):
+        """
+        Combine per-vital AgentResponses into the single response returned to the orchestrator.
+        With no results (e.g. the response only read vitals) it reports 0 recorded.
+        """
+        if len(results) == 1:
+            return results[0]  # This is already an AgentResponse from write_vitals
+
+        # Multiple vitals recorded
+        successful_results = [result for result in results if result.is_success()]
+        if results and not successful_results:
+            return AgentResponse(
+                status="fail",
+                text=f"Failed to record {len(results)} vital signs. Error: {results[0].reason}",
+                reason=results[0].reason,
+                data={
+                    "entries": [],
+                    "total_recorded": 0,
+                    "results": [result.to_dict() for result in results]
+                },
+                metadata={
+                    "agent": "vitals_agent",
+                    "operation": "write_multiple_vitals"
+                }
+            )
+        return AgentResponse(
+            status="success",
+            text=f"Successfully recorded {len(successful_results)} vital signs.",
+            reason="",
+            data={
+                "entries": [result.data.get("entry", {}) for result in successful_results],
+                "total_recorded": len(successful_results),
+                "results": [result.to_dict() for result in results]
+            },
+            metadata={
+                "agent": "vitals_agent",
+                "operation": "write_multiple_vitals"
+            }
+        )
\ No newline at end of file
@@ -0,0 +1,226 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+from ems_copilot.infrastructure.database.history_filters import normalize_patient
+
+
+# Canonical vital name -> (name alternatives, (min, max) plausible range)
+VITAL_DEFINITIONS = {
+    "blood pressure": ([r"bp", r"b/p", r"blood\s*pressure"], (20, 300)),
+    "heart rate": ([r"hr", r"heart\s*rate", r"heartrate", r"pulse"], (20, 300)),
+    "o2": ([r"o2", r"spo2", r"sp\s*o2", r"o2\s*sats?", r"sats?", r"saturation",
+            r"oxygen(?:\s*sat(?:uration)?)?", r"pulse\s*ox"], (50, 100)),
+    "glucose": ([r"glucose", r"sugar", r"blood\s*sugar", r"bgl", r"bg", r"cbg", r"glu"], (1, 1000)),
+    "temperature": ([r"temp(?:erature)?"], (30, 110)),
+    "respiratory rate": ([r"rr", r"resps?", r"respiratory(?:\s*rate)?", r"resp\s*rate", r"respirations",
+                          r"breathing\s*rate"], (4, 80)),
+    "gcs": ([r"gcs", r"glasgow(?:\s*coma\s*scale)?"], (3, 15)),
+    "pain score": ([r"pain\s*(?:score|scale|level)"], (0, 10)),
+}
+
+_UNIT = r"(?:%|percent|bpm|mg\s*/\s*dl|mmol(?:\s*/\s*l)?|mmhg|°?\s*[fc]\b|degrees(?:\s*[fc])?|/\s*min|breaths(?:\s*per\s*min(?:ute)?)?)"
+_NUMBER = r"\d{1,3}(?:\.\d+)?"
+_LINK = r"(?:\s*(?:is|of|at|was|now|reads?|reading|measured\s*at|dropped\s*to|increased\s*to|went\s*(?:up|down)\s*to|[:=\-]))?\s*"
+
+# Ordered longest-name-first so "pulse ox" wins over "pulse"
+_NAME_ALTERNATIVES = sorted(
+    ((canonical, alt) for canonical, (alternatives, _) in VITAL_DEFINITIONS.items() for alt in alternatives),
+    key=lambda item: -len(item[1])
+)
+_VITAL_NAME = "|".join(f"(?P<v{i}>{alt})" for i, (_, alt) in enumerate(_NAME_ALTERNATIVES))
+
+_VITAL_PATTERN = re.compile(
+    rf"\b(?:{_VITAL_NAME})\b{_LINK}"
+    rf"(?P<value>(?P<sys>\d{{2,3}})\s*(?:/|over)\s*(?P<dia>\d{{2,3}})|{_NUMBER})"
+    rf"(?:\s*(?P<unit>{_UNIT}))?",
+    re.I
+)
+_BARE_BP_PATTERN = re.compile(r"\b(?P<sys>\d{2,3})\s*(?:/|over)\s*(?P<dia>\d{2,3})\b(?:\s*mmhg)?", re.I)
+
+_NAME = r"(?P<name>[A-Z][a-z][A-Za-z'\-]*(?:\s+[A-Z][a-z][A-Za-z'\-]*){0,2})"
+# (pattern, explicit). Explicit patterns say outright that the words are a patient
+# name; the others only go by position, so "HR 88 for Chest Pain" or "HR 60 on
+# Monday" match them too and need a known patient to confirm the name.
+_NAME_PATTERNS = [
+    (re.compile(rf"\bpatient(?:'s)?\s+name\s+is\s+{_NAME}"), True),
+    (re.compile(rf"\b(?i:for|on|from)\s+(?:patient|pt\.?)\s+{_NAME}\b"), True),
+    (re.compile(rf"\b(?i:for|on|from)\s+{_NAME}\b"), False),
+    (re.compile(rf"\b(?:patient|pt\.?)\s+{_NAME}\b"), True),
+    (re.compile(rf"^\s*(?:(?i:record|log|update)\s+)?(?:(?i:for|on|to)\s+)?{_NAME}(?:'s)?\s+(?=\w)"), False),
+]
+_NOT_NAMES = {"patient", "pt", "record", "log", "note", "update", "the", "vitals", "please", "new", "current",
+              "for", "on", "to", "from",
+              # Questions ("What's wrong with...", "Is his O2...") name no patient
+              "what", "whats", "how", "why", "when", "where", "who", "which", "is", "are", "does", "do",
+              "should", "can", "could", "would", "any", "tell", "give", "show", "assess", "check"}
+
+# Words that may remain once vitals and the patient name are removed without
+# making the utterance ambiguous.
+_FILLER_WORDS = {
+    "a", "an", "and", "the", "has", "had", "have", "is", "was", "with", "of", "for", "on",
+    "patient", "patients", "pt", "pts", "s", "record", "recorded", "log", "logged", "write",
+    "down", "vitals", "vital", "signs", "sign", "her", "his", "their", "now", "also", "plus",
+    "at", "please", "name", "by", "to", "update", "updated", "new", "current", "currently",
+    "reading", "readings", "set", "of", "that", "are", "were", "got", "get", "taking", "taken",
+}
+# Letter words and numbers; a leftover number is a value the parser did not attribute
+_WORD = re.compile(r"[a-z]+|\d+(?:\.\d+)?", re.I)
+
+
+class VitalsParseResult:
+    """
+    Outcome of parsing one vitals utterance locally.
+    """
+
+    def __init__(self, entries: List[Dict], patient_name: Optional[str], leftover: List[str],
+                 name_confirmed: bool = True):
+        """
+        Args:
+            entries: write_multiple_vitals style argument dicts, one per vital found
+            patient_name: Patient name, if one was found
+            leftover: Words the parser could not account for
+            name_confirmed: Whether patient_name was introduced as a name ("patient
+                Hank Smith") or is a known patient, rather than guessed from position
+        """
+        self.entries = entries
+        self.patient_name = patient_name
+        self.leftover = leftover
+        self.name_confirmed = name_confirmed
+
+    @property
+    def fully_resolved(self) -> bool:
+        """
+        True when the utterance can be written without asking the LLM: at least one
+        vital, a confirmed patient name, one value per vital ("HR 120 ... HR 90" may be a
+        correction), and nothing left over that might be a note, a question or
+        another value.
+        """
+        names = [entry["vitals_name"] for entry in self.entries]
+        return (bool(self.entries) and bool(self.patient_name) and self.name_confirmed and not self.leftover
+                and len(set(names)) == len(names))
+
+    def __str__(self) -> str:
+        return (f"VitalsParseResult(patient_name='{self.patient_name}', name_confirmed={self.name_confirmed}, "
+                f"entries={len(self.entries)}, leftover={self.leftover})")
+
+
+class VitalsParser:
+    """
+    Deterministic extractor for regular field utterances such as
+    "O2 93, sugar 120, HR 110, BP 140/90 for Hank Smith".
+
+    It produces the same arguments Gemini would pass to write_multiple_vitals, so
+    the VitalsAgent can skip the network round trip whenever the result is
+    fully resolved.
+    """
+
+    def parse(self, text: str, timestamp: Optional[str] = None,
+              known_patients: Optional[Iterable[str]] = None) -> VitalsParseResult:
+        """
+        Parse vitals names, values, units and the patient name from text.
+
+        Args:
+            text: The utterance
+            timestamp: ISO 8601 timestamp stamped on every entry
+            known_patients: Patients already established (e.g. the session's current
+                patient); a name found only by position is confirmed if it is one of them
+
+        Returns:
+            VitalsParseResult
+        """
+        text = text or ""
+        consumed = []
+        found = []
+
+        for match in _VITAL_PATTERN.finditer(text):
+            canonical = self._canonical_name(match)
+            value = self._format_value(canonical, match)
+            if value is None:
+                continue
+            found.append((match.start(), canonical, value))
+            consumed.append(match.span())
+
+        for match in _BARE_BP_PATTERN.finditer(text):
+            if any(start <= match.start() < end for start, end in consumed):
+                continue
+            value = self._format_value("blood pressure", match)
+            if value is None:
+                continue
+            found.append((match.start(), "blood pressure", value))
+            consumed.append(match.span())
+
+        patient_name = None
+        name_confirmed = False
+        for pattern, explicit in _NAME_PATTERNS:
+            match = pattern.search(text)
+            if match and self._is_plausible_name(match.group("name")):
+                patient_name = re.sub(r"'s$", "", match.group("name").strip())
+                consumed.append(match.span("name"))
+                known = {normalize_patient(name) for name in known_patients or ()}
+                name_confirmed = explicit or normalize_patient(patient_name) in known
+                break
+
+        found.sort()
+        entries = [
+            {
+                "vitals_name": canonical,
+                "vitals_value": value,
+                "patient_name": patient_name,
+                "timestamp": timestamp,
+            }
+            for _, canonical, value in found
+        ]
+        return VitalsParseResult(entries, patient_name, self._leftover_words(text, consumed), name_confirmed)
+
+    @staticmethod
+    def _canonical_name(match) -> str:
+        for i, (canonical, _) in enumerate(_NAME_ALTERNATIVES):
+            if match.group(f"v{i}") is not None:
+                return canonical
+        raise ValueError("Vital pattern matched without a vital name")
+
+    @staticmethod
+    def _format_value(canonical: str, match) -> Optional[str]:
+        """
+        Normalize the matched value (and unit), or return None if it is implausible.
+        """
+        low, high = VITAL_DEFINITIONS[canonical][1]
+        if match.group("sys"):
+            systolic, diastolic = int(match.group("sys")), int(match.group("dia"))
+            if canonical != "blood pressure" or not (low <= diastolic < systolic <= high):
+                return None
+            return f"{systolic}/{diastolic}"
+
+        value = match.group("value")
+        if not low <= float(value) <= high:
+            return None
+        unit = (match.groupdict().get("unit") or "").lower().replace(" ", "")
+        if unit in ("%", "percent"):
+            return f"{value}%"
+        if unit.startswith("mg/dl"):
+            return f"{value} mg/dL"
+        if unit.startswith("mmol"):
+            return f"{value} mmol/L"
+        if unit.endswith("f") or unit.endswith("c"):
+            return f"{value} {unit[-1].upper()}"
+        return value
+
+    @staticmethod
+    def _is_plausible_name(name: str) -> bool:
+        words = name.split()
+        if re.sub(r"'s$", "", words[0].lower()) in _NOT_NAMES:
+            return False
+        return not any(re.fullmatch(alt, word, re.I)
+                       for word in words for _, alt in _NAME_ALTERNATIVES)
+
+    @staticmethod
+    def _leftover_words(text: str, consumed) -> List[str]:
+        remaining = []
+        cursor = 0
+        for start, end in sorted(consumed):
+            if start > cursor:
+                remaining.append(text[cursor:start])
+            cursor = max(cursor, end)
+        remaining.append(text[cursor:])
+        words = _WORD.findall(" ".join(remaining).lower())
+        return [word for word in words if word not in _FILLER_WORDS]
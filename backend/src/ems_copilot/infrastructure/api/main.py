@@ -1,25 +1,113 @@
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from ems_copilot.domain.services.orchestrator_agent import OrchestratorAgent
+from ems_copilot.infrastructure.utils.gemini_client_pool import gemini_pool_health
+from ems_copilot.infrastructure.database.conversation_history import close_conversation_histories, get_conversation_history
+from ems_copilot.infrastructure.database.history_retention import get_history_retention
+from ems_copilot.infrastructure.database.patient_cache import get_patient_cache
+from ems_copilot.infrastructure.database.facility_index import get_facility_index
+from ems_copilot.infrastructure.utils.async_utils import run_blocking, shutdown_io_executor
+from ems_copilot.infrastructure.utils.startup import StartupWarmup, warmup_enabled
+from ems_copilot.infrastructure.utils.stream_metrics import get_stream_metrics
+from ems_copilot.infrastructure.utils.tts_pipeline import TTSPipeline, VoiceSettings
+from ems_copilot.infrastructure.utils.audio_cache import get_audio_cache
+from ems_copilot.infrastructure.utils.tts_clients import get_tts_clients
+from contextlib import asynccontextmanager
+import asyncio
+import base64
 import logging
 import json
 import os
-import tempfile
-from google.cloud import texttospeech
+import threading
+import time
+import uuid
+from typing import Optional
 
-app = FastAPI()
 
+# The orchestrator is built in the lifespan hook (or on first use), not at import time
+_orchestrator = None
+_orchestrator_lock = threading.Lock()
 
-# Initialize orchestrator agent
-orchestrator_agent = OrchestratorAgent(
-    gemini_api_key=os.getenv("GEMINI_API_KEY"),
-    firebase_credentials_path=os.getenv("FIRESTORE_CREDENTIALS_PATH")
+
+def get_orchestrator():
+    """
+    Return the app's OrchestratorAgent, building it on first call.
+
+    Building it connects to Firestore and creates every sub-agent, and importing
+    the agents pulls in their SDKs, so neither happens when this module is imported.
+    """
+    global _orchestrator
+    if _orchestrator is None:
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                from ems_copilot.domain.services.orchestrator_agent import OrchestratorAgent
+                _orchestrator = OrchestratorAgent(
+                    gemini_api_key=os.getenv("GEMINI_API_KEY"),
+                    firebase_credentials_path=os.getenv("FIRESTORE_CREDENTIALS_PATH")
+                )
+    return _orchestrator
+
+
+# Loads what the first request would otherwise pay for, in the background after startup
+startup_warmup = StartupWarmup([
+    ("gemini_client", lambda: get_orchestrator().client_pool.warm_up()),
+    ("conversation_history", lambda: get_conversation_history().warm_up()),
+    ("facility_index", get_facility_index),
+])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One sync and one async TTS client for the app's lifetime
+    try:
+        get_tts_clients().start()
+    except Exception as e:
+        logging.error(f"Error creating Text-to-Speech clients: {str(e)}")
+    # Build the agents before serving, off the event loop
+    started = time.perf_counter()
+    await run_blocking(get_orchestrator)
+    logging.info(f"Agents ready in {(time.perf_counter() - started) * 1000:.0f} ms")
+    # STARTUP_WARMUP=false leaves model and client loading to the first request
+    if warmup_enabled():
+        startup_warmup.start()
+    # Archive and compact old conversation history every HISTORY_RETENTION_INTERVAL seconds (0 disables)
+    retention_interval = float(os.getenv("HISTORY_RETENTION_INTERVAL", "3600"))
+    if retention_interval > 0:
+        get_history_retention().start(retention_interval)
+    yield
+    await startup_warmup.close()
+    if retention_interval > 0:
+        get_history_retention().close()
+    await get_tts_clients().close()
+    # Drain queued history writes before the worker exits
+    close_conversation_histories()
+    shutdown_io_executor()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Sentence-chunked streaming TTS; every synthesis path goes through the audio cache
+tts_pipeline = TTSPipeline(
+    max_concurrency=int(os.getenv("TTS_MAX_CONCURRENCY", "4")),
+    cache=get_audio_cache()
 )
 
 # Request model
 class QueryRequest(BaseModel):
     query: str
+    # Crew/unit the conversation belongs to
+    session_id: Optional[str] = None
+    # Optional device position, reported alongside the question
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+# Device location update model
+class LocationUpdate(BaseModel):
+    latitude: float
+    longitude: float
+    accuracy_m: Optional[float] = None
+    # Crew/unit the device belongs to; the fix only applies to its questions
+    session_id: Optional[str] = None
 
 # Text-to-Speech request model
 class TextToSpeechRequest(BaseModel):
@@ -46,18 +134,92 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+
+def push_location(latitude, longitude, accuracy_m=None, session_id=None):
+    """
+    Record a client-reported position so the session's GPS answers skip the geolocation lookup.
+    """
+    if latitude is None or longitude is None:
+        return None
+    return get_orchestrator().gps_agent.location_provider.push(latitude, longitude, accuracy_m, session_id)
+
+
+async def end_session(session_id):
+    """
+    Drop a finished session's conversation memory, pushed location and history
+    partition (its exchanges stay in the full history).
+    """
+    orchestrator = get_orchestrator()
+    orchestrator.sessions.end(session_id)
+    orchestrator.gps_agent.location_provider.forget(session_id)
+    try:
+        await run_blocking(orchestrator.conversation_history.drop_partition, session_id)
+    except Exception as e:
+        logging.error(f"Error dropping history partition for {session_id}: {str(e)}")
+
+
+def voice_settings(request: TextToSpeechRequest, audio_encoding: str = "MP3", sample_rate_hertz: int = None) -> VoiceSettings:
+    return VoiceSettings(
+        voice_name=request.voice_name,
+        language_code=request.language_code,
+        speaking_rate=request.speaking_rate,
+        pitch=request.pitch,
+        audio_encoding=audio_encoding,
+        sample_rate_hertz=sample_rate_hertz
+    )
+
+
+# Spoken query request model
+class SpeakQueryRequest(TextToSpeechRequest):
+    text: str = ""
+    query: str
+    session_id: Optional[str] = None
+
+
+async def response_text_chunks(query: str, session_id: Optional[str] = None):
+    """
+    Text deltas of the orchestrator's streamed answer.
+    """
+    async for event in get_orchestrator().orchestrate_stream(query, session_id):
+        if event["type"] == "delta":
+            yield event["text"]
+
+def connection_session_id() -> str:
+    """
+    Session for a websocket that does not name one; it ends with the connection.
+    """
+    return f"ws-{uuid.uuid4().hex}"
+
+
 @app.websocket("/ws/chat")
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
+    # Messages may carry a "session_id" (kept across reconnects); otherwise the connection is the session
+    connection_session = connection_session_id()
     try:
         while True:
             # Receive message from client
             data = await websocket.receive_text()
             message_data = json.loads(data)
             user_message = message_data.get("message", "")
+            session_id = message_data.get("session_id") or connection_session
+
+            # Clients may attach {"location": {"latitude": ..., "longitude": ..., "accuracy_m": ...}}
+            location = message_data.get("location") or {}
+            push_location(location.get("latitude"), location.get("longitude"), location.get("accuracy_m"), session_id)
+            if location and not user_message:
+                continue
+
+            # Clients that send "stream": true get "route" and "delta" frames as the answer
+            # is generated, then a "done" frame that also carries the full "response".
+            # Otherwise the reply is a single {"response": ...} frame, as before.
+            if message_data.get("stream", False):
+                async for event in get_orchestrator().orchestrate_stream(user_message, session_id):
+                    await manager.send_message(json.dumps(event), websocket)
+                continue
 
             # Process message through orchestrator
-            response = orchestrator_agent.orchestrate(user_message)
+            response = await get_orchestrator().orchestrate_async(user_message, session_id)
             
             # Send response back to client
             await manager.send_message(
@@ -66,6 +228,7 @@ async def websocket_endpoint(websocket: WebSocket):
             )
     except WebSocketDisconnect:
         manager.disconnect(websocket)
+        await end_session(connection_session)
     except Exception as e:
         logging.error(f"Error in WebSocket connection: {str(e)}")
         await manager.send_message(
@@ -73,17 +236,166 @@ async def websocket_endpoint(websocket: WebSocket):
             websocket
         )
 
+@app.websocket("/ws/speak")
+async def websocket_speak(websocket: WebSocket):
+    """
+    Spoken answers: the client sends {"message": ..., "voice_name": ..., "speaking_rate": ..., "pitch": ...}.
+    The server streams the same text frames as a streaming /ws/chat, interleaved with
+    {"type": "audio", "index": n, "text": sentence, "audio": base64 MP3} frames in
+    sentence order, so playback starts while later sentences are still generating.
+    """
+    await manager.connect(websocket)
+    connection_session = connection_session_id()
+    send_lock = asyncio.Lock()
+
+    async def send(event):
+        async with send_lock:
+            await manager.send_message(json.dumps(event), websocket)
+
+    try:
+        while True:
+            message_data = json.loads(await websocket.receive_text())
+            user_message = message_data.get("message", "")
+            session_id = message_data.get("session_id") or connection_session
+            voice = VoiceSettings(
+                voice_name=message_data.get("voice_name", "en-US-Standard-A"),
+                language_code=message_data.get("language_code", "en-US"),
+                speaking_rate=message_data.get("speaking_rate", 1.0),
+                pitch=message_data.get("pitch", 0.0)
+            )
+
+            async def text_chunks():
+                async for event in get_orchestrator().orchestrate_stream(user_message, session_id):
+                    await send(event)
+                    if event["type"] == "delta":
+                        yield event["text"]
+
+            async for segment in tts_pipeline.stream(text_chunks(), voice):
+                await send({
+                    "type": "audio",
+                    "index": segment.index,
+                    "text": segment.text,
+                    "media_type": voice.media_type,
+                    "audio": base64.b64encode(segment.audio).decode("ascii")
+                })
+            await send({"type": "audio_done"})
+    except WebSocketDisconnect:
+        manager.disconnect(websocket)
+        await end_session(connection_session)
+    except Exception as e:
+        logging.error(f"Error in speak WebSocket connection: {str(e)}")
+        await manager.send_message(
+            json.dumps({"error": "An error occurred processing your message"}),
+            websocket
+        )
+
+# Health check endpoint (used by the Docker HEALTHCHECK)
+@app.get("/health")
+async def health():
+    pools = gemini_pool_health()
+    status = "ok" if all(pool["status"] == "ok" for pool in pools.values()) else "degraded"
+    history = get_conversation_history()
+    orchestrator = get_orchestrator()
+    return {
+        "status": status,
+        "gemini_client_pools": pools,
+        "embedding_cache": history.embedding_cache.stats(),
+        "history_write_queue": history.write_queue.stats() if history.write_behind else None,
+        "history_retention": get_history_retention().stats(),
+        "patient_cache": get_patient_cache().stats(),
+        "streams": get_stream_metrics().stats(),
+        "tts_audio_cache": get_audio_cache().stats(),
+        "tts_clients": get_tts_clients().stats(),
+        "response_cache": orchestrator.response_cache.stats() if orchestrator.response_cache else None,
+        "location": orchestrator.gps_agent.location_provider.stats(),
+        "facility_index": get_facility_index().stats() if get_facility_index() else None,
+        "sessions": orchestrator.sessions.stats(),
+        "startup": startup_warmup.stats()
+    }
+
+# Device location updates
+@app.post("/location")
+async def update_location(update: LocationUpdate):
+    """
+    Report the unit's current position from the client device. GPS questions from
+    the same session_id use it instead of a geolocation lookup while it is fresh.
+    """
+    location = push_location(update.latitude, update.longitude, update.accuracy_m, update.session_id)
+    return {"location": location.to_dict()}
+
 # Route query to the orchestrator agent
 @app.post("/query")
 async def route_query(request: QueryRequest):
     logging.info(f"Received query: {request.query}")
+    push_location(request.latitude, request.longitude, session_id=request.session_id)
     try:
-        response = orchestrator_agent.orchestrate(request.query)
+        response = await get_orchestrator().orchestrate_async(request.query, request.session_id)
         return {"response": response}
     except Exception as e:
         logging.error(f"Error processing query: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
+# Streaming query endpoint (Server-Sent Events)
+@app.post("/query/stream")
+async def route_query_stream(request: QueryRequest):
+    """
+    Same as /query, but streams the answer as Server-Sent Events.
+
+    Each event is a JSON object: "route" once the agent is chosen, "delta" for
+    each chunk of text, and a final "done" event with the full response and
+    the time to first token.
+    """
+    logging.info(f"Received streaming query: {request.query}")
+    push_location(request.latitude, request.longitude, session_id=request.session_id)
+
+    async def events():
+        try:
+            async for event in get_orchestrator().orchestrate_stream(request.query, request.session_id):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logging.error(f"Error streaming query: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Spoken answer as chunked MP3
+@app.post("/query/speak")
+async def speak_query(request: SpeakQueryRequest):
+    """
+    Answer a query and stream the spoken answer as chunked MP3.
+
+    Sentences are synthesized as the answer streams from the LLM, so the first
+    audio arrives long before the answer is complete.
+    """
+    logging.info(f"Received spoken query: {request.query}")
+    voice = voice_settings(request)
+
+    async def audio():
+        async for segment in tts_pipeline.stream(response_text_chunks(request.query, request.session_id), voice):
+            yield segment.audio
+
+    return StreamingResponse(audio(), media_type=voice.media_type)
+
+# Streaming Text-to-Speech endpoint
+@app.post("/tts/stream")
+async def stream_text_to_speech(request: TextToSpeechRequest):
+    """
+    Convert (long) text to speech sentence by sentence, synthesizing concurrently
+    and streaming ordered MP3 segments as chunked HTTP.
+    """
+    logging.info(f"Streaming text to speech: {request.text[:50]}...")
+    voice = voice_settings(request)
+
+    async def audio():
+        async for segment in tts_pipeline.stream_text(request.text, voice):
+            yield segment.audio
+
+    return StreamingResponse(audio(), media_type=voice.media_type)
+
 # Text-to-Speech endpoint
 @app.post("/text-to-speech")
 async def text_to_speech(request: TextToSpeechRequest):
@@ -94,46 +406,19 @@ async def text_to_speech(request: TextToSpeechRequest):
         request: TextToSpeechRequest containing text and voice parameters
         
     Returns:
-        FileResponse: WAV audio file
+        Response: WAV audio served from memory as an attachment
     """
     try:
         logging.info(f"Converting text to speech: {request.text[:50]}...")
         
-        # Initialize the Text-to-Speech client
-        client = texttospeech.TextToSpeechClient()
-        
-        # Set the text input to be synthesized
-        synthesis_input = texttospeech.SynthesisInput(text=request.text)
-        
-        # Build the voice request
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=request.language_code,
-            name=request.voice_name
-        )
-        
-        # Select the type of audio file to return
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
-            speaking_rate=request.speaking_rate,
-            pitch=request.pitch
-        )
-        
-        # Perform the text-to-speech request
-        response = client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
-        )
-        
-        # Create a temporary file to store the audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            temp_file.write(response.audio_content)
-            temp_file_path = temp_file.name
+        # Synthesize (or serve from the audio cache) as LINEAR16
+        audio_content = await tts_pipeline.synthesize(request.text, voice_settings(request, "LINEAR16"))
         
-        # Return the audio file
-        return FileResponse(
-            path=temp_file_path,
+        # Return the audio straight from memory
+        return Response(
+            content=audio_content,
             media_type="audio/wav",
-            filename="speech.wav",
-            background=lambda: os.unlink(temp_file_path)  # Clean up temp file after response
+            headers={"Content-Disposition": 'attachment; filename="speech.wav"'}
         )
         
     except Exception as e:
@@ -147,7 +432,7 @@ async def text_to_speech(request: TextToSpeechRequest):
 @app.get("/voices")
 async def get_voices(language_code: str = "en-US"):
     """
-    Get a list of available voices for the specified language.
+    Get a list of available voices for the specified language (cached for an hour).
     
     Args:
         language_code: Language code to filter voices (default: en-US)
@@ -158,22 +443,7 @@ async def get_voices(language_code: str = "en-US"):
     try:
         logging.info(f"Fetching voices for language: {language_code}")
         
-        # Initialize the Text-to-Speech client
-        client = texttospeech.TextToSpeechClient()
-        
-        # Perform the request
-        response = client.list_voices(language_code=language_code)
-        
-        # Format the response
-        voices = []
-        for voice in response.voices:
-            voices.append({
-                "name": voice.name,
-                "language_codes": list(voice.language_codes),
-                "ssml_gender": voice.ssml_gender.name,
-                "natural_sample_rate_hertz": voice.natural_sample_rate_hertz
-            })
-        
+        voices = await get_tts_clients().list_voices_async(language_code)
         return {"voices": voices}
         
     except Exception as e:
@@ -198,34 +468,14 @@ async def hd_text_to_speech(request: TextToSpeechRequest):
     try:
         logging.info(f"Converting text to HD speech: {request.text[:50]}...")
         
-        # Initialize the Text-to-Speech client
-        client = texttospeech.TextToSpeechClient()
-        
-        # Set the text input to be synthesized
-        synthesis_input = texttospeech.SynthesisInput(text=request.text)
-        
-        # Build the voice request with HD voice
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=request.language_code,
-            name=request.voice_name
-        )
-        
-        # Select the type of audio file to return (HD quality)
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
-            sample_rate_hertz=24000,  # Higher sample rate for HD quality
-            speaking_rate=request.speaking_rate,
-            pitch=request.pitch
-        )
-        
-        # Perform the text-to-speech request
-        response = client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
+        # Synthesize (or serve from the audio cache) at the higher HD sample rate
+        audio_content = await tts_pipeline.synthesize(
+            request.text, voice_settings(request, "LINEAR16", sample_rate_hertz=24000)
         )
         
         # Return the raw audio content directly
         return Response(
-            content=response.audio_content,
+            content=audio_content,
             media_type="audio/wav",
             headers={"Content-Disposition": "inline"}
         )
@@ -1,96 +1,450 @@
+import atexit
 import os
 import json
-import chromadb
+import time
+import uuid
 from datetime import datetime
-from typing import List, Dict, Optional
-from sentence_transformers import SentenceTransformer
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+import threading
+from collections import OrderedDict
+from ems_copilot.infrastructure.database.embedding_cache import EmbeddingCache
+from ems_copilot.infrastructure.database.history_filters import (
+    PARTITION_PREFIX, TimeBound, build_where, normalize_patient, partition_name
+)
+from ems_copilot.infrastructure.database.history_write_queue import HistoryWriteQueue
+from ems_copilot.infrastructure.database.vector_store import open_vector_store
+from ems_copilot.infrastructure.database.embedding_model import (
+    DEFAULT_EMBEDDING_MODEL, embedding_cache_name, get_embedding_model, resolve_embedding_backend
+)
+from ems_copilot.infrastructure.utils.async_utils import run_blocking
 
 
 class ConversationHistory:
     """
-    Simple conversation history using ChromaDB for vector storage and semantic search.
+    Simple conversation history using a vector store for semantic search.
+
+    The vector store (Chroma by default, or the in-process local backend) and
+    the embedding model are created lazily on first use, and
+    the embedding model is shared process-wide. Use get_conversation_history() to
+    get the shared instance rather than constructing one per agent.
+
+    Every exchange is stored with its session, patient and creation time as
+    metadata, so searches can be scoped with a Chroma `where` clause. With
+    session partitions enabled, exchanges that belong to a session are also
+    written to a small per-session collection, and session-scoped searches
+    query only that collection instead of the whole history. A partition is
+    only a copy: it is dropped when its session ends or goes idle and rebuilt
+    from the full history if the session comes back.
     """
     
-    def __init__(self, persist_directory: str = "./conversation_history"):
+    def __init__(self,
+                 persist_directory: str = "./conversation_history",
+                 embedding_model=None,
+                 embedding_model_name: str = DEFAULT_EMBEDDING_MODEL,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 write_behind: Optional[bool] = None,
+                 partition_by_session: Optional[bool] = None,
+                 vector_backend: Optional[str] = None,
+                 embedding_backend: Optional[str] = None):
         """
         Initialize the conversation history service.
         
         Args:
-            persist_directory: Directory to persist ChromaDB data
+            persist_directory: Directory to persist vector store data
+            embedding_model: Optional pre-loaded embedding model (defaults to the shared one)
+            embedding_model_name: Name of the shared embedding model to load lazily
+            embedding_cache: Optional embedding cache. By default an LRU cache sized by
+                EMBEDDING_CACHE_SIZE (4096) and persisted to EMBEDDING_CACHE_PATH if set.
+            write_behind: Persist add_conversation() calls from a background queue
+                instead of on the caller's thread (defaults to HISTORY_WRITE_BEHIND, on)
+            partition_by_session: Keep a per-session collection next to the full history
+                (defaults to HISTORY_SESSION_PARTITIONS, on)
+            vector_backend: "chroma" or "local" (defaults to VECTOR_STORE_BACKEND, chroma)
+            embedding_backend: "torch" (SentenceTransformer) or "onnx" (int8 ONNX export)
+                for the shared model (defaults to EMBEDDING_BACKEND, torch)
         """
         self.persist_directory = persist_directory
-        os.makedirs(persist_directory, exist_ok=True)
-        
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(path=persist_directory)
-        
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name="conversation_history",
-            metadata={"description": "EMS Copilot conversation history"}
+        self.embedding_model_name = embedding_model_name
+        self.embedding_backend = embedding_backend_name = resolve_embedding_backend(embedding_backend)
+        self._embedding_model = embedding_model
+        if embedding_cache is None:
+            embedding_cache = EmbeddingCache(
+                max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+                persist_path=os.getenv("EMBEDDING_CACHE_PATH"),
+                model_name=embedding_cache_name(embedding_model_name, embedding_backend_name)
+            )
+        self.embedding_cache = embedding_cache
+        self.vector_backend = vector_backend
+        self._store = None
+        self._collection = None
+        self._init_lock = threading.Lock()
+        if write_behind is None:
+            write_behind = os.getenv("HISTORY_WRITE_BEHIND", "true").lower() in ("1", "true", "yes")
+        self.write_behind = write_behind
+        self._write_queue = None
+        if partition_by_session is None:
+            partition_by_session = os.getenv("HISTORY_SESSION_PARTITIONS", "true").lower() in ("1", "true", "yes")
+        self.partition_by_session = partition_by_session
+        # session_id -> partition collection handle, least recently used first
+        self._partitions = OrderedDict()
+        self.max_open_partitions = int(os.getenv("HISTORY_OPEN_PARTITIONS", "256"))
+        # Names of the partition collections in the store, listed on first use
+        self._partition_names = None
+
+    @property
+    def store(self):
+        """Vector store, opened on first use."""
+        if self._store is None:
+            with self._init_lock:
+                if self._store is None:
+                    self._store = open_vector_store(self.persist_directory, self.vector_backend)
+        return self._store
+
+    @property
+    def collection(self):
+        """Conversation history collection, created on first use."""
+        if self._collection is None:
+            store = self.store
+            with self._init_lock:
+                if self._collection is None:
+                    self._collection = store.get_or_create_collection(
+                        name="conversation_history",
+                        metadata={"description": "EMS Copilot conversation history"}
+                    )
+        return self._collection
+
+    def partition(self, session_id: str):
+        """
+        The session's partition collection, created on first use. A new partition
+        is filled with the session's exchanges already in the full history, so a
+        session whose partition was dropped still sees its earlier exchanges.
+        """
+        with self._init_lock:
+            collection = self._partitions.get(session_id)
+            if collection is not None:
+                self._partitions.move_to_end(session_id)
+                return collection
+        name = partition_name(session_id)
+        existed = name in self.partition_names()
+        collection = self.store.get_or_create_collection(
+            name=name,
+            metadata={"description": "EMS Copilot conversation history partition", "session_id": str(session_id)}
         )
-        
-        # Initialize sentence transformer for embeddings
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        if not existed:
+            self._backfill_partition(session_id, collection)
+        with self._init_lock:
+            self._partition_names.add(name)
+            self._partitions[session_id] = collection
+            while len(self._partitions) > self.max_open_partitions:
+                self._partitions.popitem(last=False)
+        return collection
+
+    def partition_names(self) -> set:
+        """
+        Names of the session partition collections in the store.
+        """
+        if self._partition_names is None:
+            names = {name for name in self.store.list_collections() if name.startswith(PARTITION_PREFIX)}
+            with self._init_lock:
+                if self._partition_names is None:
+                    self._partition_names = names
+        return self._partition_names
+
+    def _backfill_partition(self, session_id, collection, page_size: int = 1000):
+        offset = 0
+        while True:
+            page = self.collection.get(where=build_where(session_id), limit=page_size, offset=offset,
+                                       include=["embeddings", "metadatas", "documents"])
+            if page["ids"]:
+                collection.add(ids=page["ids"], embeddings=page["embeddings"],
+                               documents=page["documents"], metadatas=page["metadatas"])
+            if len(page["ids"]) < page_size:
+                return
+            offset += page_size
+
+    def drop_partition(self, session_id: str) -> bool:
+        """
+        Delete a session's partition (when the session ends). Its exchanges stay
+        in the full history.
+
+        Returns:
+            True if the session had a partition
+        """
+        if not self.partition_by_session:
+            return False
+        self.flush_pending(session_id)
+        return self._drop_partition_named(partition_name(session_id))
+
+    def drop_idle_partitions(self, idle_seconds: float, now: Optional[float] = None) -> int:
+        """
+        Delete the partitions of sessions with no exchange in the last idle_seconds.
+
+        Returns:
+            Number of partitions deleted
+        """
+        self.flush_pending()
+        cutoff = (time.time() if now is None else now) - idle_seconds
+        dropped = 0
+        for name in sorted(self.partition_names()):
+            recent = self.store.get_or_create_collection(name=name).get(
+                where={"created_at": {"$gte": cutoff}}, limit=1, include=[])
+            if not recent["ids"] and self._drop_partition_named(name):
+                dropped += 1
+        return dropped
+
+    def _drop_partition_named(self, name: str) -> bool:
+        names = self.partition_names()
+        with self._init_lock:
+            for session_id in [session_id for session_id in self._partitions if partition_name(session_id) == name]:
+                del self._partitions[session_id]
+            if name not in names:
+                return False
+            names.discard(name)
+        self.store.delete_collection(name)
+        return True
+
+    @property
+    def write_queue(self) -> HistoryWriteQueue:
+        """Background write-behind queue, started on first use."""
+        if self._write_queue is None:
+            with self._init_lock:
+                if self._write_queue is None:
+                    self._write_queue = HistoryWriteQueue(
+                        self.write_records,
+                        max_pending=int(os.getenv("HISTORY_WRITE_QUEUE_SIZE", "1000")),
+                        batch_size=int(os.getenv("HISTORY_WRITE_BATCH_SIZE", "64"))
+                    )
+                    # Scripts that never call close() still get their writes drained
+                    atexit.register(self._write_queue.close)
+        return self._write_queue
+
+    @property
+    def embedding_model(self):
+        """Embedding model (SentenceTransformer or ONNX), shared across the process."""
+        if self._embedding_model is None:
+            self._embedding_model = get_embedding_model(self.embedding_model_name, self.embedding_backend)
+        return self._embedding_model
+
+    def embed(self, text: str) -> List[float]:
+        """
+        Embed a single text, serving repeats from the embedding cache.
+        """
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        """
+        Embed several texts, running the model (in batches of batch_size) only on cache misses.
+        """
+        return self.embedding_cache.encode(
+            texts,
+            lambda batch: self.embedding_model.encode(batch, batch_size=batch_size).tolist()
+        )
+
+    def warm_up(self):
+        """
+        Eagerly open the collection and load the embedding model.
+        """
+        self.collection
+        self.embedding_model
         
     def add_conversation(self, 
                         user_query: str, 
-                        agent_response: str) -> str:
+                        agent_response: str,
+                        session_id: Optional[str] = None,
+                        patient_name: Optional[str] = None) -> str:
         """
         Add a conversation exchange to the history.
+
+        With write-behind enabled this only queues the exchange; embedding and the
+        Chroma insert happen on the background writer, and searches for the same
+        session wait for it so reads still see their own writes.
         
         Args:
             user_query: The user's query
             agent_response: The agent's response
+            session_id: Optional session (crew/unit) the exchange belongs to
+            patient_name: Optional patient the exchange is about
             
         Returns:
             The ID of the added conversation
         """
-        # Create a combined text for embedding
-        combined_text = f"User: {user_query}\nAgent: {agent_response}"
-        
-        # Generate embedding
-        embedding = self.embedding_model.encode(combined_text).tolist()
+        record = self.new_record(user_query, agent_response, session_id, patient_name)
+        if self.write_behind:
+            self.write_queue.submit(record)
+        else:
+            self.write_records([record])
+        return record["id"]
+
+    def add_conversations_bulk(self,
+                               exchanges: List[Tuple[str, str]],
+                               batch_size: int = 64,
+                               chunk_size: Optional[int] = None,
+                               session_id: Optional[str] = None) -> List[str]:
+        """
+        Add many conversation exchanges with batched embedding and chunked inserts.
+
+        Texts are embedded through the SentenceTransformer in batches of batch_size
+        (cache hits skip the model entirely) and written to Chroma in chunks, so a
+        backfill of N exchanges costs N / batch_size forward passes and
+        N / chunk_size inserts instead of N of each. Bulk writes are synchronous.
         
-        # Prepare simple metadata
-        conversation_metadata = {
-            "timestamp": datetime.now().isoformat(),
+        Args:
+            exchanges: (user_query, agent_response) pairs
+            batch_size: Number of texts per embedding forward pass
+            chunk_size: Number of records per Chroma insert (defaults to
+                HISTORY_INSERT_CHUNK_SIZE or 1000, capped by Chroma's max batch size)
+            session_id: Optional session the exchanges belong to
+            
+        Returns:
+            The IDs of the added conversations, in input order
+        """
+        records = [self.new_record(user_query, agent_response, session_id) for user_query, agent_response in exchanges]
+        self.write_records(records, batch_size=batch_size, chunk_size=chunk_size)
+        return [record["id"] for record in records]
+
+    def new_record(self, user_query: str, agent_response: str, session_id: Optional[str] = None,
+                   patient_name: Optional[str] = None) -> Dict:
+        """
+        Build a history record, stamping its ID and timestamp at creation time.
+        """
+        now = datetime.now()
+        return {
+            "id": f"conv_{now.timestamp()}_{uuid.uuid4().hex[:8]}",
+            "timestamp": now.isoformat(),
+            "created_at": now.timestamp(),
             "user_query": str(user_query),
-            "agent_response": str(agent_response)
+            "agent_response": str(agent_response),
+            "session_id": session_id,
+            "patient": normalize_patient(patient_name)
         }
+
+    def write_records(self,
+                      records: List[Dict],
+                      batch_size: int = 64,
+                      chunk_size: Optional[int] = None) -> None:
+        """
+        Embed and persist history records (see new_record) to the vector store.
+        """
+        if not records:
+            return
+
+        # Create a combined text for embedding
+        documents = [f"User: {record['user_query']}\nAgent: {record['agent_response']}" for record in records]
         
-        # Add to collection
-        conversation_id = f"conv_{datetime.now().timestamp()}"
-        self.collection.add(
-            embeddings=[embedding],
-            documents=[combined_text],
-            metadatas=[conversation_metadata],
-            ids=[conversation_id]
-        )
+        # Generate embeddings
+        embeddings = self.embed_many(documents, batch_size=batch_size)
         
-        return conversation_id
+        # Prepare simple metadata (Chroma rejects None values, so only set session_id and
+        # patient when known). created_at is numeric so time windows can be filtered in Chroma.
+        metadatas = []
+        for record in records:
+            metadata = {
+                "timestamp": record["timestamp"],
+                "created_at": record.get("created_at") or datetime.fromisoformat(record["timestamp"]).timestamp(),
+                "user_query": record["user_query"],
+                "agent_response": record["agent_response"]
+            }
+            if record.get("session_id"):
+                metadata["session_id"] = record["session_id"]
+            if record.get("patient"):
+                metadata["patient"] = record["patient"]
+            if record.get("kind"):
+                metadata["kind"] = record["kind"]
+            metadatas.append(metadata)
+        ids = [record["id"] for record in records]
+        
+        # Open the session partitions first, so a new one is backfilled without these records
+        by_session = {}
+        if self.partition_by_session:
+            for i, record in enumerate(records):
+                if record.get("session_id"):
+                    by_session.setdefault(record["session_id"], []).append(i)
+        partitions = {session_id: self.partition(session_id) for session_id in by_session}
+
+        # Add to collection in chunks
+        chunk_size = chunk_size or self.insert_chunk_size()
+        self._add_chunked(self.collection, ids, embeddings, documents, metadatas, chunk_size)
+
+        # Mirror session exchanges into their partitions
+        for session_id, positions in by_session.items():
+            self._add_chunked(
+                partitions[session_id],
+                [ids[i] for i in positions],
+                [embeddings[i] for i in positions],
+                [documents[i] for i in positions],
+                [metadatas[i] for i in positions],
+                chunk_size
+            )
+
+    @staticmethod
+    def _add_chunked(collection, ids, embeddings, documents, metadatas, chunk_size):
+        for start in range(0, len(ids), chunk_size):
+            end = start + chunk_size
+            collection.add(
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end]
+            )
+
+    def insert_chunk_size(self) -> int:
+        """
+        Records per Chroma insert: HISTORY_INSERT_CHUNK_SIZE (default 1000), capped by
+        the store's maximum batch size when the store reports one.
+        """
+        chunk_size = int(os.getenv("HISTORY_INSERT_CHUNK_SIZE", "1000"))
+        get_max_batch_size = getattr(self.store, "get_max_batch_size", None)
+        max_batch_size = get_max_batch_size() if get_max_batch_size else None
+        if max_batch_size:
+            chunk_size = min(chunk_size, max_batch_size)
+        return chunk_size
     
     def search_conversations(self, 
                            query: str, 
-                           n_results: int = 5) -> List[Dict]:
+                           n_results: int = 5,
+                           session_id: Optional[str] = None,
+                           patient_name: Optional[str] = None,
+                           since: TimeBound = None,
+                           until: TimeBound = None) -> List[Dict]:
         """
         Search for relevant conversations based on semantic similarity.
+
+        Filters are applied inside the vector store, so only matching exchanges are ranked.
+        A session-scoped search reads the session's partition when partitions are
+        enabled, so its cost depends on that session's size, not the whole history.
+        Exchanges stored before these filters existed have no patient or created_at
+        metadata and only match unfiltered searches.
         
         Args:
             query: The search query
             n_results: Number of results to return
+            session_id: Only search this session's exchanges (its queued writes are
+                made visible first; None searches every session and waits for all
+                queued writes)
+            patient_name: Only search exchanges about this patient
+            since: Only search exchanges at or after this time (datetime or epoch seconds)
+            until: Only search exchanges at or before this time
             
         Returns:
             List of relevant conversations with metadata
         """
+        # Read-your-writes: make sure queued exchanges are persisted first
+        self.flush_pending(session_id)
+
         # Generate query embedding
-        query_embedding = self.embedding_model.encode(query).tolist()
+        query_embedding = self.embed(query)
         
-        # Search the collection
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results
-        )
+        # Search the session's partition, or the full history filtered in the store
+        if session_id and self.partition_by_session:
+            collection = self.partition(session_id)
+            where = build_where(patient_name=patient_name, since=since, until=until)
+        else:
+            collection = self.collection
+            where = build_where(session_id, patient_name, since, until)
+        query_args = {"query_embeddings": [query_embedding], "n_results": n_results}
+        if where is not None:
+            query_args["where"] = where
+        results = collection.query(**query_args)
         
         # Format results
         relevant_conversations = []
@@ -106,8 +460,174 @@ class ConversationHistory:
         
         return relevant_conversations
     
+    def count(self) -> int:
+        """
+        Number of exchanges in the full history.
+        """
+        return self.collection.count()
+
+    def scan(self, where: Optional[Dict] = None, include_documents: bool = False,
+             page_size: int = 1000) -> Iterator[Dict]:
+        """
+        Iterate over stored exchanges page by page (no embeddings are loaded).
+
+        Yields:
+            {"id", "metadata"} dicts, plus "document" when include_documents is set
+        """
+        include = ["metadatas", "documents"] if include_documents else ["metadatas"]
+        offset = 0
+        while True:
+            page = self.collection.get(where=where, include=include, limit=page_size, offset=offset)
+            ids = page["ids"]
+            for i, record_id in enumerate(ids):
+                record = {"id": record_id, "metadata": page["metadatas"][i] or {}}
+                if include_documents:
+                    record["document"] = page["documents"][i]
+                yield record
+            if len(ids) < page_size:
+                return
+            offset += page_size
+
+    def get_records(self, ids: List[str], chunk_size: int = 1000) -> List[Dict]:
+        """
+        Stored exchanges (id, metadata, document) for the given IDs.
+        """
+        records = []
+        for start in range(0, len(ids), chunk_size):
+            page = self.collection.get(ids=ids[start:start + chunk_size], include=["metadatas", "documents"])
+            records.extend({"id": record_id, "metadata": page["metadatas"][i] or {}, "document": page["documents"][i]}
+                           for i, record_id in enumerate(page["ids"]))
+        return records
+
+    def delete_records(self, records: Iterable[Dict], chunk_size: int = 1000) -> int:
+        """
+        Delete exchanges (as returned by scan or get_records) from the full
+        history and from their session partitions. A partition left empty is
+        dropped.
+
+        Returns:
+            Number of exchanges deleted
+        """
+        ids = []
+        by_session = {}
+        for record in records:
+            ids.append(record["id"])
+            session_id = record["metadata"].get("session_id")
+            if session_id and self.partition_by_session:
+                by_session.setdefault(session_id, []).append(record["id"])
+        for start in range(0, len(ids), chunk_size):
+            self.collection.delete(ids=ids[start:start + chunk_size])
+        for session_id, session_ids in by_session.items():
+            # A dropped partition is not recreated just to delete from it
+            if partition_name(session_id) not in self.partition_names():
+                continue
+            partition = self.partition(session_id)
+            for start in range(0, len(session_ids), chunk_size):
+                partition.delete(ids=session_ids[start:start + chunk_size])
+            if partition.count() == 0:
+                self._drop_partition_named(partition_name(session_id))
+        return len(ids)
+
+    def disk_bytes(self) -> int:
+        """
+        Size of the persist directory on disk.
+        """
+        total = 0
+        for root, _, files in os.walk(self.persist_directory):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    def flush_pending(self, session_id: Optional[str] = None, timeout: float = 5.0) -> bool:
+        """
+        Wait until queued writes for session_id (or all sessions) are persisted.
+        """
+        if self._write_queue is None:
+            return True
+        return self._write_queue.wait_for(session_id, timeout=timeout)
+
+    def close(self):
+        """
+        Drain the write-behind queue, persist the embedding cache and close the
+        vector store (call on shutdown).
+        """
+        if self._write_queue is not None:
+            self._write_queue.close()
+        self.embedding_cache.save()
+        if self._store is not None:
+            self._store.close()
+
+    async def add_conversation_async(self, user_query: str, agent_response: str, session_id: Optional[str] = None,
+                                     patient_name: Optional[str] = None) -> str:
+        """
+        Async version of add_conversation; queueing (or the synchronous embed and
+        insert) runs in the shared I/O executor.
+        """
+        return await run_blocking(self.add_conversation, user_query, agent_response, session_id, patient_name)
+
+    async def add_conversations_bulk_async(self, exchanges: List[Tuple[str, str]], batch_size: int = 64) -> List[str]:
+        """
+        Async version of add_conversations_bulk.
+        """
+        return await run_blocking(self.add_conversations_bulk, exchanges, batch_size)
+
+    async def search_conversations_async(self, query: str, n_results: int = 5, session_id: Optional[str] = None,
+                                         patient_name: Optional[str] = None, since: TimeBound = None,
+                                         until: TimeBound = None) -> List[Dict]:
+        """
+        Async version of search_conversations; embedding and the vector store query run
+        in the shared I/O executor.
+        """
+        return await run_blocking(self.search_conversations, query, n_results, session_id, patient_name, since, until)
+
     def clear_history(self):
         """
         Clear all conversation history.
         """
-        self.collection.delete() 
\ No newline at end of file
+        self.flush_pending()
+        self.collection.delete()
+        for name in self.store.list_collections():
+            if name.startswith(PARTITION_PREFIX):
+                self.store.delete_collection(name)
+        with self._init_lock:
+            self._partitions.clear()
+            self._partition_names = set()
+
+
+# Shared history services, one per persist directory
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def get_conversation_history(persist_directory: str = "./conversation_history") -> ConversationHistory:
+    """
+    Return the process-wide ConversationHistory for persist_directory.
+
+    Agents should receive this shared instance so the embedding model is loaded
+    once and only one vector store is opened on the directory.
+
+    Args:
+        persist_directory: Directory to persist vector store data
+
+    Returns:
+        ConversationHistory: The shared, lazily initialized history service
+    """
+    with _histories_lock:
+        history = _histories.get(persist_directory)
+        if history is None:
+            history = ConversationHistory(persist_directory)
+            _histories[persist_directory] = history
+        return history
+
+
+def close_conversation_histories():
+    """
+    Drain and close every shared history service (called on application shutdown).
+    """
+    with _histories_lock:
+        histories = list(_histories.values())
+    for history in histories:
+        history.close()
@@ -0,0 +1,179 @@
+import atexit
+import hashlib
+import os
+import pickle
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+class EmbeddingCache:
+    """
+    Content-hash keyed LRU cache for text embeddings.
+
+    Keys are a SHA-256 of the model name plus the normalized text, so repeated and
+    trivially re-phrased EMS utterances ("Patient has chest pain." vs
+    "patient has  chest pain") skip model inference. Vectors are stored as compact
+    float32 arrays and can optionally be persisted to disk between restarts.
+    """
+
+    _whitespace = re.compile(r"\s+")
+
+    def __init__(self,
+                 max_entries: int = 4096,
+                 persist_path: Optional[str] = None,
+                 model_name: str = ""):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of embeddings kept before LRU eviction
+            persist_path: Optional file to load from now and save to on exit
+            model_name: Embedding model name, mixed into the key so models never collide
+        """
+        if max_entries < 1:
+            raise ValueError("Embedding cache must hold at least one entry")
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.model_name = model_name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if persist_path:
+            self.load()
+            atexit.register(self.save)
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """
+        Normalize text so near-identical phrasings share a cache key.
+        """
+        text = cls._whitespace.sub(" ", str(text).strip().lower())
+        return text.strip(" .!?,;:")
+
+    def key(self, text: str) -> str:
+        """
+        Content hash used as the cache key for text.
+        """
+        payload = f"{self.model_name}\0{self.normalize(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """
+        Return the cached embedding for text, or None on a miss.
+        """
+        key = self.key(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector.tolist()
+
+    def put(self, text: str, embedding) -> None:
+        """
+        Store an embedding for text, evicting the least recently used entries if full.
+        """
+        vector = array("f", [float(x) for x in embedding])
+        key = self.key(text)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def encode(self, texts: List[str], encoder: Callable[[List[str]], list]) -> List[List[float]]:
+        """
+        Embed texts, running encoder only for the texts that miss the cache.
+
+        Args:
+            texts: Texts to embed
+            encoder: Callable taking a list of texts and returning one vector per text
+
+        Returns:
+            One embedding (list of floats) per input text, in order
+        """
+        results = [self.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(results) if vector is None]
+        if missing:
+            # Encode each distinct (normalized) missing text once
+            unique = OrderedDict()
+            for i in missing:
+                unique.setdefault(self.key(texts[i]), texts[i])
+            vectors = encoder(list(unique.values()))
+            encoded = {}
+            for (key, text), vector in zip(unique.items(), vectors):
+                self.put(text, vector)
+                encoded[key] = [float(x) for x in vector]
+            for i in missing:
+                results[i] = encoded[self.key(texts[i])]
+        return results
+
+    def stats(self) -> Dict:
+        """
+        Hit/miss counters and current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        """
+        Drop all cached embeddings and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def load(self) -> None:
+        """
+        Load persisted embeddings from persist_path, if the file exists.
+        """
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "rb") as f:
+                stored = pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable embedding cache {self.persist_path}: {e}")
+            return
+        if stored.get("model_name") != self.model_name:
+            return
+        with self._lock:
+            for key, raw in stored.get("entries", []):
+                vector = array("f")
+                vector.frombytes(raw)
+                self._entries[key] = vector
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        """
+        Atomically write the cache to persist_path.
+        """
+        if not self.persist_path:
+            return
+        with self._lock:
+            entries = [(key, vector.tobytes()) for key, vector in self._entries.items()]
+        directory = os.path.dirname(self.persist_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.persist_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"model_name": self.model_name, "entries": entries}, f)
+        os.replace(tmp_path, self.persist_path)
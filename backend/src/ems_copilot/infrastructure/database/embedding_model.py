@@ -0,0 +1,188 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# "torch" runs the SentenceTransformer; "onnx" runs its int8-quantized ONNX export
+EMBEDDING_BACKENDS = ("torch", "onnx")
+
+# One loaded model per (name, backend) for the whole process
+_models = {}
+_models_lock = threading.Lock()
+
+
+def resolve_embedding_backend(backend: Optional[str] = None) -> str:
+    """
+    The embedding backend to use: backend if given, else EMBEDDING_BACKEND (default torch).
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(EMBEDDING_BACKENDS)})")
+    return backend
+
+
+def embedding_cache_name(model_name: str, backend: Optional[str] = None) -> str:
+    """
+    Name embedding caches are keyed by. Quantized vectors differ slightly from the
+    PyTorch ones, so they never share cache entries.
+    """
+    backend = resolve_embedding_backend(backend)
+    return model_name if backend == "torch" else f"{model_name}@onnx-int8"
+
+
+def default_onnx_dir(model_name: str) -> str:
+    return os.getenv("EMBEDDING_ONNX_DIR", os.path.join("models", f"{model_name}-onnx-int8"))
+
+
+def mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """
+    Mean of the token embeddings over real (unpadded) tokens, L2-normalized,
+    which is what the SentenceTransformer's Pooling and Normalize modules compute.
+    """
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return pooled / np.clip(norms, 1e-12, None)
+
+
+class OnnxEmbeddingModel:
+    """
+    ONNX Runtime embedding model with the SentenceTransformer encode() interface.
+
+    Loads model_quantized.onnx (falling back to model.onnx) and the fast
+    tokenizer's tokenizer.json from model_dir, as written by
+    dev/export_onnx_embedding.py. Only onnxruntime and tokenizers are imported,
+    so torch never loads on this path.
+    """
+
+    def __init__(self, model_dir: str, max_length: int = 256, threads: Optional[int] = None):
+        """
+        Args:
+            model_dir: Directory with the exported model and tokenizer.json
+            max_length: Tokens per text (the model's max_seq_length)
+            threads: ONNX Runtime intra-op threads (defaults to EMBEDDING_ONNX_THREADS,
+                or all cores)
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, "model_quantized.onnx")
+        if not os.path.exists(model_path):
+            model_path = os.path.join(model_dir, "model.onnx")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"No ONNX embedding model in {model_dir}; "
+                                    "export one with dev/export_onnx_embedding.py")
+        self.model_path = model_path
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads if threads is not None else int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length)
+        pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token="[PAD]")
+
+    def encode(self, texts, batch_size: int = 32) -> np.ndarray:
+        """
+        Embed texts (a string or a list), batch_size texts per forward pass.
+
+        Returns:
+            float32 array of normalized embeddings, one row per text
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feed = {
+                "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+                "attention_mask": attention_mask,
+            }
+            if "token_type_ids" in self.input_names:
+                feed["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+            token_embeddings = self.session.run(None, feed)[0]
+            batches.append(mean_pool(token_embeddings, attention_mask))
+        if not batches:
+            return np.zeros((0, self.session.get_outputs()[0].shape[-1]), dtype=np.float32)
+        embeddings = np.vstack(batches).astype(np.float32)
+        return embeddings[0] if single else embeddings
+
+
+def embedding_parity(reference: np.ndarray, candidate: np.ndarray, k: int = 5) -> Dict[str, float]:
+    """
+    Compare two backends' embeddings of the same texts.
+
+    Args:
+        reference: Embeddings from the reference backend (e.g. PyTorch), one row per text
+        candidate: Embeddings of the same texts from the candidate backend
+        k: Neighbors compared for retrieval agreement
+
+    Returns:
+        mean_cosine and min_cosine between each text's two embeddings, and
+        topk_overlap: the average share of each text's k nearest neighbors
+        (among the other texts) that both backends agree on
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosines = (reference * candidate).sum(axis=1)
+
+    k = min(k, len(reference) - 1)
+    overlap = 1.0
+    if k > 0:
+        neighbors = []
+        for vectors in (reference, candidate):
+            similarities = vectors @ vectors.T
+            np.fill_diagonal(similarities, -np.inf)
+            neighbors.append(np.argsort(-similarities, axis=1)[:, :k])
+        overlap = float(np.mean([len(set(a) & set(b)) / k for a, b in zip(*neighbors)]))
+    return {
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        "topk_overlap": overlap,
+    }
+
+
+def get_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL, backend: Optional[str] = None):
+    """
+    Return the shared embedding model for model_name, loading it on first use.
+
+    Loading the model is the most expensive part of starting the history service,
+    so every ConversationHistory in the process shares the same instance.
+
+    Args:
+        model_name: SentenceTransformer model name
+        backend: "torch" (SentenceTransformer) or "onnx" (int8 ONNX export from
+            EMBEDDING_ONNX_DIR, default models/<model_name>-onnx-int8); defaults
+            to EMBEDDING_BACKEND
+
+    Returns:
+        SentenceTransformer or OnnxEmbeddingModel: The shared model instance
+    """
+    backend = resolve_embedding_backend(backend)
+    key = (model_name, backend)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            if backend == "onnx":
+                model = OnnxEmbeddingModel(default_onnx_dir(model_name))
+            else:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(model_name)
+            _models[key] = model
+        return model
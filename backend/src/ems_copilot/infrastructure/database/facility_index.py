@@ -0,0 +1,302 @@
+import csv
+import heapq
+import json
+import math
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+# Capability names used in datasets and queries
+CAPABILITIES = ("trauma", "stroke", "cardiac", "burn", "pediatric", "obstetrics", "psychiatric")
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Great-circle distance in kilometers.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class Facility:
+    """
+    A hospital or other receiving facility.
+    """
+
+    def __init__(self, facility_id: str, name: str, latitude: float, longitude: float,
+                 capabilities: Iterable[str] = (), trauma_level: Optional[int] = None,
+                 address: str = "", phone: str = ""):
+        """
+        Args:
+            facility_id: Stable identifier from the dataset
+            name: Display name
+            latitude: Degrees north
+            longitude: Degrees east
+            capabilities: Capability names (see CAPABILITIES); "trauma" is implied by trauma_level
+            trauma_level: 1 (highest) to 5, or None for non-trauma facilities
+            address: Street address
+            phone: Contact number
+        """
+        self.facility_id = facility_id
+        self.name = name
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.capabilities = {capability.strip().lower() for capability in capabilities if capability.strip()}
+        self.trauma_level = trauma_level
+        if trauma_level is not None:
+            self.capabilities.add("trauma")
+        self.address = address
+        self.phone = phone
+
+    def matches(self, capabilities: Set[str] = frozenset(), max_trauma_level: Optional[int] = None) -> bool:
+        """
+        True if the facility has every capability and at least the given trauma level.
+        """
+        if not capabilities <= self.capabilities:
+            return False
+        if max_trauma_level is not None and (self.trauma_level is None or self.trauma_level > max_trauma_level):
+            return False
+        return True
+
+    def describe(self) -> str:
+        details = []
+        if self.trauma_level is not None:
+            details.append(f"trauma level {self.trauma_level}")
+        details.extend(sorted(self.capabilities - {"trauma"}))
+        text = self.name
+        if details:
+            text += f" ({', '.join(details)})"
+        if self.address:
+            text += f", {self.address}"
+        return text
+
+    def to_dict(self):
+        return {
+            "facility_id": self.facility_id,
+            "name": self.name,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "capabilities": sorted(self.capabilities),
+            "trauma_level": self.trauma_level,
+            "address": self.address,
+            "phone": self.phone,
+        }
+
+    def __str__(self) -> str:
+        return f"Facility(name='{self.name}', latitude={self.latitude}, longitude={self.longitude})"
+
+
+def _trauma_level(value) -> Optional[int]:
+    text = str(value or "").strip().upper().replace("LEVEL", "").strip()
+    roman = {"I": 1, "II": 2, "III": 3, "IV": 4, "V": 5}
+    if text in roman:
+        return roman[text]
+    return int(text) if text.isdigit() else None
+
+
+def _capabilities(value) -> List[str]:
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in value]
+    return [item for item in str(value or "").replace(",", ";").split(";")]
+
+
+def load_facilities(path: str) -> List[Facility]:
+    """
+    Load facilities from a CSV or GeoJSON file.
+
+    CSV columns: id, name, latitude, longitude, and optionally trauma_level
+    (1-5 or I-V), capabilities (";"-separated), address and phone. GeoJSON:
+    Point features with the same names as properties.
+    """
+    if path.lower().endswith((".geojson", ".json")):
+        with open(path) as f:
+            collection = json.load(f)
+        facilities = []
+        for number, feature in enumerate(collection.get("features", [])):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") != "Point":
+                continue
+            longitude, latitude = geometry["coordinates"][:2]
+            properties = feature.get("properties") or {}
+            facilities.append(Facility(
+                facility_id=str(properties.get("id", feature.get("id", number))),
+                name=properties.get("name", ""),
+                latitude=latitude,
+                longitude=longitude,
+                capabilities=_capabilities(properties.get("capabilities")),
+                trauma_level=_trauma_level(properties.get("trauma_level")),
+                address=properties.get("address", ""),
+                phone=properties.get("phone", "")
+            ))
+        return facilities
+
+    with open(path, newline="") as f:
+        return [Facility(
+            facility_id=row.get("id") or str(number),
+            name=row["name"],
+            latitude=float(row["latitude"]),
+            longitude=float(row["longitude"]),
+            capabilities=_capabilities(row.get("capabilities")),
+            trauma_level=_trauma_level(row.get("trauma_level")),
+            address=row.get("address", ""),
+            phone=row.get("phone", "")
+        ) for number, row in enumerate(csv.DictReader(f))]
+
+
+class FacilityIndex:
+    """
+    Uniform lat/lng grid over facilities for nearest and within-radius lookups.
+
+    Each cell holds the facilities inside it. k-nearest searches rings of cells
+    outward from the query cell and stops as soon as no unvisited ring can be
+    closer than the k-th result, so a lookup touches a handful of cells
+    regardless of dataset size.
+    """
+
+    def __init__(self, facilities: Iterable[Facility], cell_degrees: float = 0.1):
+        """
+        Args:
+            facilities: Facilities to index
+            cell_degrees: Grid cell size in degrees (0.1 is about 11 km north-south)
+        """
+        self.cell_degrees = cell_degrees
+        self.facilities = list(facilities)
+        self._cells = {}
+        for facility in self.facilities:
+            self._cells.setdefault(self._cell(facility.latitude, facility.longitude), []).append(facility)
+        if self._cells:
+            rows = [cell[0] for cell in self._cells]
+            columns = [cell[1] for cell in self._cells]
+            self._bounds = (min(rows), max(rows), min(columns), max(columns))
+
+    def __len__(self):
+        return len(self.facilities)
+
+    def _cell(self, latitude, longitude) -> Tuple[int, int]:
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def _ring(self, row, column, radius):
+        if radius == 0:
+            yield row, column
+            return
+        for r in range(row - radius, row + radius + 1):
+            if r == row - radius or r == row + radius:
+                for c in range(column - radius, column + radius + 1):
+                    yield r, c
+            else:
+                yield r, column - radius
+                yield r, column + radius
+
+    def _max_radius(self, row, column):
+        low_row, high_row, low_column, high_column = self._bounds
+        return max(abs(row - low_row), abs(row - high_row), abs(column - low_column), abs(column - high_column))
+
+    def _ring_min_km(self, latitude, radius):
+        # Anything in ring `radius` is at least (radius - 1) whole cells away in one axis;
+        # east-west cells shrink with latitude, so use the narrower extent at the widest latitude
+        widest = min(89.9, abs(latitude) + (radius + 1) * self.cell_degrees)
+        cell_km = self.cell_degrees * KM_PER_DEGREE * math.cos(math.radians(widest))
+        return max(0, radius - 1) * cell_km
+
+    def nearest(self, latitude: float, longitude: float, k: int = 3,
+                capabilities: Iterable[str] = (), max_trauma_level: Optional[int] = None,
+                max_km: Optional[float] = None) -> List[Tuple[Facility, float]]:
+        """
+        The k closest facilities with the required capabilities.
+
+        Args:
+            latitude: Query latitude
+            longitude: Query longitude
+            k: Number of facilities to return
+            capabilities: Capabilities every result must have
+            max_trauma_level: Only trauma centers of this level or better (1 is best)
+            max_km: Ignore facilities farther than this
+
+        Returns:
+            (facility, distance_km) pairs, closest first
+        """
+        if not self._cells or k < 1:
+            return []
+        required = {capability.lower() for capability in capabilities}
+        row, column = self._cell(latitude, longitude)
+        best = []  # max-heap of (-distance, id, facility)
+        for radius in range(self._max_radius(row, column) + 1):
+            ring_min = self._ring_min_km(latitude, radius)
+            if len(best) == k and ring_min > -best[0][0]:
+                break
+            if max_km is not None and ring_min > max_km:
+                break
+            for cell in self._ring(row, column, radius):
+                for facility in self._cells.get(cell, ()):
+                    if not facility.matches(required, max_trauma_level):
+                        continue
+                    distance = haversine_km(latitude, longitude, facility.latitude, facility.longitude)
+                    if max_km is not None and distance > max_km:
+                        continue
+                    entry = (-distance, id(facility), facility)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, entry)
+        return [(facility, -negative) for negative, _, facility in sorted(best, reverse=True)]
+
+    def within(self, latitude: float, longitude: float, radius_km: float,
+               capabilities: Iterable[str] = (), max_trauma_level: Optional[int] = None) -> List[Tuple[Facility, float]]:
+        """
+        Every matching facility within radius_km, closest first.
+        """
+        if not self._cells:
+            return []
+        required = {capability.lower() for capability in capabilities}
+        lat_span = radius_km / KM_PER_DEGREE
+        widest = min(89.9, abs(latitude) + lat_span)
+        lng_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(widest)), 1e-6))
+        low_row, low_column = self._cell(latitude - lat_span, longitude - lng_span)
+        high_row, high_column = self._cell(latitude + lat_span, longitude + lng_span)
+
+        results = []
+        for r in range(low_row, high_row + 1):
+            for c in range(low_column, high_column + 1):
+                for facility in self._cells.get((r, c), ()):
+                    if not facility.matches(required, max_trauma_level):
+                        continue
+                    distance = haversine_km(latitude, longitude, facility.latitude, facility.longitude)
+                    if distance <= radius_km:
+                        results.append((facility, distance))
+        results.sort(key=lambda result: result[1])
+        return results
+
+    def stats(self) -> Dict:
+        return {
+            "facilities": len(self.facilities),
+            "cells": len(self._cells),
+            "cell_degrees": self.cell_degrees,
+        }
+
+
+_facility_index = None
+_facility_index_lock = threading.Lock()
+
+
+def get_facility_index() -> Optional[FacilityIndex]:
+    """
+    Return the process-wide facility index loaded from FACILITIES_PATH (CSV or
+    GeoJSON), or None when no dataset is configured.
+    """
+    global _facility_index
+    path = os.getenv("FACILITIES_PATH")
+    if not path:
+        return None
+    with _facility_index_lock:
+        if _facility_index is None:
+            facilities = load_facilities(path)
+            _facility_index = FacilityIndex(facilities, cell_degrees=float(os.getenv("FACILITIES_CELL_DEGREES", "0.1")))
+            print(f"Loaded {len(facilities)} facilities from {path}")
+        return _facility_index
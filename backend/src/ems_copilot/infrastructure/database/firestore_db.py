@@ -1,24 +1,55 @@
 import os
-import firebase_admin
-from firebase_admin import credentials, firestore
+from ems_copilot.infrastructure.utils.async_utils import run_blocking
+from ems_copilot.infrastructure.database.patient_cache import PatientRecordCache, get_patient_cache
+from ems_copilot.infrastructure.database.vitals_timeseries import VitalsTimeSeriesStore, get_vitals_timeseries
 
 # Global flag to track if Firebase has been initialized
 _firebase_initialized = False
 
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_WRITES = 500
+
 class FirestoreDB:
-    def __init__(self, credentials_path):
+    def __init__(self, credentials_path, patient_cache: PatientRecordCache = None, listen: bool = None,
+                 vitals_series: VitalsTimeSeriesStore = None):
         """
         Initialize FirestoreDB with the given credentials.
+
+        Args:
+            credentials_path: Path to the service account JSON
+            patient_cache: Read-through cache for per-patient lookups (defaults to the shared one)
+            listen: Keep cached patients fresh with on_snapshot listeners, so writes from
+                other devices show up immediately (defaults to PATIENT_CACHE_LISTEN, off).
+                Without listeners, only our own writes are applied and entries expire by TTL.
+            vitals_series: Time-series store used for trend queries (defaults to the shared one)
         """
         self.credentials_path = credentials_path
+        self.patient_cache = patient_cache or get_patient_cache()
+        self.vitals_series = vitals_series or get_vitals_timeseries()
+        if listen is None:
+            listen = os.getenv("PATIENT_CACHE_LISTEN", "false").lower() in ("1", "true", "yes")
+        self.listen = listen
         self._initialize_firestore()
 
     def _initialize_firestore(self):
         """
         Initialize the Firestore client.
+
+        When FIRESTORE_EMULATOR_HOST is set (e.g. localhost:8080) and no credentials
+        file is available, a plain Firestore client is created against the emulator
+        with anonymous credentials, so tests do not need a service account.
         """
         global _firebase_initialized
+
+        if os.getenv("FIRESTORE_EMULATOR_HOST") and not (self.credentials_path and os.path.exists(self.credentials_path)):
+            from google.cloud import firestore as cloud_firestore
+            self.db = cloud_firestore.Client(project=os.getenv("GOOGLE_CLOUD_PROJECT", "ems-copilot-emulator"))
+            print(f"Using Firestore emulator at {os.getenv('FIRESTORE_EMULATOR_HOST')}")
+            return
         
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
         if not _firebase_initialized:
             try:
                 cred = credentials.Certificate(self.credentials_path)
@@ -44,10 +75,48 @@ class FirestoreDB:
             print("writing to collection: ", collection_name)
             doc_ref = self.db.collection(collection_name).document()
             doc_ref.set(vitals_data)
+            self.patient_cache.append(collection_name, vitals_data.get("patient_name"), dict(vitals_data))
+            self.vitals_series.add_record(vitals_data)
             print(f"Vitals for patient {vitals_data['patient_name']} written successfully.")
         except Exception as e:
             raise Exception(f"Failed to write vitals to Firestore: {e}")
 
+    def write_vitals_batch(self, collection_name, vitals_entries):
+        """
+        Write several vitals entries in one atomic batched write.
+
+        Either every entry is committed or none is, and the whole batch costs a
+        single commit round trip instead of one set() per entry.
+
+        Args:
+            collection_name: Collection to write to
+            vitals_entries: List of vitals dicts (same shape as write_vitals)
+
+        Returns:
+            List of document IDs, in the same order as vitals_entries
+        """
+        if not vitals_entries:
+            return []
+        if len(vitals_entries) > MAX_BATCH_WRITES:
+            raise ValueError(f"Cannot write {len(vitals_entries)} vitals atomically (limit {MAX_BATCH_WRITES})")
+
+        try:
+            print(f"writing {len(vitals_entries)} vitals to collection: ", collection_name)
+            batch = self.db.batch()
+            doc_ids = []
+            for vitals_data in vitals_entries:
+                doc_ref = self.db.collection(collection_name).document()
+                batch.set(doc_ref, vitals_data)
+                doc_ids.append(doc_ref.id)
+            batch.commit()
+            for vitals_data in vitals_entries:
+                self.patient_cache.append(collection_name, vitals_data.get("patient_name"), dict(vitals_data))
+                self.vitals_series.add_record(vitals_data)
+            print(f"{len(vitals_entries)} vitals written successfully.")
+            return doc_ids
+        except Exception as e:
+            raise Exception(f"Failed to write vitals batch to Firestore: {e}")
+
     def write_note(self, collection_name, note_data):
         """
         Write a patient note to Firestore.
@@ -56,6 +125,7 @@ class FirestoreDB:
             print("writing note to collection: ", collection_name)
             doc_ref = self.db.collection(collection_name).document()
             doc_ref.set(note_data)
+            self.patient_cache.append(collection_name, note_data.get("patient_name"), dict(note_data))
             print(f"Note for patient {note_data['patient_name']} written successfully.")
         except Exception as e:
             raise Exception(f"Failed to write note to Firestore: {e}")
@@ -76,26 +146,95 @@ class FirestoreDB:
 
     def get_vitals_by_patient_name(self, collection_name, patient_name):
         """
-        Retrieve vitals data for a specific patient from Firestore.
+        Retrieve vitals data for a specific patient, oldest first.
+        Served from the patient cache after the first lookup.
         """
         try:
-            docs = self.db.collection(collection_name).where('patient_name', '==', patient_name).stream()
-            vitals_data = []
-            for doc in docs:
-                vitals_data.append(doc.to_dict())
-            return vitals_data
+            return self.get_patient_records(collection_name, patient_name)
         except Exception as e:
             raise Exception(f"Failed to retrieve vitals from Firestore: {e}")
 
     def get_notes_by_patient_name(self, collection_name, patient_name):
         """
-        Retrieve notes for a specific patient from Firestore.
+        Retrieve notes for a specific patient, oldest first.
+        Served from the patient cache after the first lookup.
         """
         try:
-            docs = self.db.collection(collection_name).where('patient_name', '==', patient_name).stream()
-            notes_data = []
-            for doc in docs:
-                notes_data.append(doc.to_dict())
-            return notes_data
+            return self.get_patient_records(collection_name, patient_name)
         except Exception as e:
-            raise Exception(f"Failed to retrieve notes from Firestore: {e}")
\ No newline at end of file
+            raise Exception(f"Failed to retrieve notes from Firestore: {e}")
+
+    def get_patient_records(self, collection_name, patient_name):
+        """
+        Read-through lookup of every document for a patient in a collection.
+        """
+        records = self.patient_cache.get(collection_name, patient_name)
+        if records is not None:
+            return records
+
+        # A write landing while the query streams makes the result stale; put() then skips caching it
+        version = self.patient_cache.version(collection_name, patient_name)
+        query = self.db.collection(collection_name).where('patient_name', '==', patient_name)
+        records = self.patient_cache.put(collection_name, patient_name, [doc.to_dict() for doc in query.stream()],
+                                         version=version)
+        if self.listen and not self.patient_cache.has_listener(collection_name, patient_name):
+            self.watch_patient(collection_name, patient_name, query)
+        return records
+
+    def get_vitals_trends(self, collection_name, patient_name, window_minutes=None):
+        """
+        Per-metric trend summaries (min/max/delta/slope) for a patient.
+
+        The patient's series are built once from the (cached) vitals documents and
+        then kept current by our own writes; they are rebuilt only when the
+        document count changes underneath them (e.g. a snapshot listener update).
+
+        Returns:
+            Dict of metric -> summary, see VitalsTimeSeriesStore.trends
+        """
+        try:
+            records = self.get_patient_records(collection_name, patient_name)
+            if not self.vitals_series.is_loaded(patient_name) or \
+                    self.vitals_series.source_count(patient_name) != len(records):
+                self.vitals_series.load_patient(patient_name, records)
+            return self.vitals_series.trends(patient_name, window_minutes)
+        except Exception as e:
+            raise Exception(f"Failed to retrieve vitals trends from Firestore: {e}")
+
+    def watch_patient(self, collection_name, patient_name, query=None):
+        """
+        Keep a cached patient fresh with an on_snapshot listener. The listener is
+        stopped when the patient is evicted from the cache.
+        """
+        if query is None:
+            query = self.db.collection(collection_name).where('patient_name', '==', patient_name)
+
+        def on_snapshot(docs, changes, read_time):
+            self.patient_cache.put(collection_name, patient_name, [doc.to_dict() for doc in docs])
+
+        watch = query.on_snapshot(on_snapshot)
+        self.patient_cache.set_listener(collection_name, patient_name, watch.unsubscribe)
+
+    # Async wrappers: the Firestore client is blocking, so these run the sync
+    # methods in the shared I/O executor instead of on the event loop.
+
+    async def write_vitals_async(self, collection_name, vitals_data):
+        return await run_blocking(self.write_vitals, collection_name, vitals_data)
+
+    async def write_vitals_batch_async(self, collection_name, vitals_entries):
+        return await run_blocking(self.write_vitals_batch, collection_name, vitals_entries)
+
+    async def get_vitals_trends_async(self, collection_name, patient_name, window_minutes=None):
+        return await run_blocking(self.get_vitals_trends, collection_name, patient_name, window_minutes)
+
+    async def write_note_async(self, collection_name, note_data):
+        return await run_blocking(self.write_note, collection_name, note_data)
+
+    async def get_vitals_async(self, collection_name, patient_id):
+        return await run_blocking(self.get_vitals, collection_name, patient_id)
+
+    async def get_vitals_by_patient_name_async(self, collection_name, patient_name):
+        return await run_blocking(self.get_vitals_by_patient_name, collection_name, patient_name)
+
+    async def get_notes_by_patient_name_async(self, collection_name, patient_name):
+        return await run_blocking(self.get_notes_by_patient_name, collection_name, patient_name)
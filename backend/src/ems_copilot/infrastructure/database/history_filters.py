@@ -0,0 +1,71 @@
+import hashlib
+import re
+from datetime import datetime
+from typing import Dict, Optional, Union
+
+
+# Collection name prefix for per-session history partitions
+PARTITION_PREFIX = "session_"
+
+TimeBound = Union[datetime, float, int, None]
+
+
+def normalize_patient(patient_name: Optional[str]) -> Optional[str]:
+    """
+    Patient key stored in metadata and matched by filters ("Hank  Smith" -> "hank smith").
+    """
+    if not patient_name:
+        return None
+    return re.sub(r"\s+", " ", str(patient_name)).strip().lower() or None
+
+
+def to_epoch(value: TimeBound) -> Optional[float]:
+    """
+    Seconds since the epoch for a datetime or number (None passes through).
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def partition_name(session_id: str) -> str:
+    """
+    Chroma collection name for a session's partition. Session ids are hashed
+    because collection names only allow a limited character set and length.
+    """
+    return PARTITION_PREFIX + hashlib.sha1(str(session_id).encode("utf-8")).hexdigest()[:20]
+
+
+def build_where(session_id: Optional[str] = None,
+                patient_name: Optional[str] = None,
+                since: TimeBound = None,
+                until: TimeBound = None) -> Optional[Dict]:
+    """
+    Chroma `where` clause for scoped history searches.
+
+    Args:
+        session_id: Only exchanges from this session
+        patient_name: Only exchanges about this patient
+        since: Only exchanges at or after this time (datetime or epoch seconds)
+        until: Only exchanges at or before this time
+
+    Returns:
+        A where dict, or None when no filter applies
+    """
+    conditions = []
+    if session_id:
+        conditions.append({"session_id": {"$eq": str(session_id)}})
+    patient = normalize_patient(patient_name)
+    if patient:
+        conditions.append({"patient": {"$eq": patient}})
+    if since is not None:
+        conditions.append({"created_at": {"$gte": to_epoch(since)}})
+    if until is not None:
+        conditions.append({"created_at": {"$lte": to_epoch(until)}})
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
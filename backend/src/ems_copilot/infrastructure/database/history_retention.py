@@ -0,0 +1,396 @@
+import gzip
+import heapq
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+SUMMARY_KIND = "summary"
+ARCHIVE_FORMATS = ("jsonl", "parquet")
+
+
+class RetentionPolicy:
+    """
+    Which history exchanges are kept in the live store.
+    """
+
+    def __init__(self, max_age_days: Optional[float] = 30.0, max_exchanges: Optional[int] = 100_000,
+                 summary_max_age_days: Optional[float] = 365.0):
+        """
+        Args:
+            max_age_days: Exchanges older than this are archived (None keeps them)
+            max_exchanges: Live store size; the oldest exchanges beyond it are
+                archived (None for no limit)
+            summary_max_age_days: Age at which session summaries are archived too
+        """
+        self.max_age_days = max_age_days
+        self.max_exchanges = max_exchanges
+        self.summary_max_age_days = summary_max_age_days
+
+    def select_expired(self, records: List[Dict], now: Optional[float] = None) -> List[Dict]:
+        """
+        Pick the exchanges to archive.
+
+        Exchanges past their age limit go first; if the store is still over
+        max_exchanges, the oldest remaining exchanges follow, summaries last.
+
+        Args:
+            records: {"id", "metadata"} dicts for every stored exchange
+            now: Epoch seconds to measure ages from (defaults to now)
+
+        Returns:
+            Expired records, oldest first
+        """
+        now = time.time() if now is None else now
+        records = list(records)
+        expired = [record for record in records if self.is_aged_out(record, now)]
+        expired_ids = {record["id"] for record in expired}
+        kept = [record for record in records if record["id"] not in expired_ids]
+        expired.extend(self.oldest_beyond_limit(kept, len(kept)))
+        expired.sort(key=record_time)
+        return expired
+
+    def age_cutoff(self, now: float) -> Optional[float]:
+        """
+        Epoch seconds before which an exchange may be past its age limit (None
+        when no age limit applies), for filtering in the store.
+        """
+        limits = [days for days in (self.max_age_days, self.summary_max_age_days) if days is not None]
+        return now - min(limits) * 86400 if limits else None
+
+    def is_aged_out(self, record: Dict, now: float) -> bool:
+        is_summary = record["metadata"].get("kind") == SUMMARY_KIND
+        max_age_days = self.summary_max_age_days if is_summary else self.max_age_days
+        return max_age_days is not None and record_time(record) < now - max_age_days * 86400
+
+    def oldest_beyond_limit(self, kept: Iterable[Dict], kept_count: int) -> List[Dict]:
+        """
+        The oldest of kept_count remaining exchanges (summaries last) that put the
+        store over max_exchanges. Only those are held in memory while kept streams by.
+        """
+        if self.max_exchanges is None or kept_count <= self.max_exchanges:
+            return []
+        return heapq.nsmallest(
+            kept_count - self.max_exchanges, kept,
+            key=lambda record: (record["metadata"].get("kind") == SUMMARY_KIND, record_time(record))
+        )
+
+
+def record_time(record: Dict) -> float:
+    """
+    Creation time of a stored exchange in epoch seconds. Exchanges stored before
+    created_at existed fall back to their ISO timestamp.
+    """
+    metadata = record["metadata"]
+    if metadata.get("created_at") is not None:
+        return float(metadata["created_at"])
+    try:
+        return datetime.fromisoformat(metadata["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def summarize_exchanges(session_id: Optional[str], records: List[Dict], max_queries: int = 5) -> str:
+    """
+    Extractive summary of a session's archived exchanges: span, patients and the
+    most recent requests and answer.
+    """
+    records = sorted(records, key=record_time)
+    start = datetime.fromtimestamp(record_time(records[0])).strftime("%Y-%m-%d %H:%M")
+    end = datetime.fromtimestamp(record_time(records[-1])).strftime("%Y-%m-%d %H:%M")
+    label = f"Session {session_id}" if session_id else "Unscoped history"
+    lines = [f"{label}: {len(records)} earlier exchanges from {start} to {end}."]
+    patients = sorted({record["metadata"]["patient"] for record in records if record["metadata"].get("patient")})
+    if patients:
+        lines.append(f"Patients: {', '.join(patients)}.")
+    queries = [_clip(record["metadata"].get("user_query", ""), 120) for record in records[-max_queries:]]
+    queries = [query for query in queries if query]
+    if queries:
+        lines.append("Last requests: " + "; ".join(queries) + ".")
+    last_answer = _clip(records[-1]["metadata"].get("agent_response", ""), 240)
+    if last_answer:
+        lines.append(f"Last answer: {last_answer}")
+    return "\n".join(lines)
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def write_archive(records: List[Dict], directory: str, archive_format: str = "jsonl") -> str:
+    """
+    Write archived exchanges to a new compressed file in directory.
+
+    Args:
+        records: {"id", "metadata", "document"} dicts
+        directory: Archive directory (created if needed)
+        archive_format: "jsonl" (gzip) or "parquet" (zstd, requires pyarrow)
+
+    Returns:
+        Path of the archive file
+    """
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    rows = [{"id": record["id"], "document": record.get("document"), **record["metadata"]} for record in records]
+    if archive_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        path = os.path.join(directory, f"history-{stamp}.parquet")
+        pq.write_table(pa.Table.from_pylist(rows), path, compression="zstd")
+        return path
+    path = os.path.join(directory, f"history-{stamp}.jsonl.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return path
+
+
+class HistoryRetention:
+    """
+    Retention job for the conversation history store.
+
+    Each run archives the exchanges the policy expires to a compressed file,
+    replaces each session's archived exchanges with one summary exchange (so
+    later searches still see what happened earlier), deletes the originals
+    from the live store and its session partitions, drops the partitions of
+    sessions idle for partition_idle_seconds, and reports the live
+    index size, a probe search's latency and the bytes reclaimed. Chroma's
+    SQLite file reuses freed pages rather than shrinking, so reclaimed bytes
+    mostly show up as the store not growing.
+    """
+
+    def __init__(self, history, policy: Optional[RetentionPolicy] = None,
+                 archive_dir: str = "./conversation_archive", archive_format: str = "jsonl",
+                 summarize: Callable[[Optional[str], List[Dict]], str] = summarize_exchanges,
+                 probe_query: str = "patient status and vital signs",
+                 partition_idle_seconds: Optional[float] = 86400.0):
+        """
+        Args:
+            history: ConversationHistory to maintain
+            policy: Retention policy (defaults to RetentionPolicy())
+            archive_dir: Directory archives are written to
+            archive_format: "jsonl" or "parquet" (falls back to jsonl without pyarrow)
+            summarize: (session_id, records) -> summary text
+            probe_query: Search timed after each run
+            partition_idle_seconds: Session partitions with no exchange this recent are
+                dropped (their exchanges stay in the full history; None keeps them)
+        """
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format: {archive_format}")
+        if archive_format == "parquet":
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                print("pyarrow is not installed; archiving history as compressed JSONL")
+                archive_format = "jsonl"
+        self.history = history
+        self.policy = policy or RetentionPolicy()
+        self.archive_dir = archive_dir
+        self.archive_format = archive_format
+        self.summarize = summarize
+        self.probe_query = probe_query
+        self.partition_idle_seconds = partition_idle_seconds
+        self._run_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.interval_seconds = None
+        self.runs = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_report = None
+        self.total_archived = 0
+        self.total_bytes_reclaimed = 0
+
+    def run_once(self, now: Optional[float] = None) -> Dict:
+        """
+        Apply the policy once.
+
+        Returns:
+            Report with the exchanges archived, summaries written, archive file and
+            size, idle partitions dropped, live exchange count, index bytes before and after, bytes
+            reclaimed and the probe search latency
+        """
+        with self._run_lock:
+            started = time.perf_counter()
+            self.history.flush_pending()
+            bytes_before = self.history.disk_bytes()
+            expired = self.select_expired(now)
+
+            archive_path, archive_bytes, summaries = None, 0, 0
+            if expired:
+                records = self.history.get_records([record["id"] for record in expired])
+                archive_path = write_archive(records, self.archive_dir, self.archive_format)
+                archive_bytes = os.path.getsize(archive_path)
+                summaries = self._write_summaries(records)
+                self.history.delete_records(records)
+
+            partitions_dropped = 0
+            if self.partition_idle_seconds is not None:
+                partitions_dropped = self.history.drop_idle_partitions(self.partition_idle_seconds, now)
+
+            bytes_after = self.history.disk_bytes()
+            probe_started = time.perf_counter()
+            self.history.search_conversations(self.probe_query, n_results=5)
+            search_ms = (time.perf_counter() - probe_started) * 1000
+
+            report = {
+                "archived": len(expired),
+                "summaries": summaries,
+                "archive_path": archive_path,
+                "archive_bytes": archive_bytes,
+                "partitions_dropped": partitions_dropped,
+                "exchanges": self.history.count(),
+                "index_bytes_before": bytes_before,
+                "index_bytes_after": bytes_after,
+                "bytes_reclaimed": max(0, bytes_before - bytes_after),
+                "search_ms": round(search_ms, 2),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "finished_at": datetime.now().isoformat(),
+            }
+            with self._stats_lock:
+                self.runs += 1
+                self.total_archived += report["archived"]
+                self.total_bytes_reclaimed += report["bytes_reclaimed"]
+                self.last_report = report
+            print(f"History retention: archived {report['archived']} exchanges into {summaries} summaries, "
+                  f"{report['exchanges']} live, search {report['search_ms']} ms")
+            return report
+
+    def select_expired(self, now: Optional[float] = None) -> List[Dict]:
+        """
+        The exchanges the policy expires, read from the store without loading it
+        whole: only exchanges older than the age cutoff are paged in, and the
+        full store is streamed only when it is over max_exchanges, keeping just
+        the oldest excess exchanges. Exchanges stored before created_at existed
+        only expire through the size limit.
+        """
+        now = time.time() if now is None else now
+        expired = []
+        cutoff = self.policy.age_cutoff(now)
+        if cutoff is not None:
+            expired = [record for record in self.history.scan(where={"created_at": {"$lt": cutoff}})
+                       if self.policy.is_aged_out(record, now)]
+        if self.policy.max_exchanges is not None:
+            kept_count = self.history.count() - len(expired)
+            if kept_count > self.policy.max_exchanges:
+                expired_ids = {record["id"] for record in expired}
+                kept = (record for record in self.history.scan() if record["id"] not in expired_ids)
+                expired.extend(self.policy.oldest_beyond_limit(kept, kept_count))
+        expired.sort(key=record_time)
+        return expired
+
+    def _write_summaries(self, records):
+        by_session = {}
+        for record in records:
+            # Summaries are archived as they are, not summarized again
+            if record["metadata"].get("kind") != SUMMARY_KIND:
+                by_session.setdefault(record["metadata"].get("session_id"), []).append(record)
+        summaries = []
+        for session_id, session_records in by_session.items():
+            summary = self.history.new_record(
+                f"Summary of earlier conversation ({len(session_records)} exchanges)",
+                self.summarize(session_id, session_records),
+                session_id
+            )
+            patients = {record["metadata"].get("patient") for record in session_records}
+            if len(patients) == 1:
+                summary["patient"] = patients.pop()
+            # Dated at the end of the span it covers, so time-window searches place it correctly
+            summary["created_at"] = max(record_time(record) for record in session_records)
+            summary["timestamp"] = datetime.fromtimestamp(summary["created_at"]).isoformat()
+            summary["kind"] = SUMMARY_KIND
+            summaries.append(summary)
+        self.history.write_records(summaries)
+        return len(summaries)
+
+    def start(self, interval_seconds: float) -> None:
+        """
+        Run the job every interval_seconds on a background thread.
+        """
+        if self._thread is not None:
+            return
+        self.interval_seconds = interval_seconds
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="history-retention", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                    self.last_error = str(e)
+                print(f"Error running history retention: {e}")
+
+    def close(self, timeout: float = 30.0) -> None:
+        """
+        Stop the background job, letting a run in progress finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "running": self._thread is not None,
+                "interval_seconds": self.interval_seconds,
+                "max_age_days": self.policy.max_age_days,
+                "max_exchanges": self.policy.max_exchanges,
+                "archive_format": self.archive_format,
+                "runs": self.runs,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "total_archived": self.total_archived,
+                "total_bytes_reclaimed": self.total_bytes_reclaimed,
+                "last_report": self.last_report,
+            }
+
+
+def _optional_number(value: str, cast):
+    return None if value.strip().lower() in ("", "0", "none", "off") else cast(value)
+
+
+_retention = None
+_retention_lock = threading.Lock()
+
+
+def get_history_retention(history=None) -> HistoryRetention:
+    """
+    Return the process-wide retention job for the shared conversation history.
+
+    HISTORY_RETENTION_DAYS (default 30), HISTORY_MAX_EXCHANGES (default 100000)
+    and HISTORY_SUMMARY_RETENTION_DAYS (default 365) set the policy; 0 disables a
+    limit. HISTORY_ARCHIVE_DIR (default ./conversation_archive) and
+    HISTORY_ARCHIVE_FORMAT (jsonl or parquet) control the archive.
+    HISTORY_PARTITION_IDLE_HOURS (default 24, 0 keeps them) sets when idle
+    session partitions are dropped.
+    """
+    global _retention
+    with _retention_lock:
+        if _retention is None:
+            if history is None:
+                from ems_copilot.infrastructure.database.conversation_history import get_conversation_history
+                history = get_conversation_history()
+            policy = RetentionPolicy(
+                max_age_days=_optional_number(os.getenv("HISTORY_RETENTION_DAYS", "30"), float),
+                max_exchanges=_optional_number(os.getenv("HISTORY_MAX_EXCHANGES", "100000"), int),
+                summary_max_age_days=_optional_number(os.getenv("HISTORY_SUMMARY_RETENTION_DAYS", "365"), float)
+            )
+            _retention = HistoryRetention(
+                history,
+                policy,
+                archive_dir=os.getenv("HISTORY_ARCHIVE_DIR", "./conversation_archive"),
+                archive_format=os.getenv("HISTORY_ARCHIVE_FORMAT", "jsonl").lower(),
+                partition_idle_seconds=_optional_number(
+                    os.getenv("HISTORY_PARTITION_IDLE_HOURS", "24"), lambda hours: float(hours) * 3600)
+            )
+        return _retention
@@ -0,0 +1,174 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class HistoryWriteQueue:
+    """
+    Bounded write-behind queue for conversation history.
+
+    Requests hand their exchange to the queue and return immediately; a single
+    background thread embeds and persists queued exchanges in batches. Writes are
+    applied in submission order, so a per-session sequence watermark is enough to
+    give read-your-writes: wait_for(session_id) blocks until everything that
+    session submitted so far has been persisted.
+    """
+
+    def __init__(self,
+                 write_batch: Callable[[List[Dict]], None],
+                 max_pending: int = 1000,
+                 batch_size: int = 64,
+                 flush_interval: float = 0.05):
+        """
+        Initialize the queue and start the background writer.
+
+        Args:
+            write_batch: Callable that persists a list of history records
+            max_pending: Maximum queued records; submit() blocks when full (backpressure)
+            batch_size: Maximum records persisted per write_batch call
+            flush_interval: Seconds the writer waits for more records before flushing
+        """
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._condition = threading.Condition()
+        # Serializes sequence assignment with enqueueing so queue order == sequence order
+        self._submit_lock = threading.Lock()
+        self._submitted_seq = 0
+        self._flushed_seq = 0
+        self._last_seq_by_session = {}
+        self._closed = False
+        self.batches_written = 0
+        self.records_written = 0
+        self.errors = 0
+        self.last_error = None
+
+        self._thread = threading.Thread(target=self._run, name="history-write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: Dict) -> None:
+        """
+        Queue a history record for persistence. Blocks only if the queue is full.
+        """
+        with self._submit_lock:
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError("History write queue is closed")
+                self._submitted_seq += 1
+                seq = self._submitted_seq
+                self._last_seq_by_session[record.get("session_id")] = seq
+            self._queue.put((seq, record))
+
+    def wait_for(self, session_id: Optional[str] = None, timeout: float = 5.0) -> bool:
+        """
+        Block until all records submitted so far for session_id are persisted.
+
+        Args:
+            session_id: Session whose writes must be visible; None waits for every session
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if the writes are persisted, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if session_id is None:
+                target = self._submitted_seq
+            else:
+                target = self._last_seq_by_session.get(session_id, 0)
+            while self._flushed_seq < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Block until every queued record is persisted.
+        """
+        return self.wait_for(None, timeout=timeout)
+
+    def close(self, timeout: float = 30.0) -> None:
+        """
+        Stop accepting records, drain the queue and stop the writer thread.
+        """
+        with self._submit_lock:
+            with self._condition:
+                if self._closed:
+                    return
+                self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    def pending(self) -> int:
+        """
+        Number of submitted records not yet persisted.
+        """
+        with self._condition:
+            return self._submitted_seq - self._flushed_seq
+
+    def stats(self) -> Dict:
+        """
+        Queue depth and writer counters.
+        """
+        return {
+            "pending": self.pending(),
+            "batches_written": self.batches_written,
+            "records_written": self.records_written,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+        # Drain anything submitted before close()
+        remaining_items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                remaining_items.append(item)
+        for start in range(0, len(remaining_items), self.batch_size):
+            self._write(remaining_items[start:start + self.batch_size])
+
+    def _write(self, batch):
+        try:
+            self.write_batch([record for _, record in batch])
+            self.batches_written += 1
+            self.records_written += len(batch)
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            print(f"Error persisting {len(batch)} history records: {e}")
+        finally:
+            with self._condition:
+                self._flushed_seq = max(self._flushed_seq, batch[-1][0])
+                # Forget sessions with nothing left in flight
+                for _, record in batch:
+                    session_id = record.get("session_id")
+                    if self._last_seq_by_session.get(session_id, 0) <= self._flushed_seq:
+                        self._last_seq_by_session.pop(session_id, None)
+                self._condition.notify_all()
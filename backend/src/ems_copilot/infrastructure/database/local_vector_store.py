@@ -0,0 +1,481 @@
+import json
+import os
+import shutil
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+COLLECTION_FILE = "collection.json"
+VECTORS_FILE = "vectors.f32"
+RECORDS_FILE = "records.jsonl"
+HNSW_FILE = "hnsw.bin"
+
+# Filtered searches that keep less than this share of a collection are brute-forced
+# over the matching rows instead of walking the HNSW graph with a filter callback
+HNSW_FILTER_FRACTION = 0.1
+
+_COMPARISONS = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$lt": lambda value, operand: value is not None and value < operand,
+    "$lte": lambda value, operand: value is not None and value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+
+def matches_where(metadata: Dict, where: Optional[Dict]) -> bool:
+    """
+    Evaluate a Chroma-style `where` clause ($eq, $ne, $gt, $gte, $lt, $lte, $in,
+    $nin, $and, $or; a bare value means $eq) against one metadata dict.
+    """
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        else:
+            value = metadata.get(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for operator, operand in condition.items():
+                compare = _COMPARISONS.get(operator)
+                if compare is None:
+                    raise ValueError(f"Unsupported where operator: {operator}")
+                try:
+                    if not compare(value, operand):
+                        return False
+                except TypeError:
+                    return False
+    return True
+
+
+def _load_hnswlib():
+    try:
+        import hnswlib
+        return hnswlib
+    except ImportError:
+        return None
+
+
+class LocalCollection:
+    """
+    In-process vector collection with the subset of the Chroma Collection API
+    that ConversationHistory uses (add, query, get, delete, count).
+
+    Vectors are normalized and stored in a memory-mapped float32 matrix, so
+    the OS pages them in on demand and reopening is instant. Ids, documents
+    and metadata live in memory and are persisted as an append-only JSONL log.
+    Queries are a single matrix-vector product below hnsw_threshold vectors.
+    Above it they go through an hnswlib graph, when hnswlib is installed.
+    Distances are cosine distances (1 - cosine similarity).
+    """
+
+    def __init__(self, path: str, name: str, metadata: Optional[Dict] = None,
+                 hnsw_threshold: int = 50_000, initial_capacity: int = 1024):
+        """
+        Args:
+            path: Directory holding the collection's files (created if needed)
+            name: Collection name
+            metadata: Collection metadata (stored on creation)
+            hnsw_threshold: Vector count at which the HNSW index is built
+            initial_capacity: Rows allocated in the matrix file at first insert
+        """
+        self.path = path
+        self.name = name
+        self.metadata = metadata or {}
+        self.hnsw_threshold = hnsw_threshold
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._dimensions = None
+        self._capacity = 0
+        self._matrix = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids = []
+        self._documents = []
+        self._metadatas = []
+        self._rows = {}
+        self._free = []
+        self._log = None
+        self._log_lines = 0
+        self._hnsw = None
+        self._hnsw_loaded_from_disk = False
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # Persistence
+
+    def _load(self):
+        settings_path = os.path.join(self.path, COLLECTION_FILE)
+        settings = {}
+        if os.path.exists(settings_path):
+            with open(settings_path) as f:
+                settings = json.load(f)
+            self.metadata = settings.get("metadata") or self.metadata
+            self._dimensions = settings.get("dimensions")
+        if self._dimensions:
+            vectors_path = os.path.join(self.path, VECTORS_FILE)
+            rows = os.path.getsize(vectors_path) // (4 * self._dimensions) if os.path.exists(vectors_path) else 0
+            if rows:
+                self._open_matrix(rows)
+
+        records_path = os.path.join(self.path, RECORDS_FILE)
+        if os.path.exists(records_path):
+            with open(records_path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    self._log_lines += 1
+                    if entry["op"] == "add":
+                        self._place(entry["row"], entry["id"], entry.get("document"), entry.get("metadata") or {})
+                    elif entry["op"] == "delete":
+                        self._remove(entry["id"])
+        self._free = [row for row in range(len(self._ids)) if self._ids[row] is None]
+        self._write_settings()
+
+        # Reuse the saved graph only if nothing was written after it was saved
+        hnsw_path = os.path.join(self.path, HNSW_FILE)
+        if os.path.exists(hnsw_path):
+            if settings.get("hnsw_log_lines") == self._log_lines and self._load_hnsw(hnsw_path):
+                self._hnsw_loaded_from_disk = True
+            else:
+                os.remove(hnsw_path)
+
+    def _write_settings(self, **extra):
+        settings = {"name": self.name, "metadata": self.metadata, "dimensions": self._dimensions, **extra}
+        with open(os.path.join(self.path, COLLECTION_FILE), "w") as f:
+            json.dump(settings, f)
+
+    def _append_log(self, entries):
+        if self._log is None:
+            self._log = open(os.path.join(self.path, RECORDS_FILE), "a", encoding="utf-8")
+        self._log.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+        self._log.flush()
+        self._log_lines += len(entries)
+
+    def _compact_log(self):
+        # Rewrite the log with only live records once deletes and replacements dominate it
+        path = os.path.join(self.path, RECORDS_FILE)
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for row, record_id in enumerate(self._ids):
+                if record_id is not None:
+                    f.write(json.dumps({"op": "add", "row": row, "id": record_id, "document": self._documents[row],
+                                        "metadata": self._metadatas[row]}, ensure_ascii=False) + "\n")
+        os.replace(path + ".tmp", path)
+        self._log_lines = len(self._rows)
+
+    def _open_matrix(self, capacity):
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        open(vectors_path, "ab").close()
+        if os.path.getsize(vectors_path) < capacity * self._dimensions * 4:
+            os.truncate(vectors_path, capacity * self._dimensions * 4)
+        self._matrix = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self._dimensions))
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive[:capacity]
+        self._alive = alive
+        self._capacity = capacity
+        if self._hnsw is not None:
+            self._hnsw.resize_index(capacity)
+
+    # Row bookkeeping
+
+    def _place(self, row, record_id, document, metadata):
+        while len(self._ids) <= row:
+            self._ids.append(None)
+            self._documents.append(None)
+            self._metadatas.append(None)
+        previous = self._rows.get(record_id)
+        if previous is not None and previous != row:
+            self._clear_row(previous)
+        self._ids[row] = record_id
+        self._documents[row] = document
+        self._metadatas[row] = metadata
+        self._rows[record_id] = row
+        if row < len(self._alive):
+            self._alive[row] = True
+
+    def _clear_row(self, row):
+        self._ids[row] = None
+        self._documents[row] = None
+        self._metadatas[row] = None
+        if row < len(self._alive):
+            self._alive[row] = False
+        if self._hnsw is not None:
+            try:
+                self._hnsw.mark_deleted(row)
+            except RuntimeError:
+                pass
+
+    def _remove(self, record_id):
+        row = self._rows.pop(record_id, None)
+        if row is None:
+            return False
+        self._clear_row(row)
+        self._free.append(row)
+        return True
+
+    # Chroma-compatible API
+
+    def count(self) -> int:
+        return len(self._rows)
+
+    def add(self, ids: List[str], embeddings, documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict]] = None) -> None:
+        """
+        Add records; an existing id is replaced.
+        """
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("Expected one embedding per id")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [{}] * len(ids)
+
+        with self._lock:
+            if self._dimensions is None:
+                self._dimensions = vectors.shape[1]
+                self._write_settings()
+            elif vectors.shape[1] != self._dimensions:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection "
+                                 f"dimensionality {self._dimensions}")
+            rows = []
+            next_row = len(self._ids)
+            for record_id in ids:
+                row = self._rows.get(record_id)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        row, next_row = next_row, next_row + 1
+                rows.append(row)
+            needed = max(rows) + 1
+            if needed > self._capacity:
+                self._open_matrix(max(needed, 2 * self._capacity, self.initial_capacity))
+            self._matrix[rows] = vectors
+            entries = []
+            for row, record_id, document, metadata in zip(rows, ids, documents, metadatas):
+                self._place(row, record_id, document, dict(metadata or {}))
+                entries.append({"op": "add", "row": row, "id": record_id, "document": document,
+                                "metadata": metadata or {}})
+            self._append_log(entries)
+            if self._hnsw is not None:
+                self._hnsw.add_items(vectors, np.asarray(rows))
+            else:
+                self._maybe_build_hnsw()
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None) -> None:
+        """
+        Delete records by id and/or where clause (everything when neither is given).
+        """
+        with self._lock:
+            if ids is None and where is None:
+                targets = list(self._rows)
+            else:
+                targets = [record_id for record_id in (ids if ids is not None else list(self._rows))
+                           if record_id in self._rows and matches_where(self._metadatas[self._rows[record_id]], where)]
+            removed = [record_id for record_id in targets if self._remove(record_id)]
+            if removed:
+                self._append_log([{"op": "delete", "id": record_id} for record_id in removed])
+            if self._log_lines > 2 * len(self._rows) + 1000:
+                self._compact_log()
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Optional[List[str]] = None) -> Dict:
+        """
+        Records by id and/or where clause, in storage order.
+        """
+        include = ["metadatas", "documents"] if include is None else include
+        with self._lock:
+            if ids is not None:
+                rows = [self._rows[record_id] for record_id in ids if record_id in self._rows]
+            else:
+                rows = [row for row, record_id in enumerate(self._ids) if record_id is not None]
+            if where:
+                rows = [row for row in rows if matches_where(self._metadatas[row], where)]
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+            return self._result(rows, include)
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict] = None,
+              include: Optional[List[str]] = None) -> Dict:
+        """
+        Nearest records for each query embedding, closest first.
+        """
+        include = ["metadatas", "documents", "distances"] if include is None else include
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+
+        results = {key: [] for key in ("ids", "documents", "metadatas", "distances")}
+        with self._lock:
+            for query in queries:
+                rows, similarities = self._nearest(query, n_results, where)
+                result = self._result(rows, include)
+                for key in ("ids", "documents", "metadatas"):
+                    results[key].append(result[key])
+                results["distances"].append([float(1 - similarity) for similarity in similarities]
+                                            if "distances" in include else None)
+        return results
+
+    def _result(self, rows, include):
+        return {
+            "ids": [self._ids[row] for row in rows],
+            "documents": [self._documents[row] for row in rows] if "documents" in include else None,
+            "metadatas": [self._metadatas[row] for row in rows] if "metadatas" in include else None,
+            "embeddings": [self._matrix[row].tolist() for row in rows] if "embeddings" in include else None,
+        }
+
+    # Search
+
+    def _nearest(self, query, k, where):
+        if not self._rows or k < 1 or self._matrix is None:
+            return [], []
+        if self._dimensions != len(query):
+            raise ValueError(f"Query dimension {len(query)} does not match collection dimensionality {self._dimensions}")
+        candidates = None
+        if where:
+            candidates = np.fromiter((row for row, record_id in enumerate(self._ids)
+                                      if record_id is not None and matches_where(self._metadatas[row], where)),
+                                     dtype=np.int64)
+            if len(candidates) == 0:
+                return [], []
+        k = min(k, len(self._rows) if candidates is None else len(candidates))
+
+        use_hnsw = self._hnsw is not None and (
+            candidates is None or len(candidates) >= HNSW_FILTER_FRACTION * len(self._rows))
+        if use_hnsw:
+            self._hnsw.set_ef(max(64, 2 * k))
+            allowed = None
+            if candidates is not None:
+                mask = np.zeros(self._capacity, dtype=bool)
+                mask[candidates] = True
+                allowed = lambda label: bool(mask[label])
+            try:
+                labels, distances = self._hnsw.knn_query(query, k=k, filter=allowed)
+                return labels[0].tolist(), (1 - distances[0]).tolist()
+            except RuntimeError:
+                # Too few reachable matches for the graph search; fall back to the exact scan
+                pass
+
+        used = len(self._ids)
+        if candidates is None:
+            scores = self._matrix[:used] @ query
+            scores[~self._alive[:used]] = -np.inf
+            rows = np.arange(used)
+        else:
+            scores = self._matrix[candidates] @ query
+            rows = candidates
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])]
+        return rows[top].tolist(), scores[top].tolist()
+
+    def _maybe_build_hnsw(self):
+        if self._hnsw is not None or len(self._rows) < self.hnsw_threshold:
+            return
+        hnswlib = _load_hnswlib()
+        if hnswlib is None:
+            return
+        index = hnswlib.Index(space="ip", dim=self._dimensions)
+        index.init_index(max_elements=self._capacity, ef_construction=100, M=16)
+        rows = np.flatnonzero(self._alive[:len(self._ids)])
+        for start in range(0, len(rows), 10_000):
+            chunk = rows[start:start + 10_000]
+            index.add_items(np.asarray(self._matrix[chunk]), chunk)
+        self._hnsw = index
+        print(f"Built HNSW index for {self.name} ({len(rows)} vectors)")
+
+    def _load_hnsw(self, path):
+        hnswlib = _load_hnswlib()
+        if hnswlib is None or not self._dimensions:
+            return False
+        index = hnswlib.Index(space="ip", dim=self._dimensions)
+        index.load_index(path, max_elements=max(self._capacity, 1))
+        self._hnsw = index
+        return True
+
+    def uses_hnsw(self) -> bool:
+        return self._hnsw is not None
+
+    def close(self) -> None:
+        """
+        Flush the matrix and log, and save the HNSW graph so reopening skips the rebuild.
+        """
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            if self._hnsw is not None:
+                self._hnsw.save_index(os.path.join(self.path, HNSW_FILE))
+                self._write_settings(hnsw_log_lines=self._log_lines)
+
+
+class LocalVectorStore:
+    """
+    Directory of LocalCollections, with the client methods ConversationHistory
+    uses (get_or_create_collection, list_collections, delete_collection).
+    """
+
+    def __init__(self, directory: str, hnsw_threshold: int = 50_000):
+        """
+        Args:
+            directory: Root directory; each collection gets a subdirectory
+            hnsw_threshold: Vector count at which a collection builds its HNSW index
+        """
+        self.directory = directory
+        self.hnsw_threshold = hnsw_threshold
+        self._collections = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict] = None) -> LocalCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = LocalCollection(os.path.join(self.directory, name), name, metadata,
+                                             hnsw_threshold=self.hnsw_threshold)
+                self._collections[name] = collection
+            return collection
+
+    def list_collections(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.exists(os.path.join(self.directory, name, COLLECTION_FILE)))
+
+    def delete_collection(self, name: str) -> None:
+        with self._lock:
+            collection = self._collections.pop(name, None)
+        if collection is not None:
+            collection.close()
+        shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def close(self) -> None:
+        with self._lock:
+            collections = list(self._collections.values())
+        for collection in collections:
+            collection.close()
@@ -0,0 +1,219 @@
+import bisect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+class PatientRecordCache:
+    """
+    In-process read-through cache of per-patient Firestore records (vitals, notes).
+
+    Records are held time-ordered per (collection, patient_name). Entries expire
+    after ttl_seconds and the least recently used patient is evicted beyond
+    max_patients. Our own writes are applied write-through, and entries kept
+    fresh by a Firestore on_snapshot listener are simply replaced wholesale; the
+    listener is unsubscribed when its entry is evicted, so listeners stay bounded
+    by max_patients too. Every write bumps the patient's version, so a load that
+    raced with a write (see put) is discarded instead of hiding it until the TTL.
+    Only cached patients keep their own version; the rest share a floor version
+    that every write to them (or eviction) raises, so versions stay bounded too.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_patients: int = 256):
+        """
+        Args:
+            ttl_seconds: Seconds a loaded patient stays valid (0 disables expiry)
+            max_patients: Maximum (collection, patient) entries kept in memory
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_patients = max_patients
+        # key -> (loaded_at, sort keys, records)
+        self._entries = OrderedDict()
+        # key -> unsubscribe callable for an attached snapshot listener
+        self._listeners = {}
+        # key -> write clock at the patient's last write, for cached patients only
+        self._versions = {}
+        # Writes seen so far, and the version shared by every patient not in _versions
+        self._clock = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _sort_key(record: Dict) -> str:
+        return str(record.get("timestamp") or "")
+
+    def get(self, collection_name: str, patient_name: str) -> Optional[List[Dict]]:
+        """
+        Return the cached records for a patient (oldest first), or None on a miss.
+        """
+        key = (collection_name, patient_name)
+        expired = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self._forget_versions([key])
+                entry = None
+                expired = True
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if expired:
+            self._release([key])
+        return None if entry is None else list(entry[2])
+
+    def version(self, collection_name: str, patient_name: str) -> int:
+        """
+        Current write version for a patient; read it before querying Firestore and
+        pass it to put().
+        """
+        with self._lock:
+            return self._versions.get((collection_name, patient_name), self._floor)
+
+    def put(self, collection_name: str, patient_name: str, records: List[Dict],
+            version: Optional[int] = None) -> List[Dict]:
+        """
+        Replace the cached records for a patient (e.g. after a Firestore query or snapshot).
+        With version, the records are not cached if the patient was written since
+        that version was read, as the query may have missed the write.
+
+        Returns:
+            The records, oldest first
+        """
+        records = sorted(records, key=self._sort_key)
+        key = (collection_name, patient_name)
+        evicted = []
+        with self._lock:
+            current = self._versions.get(key, self._floor)
+            if version is not None and current != version:
+                return list(records)
+            self._entries[key] = (time.monotonic(), [self._sort_key(record) for record in records], records)
+            self._entries.move_to_end(key)
+            self._versions[key] = current
+            while len(self._entries) > self.max_patients:
+                evicted.append(self._entries.popitem(last=False)[0])
+                self.evictions += 1
+            self._forget_versions(evicted)
+        self._release(evicted)
+        return list(records)
+
+    def append(self, collection_name: str, patient_name: str, record: Dict) -> None:
+        """
+        Write-through a newly written record. Patients that are not cached are left
+        alone; the next read loads them in full.
+        """
+        key = (collection_name, patient_name)
+        with self._lock:
+            self._clock += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                self._floor = self._clock
+                return
+            self._versions[key] = self._clock
+            _, sort_keys, records = entry
+            sort_key = self._sort_key(record)
+            index = bisect.bisect_right(sort_keys, sort_key)
+            sort_keys.insert(index, sort_key)
+            records.insert(index, record)
+
+    def invalidate(self, collection_name: str, patient_name: str) -> None:
+        """
+        Drop a patient so the next read goes to Firestore.
+        """
+        key = (collection_name, patient_name)
+        with self._lock:
+            self._clock += 1
+            removed = self._entries.pop(key, None) is not None
+            self._forget_versions([key])
+        if removed:
+            self._release([key])
+
+    def clear(self) -> None:
+        """
+        Drop every cached patient.
+        """
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._forget_versions(keys)
+        self._release(keys)
+
+    def set_listener(self, collection_name: str, patient_name: str, unsubscribe: Callable[[], None]) -> None:
+        """
+        Attach a snapshot listener's unsubscribe callable to a patient entry.
+        """
+        with self._lock:
+            previous = self._listeners.pop((collection_name, patient_name), None)
+            self._listeners[(collection_name, patient_name)] = unsubscribe
+        if previous:
+            previous()
+
+    def has_listener(self, collection_name: str, patient_name: str) -> bool:
+        with self._lock:
+            return (collection_name, patient_name) in self._listeners
+
+    def _forget_versions(self, keys):
+        """
+        Drop the versions of patients that left the cache (call with the lock held).
+        They fall back to the floor, raised to the clock so a load that read an
+        older version before a write to them is still rejected.
+        """
+        for key in keys:
+            self._versions.pop(key, None)
+        self._floor = self._clock
+
+    def _release(self, keys):
+        """
+        Unsubscribe listeners of entries that left the cache.
+        """
+        with self._lock:
+            unsubscribes = [self._listeners.pop(key) for key in keys if key in self._listeners]
+        for unsubscribe in unsubscribes:
+            try:
+                unsubscribe()
+            except Exception as e:
+                print(f"Error stopping patient listener: {e}")
+
+    def stats(self) -> Dict:
+        """
+        Hit/miss counters and current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "patients": len(self._entries),
+                "records": sum(len(entry[2]) for entry in self._entries.values()),
+                "listeners": len(self._listeners),
+                "max_patients": self.max_patients,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+_patient_cache = None
+_patient_cache_lock = threading.Lock()
+
+
+def get_patient_cache() -> PatientRecordCache:
+    """
+    Return the process-wide patient record cache, sized by PATIENT_CACHE_SIZE
+    (default 256 patients) with a PATIENT_CACHE_TTL (default 300 seconds).
+    """
+    global _patient_cache
+    with _patient_cache_lock:
+        if _patient_cache is None:
+            _patient_cache = PatientRecordCache(
+                ttl_seconds=float(os.getenv("PATIENT_CACHE_TTL", "300")),
+                max_patients=int(os.getenv("PATIENT_CACHE_SIZE", "256"))
+            )
+        return _patient_cache
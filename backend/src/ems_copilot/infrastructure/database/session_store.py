@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+
+DEFAULT_SESSION = "default"
+
+
+class SessionMemory:
+    """
+    Recent conversation turns for one session (crew/unit), as a bounded ring buffer.
+    """
+
+    def __init__(self, session_id: str, max_turns: int = 50):
+        """
+        Args:
+            session_id: Session the turns belong to
+            max_turns: Turns kept; the oldest is dropped beyond this
+        """
+        self.session_id = session_id
+        self.turns = deque(maxlen=max_turns)
+        # Patient the crew is currently working on (last one named)
+        self.patient = None
+        self.bytes = 0
+        self.last_active = time.monotonic()
+
+    @staticmethod
+    def _size(turn) -> int:
+        return len(turn["content"]) + 64
+
+    def append(self, role: str, content: str) -> int:
+        """
+        Add a turn, dropping the oldest when full.
+
+        Returns:
+            Change in the session's size (bytes, approximate)
+        """
+        turn = {"role": role, "content": str(content), "time": time.time()}
+        delta = self._size(turn)
+        if len(self.turns) == self.turns.maxlen:
+            delta -= self._size(self.turns[0])
+        self.turns.append(turn)
+        self.bytes += delta
+        self.last_active = time.monotonic()
+        return delta
+
+    def trim_oldest(self) -> int:
+        """
+        Drop the oldest turn.
+
+        Returns:
+            Bytes freed
+        """
+        if not self.turns:
+            return 0
+        freed = self._size(self.turns.popleft())
+        self.bytes -= freed
+        return freed
+
+    def recent(self, n: Optional[int] = None) -> List[Dict]:
+        turns = list(self.turns)
+        return turns if n is None else turns[-n:]
+
+
+class SessionStore:
+    """
+    Per-session conversation state with bounded memory.
+
+    Each session keeps at most max_turns turns. Sessions idle for idle_seconds
+    are evicted, and when the total size passes max_bytes (or the session count
+    passes max_sessions) the least recently active sessions go first, so memory
+    stays flat however long the server runs.
+    """
+
+    def __init__(self, max_turns: int = 50, idle_seconds: float = 3600.0,
+                 max_bytes: int = 16 * 1024 * 1024, max_sessions: int = 1000):
+        """
+        Args:
+            max_turns: Turns kept per session
+            idle_seconds: Inactivity after which a session is dropped
+            max_bytes: Approximate total size of all sessions
+            max_sessions: Maximum number of live sessions
+        """
+        self.max_turns = max_turns
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        # session_id -> SessionMemory, least recently active first
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.idle_evictions = 0
+        self.budget_evictions = 0
+
+    def append(self, session_id: Optional[str], role: str, content: str) -> None:
+        """
+        Record a turn for a session (DEFAULT_SESSION when None), creating it if needed.
+        """
+        session_id = session_id or DEFAULT_SESSION
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = SessionMemory(session_id, self.max_turns)
+            self._sessions.move_to_end(session_id)
+            self._bytes += session.append(role, content)
+            self._evict_idle()
+            self._enforce_budget(session)
+
+    def remember_patient(self, session_id: Optional[str], patient_name: Optional[str]) -> None:
+        """
+        Record the patient a session is working on, so later questions that do not
+        name one ("what's wrong with the patient?") refer to them. Ignored when
+        patient_name is empty.
+        """
+        if not patient_name:
+            return
+        session_id = session_id or DEFAULT_SESSION
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = SessionMemory(session_id, self.max_turns)
+            self._sessions.move_to_end(session_id)
+            session.patient = patient_name
+            session.last_active = time.monotonic()
+            self._evict_idle()
+            self._enforce_budget(session)
+
+    def current_patient(self, session_id: Optional[str] = None) -> Optional[str]:
+        """
+        The patient last named in the session, or None.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id or DEFAULT_SESSION)
+            return session.patient if session else None
+
+    def history(self, session_id: Optional[str] = None, n: Optional[int] = None) -> List[Dict]:
+        """
+        The session's recent turns, oldest first (empty for unknown sessions).
+        """
+        with self._lock:
+            session = self._sessions.get(session_id or DEFAULT_SESSION)
+            return session.recent(n) if session else []
+
+    def end(self, session_id: str) -> bool:
+        """
+        Drop a session (e.g. when its websocket closes).
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return False
+            self._bytes -= session.bytes
+            return True
+
+    def evict_idle(self) -> int:
+        """
+        Drop sessions idle for longer than idle_seconds.
+
+        Returns:
+            Number of sessions dropped
+        """
+        with self._lock:
+            return self._evict_idle()
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        evicted = 0
+        # Least recently active first, so stop at the first active session
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_active >= cutoff:
+                break
+            del self._sessions[session_id]
+            self._bytes -= session.bytes
+            evicted += 1
+        self.idle_evictions += evicted
+        return evicted
+
+    def _enforce_budget(self, current):
+        while len(self._sessions) > 1 and (self._bytes > self.max_bytes or len(self._sessions) > self.max_sessions):
+            session_id, session = self._sessions.popitem(last=False)
+            self._bytes -= session.bytes
+            self.budget_evictions += 1
+        # A single session over the whole budget gives up its oldest turns
+        while self._bytes > self.max_bytes and len(current.turns) > 1:
+            self._bytes -= current.trim_oldest()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "turns": sum(len(session.turns) for session in self._sessions.values()),
+                "idle_evictions": self.idle_evictions,
+                "budget_evictions": self.budget_evictions,
+            }
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """
+    Return the process-wide session store, sized by SESSION_MAX_TURNS (default 50),
+    SESSION_IDLE_SECONDS (default 3600), SESSION_MEMORY_MB (default 16) and
+    SESSION_MAX_SESSIONS (default 1000).
+    """
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = SessionStore(
+                max_turns=int(os.getenv("SESSION_MAX_TURNS", "50")),
+                idle_seconds=float(os.getenv("SESSION_IDLE_SECONDS", "3600")),
+                max_bytes=int(float(os.getenv("SESSION_MEMORY_MB", "16")) * 1024 * 1024),
+                max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+            )
+        return _session_store
@@ -0,0 +1,69 @@
+import os
+from typing import Dict, List, Optional
+
+
+VECTOR_BACKENDS = ("chroma", "local")
+
+
+class ChromaVectorStore:
+    """
+    Chroma persistent client behind the vector store interface.
+
+    A vector store exposes get_or_create_collection, list_collections (names),
+    delete_collection and close; its collections provide the Chroma Collection
+    methods add, query, get, delete and count. Chroma collections are returned
+    as they are.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Chroma persist directory
+        """
+        import chromadb
+        self.directory = directory
+        self.client = chromadb.PersistentClient(path=directory)
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict] = None):
+        return self.client.get_or_create_collection(name=name, metadata=metadata)
+
+    def list_collections(self) -> List[str]:
+        # Older clients return Collection objects, newer ones return names
+        return [getattr(collection, "name", collection) for collection in self.client.list_collections()]
+
+    def delete_collection(self, name: str) -> None:
+        self.client.delete_collection(name)
+
+    def get_max_batch_size(self) -> Optional[int]:
+        get_max_batch_size = getattr(self.client, "get_max_batch_size", None)
+        return get_max_batch_size() if get_max_batch_size else None
+
+    def close(self) -> None:
+        pass
+
+
+def open_vector_store(directory: str, backend: Optional[str] = None):
+    """
+    Open the vector store for a history directory.
+
+    Args:
+        directory: Persist directory
+        backend: "chroma" or "local" (defaults to VECTOR_STORE_BACKEND, chroma).
+            The local backend keeps its collections under directory/local and
+            builds an HNSW index once a collection reaches LOCAL_VECTOR_HNSW_THRESHOLD
+            vectors (default 50000). Switching backends does not migrate data.
+
+    Returns:
+        ChromaVectorStore or LocalVectorStore
+    """
+    backend = (backend or os.getenv("VECTOR_STORE_BACKEND", "chroma")).lower()
+    if backend not in VECTOR_BACKENDS:
+        raise ValueError(f"Unknown vector store backend: {backend} (expected one of {', '.join(VECTOR_BACKENDS)})")
+    os.makedirs(directory, exist_ok=True)
+    if backend == "local":
+        from ems_copilot.infrastructure.database.local_vector_store import LocalVectorStore
+        return LocalVectorStore(
+            os.path.join(directory, "local"),
+            hnsw_threshold=int(os.getenv("LOCAL_VECTOR_HNSW_THRESHOLD", "50000"))
+        )
+    return ChromaVectorStore(directory)
@@ -0,0 +1,341 @@
+import bisect
+import os
+import re
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Normalized metric -> display label
+METRIC_LABELS = {
+    "heart_rate": "Heart rate",
+    "spo2": "SpO2",
+    "glucose": "Glucose",
+    "bp_systolic": "BP systolic",
+    "bp_diastolic": "BP diastolic",
+    "temperature": "Temperature",
+    "respiratory_rate": "Respiratory rate",
+}
+
+# Free-form vitals_name (as written by the agent or the LLM) -> normalized metric
+_METRIC_PATTERNS = [
+    ("blood_pressure", re.compile(r"^(?:bp|b/p|blood\s*pressure)$")),
+    ("heart_rate", re.compile(r"^(?:hr|heart\s*rate|heartrate|pulse)$")),
+    ("spo2", re.compile(r"^(?:o2|spo2|sp\s*o2|o2\s*sats?|sats?|saturation|oxygen(?:\s*sat(?:uration)?)?|pulse\s*ox)$")),
+    ("glucose", re.compile(r"^(?:glucose|sugar|blood\s*sugar|bgl|bg|cbg|glu)$")),
+    ("temperature", re.compile(r"^temp(?:erature)?$")),
+    ("respiratory_rate", re.compile(r"^(?:rr|resps?|respiratory(?:\s*rate)?|resp\s*rate|respirations)$")),
+]
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_BP = re.compile(r"(\d{2,3})\s*(?:/|over)\s*(\d{2,3})")
+
+
+def normalize_metric(vitals_name: str) -> Optional[str]:
+    """
+    Map a recorded vitals_name to a normalized metric (None for notes and unknown names).
+    """
+    name = (vitals_name or "").strip().lower()
+    for metric, pattern in _METRIC_PATTERNS:
+        if pattern.match(name):
+            return metric
+    return None
+
+
+def parse_vital(vitals_name: str, vitals_value) -> List[Tuple[str, float]]:
+    """
+    Parse one recorded vital into (metric, value) pairs.
+
+    Blood pressure yields systolic and diastolic; glucose in mmol/L is converted
+    to mg/dL and temperature in Celsius to Fahrenheit so each series has one unit.
+    """
+    metric = normalize_metric(vitals_name)
+    if metric is None:
+        return []
+    text = str(vitals_value or "").strip().lower()
+
+    if metric == "blood_pressure":
+        match = _BP.search(text)
+        if not match:
+            return []
+        return [("bp_systolic", float(match.group(1))), ("bp_diastolic", float(match.group(2)))]
+
+    match = _NUMBER.search(text)
+    if not match:
+        return []
+    value = float(match.group())
+    if metric == "glucose" and "mmol" in text:
+        value *= 18.0
+    elif metric == "temperature" and (text.rstrip().endswith("c") or value < 50):
+        value = value * 9.0 / 5.0 + 32.0
+    return [(metric, value)]
+
+
+def parse_timestamp(timestamp) -> Optional[float]:
+    """
+    Convert an ISO 8601 timestamp (or datetime) to epoch seconds.
+    """
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    try:
+        return datetime.fromisoformat(str(timestamp).replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class VitalSeries:
+    """
+    One metric for one patient as two parallel float64 arrays kept sorted by time.
+
+    Appends in time order are O(1); range lookups are O(log n) bisects and the
+    statistics run vectorized over zero-copy NumPy views of the slice.
+    """
+
+    def __init__(self):
+        self.times = array("d")
+        self.values = array("d")
+
+    def __len__(self):
+        return len(self.times)
+
+    def add(self, when: float, value: float) -> None:
+        if not self.times or when >= self.times[-1]:
+            self.times.append(when)
+            self.values.append(value)
+            return
+        # Late arrival: keep the arrays sorted
+        index = bisect.bisect_right(self.times, when)
+        self.times.insert(index, when)
+        self.values.insert(index, value)
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Times and values with start <= time <= end, as NumPy arrays.
+        """
+        times, values = self._views(start, end)
+        return times.copy(), values.copy()
+
+    def _views(self, start, end):
+        # Zero-copy views; the arrays cannot grow while these are alive, so callers
+        # must not hold them across add() (the store summarizes under its lock)
+        low = 0 if start is None else bisect.bisect_left(self.times, start)
+        high = len(self.times) if end is None else bisect.bisect_right(self.times, end)
+        times = np.frombuffer(self.times, dtype=np.float64)[low:high]
+        values = np.frombuffer(self.values, dtype=np.float64)[low:high]
+        return times, values
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> Optional[Dict]:
+        """
+        min/max/mean, first/last, delta and least-squares slope (per minute) over a range.
+        """
+        times, values = self._views(start, end)
+        if not len(values):
+            return None
+        minutes = (times - times[0]) / 60.0
+        slope = 0.0
+        if len(values) > 1:
+            centered = minutes - minutes.mean()
+            denominator = float(np.dot(centered, centered))
+            if denominator > 0:
+                slope = float(np.dot(centered, values - values.mean())) / denominator
+        return {
+            "count": int(len(values)),
+            "first": float(values[0]),
+            "last": float(values[-1]),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+            "delta": float(values[-1] - values[0]),
+            "slope_per_min": slope,
+            "span_min": float(minutes[-1]),
+            "last_time": datetime.fromtimestamp(times[-1]).isoformat(),
+        }
+
+
+class VitalsTimeSeriesStore:
+    """
+    Per-patient, per-metric vitals series built from Firestore vitals documents.
+
+    A patient is loaded once from its documents (load_patient) and then kept
+    current write-through (add_record), so trend questions never re-read or
+    re-parse documents.
+    """
+
+    def __init__(self, max_patients: int = 256):
+        """
+        Args:
+            max_patients: Patients kept in memory; the least recently updated is dropped beyond this
+        """
+        self.max_patients = max_patients
+        self._patients = {}
+        # patient -> number of source documents ingested, used to detect stale loads
+        self._source_counts = {}
+        self._updated = {}
+        self._names = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(patient_name: str) -> str:
+        return (patient_name or "").strip().lower()
+
+    def is_loaded(self, patient_name: str) -> bool:
+        with self._lock:
+            return self._key(patient_name) in self._patients
+
+    def source_count(self, patient_name: str) -> int:
+        with self._lock:
+            return self._source_counts.get(self._key(patient_name), 0)
+
+    def load_patient(self, patient_name: str, records: Iterable[Dict]) -> None:
+        """
+        (Re)build a patient's series from vitals documents.
+        """
+        series = {}
+        count = 0
+        for record in records:
+            count += 1
+            self._ingest(series, record)
+        key = self._key(patient_name)
+        with self._lock:
+            self._patients[key] = series
+            self._source_counts[key] = count
+            self._updated[key] = time.monotonic()
+            self._names[key] = patient_name
+            while len(self._patients) > self.max_patients:
+                stale = min(self._updated, key=self._updated.get)
+                for mapping in (self._patients, self._source_counts, self._updated, self._names):
+                    mapping.pop(stale, None)
+
+    def add_record(self, record: Dict) -> None:
+        """
+        Append a newly written vitals document. Ignored for patients that are not
+        loaded yet; their next load reads it from Firestore.
+        """
+        key = self._key(record.get("patient_name"))
+        with self._lock:
+            series = self._patients.get(key)
+            if series is None:
+                return
+            self._ingest(series, record)
+            self._source_counts[key] += 1
+            self._updated[key] = time.monotonic()
+
+    @staticmethod
+    def _ingest(series: Dict[str, VitalSeries], record: Dict) -> None:
+        when = parse_timestamp(record.get("timestamp"))
+        if when is None:
+            return
+        for metric, value in parse_vital(record.get("vitals_name"), record.get("vitals_value")):
+            series.setdefault(metric, VitalSeries()).add(when, value)
+
+    def series(self, patient_name: str, metric: str) -> Optional[VitalSeries]:
+        with self._lock:
+            return self._patients.get(self._key(patient_name), {}).get(metric)
+
+    def most_recent_patient(self) -> Optional[str]:
+        """
+        The patient whose series changed last (the one the crew is most likely working on).
+        """
+        with self._lock:
+            if not self._updated:
+                return None
+            return self._names[max(self._updated, key=self._updated.get)]
+
+    def trends(self, patient_name: str, window_minutes: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Per-metric summaries for a patient, optionally over the last window_minutes
+        of that patient's data.
+        """
+        summaries = {}
+        with self._lock:
+            for metric, values in self._patients.get(self._key(patient_name), {}).items():
+                start = None
+                if window_minutes is not None and len(values):
+                    start = values.times[-1] - window_minutes * 60.0
+                summary = values.summary(start)
+                if summary:
+                    summaries[metric] = summary
+        return summaries
+
+    def snapshot(self, metrics: List[str], patient_names: Optional[List[str]] = None) -> Dict:
+        """
+        Latest and previous reading of each metric for many patients as dense matrices.
+
+        Args:
+            metrics: Metric columns, in order
+            patient_names: Patients to include (defaults to every loaded patient)
+
+        Returns:
+            Dict with "patients" (names) and (n_patients, n_metrics) float64 arrays
+            "latest", "latest_time", "previous" and "previous_time"; NaN where a
+            patient has no (or only one) reading for a metric
+        """
+        with self._lock:
+            if patient_names is None:
+                keys = list(self._patients)
+            else:
+                keys = [key for key in map(self._key, patient_names) if key in self._patients]
+            shape = (len(keys), len(metrics))
+            latest, latest_time = np.full(shape, np.nan), np.full(shape, np.nan)
+            previous, previous_time = np.full(shape, np.nan), np.full(shape, np.nan)
+            for row, key in enumerate(keys):
+                series = self._patients[key]
+                for column, metric in enumerate(metrics):
+                    values = series.get(metric)
+                    if not values:
+                        continue
+                    latest[row, column] = values.values[-1]
+                    latest_time[row, column] = values.times[-1]
+                    if len(values) > 1:
+                        previous[row, column] = values.values[-2]
+                        previous_time[row, column] = values.times[-2]
+            names = [self._names[key] for key in keys]
+        return {
+            "patients": names,
+            "latest": latest,
+            "latest_time": latest_time,
+            "previous": previous,
+            "previous_time": previous_time,
+        }
+
+    def trend_summary_text(self, patient_name: str, window_minutes: Optional[float] = None) -> str:
+        """
+        Compact, prompt-ready trend lines for a patient.
+        """
+        lines = []
+        for metric, summary in self.trends(patient_name, window_minutes).items():
+            line = f"{METRIC_LABELS[metric]}: {summary['last']:g}"
+            if summary["count"] > 1:
+                line += (f" (min {summary['min']:g}, max {summary['max']:g}, "
+                         f"{summary['delta']:+g} over {summary['span_min']:.0f} min, "
+                         f"{summary['slope_per_min']:+.2f}/min, n={summary['count']})")
+            lines.append(line)
+        return "\n".join(lines)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "patients": len(self._patients),
+                "points": sum(len(values) for series in self._patients.values() for values in series.values()),
+            }
+
+
+_vitals_timeseries = None
+_vitals_timeseries_lock = threading.Lock()
+
+
+def get_vitals_timeseries() -> VitalsTimeSeriesStore:
+    """
+    Return the process-wide vitals time-series store (VITALS_TIMESERIES_PATIENTS
+    patients, default 256).
+    """
+    global _vitals_timeseries
+    with _vitals_timeseries_lock:
+        if _vitals_timeseries is None:
+            _vitals_timeseries = VitalsTimeSeriesStore(
+                max_patients=int(os.getenv("VITALS_TIMESERIES_PATIENTS", "256"))
+            )
+        return _vitals_timeseries
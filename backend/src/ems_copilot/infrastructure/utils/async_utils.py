@@ -0,0 +1,45 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Dedicated executor for blocking I/O (Firestore, Chroma, embeddings) so it never
+# runs on the event-loop thread and never competes with the default executor.
+_io_executor = None
+
+
+def get_io_executor():
+    """
+    Return the shared thread pool used for blocking calls from async code.
+    Its size comes from EMS_IO_THREADS (default 16).
+    """
+    global _io_executor
+    if _io_executor is None:
+        max_workers = int(os.getenv("EMS_IO_THREADS", "16"))
+        _io_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ems-io")
+    return _io_executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking function in the shared I/O executor and await its result.
+
+    Args:
+        func: The blocking callable
+        *args, **kwargs: Arguments passed to func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_io_executor(wait=True):
+    """
+    Shut down the shared I/O executor (called on application shutdown).
+    """
+    global _io_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=wait)
+        _io_executor = None
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class AudioCache:
+    """
+    Content-addressed cache for synthesized speech.
+
+    Keys are a SHA-256 of the text plus every parameter that changes the audio
+    (voice, language, rate, pitch, encoding, sample rate), so stock phrases such
+    as "Heart rate recorded successfully." are synthesized once. A byte-bounded
+    in-memory LRU sits in front of an optional on-disk tier that is also bounded
+    by size and evicts the least recently used files.
+    """
+
+    _whitespace = re.compile(r"\s+")
+
+    def __init__(self,
+                 max_memory_bytes: int = 32 * 1024 * 1024,
+                 disk_directory: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_memory_bytes: Audio bytes kept in memory before LRU eviction
+            disk_directory: Directory for the on-disk tier (None keeps the cache in memory only)
+            max_disk_bytes: Audio bytes kept on disk before LRU eviction
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_directory = disk_directory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        # key -> file size, least recently used first
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if disk_directory:
+            self._scan_disk()
+
+    @classmethod
+    def key(cls, text: str, voice, **extra) -> str:
+        """
+        Content hash for text spoken with voice (a VoiceSettings) and any extra parameters.
+        """
+        payload = {
+            "text": cls._whitespace.sub(" ", str(text).strip()),
+            "voice_name": voice.voice_name,
+            "language_code": voice.language_code,
+            "speaking_rate": float(voice.speaking_rate),
+            "pitch": float(voice.pitch),
+            "audio_encoding": voice.audio_encoding,
+            "sample_rate_hertz": voice.sample_rate_hertz,
+            **extra,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str, memory_only: bool = False) -> Optional[bytes]:
+        """
+        Return cached audio for key (promoting disk hits into memory), or None on a miss.
+
+        Args:
+            key: Cache key from AudioCache.key
+            memory_only: Skip the disk tier (and do not count a miss), for non-blocking fast paths
+        """
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+            if memory_only:
+                return None
+            on_disk = key in self._disk
+
+        audio = self._read_disk(key) if on_disk else None
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._disk.move_to_end(key)
+        self._remember(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """
+        Store audio in memory and, when enabled, on disk.
+        """
+        self._remember(key, audio)
+        if self.disk_directory:
+            self._write_disk(key, audio)
+
+    def stats(self) -> Dict:
+        """
+        Hit/miss counters per tier and current sizes.
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_evictions": self.memory_evictions,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "disk_evictions": self.disk_evictions,
+            }
+
+    def clear(self) -> None:
+        """
+        Drop the in-memory tier and reset the counters (the disk tier is kept).
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self.memory_hits = self.disk_hits = self.misses = 0
+            self.memory_evictions = self.disk_evictions = 0
+
+    def _remember(self, key, audio):
+        if len(audio) > self.max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.memory_evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.disk_directory, key[:2], f"{key}.audio")
+
+    def _scan_disk(self):
+        """
+        Index existing files, least recently used (oldest mtime) first.
+        """
+        files = []
+        for root, _, names in os.walk(self.disk_directory):
+            for name in names:
+                if name.endswith(".audio"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, name[:-len(".audio")], stat.st_size))
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            # mtime doubles as the LRU clock across restarts
+            os.utime(path)
+            return audio
+        except OSError:
+            with self._lock:
+                size = self._disk.pop(key, None)
+                if size is not None:
+                    self._disk_bytes -= size
+            return None
+
+    def _write_disk(self, key, audio):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing TTS audio cache entry: {e}")
+            return
+        with self._lock:
+            previous = self._disk.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous
+            self._disk[key] = len(audio)
+            self._disk_bytes += len(audio)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        evicted = []
+        with self._lock:
+            while self._disk_bytes > self.max_disk_bytes and self._disk:
+                key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self.disk_evictions += 1
+                evicted.append(key)
+        for key in evicted:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    """
+    Return the process-wide TTS audio cache.
+
+    Sized by TTS_CACHE_MEMORY_MB (default 32) in memory and TTS_CACHE_DISK_MB
+    (default 256) on disk under TTS_CACHE_DIR (default ./tts_cache; set it to an
+    empty string to keep the cache in memory only).
+    """
+    global _audio_cache
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioCache(
+                max_memory_bytes=int(float(os.getenv("TTS_CACHE_MEMORY_MB", "32")) * 1024 * 1024),
+                disk_directory=os.getenv("TTS_CACHE_DIR", "./tts_cache") or None,
+                max_disk_bytes=int(float(os.getenv("TTS_CACHE_DISK_MB", "256")) * 1024 * 1024)
+            )
+        return _audio_cache
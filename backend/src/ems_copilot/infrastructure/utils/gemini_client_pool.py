@@ -0,0 +1,259 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+
+class GeminiClientPool:
+    """
+    Process-wide pool of reusable Gemini clients.
+
+    Each genai.Client owns its own HTTP client, so keeping a small set of them
+    alive lets every agent hop reuse warm connections instead of paying client
+    construction and a fresh TLS handshake per call.
+    """
+
+    def __init__(self, api_key, size=None, base_url=None, timeout_ms=None, acquire_timeout=30.0):
+        """
+        Initialize the pool. Clients are created lazily, up to `size`.
+
+        Args:
+            api_key: Gemini API key shared by every client in the pool
+            size: Maximum number of clients (defaults to GEMINI_CLIENT_POOL_SIZE or 4)
+            base_url: Optional API base URL override (e.g. a local fake Gemini server)
+            timeout_ms: Optional per-request HTTP timeout in milliseconds
+            acquire_timeout: Seconds to wait for a free client before giving up
+        """
+        if size is None:
+            size = int(os.getenv("GEMINI_CLIENT_POOL_SIZE", "4"))
+        if size < 1:
+            raise ValueError("Gemini client pool size must be at least 1")
+
+        self.api_key = api_key
+        self.size = size
+        self.base_url = base_url if base_url is not None else os.getenv("GEMINI_BASE_URL")
+        self.timeout_ms = timeout_ms
+        self.acquire_timeout = acquire_timeout
+
+        self._available = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._requests = 0
+        self._errors = 0
+        self._consecutive_errors = 0
+        self._total_latency = 0.0
+        self._last_error = None
+        self._last_error_at = None
+
+    def _create_client(self):
+        """
+        Build a new genai.Client using the pool's HTTP options.
+        The SDK is imported here, on the first client, rather than at import time.
+        """
+        from google import genai
+        from google.genai import types
+
+        http_options = None
+        if self.base_url or self.timeout_ms:
+            http_options = types.HttpOptions(base_url=self.base_url, timeout=self.timeout_ms)
+        return genai.Client(api_key=self.api_key, http_options=http_options)
+
+    def _acquire(self):
+        """
+        Take an idle client, creating one if the pool has not reached its size.
+        """
+        try:
+            return self._available.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            try:
+                return self._create_client()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._available.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No Gemini client became available within {self.acquire_timeout}s "
+                f"(pool size {self.size})"
+            )
+
+    def warm_up(self):
+        """
+        Create a client ahead of the first call, so that call does not pay for
+        importing the SDK and building the HTTP client.
+        """
+        self._available.put(self._acquire())
+
+    def _checkout(self):
+        with self._lock:
+            self._in_use += 1
+        return time.perf_counter()
+
+    def _checkin(self, client, started, error=None):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._in_use -= 1
+            self._requests += 1
+            if error is None:
+                self._total_latency += elapsed
+                self._consecutive_errors = 0
+            else:
+                self._errors += 1
+                self._consecutive_errors += 1
+                self._last_error = str(error)
+                self._last_error_at = time.time()
+        self._available.put(client)
+
+    @contextmanager
+    def client(self):
+        """
+        Check out a client for the duration of a `with` block.
+
+        Usage:
+            with pool.client() as client:
+                client.models.generate_content(...)
+        """
+        client = self._acquire()
+        started = self._checkout()
+        error = None
+        try:
+            yield client
+        except Exception as e:
+            # GeneratorExit (a stream closed early) and cancellation are not Gemini errors
+            error = e
+            raise
+        finally:
+            self._checkin(client, started, error=error)
+
+    @asynccontextmanager
+    async def async_client(self):
+        """
+        Async variant of client(). Waiting for a busy pool happens off the event loop.
+
+        Usage:
+            async with pool.async_client() as client:
+                await client.aio.models.generate_content(...)
+        """
+        try:
+            client = self._available.get_nowait()
+        except queue.Empty:
+            acquiring = asyncio.get_running_loop().run_in_executor(None, self._acquire)
+            try:
+                client = await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # The executor thread still gets a client; put it back once it does
+                acquiring.add_done_callback(self._return_abandoned)
+                raise
+        started = self._checkout()
+        error = None
+        try:
+            yield client
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._checkin(client, started, error=error)
+
+    def _return_abandoned(self, acquiring):
+        """
+        Return a client acquired for a caller that was cancelled while waiting.
+        """
+        if not acquiring.cancelled() and acquiring.exception() is None:
+            self._available.put(acquiring.result())
+
+    def health(self):
+        """
+        Report pool utilization and error statistics.
+
+        Returns:
+            dict: Pool size, created/in-use/idle client counts, request and error
+            counters, average latency and the most recent error (if any).
+            Status is 'degraded' after three consecutive failed requests.
+        """
+        with self._lock:
+            successes = self._requests - self._errors
+            avg_latency_ms = (self._total_latency / successes * 1000) if successes else 0.0
+            return {
+                "status": "degraded" if self._consecutive_errors >= 3 else "ok",
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._available.qsize(),
+                "requests": self._requests,
+                "errors": self._errors,
+                "avg_latency_ms": round(avg_latency_ms, 2),
+                "last_error": self._last_error,
+                "last_error_at": self._last_error_at,
+                "base_url": self.base_url,
+            }
+
+    def close(self):
+        """
+        Drop all idle clients so their connections can be released.
+        """
+        while True:
+            try:
+                self._available.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = self._in_use
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_gemini_client_pool(api_key, **kwargs):
+    """
+    Return the shared GeminiClientPool for the given API key, creating it on first use.
+
+    Args:
+        api_key: Gemini API key
+        **kwargs: Passed to GeminiClientPool when the pool is first created
+
+    Returns:
+        GeminiClientPool: The process-wide pool for this key
+    """
+    with _pools_lock:
+        pool = _pools.get(api_key)
+        if pool is None:
+            pool = GeminiClientPool(api_key, **kwargs)
+            _pools[api_key] = pool
+        return pool
+
+
+def reset_gemini_client_pools():
+    """
+    Close and forget every shared pool (used by tests and on shutdown).
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def gemini_pool_health():
+    """
+    Health report for every shared pool, keyed by a redacted API key.
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {
+        (f"...{key[-4:]}" if key else "default"): pool.health()
+        for key, pool in pools
+    }
@@ -0,0 +1,245 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import requests
+
+from ems_copilot.infrastructure.utils.async_utils import run_blocking
+
+
+class Location:
+    """
+    A position fix.
+    """
+
+    def __init__(self, latitude: float, longitude: float, accuracy_m: Optional[float] = None,
+                 source: str = "unknown", observed_at: Optional[float] = None):
+        """
+        Args:
+            latitude: Degrees north
+            longitude: Degrees east
+            accuracy_m: Reported accuracy radius in meters
+            source: Where the fix came from ("device", "google", "static")
+            observed_at: time.monotonic() of the fix (defaults to now)
+        """
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.accuracy_m = accuracy_m
+        self.source = source
+        self.observed_at = time.monotonic() if observed_at is None else observed_at
+
+    def age(self) -> float:
+        return time.monotonic() - self.observed_at
+
+    def to_dict(self):
+        return {
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "accuracy_m": self.accuracy_m,
+            "source": self.source,
+            "age_seconds": round(self.age(), 1),
+        }
+
+    def __str__(self) -> str:
+        # The format the GPS prompt has always used
+        return f"Latitude: {self.latitude}, Longitude: {self.longitude}"
+
+
+class GoogleGeolocationProvider:
+    """
+    Google Geolocation API lookup over a keep-alive session with a timeout.
+    """
+
+    def __init__(self, api_key: str, timeout: float = 5.0, session: Optional[requests.Session] = None):
+        """
+        Args:
+            api_key: Google Maps API key
+            timeout: Seconds before the request is abandoned
+            session: Optional requests session (one is created otherwise)
+        """
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def locate(self) -> Location:
+        url = f"https://www.googleapis.com/geolocation/v1/geolocate?key={self.api_key}"
+        response = self.session.post(url, timeout=self.timeout)
+        if response.status_code != 200:
+            raise Exception(f"Error: {response.text}")
+        body = response.json()
+        location = body["location"]
+        return Location(location["lat"], location["lng"], body.get("accuracy"), source="google")
+
+
+class StaticLocationProvider:
+    """
+    Fixed position, for tests and local development without a Maps key.
+    """
+
+    def __init__(self, latitude: float, longitude: float):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.calls = 0
+
+    def locate(self) -> Location:
+        self.calls += 1
+        return Location(self.latitude, self.longitude, source="static")
+
+
+class CachedLocationProvider:
+    """
+    Current-location source for the GPS agent.
+
+    Coordinates pushed by a client device are kept per session (crew/unit) and
+    win for that session while they are fresh; otherwise the wrapped provider is
+    asked at most once per ttl_seconds. When a lookup fails, the session's last
+    known fix is used if it is no older than max_stale_seconds.
+    """
+
+    def __init__(self, provider, ttl_seconds: float = 60.0, push_ttl_seconds: float = 300.0,
+                 max_stale_seconds: float = 600.0, max_sessions: int = 1000):
+        """
+        Args:
+            provider: Object with locate() -> Location (network lookups run in the I/O executor)
+            ttl_seconds: How long a looked-up fix is reused
+            push_ttl_seconds: How long a device-pushed fix is preferred over lookups
+            max_stale_seconds: Oldest fix served when the provider fails
+            max_sessions: Sessions whose pushed fix is kept; the least recently pushed go first
+        """
+        self.provider = provider
+        self.ttl_seconds = ttl_seconds
+        self.push_ttl_seconds = push_ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.max_sessions = max_sessions
+        # session_id -> last pushed Location, least recently pushed first
+        self._pushed = OrderedDict()
+        self._looked_up = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.lookups = 0
+        self.pushes = 0
+        self.failures = 0
+
+    def push(self, latitude: float, longitude: float, accuracy_m: Optional[float] = None,
+             session_id: Optional[str] = None) -> Location:
+        """
+        Record coordinates reported by a session's client device.
+        """
+        location = Location(latitude, longitude, accuracy_m, source="device")
+        with self._lock:
+            self._pushed.pop(session_id, None)
+            self._pushed[session_id] = location
+            self.pushes += 1
+            # Fixes too old to serve even as a fallback, then the least recently pushed
+            while self._pushed:
+                oldest = next(iter(self._pushed.values()))
+                if oldest.age() < self.max_stale_seconds and len(self._pushed) <= self.max_sessions:
+                    break
+                self._pushed.popitem(last=False)
+        return location
+
+    def forget(self, session_id: Optional[str]) -> bool:
+        """
+        Drop a session's pushed fix (when the session ends).
+
+        Returns:
+            True if the session had one
+        """
+        with self._lock:
+            return self._pushed.pop(session_id, None) is not None
+
+    def cached(self, session_id: Optional[str] = None) -> Optional[Location]:
+        """
+        The session's fresh pushed fix or a fresh looked-up fix, or None if a lookup is needed.
+        """
+        with self._lock:
+            pushed = self._pushed.get(session_id)
+            if pushed is not None and pushed.age() < self.push_ttl_seconds:
+                self.hits += 1
+                return pushed
+            if self._looked_up is not None and self._looked_up.age() < self.ttl_seconds:
+                self.hits += 1
+                return self._looked_up
+            return None
+
+    def locate(self, session_id: Optional[str] = None) -> Location:
+        """
+        Current location for a session (blocking when a lookup is needed).
+        """
+        location = self.cached(session_id)
+        if location is not None:
+            return location
+        with self._lock:
+            self.lookups += 1
+        try:
+            location = self.provider.locate()
+        except Exception as e:
+            return self._fallback(e, session_id)
+        with self._lock:
+            self._looked_up = location
+        return location
+
+    async def locate_async(self, session_id: Optional[str] = None) -> Location:
+        """
+        Async version of locate; cached fixes are returned without leaving the event loop.
+        """
+        location = self.cached(session_id)
+        if location is not None:
+            return location
+        return await run_blocking(self.locate, session_id)
+
+    def _fallback(self, error, session_id):
+        with self._lock:
+            self.failures += 1
+            known = [fix for fix in (self._pushed.get(session_id), self._looked_up) if fix is not None]
+        if known:
+            latest = min(known, key=Location.age)
+            if latest.age() < self.max_stale_seconds:
+                print(f"Location lookup failed ({error}); using {latest.source} fix from {latest.age():.0f}s ago")
+                return latest
+        raise error
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "lookups": self.lookups,
+                "pushes": self.pushes,
+                "failures": self.failures,
+                "pushed_sessions": len(self._pushed),
+                "looked_up": self._looked_up.to_dict() if self._looked_up else None,
+            }
+
+
+_location_provider = None
+_location_provider_lock = threading.Lock()
+
+
+def get_location_provider(google_maps_api_key: Optional[str] = None) -> CachedLocationProvider:
+    """
+    Return the process-wide location provider.
+
+    STATIC_LOCATION="lat,lng" uses a fixed position instead of the Google
+    Geolocation API. LOCATION_CACHE_TTL (default 60 s), LOCATION_PUSH_TTL
+    (default 300 s) and GEOLOCATION_TIMEOUT (default 5 s) tune the cache.
+    """
+    global _location_provider
+    with _location_provider_lock:
+        if _location_provider is None:
+            static = os.getenv("STATIC_LOCATION")
+            if static:
+                latitude, longitude = (float(value) for value in static.split(","))
+                provider = StaticLocationProvider(latitude, longitude)
+            else:
+                provider = GoogleGeolocationProvider(
+                    google_maps_api_key or os.getenv("GOOGLE_MAPS_API_KEY"),
+                    timeout=float(os.getenv("GEOLOCATION_TIMEOUT", "5"))
+                )
+            _location_provider = CachedLocationProvider(
+                provider,
+                ttl_seconds=float(os.getenv("LOCATION_CACHE_TTL", "60")),
+                push_ttl_seconds=float(os.getenv("LOCATION_PUSH_TTL", "300"))
+            )
+        return _location_provider
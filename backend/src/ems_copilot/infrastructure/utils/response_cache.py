@@ -0,0 +1,349 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from ems_copilot.infrastructure.utils.async_utils import run_blocking
+from ems_copilot.infrastructure.utils.semantic_cache import DEFAULT_SEMANTIC_AGENTS, SemanticCache
+
+
+# Seconds an answer stays fresh, per agent; agents not listed are never cached
+# (vitals_agent writes data, so replaying its confirmation would skip the write)
+DEFAULT_RESPONSE_TTLS = {
+    "gps_agent": 300.0,
+    "triage_agent": 60.0,
+}
+
+# Agent answers that report a failure rather than an answer
+_ERROR_PREFIXES = (
+    "error",
+    "sorry, i encountered an error",
+    "no response received",
+    "invalid response structure",
+    "no text content found",
+)
+# Marker a Gemini stream appends when it fails part-way
+_STREAM_ERROR = "error calling gemini api"
+
+
+class ResponseCache:
+    """
+    Short-lived cache of agent answers for repeated questions.
+
+    Entries are keyed on the normalized query, the agent that answered it, a
+    caller-supplied context fingerprint (e.g. the unit's location cell, or the
+    session and patient) and the agent's data generation. An entry may belong
+    to a scope (e.g. a patient) with its own generation. invalidate() bumps the
+    generation of an agent, or of one scope, so a vitals write for a patient
+    makes every earlier triage answer about that patient unreachable, including
+    answers still being generated when the write landed. A scope keeps its own
+    generation only while it has entries; the others share a floor generation
+    that each scoped invalidation raises, so scopes stay bounded by max_entries.
+
+    An optional SemanticCache answers paraphrases of earlier questions for the
+    agents it allows once the exact lookup misses.
+    """
+
+    _whitespace = re.compile(r"\s+")
+    _trailing = re.compile(r"[\s?.!]+$")
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 512,
+                 semantic: Optional[SemanticCache] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            ttls: Seconds an answer stays fresh per agent name (defaults to DEFAULT_RESPONSE_TTLS)
+            max_entries: Entries kept before the least recently used is dropped
+            semantic: Optional embedding-similarity tier for paraphrased questions
+        """
+        self.ttls = dict(DEFAULT_RESPONSE_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        # key -> (agent, stored_at, response)
+        self._entries = OrderedDict()
+        self.semantic = semantic
+        self._generations = {}
+        # (agent, scope) -> (generation, live entries), for scopes with entries only
+        self._scoped_generations = {}
+        # Scoped invalidations so far, and the generation of every scope not listed
+        self._scope_clock = 0
+        self._scope_floor = 0
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    @classmethod
+    def normalize_query(cls, query: str) -> str:
+        """
+        Lowercase, collapse whitespace and drop trailing punctuation.
+        """
+        query = cls._whitespace.sub(" ", str(query or "").strip().lower())
+        return cls._trailing.sub("", query)
+
+    def caches(self, agent: str) -> bool:
+        return self.ttls.get(agent, 0) > 0
+
+    def generation(self, agent: str, scope: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Current data generation for an agent (and scope); pass it to put() to
+        detect answers computed from data that changed while they were being generated.
+        """
+        with self._lock:
+            return self._generation(agent, scope)
+
+    def _generation(self, agent, scope):
+        if not scope:
+            return self._generations.get(agent, 0), 0
+        scoped = self._scoped_generations.get((agent, scope))
+        return self._generations.get(agent, 0), self._scope_floor if scoped is None else scoped[0]
+
+    def _track(self, entry):
+        """
+        Count a new entry against its scope, pinning the scope's generation (lock held).
+        """
+        agent, scope = entry[0], entry[3]
+        if scope:
+            generation, count = self._scoped_generations.get((agent, scope), (self._scope_floor, 0))
+            self._scoped_generations[(agent, scope)] = (generation, count + 1)
+
+    def _untrack(self, entry):
+        """
+        Release an entry that left the cache; a scope with no entries left drops its
+        generation and falls back to the floor, raised to the clock so an answer
+        generated before an invalidation of the scope is still rejected (lock held).
+        """
+        agent, scope = entry[0], entry[3]
+        if not scope:
+            return
+        generation, count = self._scoped_generations[(agent, scope)]
+        if count > 1:
+            self._scoped_generations[(agent, scope)] = (generation, count - 1)
+        else:
+            del self._scoped_generations[(agent, scope)]
+            self._scope_floor = self._scope_clock
+
+    def _key(self, agent, query, context, generation):
+        raw = "\x1f".join((agent, self.normalize_query(query), str(context or ""), str(generation)))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _count(self, agent, counter):
+        counts = self._counters.setdefault(
+            agent, {"hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+        )
+        counts[counter] += 1
+
+    def get(self, agent: str, query: str, context: str = "", scope: Optional[str] = None) -> Optional[str]:
+        """
+        Return a fresh cached answer (exact match, then a close paraphrase), or None.
+        """
+        if not self.caches(agent):
+            return None
+        response = self._get_exact(agent, query, context, scope)
+        if response is None and self._semantic_eligible(agent):
+            response = self._get_semantic(agent, query, context)
+        if response is None:
+            self._record_miss(agent)
+        return response
+
+    async def get_async(self, agent: str, query: str, context: str = "",
+                        scope: Optional[str] = None) -> Optional[str]:
+        """
+        Async version of get; embedding the query for the semantic tier runs in the I/O executor.
+        """
+        if not self.caches(agent):
+            return None
+        response = self._get_exact(agent, query, context, scope)
+        if response is None and self._semantic_eligible(agent):
+            response = await run_blocking(self._get_semantic, agent, query, context)
+        if response is None:
+            self._record_miss(agent)
+        return response
+
+    def _get_exact(self, agent, query, context, scope):
+        with self._lock:
+            key = self._key(agent, query, context, self._generation(agent, scope))
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttls[agent]:
+                self._entries.move_to_end(key)
+                self._count(agent, "hits")
+                return entry[2]
+            if entry is not None:
+                self._untrack(self._entries.pop(key))
+            return None
+
+    def _semantic_eligible(self, agent):
+        return self.semantic is not None and self.semantic.caches(agent)
+
+    def _get_semantic(self, agent, query, context):
+        try:
+            match = self.semantic.lookup(agent, query, context, max_age=self.ttls[agent])
+        except Exception as e:
+            print(f"Error in semantic cache lookup: {e}")
+            return None
+        if match is None:
+            return None
+        response, similarity = match
+        print(f"Semantic cache hit for {agent} (similarity {similarity:.3f})")
+        with self._lock:
+            self._count(agent, "semantic_hits")
+        return response
+
+    def _record_miss(self, agent):
+        with self._lock:
+            self._count(agent, "misses")
+
+    def put(self, agent: str, query: str, response: str, context: str = "",
+            generation: Optional[Tuple[int, int]] = None, scope: Optional[str] = None) -> bool:
+        """
+        Store an answer. Skipped for uncached agents, error answers and answers
+        whose generation is older than the agent's (and scope's) current one.
+
+        Returns:
+            True if the answer was stored
+        """
+        if not self.caches(agent) or not self.cacheable(response):
+            return False
+        with self._lock:
+            current = self._generation(agent, scope)
+            if generation is not None and tuple(generation) != current:
+                return False
+            key = self._key(agent, query, context, current)
+            if key in self._entries:
+                self._untrack(self._entries.pop(key))
+            entry = (agent, time.monotonic(), response, scope)
+            self._entries[key] = entry
+            self._track(entry)
+            self._count(agent, "stores")
+            while len(self._entries) > self.max_entries:
+                self._untrack(self._entries.popitem(last=False)[1])
+
+        if self._semantic_eligible(agent):
+            # The query was just embedded by the lookup, so this is an embedding cache hit
+            try:
+                self.semantic.add(agent, query, response, context)
+            except Exception as e:
+                print(f"Error adding to semantic cache: {e}")
+        return True
+
+    @staticmethod
+    def cacheable(response) -> bool:
+        if not isinstance(response, str) or not response.strip():
+            return False
+        text = response.strip().lower()
+        return not text.startswith(_ERROR_PREFIXES) and _STREAM_ERROR not in text
+
+    def invalidate(self, agents: Optional[Iterable[str]] = None, scope: Optional[str] = None) -> int:
+        """
+        Drop cached answers for the given agents (all agents by default) and bump
+        their generation. With scope, only that scope's answers and generation.
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            agents = set(self.ttls if agents is None else agents)
+            if scope:
+                self._scope_clock += 1
+            for agent in agents:
+                if not scope:
+                    self._generations[agent] = self._generations.get(agent, 0) + 1
+                self._count(agent, "invalidations")
+            stale = [key for key, entry in self._entries.items()
+                     if entry[0] in agents and (not scope or entry[3] == scope)]
+            for key in stale:
+                self._untrack(self._entries.pop(key))
+            # The scope's generation is now the raised floor, whether or not it had entries
+            self._scope_floor = self._scope_clock
+        # The semantic tier has no scopes, so it drops all of the agents' answers
+        if self.semantic is not None:
+            self.semantic.invalidate(agents)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scoped_generations.clear()
+            self._scope_floor = self._scope_clock
+            self._counters.clear()
+
+    def stats(self) -> Dict:
+        """
+        Entry count, per-agent hits (exact and semantic), misses, stores,
+        invalidations and hit rate, and the semantic tier's own stats.
+        """
+        with self._lock:
+            agents = {}
+            for agent, counts in self._counters.items():
+                hits = counts["hits"] + counts["semantic_hits"]
+                lookups = hits + counts["misses"]
+                agents[agent] = {
+                    **counts,
+                    "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                    "ttl_seconds": self.ttls.get(agent, 0),
+                }
+            stats = {"entries": len(self._entries), "max_entries": self.max_entries,
+                     "scopes": len(self._scoped_generations), "agents": agents}
+        stats["semantic"] = self.semantic.stats() if self.semantic is not None else None
+        return stats
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """
+    Parse "gps_agent=300,triage_agent=60" into per-agent TTLs (0 disables an agent).
+    """
+    ttls = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            agent, seconds = item.split("=", 1)
+            ttls[agent.strip()] = float(seconds)
+    return ttls
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Return the process-wide response cache, or None when RESPONSE_CACHE_ENABLED is false.
+
+    RESPONSE_CACHE_TTLS overrides per-agent TTLs (e.g. "gps_agent=120,triage_agent=30")
+    and RESPONSE_CACHE_SIZE bounds the entry count (default 512). Unless
+    SEMANTIC_CACHE_ENABLED is false, paraphrases are matched with the conversation
+    history's embedding model: SEMANTIC_CACHE_THRESHOLD (default 0.85),
+    SEMANTIC_CACHE_SIZE (default 256) and SEMANTIC_CACHE_AGENTS (default gps_agent).
+    """
+    global _response_cache
+    if os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                ttls={**DEFAULT_RESPONSE_TTLS, **parse_ttls(os.getenv("RESPONSE_CACHE_TTLS", ""))},
+                max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "512")),
+                semantic=build_semantic_cache()
+            )
+        return _response_cache
+
+
+def build_semantic_cache() -> Optional[SemanticCache]:
+    """
+    Semantic tier over the shared history embedder, or None when SEMANTIC_CACHE_ENABLED is false.
+    """
+    if os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+
+    def embed(texts):
+        # Imported lazily: the history service (and its model) is only loaded on the first lookup
+        from ems_copilot.infrastructure.database.conversation_history import get_conversation_history
+        return get_conversation_history().embed_many(texts)
+
+    agents = os.getenv("SEMANTIC_CACHE_AGENTS", ",".join(DEFAULT_SEMANTIC_AGENTS))
+    return SemanticCache(
+        embed=embed,
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85")),
+        max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "256")),
+        agents=[agent.strip() for agent in agents.split(",") if agent.strip()]
+    )
@@ -0,0 +1,162 @@
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Only answers that are safe to share between paraphrases; triage and vitals
+# answers hinge on details an embedding does not distinguish ("HR 110" vs "HR 150")
+DEFAULT_SEMANTIC_AGENTS = ("gps_agent",)
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+class SemanticCache:
+    """
+    Embedding-similarity tier behind the exact-match response cache.
+
+    Paraphrased questions ("how far to Mercy", "ETA to Mercy hospital") are
+    answered from the closest earlier question when its cosine similarity
+    reaches the threshold, the agent and context fingerprint match and both
+    questions mention the same numbers. Vectors live in one preallocated
+    float32 matrix, so a lookup is a single matrix-vector product.
+    """
+
+    def __init__(self,
+                 embed: Callable[[List[str]], List[List[float]]],
+                 threshold: float = 0.85,
+                 max_entries: int = 256,
+                 agents: Iterable[str] = DEFAULT_SEMANTIC_AGENTS):
+        """
+        Initialize the cache.
+
+        Args:
+            embed: Callable embedding a list of texts (e.g. ConversationHistory.embed_many)
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Questions kept before the least recently used is replaced
+            agents: Agents whose answers may be shared between paraphrases
+        """
+        if max_entries < 1:
+            raise ValueError("Semantic cache must hold at least one entry")
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.agents = set(agents)
+        self._vectors = None
+        # slot -> (agent, context, numbers, response, stored_at, query), None when free
+        self._entries = [None] * max_entries
+        self._last_used = np.zeros(max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.similarities = []
+
+    def caches(self, agent: str) -> bool:
+        return agent in self.agents
+
+    def _vector(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embed([query])[0], dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _numbers(query: str) -> Tuple[str, ...]:
+        return tuple(sorted(_NUMBER.findall(query or "")))
+
+    def lookup(self, agent: str, query: str, context: str = "",
+               max_age: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """
+        Answer of the most similar cached question for the same agent and context.
+
+        Args:
+            agent: Routed agent name
+            query: The new question
+            context: Context fingerprint that must match exactly
+            max_age: Seconds an answer stays fresh (None for no limit)
+
+        Returns:
+            (answer, similarity) on a hit, else None
+        """
+        if not self.caches(agent):
+            return None
+        vector = self._vector(query)
+        numbers = self._numbers(query)
+        now = time.monotonic()
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != len(vector):
+                self.misses += 1
+                return None
+            similarities = self._vectors @ vector
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for slot in candidates[np.argsort(-similarities[candidates])].tolist():
+                entry = self._entries[slot]
+                if entry is None or entry[0] != agent or entry[1] != context or entry[2] != numbers:
+                    continue
+                if max_age is not None and now - entry[4] >= max_age:
+                    continue
+                self._last_used[slot] = now
+                self.hits += 1
+                similarity = float(similarities[slot])
+                self.similarities.append(similarity)
+                del self.similarities[:-200]
+                return entry[3], similarity
+            self.misses += 1
+            return None
+
+    def add(self, agent: str, query: str, response: str, context: str = "") -> None:
+        """
+        Remember an answer, replacing the least recently used question when full.
+        """
+        if not self.caches(agent):
+            return
+        vector = self._vector(query)
+        now = time.monotonic()
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != len(vector):
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                self._entries = [None] * self.max_entries
+            slot = int(np.argmin(self._last_used))
+            if self._entries[slot] is not None:
+                self.evictions += 1
+            self._vectors[slot] = vector
+            self._entries[slot] = (agent, context, self._numbers(query), response, now, query)
+            self._last_used[slot] = now
+
+    def invalidate(self, agents: Optional[Iterable[str]] = None) -> int:
+        """
+        Drop cached answers for the given agents (all by default).
+
+        Returns:
+            Number of entries dropped
+        """
+        agents = None if agents is None else set(agents)
+        dropped = 0
+        with self._lock:
+            for slot, entry in enumerate(self._entries):
+                if entry is not None and (agents is None or entry[0] in agents):
+                    self._entries[slot] = None
+                    self._vectors[slot] = 0.0
+                    self._last_used[slot] = 0.0
+                    dropped += 1
+        return dropped
+
+    def stats(self) -> Dict:
+        """
+        Hit/miss counters, size and the median similarity of recent hits.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": sum(entry is not None for entry in self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "agents": sorted(self.agents),
+                "median_hit_similarity": round(float(np.median(self.similarities)), 4) if self.similarities else None,
+            }
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ems_copilot.infrastructure.utils.async_utils import run_blocking
+
+
+# Modules that take seconds to import; none of them may load when the API module is imported
+HEAVY_MODULES = (
+    "chromadb",
+    "torch",
+    "sentence_transformers",
+    "onnxruntime",
+    "firebase_admin",
+    "google.genai",
+    "google.cloud.texttospeech",
+    "google.cloud.firestore",
+)
+
+
+def warmup_enabled() -> bool:
+    """
+    Whether to warm up models and clients in the background after startup
+    (STARTUP_WARMUP, default true). Without it the first request pays for them.
+    """
+    return os.getenv("STARTUP_WARMUP", "true").lower() in ("1", "true", "yes")
+
+
+def loaded_heavy_modules(modules=None) -> List[str]:
+    """
+    The HEAVY_MODULES present in modules (defaults to sys.modules).
+    """
+    if modules is None:
+        modules = sys.modules
+    return [name for name in HEAVY_MODULES if name in modules]
+
+
+class StartupWarmup:
+    """
+    Runs warm-up steps (model loads, client construction) one after another in
+    the I/O executor, in a background task, so the server accepts requests
+    while they run. A failed step is recorded and the remaining steps still run;
+    whatever a step would have loaded is then loaded by the first request instead.
+    """
+
+    def __init__(self, steps: Optional[List[Tuple[str, Callable[[], object]]]] = None):
+        """
+        Args:
+            steps: (name, blocking callable) pairs, run in order
+        """
+        self.steps = list(steps or [])
+        self.status = "idle"
+        self.results = {}
+        self.total_ms = None
+        self._task = None
+
+    def add(self, name: str, step: Callable[[], object]) -> None:
+        self.steps.append((name, step))
+
+    async def run(self) -> Dict:
+        """
+        Run every step and return the stats.
+        """
+        self.status = "running"
+        started = time.perf_counter()
+        failed = False
+        for name, step in self.steps:
+            step_started = time.perf_counter()
+            try:
+                await run_blocking(step)
+                self.results[name] = {"ms": (time.perf_counter() - step_started) * 1000, "error": None}
+            except Exception as e:
+                failed = True
+                self.results[name] = {"ms": (time.perf_counter() - step_started) * 1000, "error": str(e)}
+                print(f"Warm-up step {name} failed: {str(e)}")
+        self.total_ms = (time.perf_counter() - started) * 1000
+        self.status = "degraded" if failed else "done"
+        return self.stats()
+
+    def start(self) -> None:
+        """
+        Run the steps in a background task on the running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def close(self) -> None:
+        """
+        Cancel the warm-up if it is still running. A step already handed to the
+        executor finishes on its own thread.
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                self.status = "cancelled"
+
+    def stats(self) -> Dict:
+        return {
+            "status": self.status,
+            "total_ms": self.total_ms,
+            "steps": dict(self.results),
+        }
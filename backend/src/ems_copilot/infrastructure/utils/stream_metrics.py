@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class StreamTimer:
+    """
+    Measures one streamed response: time to first token and total time.
+    """
+
+    def __init__(self, name: str, recorder: Optional["StreamMetrics"] = None):
+        """
+        Args:
+            name: Label the measurement is reported under (agent or endpoint)
+            recorder: Metrics to report to on finish (defaults to the shared one)
+        """
+        self.name = name
+        self.recorder = recorder
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.chunks = 0
+
+    def mark(self, text: str) -> None:
+        """
+        Count a streamed chunk; the first non-empty one sets time to first token.
+        """
+        if not text:
+            return
+        self.chunks += 1
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started) * 1000
+
+    def finish(self, error: bool = False) -> Dict:
+        """
+        Record the measurement and return it.
+        """
+        measurement = {
+            "ttft_ms": self.ttft_ms,
+            "total_ms": (time.perf_counter() - self.started) * 1000,
+            "chunks": self.chunks,
+            "error": error,
+        }
+        (self.recorder or get_stream_metrics()).record(self.name, measurement)
+        return measurement
+
+
+class StreamMetrics:
+    """
+    Rolling time-to-first-token and total-latency figures per stream name.
+    """
+
+    def __init__(self, window: int = 500):
+        """
+        Args:
+            window: Number of most recent streams kept per name
+        """
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name: str) -> StreamTimer:
+        return StreamTimer(name, self)
+
+    def record(self, name: str, measurement: Dict) -> None:
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(measurement)
+            counts = self._counts.setdefault(name, {"streams": 0, "errors": 0})
+            counts["streams"] += 1
+            counts["errors"] += int(bool(measurement.get("error")))
+
+    @staticmethod
+    def _percentile(values, fraction):
+        if not values:
+            return None
+        values = sorted(values)
+        return round(values[min(len(values) - 1, int(len(values) * fraction))], 1)
+
+    def stats(self) -> Dict:
+        """
+        Per-name stream counts with p50/p95 time to first token and p50 total time (ms).
+        """
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+            counts = {name: dict(values) for name, values in self._counts.items()}
+        stats = {}
+        for name, samples in snapshot.items():
+            ttfts = [sample["ttft_ms"] for sample in samples if sample["ttft_ms"] is not None]
+            totals = [sample["total_ms"] for sample in samples]
+            stats[name] = {
+                **counts[name],
+                "ttft_p50_ms": self._percentile(ttfts, 0.5),
+                "ttft_p95_ms": self._percentile(ttfts, 0.95),
+                "total_p50_ms": self._percentile(totals, 0.5),
+            }
+        return stats
+
+
+_stream_metrics = StreamMetrics()
+
+
+def get_stream_metrics() -> StreamMetrics:
+    """
+    Return the process-wide streaming metrics.
+    """
+    return _stream_metrics
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from ems_copilot.infrastructure.utils.async_utils import run_blocking
+
+
+class TTSClientPool:
+    """
+    App-lifetime Google Text-to-Speech clients.
+
+    A TextToSpeechClient owns a gRPC channel that is thread-safe and
+    multiplexes concurrent calls, so one sync client (for executor threads)
+    and one async client (bound to the server's event loop) are shared by
+    every request instead of paying channel setup per call. The voice
+    listing is also cached, since it only changes when Google adds voices.
+    """
+
+    def __init__(self, voices_ttl_seconds: float = 3600.0, sync_client=None, async_client=None):
+        """
+        Initialize the pool. Clients are created by start() (or lazily on first use).
+
+        Args:
+            voices_ttl_seconds: How long a voice listing is served from cache
+            sync_client: Optional pre-built texttospeech.TextToSpeechClient
+            async_client: Optional pre-built texttospeech.TextToSpeechAsyncClient
+        """
+        self.voices_ttl_seconds = voices_ttl_seconds
+        self._sync_client = sync_client
+        self._async_client = async_client
+        self._lock = threading.Lock()
+        # language_code -> (fetched_at, voices)
+        self._voices = {}
+        self.voices_hits = 0
+        self.voices_misses = 0
+
+    def start(self) -> None:
+        """
+        Create both clients. Call from inside the running event loop (the
+        lifespan hook) so the async client's channel is bound to it.
+        """
+        from google.cloud import texttospeech
+
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = texttospeech.TextToSpeechClient()
+            if self._async_client is None:
+                self._async_client = texttospeech.TextToSpeechAsyncClient()
+
+    @property
+    def client(self):
+        """
+        The shared sync client (created on first use when start() was not called).
+        """
+        with self._lock:
+            if self._sync_client is None:
+                from google.cloud import texttospeech
+                self._sync_client = texttospeech.TextToSpeechClient()
+            return self._sync_client
+
+    @property
+    def async_client(self):
+        """
+        The shared async client, or None outside the server lifespan.
+        """
+        return self._async_client
+
+    async def list_voices_async(self, language_code: str = "en-US") -> List[Dict]:
+        """
+        Voices for a language as plain dicts, cached for voices_ttl_seconds.
+        """
+        with self._lock:
+            cached = self._voices.get(language_code)
+            if cached and time.monotonic() - cached[0] < self.voices_ttl_seconds:
+                self.voices_hits += 1
+                return cached[1]
+            self.voices_misses += 1
+
+        if self._async_client is not None:
+            response = await self._async_client.list_voices(language_code=language_code)
+        else:
+            response = await run_blocking(self.client.list_voices, language_code=language_code)
+
+        voices = [{
+            "name": voice.name,
+            "language_codes": list(voice.language_codes),
+            "ssml_gender": voice.ssml_gender.name,
+            "natural_sample_rate_hertz": voice.natural_sample_rate_hertz
+        } for voice in response.voices]
+
+        with self._lock:
+            self._voices[language_code] = (time.monotonic(), voices)
+        return voices
+
+    async def close(self) -> None:
+        """
+        Close both clients' channels (lifespan shutdown).
+        """
+        with self._lock:
+            sync_client, async_client = self._sync_client, self._async_client
+            self._sync_client = self._async_client = None
+        if async_client is not None:
+            await async_client.transport.close()
+        if sync_client is not None:
+            sync_client.transport.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sync_client": self._sync_client is not None,
+                "async_client": self._async_client is not None,
+                "voices_cached_languages": len(self._voices),
+                "voices_hits": self.voices_hits,
+                "voices_misses": self.voices_misses,
+            }
+
+
+_tts_clients = None
+_tts_clients_lock = threading.Lock()
+
+
+def get_tts_clients() -> TTSClientPool:
+    """
+    Return the process-wide TTS client pool.
+    """
+    global _tts_clients
+    with _tts_clients_lock:
+        if _tts_clients is None:
+            _tts_clients = TTSClientPool()
+        return _tts_clients
+
+
+def reset_tts_clients(pool: Optional[TTSClientPool] = None) -> None:
+    """
+    Replace the process-wide pool (tests).
+    """
+    global _tts_clients
+    with _tts_clients_lock:
+        _tts_clients = pool
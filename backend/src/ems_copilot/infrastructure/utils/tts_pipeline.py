@@ -0,0 +1,285 @@
+import asyncio
+import re
+from typing import AsyncIterator, Dict, List, Optional
+
+from ems_copilot.infrastructure.utils.async_utils import run_blocking
+from ems_copilot.infrastructure.utils.audio_cache import AudioCache
+from ems_copilot.infrastructure.utils.tts_clients import TTSClientPool, get_tts_clients
+
+
+class VoiceSettings:
+    """
+    Voice and audio parameters for one synthesis request.
+    """
+
+    def __init__(self,
+                 voice_name: str = "en-US-Standard-A",
+                 language_code: str = "en-US",
+                 speaking_rate: float = 1.0,
+                 pitch: float = 0.0,
+                 audio_encoding: str = "MP3",
+                 sample_rate_hertz: Optional[int] = None):
+        """
+        Args:
+            voice_name: Google TTS voice name
+            language_code: Voice language
+            speaking_rate: 0.25 to 4.0
+            pitch: -20.0 to 20.0 semitones
+            audio_encoding: "MP3" (segments can be concatenated into one stream) or "LINEAR16"
+            sample_rate_hertz: Optional output sample rate
+        """
+        self.voice_name = voice_name
+        self.language_code = language_code
+        self.speaking_rate = speaking_rate
+        self.pitch = pitch
+        self.audio_encoding = audio_encoding
+        self.sample_rate_hertz = sample_rate_hertz
+
+    @property
+    def media_type(self) -> str:
+        return "audio/mpeg" if self.audio_encoding == "MP3" else "audio/wav"
+
+
+class AudioSegment:
+    """
+    Synthesized audio for one sentence of a response.
+    """
+
+    def __init__(self, index: int, text: str, audio: bytes):
+        """
+        Args:
+            index: Position of the sentence in the response (segments are yielded in this order)
+            text: The sentence that was synthesized
+            audio: Encoded audio bytes
+        """
+        self.index = index
+        self.text = text
+        self.audio = audio
+
+    def __str__(self) -> str:
+        return f"AudioSegment(index={self.index}, text='{self.text[:30]}', bytes={len(self.audio)})"
+
+
+# A sentence ends at ., ! or ? (plus closing quotes/brackets) followed by whitespace, or at a line break
+_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n+")
+_ABBREVIATIONS = {"dr", "mr", "mrs", "ms", "st", "vs", "e.g", "i.e", "approx", "pt", "no", "min", "hr", "etc"}
+
+
+class SentenceChunker:
+    """
+    Splits incrementally streamed text into speakable chunks at sentence boundaries.
+
+    Short sentences are merged until min_chars so each synthesis call carries
+    enough text to sound natural, and runaway sentences are cut at a comma or
+    space once they pass max_chars.
+    """
+
+    def __init__(self, min_chars: int = 40, max_chars: int = 300):
+        """
+        Args:
+            min_chars: Minimum characters per chunk (except the last one)
+            max_chars: Maximum characters buffered before forcing a split
+        """
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text and return every chunk that is complete.
+        """
+        self._buffer += text or ""
+        chunks = []
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                break
+            chunk, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:]
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
+    def flush(self) -> List[str]:
+        """
+        Return whatever text is left once the stream has ended.
+        """
+        chunk, self._buffer = self._buffer.strip(), ""
+        return [chunk] if chunk else []
+
+    def _next_cut(self) -> Optional[int]:
+        for match in _BOUNDARY.finditer(self._buffer):
+            if match.start() < self.min_chars:
+                continue
+            words = self._buffer[:match.start()].rstrip(".!?\"')]").split()
+            if words and words[-1].lower() in _ABBREVIATIONS and "\n" not in match.group():
+                continue
+            return match.end()
+
+        if len(self._buffer) > self.max_chars:
+            window = self._buffer[:self.max_chars]
+            cut = max(window.rfind(", "), window.rfind("; "))
+            if cut < self.min_chars:
+                cut = window.rfind(" ")
+            return cut + 1 if cut > 0 else self.max_chars
+        return None
+
+
+class GoogleTTSBackend:
+    """
+    Google Cloud Text-to-Speech backend for the pipeline, using the app-lifetime clients.
+    """
+
+    def __init__(self, clients: Optional[TTSClientPool] = None):
+        """
+        Args:
+            clients: TTS client pool (defaults to the process-wide one)
+        """
+        self._clients = clients
+
+    @property
+    def clients(self) -> TTSClientPool:
+        return self._clients or get_tts_clients()
+
+    @staticmethod
+    def _request(text: str, voice: VoiceSettings) -> Dict:
+        from google.cloud import texttospeech
+
+        audio_config = {
+            "audio_encoding": getattr(texttospeech.AudioEncoding, voice.audio_encoding),
+            "speaking_rate": voice.speaking_rate,
+            "pitch": voice.pitch,
+        }
+        if voice.sample_rate_hertz:
+            audio_config["sample_rate_hertz"] = voice.sample_rate_hertz
+
+        return {
+            "input": texttospeech.SynthesisInput(text=text),
+            "voice": texttospeech.VoiceSelectionParams(language_code=voice.language_code, name=voice.voice_name),
+            "audio_config": texttospeech.AudioConfig(**audio_config),
+        }
+
+    def synthesize(self, text: str, voice: VoiceSettings) -> bytes:
+        """
+        Synthesize text with the given voice settings (blocking).
+        """
+        return self.clients.client.synthesize_speech(**self._request(text, voice)).audio_content
+
+    async def synthesize_async(self, text: str, voice: VoiceSettings) -> bytes:
+        """
+        Synthesize on the async client, or the sync client in the I/O executor
+        when the async client has not been started.
+        """
+        async_client = self.clients.async_client
+        if async_client is None:
+            return await run_blocking(self.synthesize, text, voice)
+        response = await async_client.synthesize_speech(**self._request(text, voice))
+        return response.audio_content
+
+
+class TTSPipeline:
+    """
+    Incremental text-to-speech: sentences are synthesized as soon as they are
+    complete, several at a time, and yielded strictly in order.
+
+    Audio for the first sentence can start playing while the LLM is still
+    generating the rest of the answer.
+    """
+
+    def __init__(self, backend=None, max_concurrency: int = 4, min_chars: int = 40, max_chars: int = 300,
+                 cache: Optional[AudioCache] = None):
+        """
+        Args:
+            backend: Object with synthesize(text, voice) -> bytes (run in the I/O executor)
+                or an async synthesize_async(text, voice); defaults to Google TTS
+            max_concurrency: Maximum sentences being synthesized at once
+            min_chars: See SentenceChunker
+            max_chars: See SentenceChunker
+            cache: Optional audio cache consulted before the backend
+        """
+        self.backend = backend or GoogleTTSBackend()
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+
+    async def synthesize(self, text: str, voice: VoiceSettings) -> bytes:
+        """
+        Synthesize one chunk of text, serving repeats from the audio cache.
+        """
+        key = None
+        if self.cache is not None:
+            key = AudioCache.key(text, voice)
+            # Memory hits are served inline; the disk tier is read off the event loop
+            audio = self.cache.get(key, memory_only=True) or await run_blocking(self.cache.get, key)
+            if audio is not None:
+                return audio
+
+        synthesize_async = getattr(self.backend, "synthesize_async", None)
+        if synthesize_async is not None:
+            audio = await synthesize_async(text, voice)
+        else:
+            audio = await run_blocking(self.backend.synthesize, text, voice)
+
+        if key is not None:
+            await run_blocking(self.cache.put, key, audio)
+        return audio
+
+    async def stream(self, text_chunks: AsyncIterator[str], voice: Optional[VoiceSettings] = None) -> AsyncIterator[AudioSegment]:
+        """
+        Turn a stream of text chunks into an ordered stream of audio segments.
+
+        Args:
+            text_chunks: Async iterator of text as it is generated
+            voice: Voice settings for every segment
+
+        Yields:
+            AudioSegment, in sentence order
+        """
+        voice = voice or VoiceSettings()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending = asyncio.Queue()
+        tasks = []
+
+        async def synthesize_segment(index, sentence):
+            async with semaphore:
+                return AudioSegment(index, sentence, await self.synthesize(sentence, voice))
+
+        def schedule(sentence):
+            task = asyncio.ensure_future(synthesize_segment(len(tasks), sentence))
+            tasks.append(task)
+            pending.put_nowait(task)
+
+        async def produce():
+            chunker = SentenceChunker(self.min_chars, self.max_chars)
+            try:
+                async for text in text_chunks:
+                    for sentence in chunker.feed(text):
+                        schedule(sentence)
+                for sentence in chunker.flush():
+                    schedule(sentence)
+            finally:
+                pending.put_nowait(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                task = await pending.get()
+                if task is None:
+                    break
+                yield await task
+            # Surface errors from the text stream
+            await producer
+        finally:
+            producer.cancel()
+            for task in tasks:
+                task.cancel()
+
+    async def stream_text(self, text: str, voice: Optional[VoiceSettings] = None) -> AsyncIterator[AudioSegment]:
+        """
+        Stream audio for a complete text, synthesizing its sentences concurrently.
+        """
+        async def single():
+            yield text
+
+        async for segment in self.stream(single(), voice):
+            yield segment
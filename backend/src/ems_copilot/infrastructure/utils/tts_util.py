@@ -1,8 +1,21 @@
 from google.cloud import texttospeech
+from ems_copilot.infrastructure.utils.audio_cache import AudioCache, get_audio_cache
+from ems_copilot.infrastructure.utils.tts_clients import get_tts_clients
+from ems_copilot.infrastructure.utils.tts_pipeline import VoiceSettings
 
 def synthesize_text(text, output_file="./artifacts/speech_test.mp3"):
-    # Create a client
-    client = texttospeech.TextToSpeechClient()
+    # Serve repeated phrases from the shared audio cache
+    cache = get_audio_cache()
+    key = AudioCache.key(text, VoiceSettings(voice_name="", language_code="en-US"), ssml_gender="MALE")
+    audio_content = cache.get(key)
+    if audio_content is not None:
+        with open(output_file, "wb") as out:
+            out.write(audio_content)
+            print(f'Cached audio content written to "{output_file}"')
+        return audio_content
+
+    # Reuse the shared client
+    client = get_tts_clients().client
 
     # Set the text input to be synthesized
     synthesis_input = texttospeech.SynthesisInput(text=text)
@@ -23,6 +36,8 @@ def synthesize_text(text, output_file="./artifacts/speech_test.mp3"):
         input=synthesis_input, voice=voice, audio_config=audio_config
     )
 
+    cache.put(key, response.audio_content)
+
     # Write the response to the output file.
     with open(output_file, "wb") as out:
         out.write(response.audio_content)
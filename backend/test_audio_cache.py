@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed TTS audio cache.
+Uses a temporary directory for the disk tier and a fake TTS backend.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.utils.audio_cache import AudioCache
+from ems_copilot.infrastructure.utils.tts_pipeline import TTSPipeline, VoiceSettings
+
+
+class CountingBackend:
+    """Returns the text as bytes and counts synthesis calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text, voice):
+        self.calls += 1
+        return text.encode()
+
+
+def test_key_depends_on_text_and_voice():
+    voice = VoiceSettings()
+    key = AudioCache.key("Heart rate recorded successfully.", voice)
+    assert key == AudioCache.key("  Heart rate   recorded successfully. ", voice)
+    assert key != AudioCache.key("Blood pressure recorded successfully.", voice)
+    assert key != AudioCache.key("Heart rate recorded successfully.", VoiceSettings(speaking_rate=1.2))
+    assert key != AudioCache.key("Heart rate recorded successfully.", VoiceSettings(pitch=2.0))
+    assert key != AudioCache.key("Heart rate recorded successfully.", VoiceSettings(audio_encoding="LINEAR16"))
+    assert key != AudioCache.key("Heart rate recorded successfully.", voice, ssml_gender="MALE")
+    print("✅ Keys vary with text and every voice parameter")
+
+
+def test_memory_tier_is_byte_bounded_lru():
+    cache = AudioCache(max_memory_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"  # a is now most recently used
+    cache.put("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234" and cache.get("c") == b"1234"
+    stats = cache.stats()
+    assert stats["memory_bytes"] == 8 and stats["memory_evictions"] == 1
+    assert stats["memory_hits"] == 3 and stats["misses"] == 1
+    print(f"✅ Memory tier evicts least recently used: {stats}")
+
+
+def test_disk_tier_survives_restart_and_promotes():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = AudioCache(max_memory_bytes=1024, disk_directory=directory, max_disk_bytes=1024)
+        cache.put("k1", b"audio-one")
+
+        restarted = AudioCache(max_memory_bytes=1024, disk_directory=directory, max_disk_bytes=1024)
+        assert restarted.stats()["disk_entries"] == 1
+        assert restarted.get("k1", memory_only=True) is None
+        assert restarted.get("k1") == b"audio-one"
+        assert restarted.get("k1") == b"audio-one"
+        stats = restarted.stats()
+        assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+        print(f"✅ Disk tier reloads on restart and promotes hits: {stats}")
+
+
+def test_disk_tier_is_size_bounded():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = AudioCache(max_memory_bytes=0, disk_directory=directory, max_disk_bytes=20)
+        for name in ("k1", "k2", "k3"):
+            cache.put(name, b"0123456789")
+        stats = cache.stats()
+        assert stats["disk_entries"] == 2 and stats["disk_bytes"] == 20 and stats["disk_evictions"] == 1
+        assert cache.get("k1") is None and cache.get("k3") == b"0123456789"
+        print(f"✅ Disk tier evicts oldest files: {stats}")
+
+
+def test_pipeline_synthesizes_repeated_phrases_once():
+    backend = CountingBackend()
+    pipeline = TTSPipeline(backend=backend, cache=AudioCache())
+
+    async def speak():
+        voice = VoiceSettings()
+        first = await pipeline.synthesize("Vitals recorded successfully.", voice)
+        second = await pipeline.synthesize("Vitals recorded successfully.", voice)
+        faster = await pipeline.synthesize("Vitals recorded successfully.", VoiceSettings(speaking_rate=1.5))
+        return first, second, faster
+
+    first, second, faster = asyncio.run(speak())
+    assert first == second == faster
+    assert backend.calls == 2
+    print(f"✅ Pipeline serves repeats from cache: {pipeline.cache.stats()}")
+
+
+if __name__ == "__main__":
+    test_key_depends_on_text_and_voice()
+    test_memory_tier_is_byte_bounded_lru()
+    test_disk_tier_survives_restart_and_promotes()
+    test_disk_tier_is_size_bounded()
+    test_pipeline_synthesizes_repeated_phrases_once()
+    print("\n✅ Audio cache tests passed")
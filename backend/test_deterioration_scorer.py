@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized NEWS2-style deterioration scorer.
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+
+from ems_copilot.domain.services.deterioration_scorer import DeteriorationScorer, SCORED_METRICS
+from ems_copilot.infrastructure.database.vitals_timeseries import VitalsTimeSeriesStore
+
+
+def test_band_scores_match_news2_thresholds():
+    # Columns: respiratory_rate, spo2, bp_systolic, heart_rate, temperature (F)
+    values = np.array([
+        [16, 98, 120, 80, 98.6],    # normal
+        [8, 91, 90, 131, 94.0],     # every parameter in its worst band
+        [21, 94, 101, 91, 101.0],   # borderline bands
+        [np.nan] * 5,               # nothing recorded
+    ])
+    scores = DeteriorationScorer.band_scores(values)
+    assert scores[0].tolist() == [0, 0, 0, 0, 0]
+    assert scores[1].tolist() == [3, 3, 3, 3, 3]
+    assert scores[2].tolist() == [2, 1, 1, 1, 1]
+    assert scores[3].tolist() == [0, 0, 0, 0, 0]
+
+
+def test_store_assessment_orders_patients_by_risk():
+    store = VitalsTimeSeriesStore()
+    store.load_patient("Stable Sam", [
+        {"vitals_name": "hr", "vitals_value": "80", "patient_name": "Stable Sam", "timestamp": "2024-01-01T10:00:00"},
+        {"vitals_name": "o2", "vitals_value": "98", "patient_name": "Stable Sam", "timestamp": "2024-01-01T10:00:00"},
+    ])
+    store.load_patient("Hank Smith", [
+        {"vitals_name": "hr", "vitals_value": "100", "patient_name": "Hank Smith", "timestamp": "2024-01-01T10:00:00"},
+        {"vitals_name": "hr", "vitals_value": "125", "patient_name": "Hank Smith", "timestamp": "2024-01-01T10:05:00"},
+        {"vitals_name": "o2", "vitals_value": "95", "patient_name": "Hank Smith", "timestamp": "2024-01-01T10:00:00"},
+        {"vitals_name": "o2", "vitals_value": "89", "patient_name": "Hank Smith", "timestamp": "2024-01-01T10:05:00"},
+        {"vitals_name": "bp", "vitals_value": "95/60", "patient_name": "Hank Smith", "timestamp": "2024-01-01T10:05:00"},
+        {"vitals_name": "rr", "vitals_value": "26", "patient_name": "Hank Smith", "timestamp": "2024-01-01T10:05:00"},
+    ])
+
+    summaries = DeteriorationScorer().assess_store(store)
+    hank, sam = summaries
+    print(hank.summary_text())
+    assert hank.patient_name == "Hank Smith"
+    assert hank.components == {"respiratory_rate": 3, "spo2": 3, "bp_systolic": 2, "heart_rate": 2}
+    assert hank.score == 10 and hank.risk == "high"
+    assert set(hank.crossings) == {"heart_rate", "spo2"}
+    assert hank.rates == {"heart_rate": 5.0, "spo2": -1.2}
+    assert hank.missing == ["temperature"]
+    assert sam.score == 0 and sam.risk == "low"
+    assert set(sam.missing) == set(SCORED_METRICS) - {"heart_rate", "spo2"}
+
+
+if __name__ == "__main__":
+    test_band_scores_match_news2_thresholds()
+    test_store_assessment_orders_patients_by_risk()
+    print("✅ Deterioration scorer tests passed")
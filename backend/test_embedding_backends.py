@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for embedding backend selection, pooling and the parity check.
+Pure NumPy; the ONNX model itself is checked by dev/export_onnx_embedding.py.
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+
+from ems_copilot.infrastructure.database.embedding_model import (
+    embedding_cache_name, embedding_parity, mean_pool, resolve_embedding_backend
+)
+
+
+def test_backend_selection():
+    assert resolve_embedding_backend("ONNX") == "onnx"
+    os.environ["EMBEDDING_BACKEND"] = "onnx"
+    try:
+        assert resolve_embedding_backend() == "onnx"
+    finally:
+        del os.environ["EMBEDDING_BACKEND"]
+    assert resolve_embedding_backend() == "torch"
+    try:
+        resolve_embedding_backend("tensorflow")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    # Existing torch caches keep their keys; quantized vectors get their own
+    assert embedding_cache_name("all-MiniLM-L6-v2", "torch") == "all-MiniLM-L6-v2"
+    assert embedding_cache_name("all-MiniLM-L6-v2", "onnx") != "all-MiniLM-L6-v2"
+    print("✅ Backend selection and cache naming")
+
+
+def test_mean_pool_ignores_padding():
+    tokens = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]],
+                       [[0.0, 2.0], [0.0, 0.0], [0.0, 0.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0], [1, 0, 0]])
+    pooled = mean_pool(tokens, mask)
+    assert np.allclose(pooled, [[1.0, 0.0], [0.0, 1.0]])
+    print("✅ Mean pooling skips padding and normalizes")
+
+
+def test_parity_check():
+    rng = np.random.default_rng(0)
+    reference = rng.standard_normal((50, 384)).astype(np.float32)
+    close = embedding_parity(reference, reference + 0.01 * rng.standard_normal(reference.shape))
+    assert close["mean_cosine"] > 0.99 and close["topk_overlap"] > 0.9
+    far = embedding_parity(reference, rng.standard_normal(reference.shape))
+    assert far["mean_cosine"] < 0.2 and far["topk_overlap"] < 0.3
+    print(f"✅ Parity check separates close ({close['mean_cosine']:.3f}) from unrelated ({far['mean_cosine']:.3f}) embeddings")
+
+
+if __name__ == "__main__":
+    test_backend_selection()
+    test_mean_pool_ignores_padding()
+    test_parity_check()
+    print("\n✅ Embedding backend tests passed")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the embedding cache used by ConversationHistory.
+Uses a counting fake encoder, so no model download is needed.
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.database.embedding_cache import EmbeddingCache
+
+
+class CountingEncoder:
+    """Fake encoder that records every batch it is asked to embed."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_repeated_phrases_skip_inference():
+    cache = EmbeddingCache(max_entries=8)
+    encoder = CountingEncoder()
+
+    cache.encode(["Patient has chest pain."], encoder)
+    cache.encode(["patient has  chest pain", "PATIENT HAS CHEST PAIN!"], encoder)
+
+    print(f"Cache stats: {cache.stats()}")
+    assert len(encoder.batches) == 1
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("heart rate 110", [1.0])
+    cache.put("bp 140/90", [2.0])
+    cache.get("heart rate 110")
+    cache.put("o2 93", [3.0])
+
+    assert cache.get("bp 140/90") is None
+    assert cache.get("heart rate 110") == [1.0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_persistence_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings.pkl")
+        cache = EmbeddingCache(max_entries=4, persist_path=path, model_name="fake")
+        cache.put("sugar 120", [0.5, 0.25])
+        cache.save()
+
+        reloaded = EmbeddingCache(max_entries=4, persist_path=path, model_name="fake")
+        assert reloaded.get("sugar 120") == [0.5, 0.25]
+
+        other_model = EmbeddingCache(max_entries=4, persist_path=path, model_name="other")
+        assert other_model.get("sugar 120") is None
+
+
+if __name__ == "__main__":
+    test_repeated_phrases_skip_inference()
+    test_lru_eviction()
+    test_persistence_round_trip()
+    print("✅ Embedding cache tests passed")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the facility dataset loader, spatial index and facility query parsing.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.domain.services.facility_query import parse_facility_query
+from ems_copilot.infrastructure.database.facility_index import (
+    Facility, FacilityIndex, haversine_km, load_facilities
+)
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "dev", "data", "facilities_sample.csv")
+HERE = (40.7306, -73.9900)
+
+
+def test_load_csv_and_geojson():
+    facilities = load_facilities(SAMPLE)
+    assert len(facilities) == 12
+    riverside = facilities[0]
+    assert riverside.trauma_level == 1 and {"trauma", "stroke", "burn"} <= riverside.capabilities
+
+    collection = {"type": "FeatureCollection", "features": [{
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [-73.9866, 40.7306]},
+        "properties": {"id": "G1", "name": "Mercy Hospital", "trauma_level": "II", "capabilities": ["cardiac"]}
+    }]}
+    with tempfile.NamedTemporaryFile("w", suffix=".geojson", delete=False) as f:
+        json.dump(collection, f)
+    try:
+        [mercy] = load_facilities(f.name)
+    finally:
+        os.unlink(f.name)
+    assert (mercy.latitude, mercy.longitude, mercy.trauma_level) == (40.7306, -73.9866, 2)
+    assert mercy.capabilities == {"cardiac", "trauma"}
+    print("✅ CSV and GeoJSON datasets load")
+
+
+def test_nearest_with_capability_filters():
+    index = FacilityIndex(load_facilities(SAMPLE))
+    [(closest, distance)] = index.nearest(*HERE, k=1)
+    assert closest.name == "Mercy Hospital" and distance < 1
+
+    trauma = index.nearest(*HERE, k=3, capabilities=["trauma"])
+    assert all(facility.trauma_level for facility, _ in trauma)
+    assert [d for _, d in trauma] == sorted(d for _, d in trauma)
+
+    level_one = index.nearest(*HERE, k=5, max_trauma_level=1)
+    assert {facility.name for facility, _ in level_one} == {
+        "Riverside Regional Medical Center", "Westgate Burn and Trauma Center"
+    }
+    assert index.nearest(*HERE, k=3, capabilities=["psychiatric", "burn"]) == []
+    print(f"✅ Nearest with filters: {[str(facility) for facility, _ in trauma]}")
+
+
+def test_grid_matches_brute_force():
+    rng = random.Random(7)
+    facilities = [Facility(str(i), f"F{i}", rng.uniform(40, 42), rng.uniform(-75, -73),
+                           capabilities=rng.sample(["stroke", "cardiac", "burn"], rng.randint(0, 2)))
+                  for i in range(2000)]
+    index = FacilityIndex(facilities, cell_degrees=0.05)
+    for _ in range(200):
+        lat, lng = rng.uniform(39.5, 42.5), rng.uniform(-75.5, -72.5)
+        capability = rng.choice([[], ["stroke"], ["burn", "cardiac"]])
+        expected = sorted((haversine_km(lat, lng, f.latitude, f.longitude), f.facility_id)
+                          for f in facilities if set(capability) <= f.capabilities)
+        got = index.nearest(lat, lng, k=5, capabilities=capability)
+        assert [f.facility_id for f, _ in got] == [facility_id for _, facility_id in expected[:5]]
+
+        radius = rng.uniform(1, 30)
+        within = index.within(lat, lng, radius, capabilities=capability)
+        assert [f.facility_id for f, _ in within] == [facility_id for d, facility_id in expected if d <= radius]
+    print("✅ Grid nearest and radius queries match brute force")
+
+
+def test_parse_facility_queries():
+    query = parse_facility_query("closest level 1 trauma center")
+    assert query.capabilities == ["trauma"] and query.max_trauma_level == 1
+    query = parse_facility_query("3 nearest stroke centers within 10 miles")
+    assert query.capabilities == ["stroke"] and query.k == 3 and abs(query.radius_km - 16.09) < 0.01
+    assert parse_facility_query("nearest hospital with a cath lab").capabilities == ["cardiac"]
+    assert parse_facility_query("how far to Mercy") is None
+    assert parse_facility_query("directions to St. Joseph's") is None
+    print("✅ Facility questions parse into structured queries")
+
+
+if __name__ == "__main__":
+    test_load_csv_and_geojson()
+    test_nearest_with_capability_filters()
+    test_grid_matches_brute_force()
+    test_parse_facility_queries()
+    print("\n✅ Facility index tests passed")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for batched Firestore vitals writes.
+Runs against the Firestore emulator:
+
+    gcloud emulators firestore start --host-port=localhost:8080
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python test_firestore_batch.py
+"""
+
+import os
+import sys
+import uuid
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+
+def emulator_available():
+    """
+    Without the emulator FirestoreDB needs real credentials, so the tests skip
+    themselves (also when collected by pytest).
+    """
+    if os.getenv("FIRESTORE_EMULATOR_HOST"):
+        return True
+    print("⏭️  FIRESTORE_EMULATOR_HOST is not set, skipping Firestore batch tests")
+    return False
+
+
+def make_db():
+    from ems_copilot.infrastructure.database.firestore_db import FirestoreDB
+    return FirestoreDB(credentials_path=None)
+
+
+def test_batch_writes_every_entry():
+    if not emulator_available():
+        return
+    db = make_db()
+    collection = f"vitals_test_{uuid.uuid4().hex[:8]}"
+    entries = [
+        {"vitals_name": "o2", "vitals_value": "93", "patient_name": "Hank Smith", "timestamp": "2024-01-01T00:00:00"},
+        {"vitals_name": "glucose", "vitals_value": "120", "patient_name": "Hank Smith", "timestamp": "2024-01-01T00:00:00"},
+        {"vitals_name": "heart rate", "vitals_value": "110", "patient_name": "Hank Smith", "timestamp": "2024-01-01T00:00:00"},
+    ]
+    doc_ids = db.write_vitals_batch(collection, entries)
+    assert len(doc_ids) == 3 and len(set(doc_ids)) == 3
+
+    stored = db.get_vitals_by_patient_name(collection, "Hank Smith")
+    assert sorted(vitals["vitals_name"] for vitals in stored) == ["glucose", "heart rate", "o2"]
+    print(f"Batch wrote {len(stored)} vitals")
+
+
+def test_batch_is_all_or_nothing():
+    if not emulator_available():
+        return
+    db = make_db()
+    collection = f"vitals_test_{uuid.uuid4().hex[:8]}"
+    entries = [
+        {"vitals_name": "o2", "vitals_value": "93", "patient_name": "Jane Doe", "timestamp": "2024-01-01T00:00:00"},
+        # Sets are not a Firestore type, so this entry makes the whole batch fail
+        {"vitals_name": "bp", "vitals_value": {"140/90"}, "patient_name": "Jane Doe", "timestamp": "2024-01-01T00:00:00"},
+    ]
+    try:
+        db.write_vitals_batch(collection, entries)
+        assert False, "Expected the batch to fail"
+    except Exception as e:
+        print(f"Batch failed as expected: {e}")
+
+    assert db.get_vitals_by_patient_name(collection, "Jane Doe") == []
+
+
+if __name__ == "__main__":
+    if not emulator_available():
+        sys.exit(0)
+    test_batch_writes_every_entry()
+    test_batch_is_all_or_nothing()
+    print("✅ Firestore batch tests passed")
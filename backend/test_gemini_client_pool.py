@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared Gemini client pool.
+Runs a local fake Gemini HTTP server so no API key or network access is needed.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.utils.gemini_client_pool import GeminiClientPool
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """Answers every generateContent call with a fixed text candidate."""
+
+    protocol_version = "HTTP/1.1"
+    connections = set()
+    stream_chunks = ["fake ", "gemini ", "stream"]
+
+    def do_POST(self):
+        FakeGeminiHandler.connections.add(self.client_address)
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        if "streamGenerateContent" in self.path:
+            self.send_stream()
+            return
+        body = json.dumps({
+            "candidates": [
+                {"content": {"role": "model", "parts": [{"text": "fake gemini reply"}]}}
+            ]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self):
+        """Server-sent events, one candidate chunk per event (as with alt=sse)."""
+        body = b"".join(
+            b"data: " + json.dumps({
+                "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]
+            }).encode() + b"\r\n\r\n"
+            for text in self.stream_chunks
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_gemini_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGeminiHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def test_pool_reuses_connections():
+    """Sequential calls through a single-client pool should share one connection."""
+    server = start_fake_gemini_server()
+    FakeGeminiHandler.connections.clear()
+    try:
+        pool = GeminiClientPool(
+            "fake-key",
+            size=1,
+            base_url=f"http://127.0.0.1:{server.server_address[1]}/"
+        )
+        for _ in range(5):
+            with pool.client() as client:
+                response = client.models.generate_content(model="gemini-fake", contents="ping")
+                assert response.text == "fake gemini reply"
+
+        health = pool.health()
+        print(f"Pool health: {health}")
+        assert health["created"] == 1
+        assert health["requests"] == 5
+        assert health["errors"] == 0
+        assert len(FakeGeminiHandler.connections) == 1
+    finally:
+        server.shutdown()
+
+
+def test_streaming_through_pool():
+    """generate_content_stream yields every chunk through a pooled client."""
+    server = start_fake_gemini_server()
+    try:
+        pool = GeminiClientPool(
+            "fake-key",
+            size=1,
+            base_url=f"http://127.0.0.1:{server.server_address[1]}/"
+        )
+        with pool.client() as client:
+            chunks = [chunk.text for chunk in client.models.generate_content_stream(model="gemini-fake", contents="ping")]
+        print(f"Streamed chunks: {chunks}")
+        assert chunks == FakeGeminiHandler.stream_chunks
+    finally:
+        server.shutdown()
+
+
+def test_pool_reports_errors():
+    """Failures inside the checkout block are counted and the client is returned."""
+    pool = GeminiClientPool("fake-key", size=2, base_url="http://127.0.0.1:9/")
+    for _ in range(3):
+        try:
+            with pool.client():
+                raise RuntimeError("simulated upstream failure")
+        except RuntimeError:
+            pass
+
+    health = pool.health()
+    print(f"Pool health: {health}")
+    assert health["errors"] == 3
+    assert health["status"] == "degraded"
+    assert health["in_use"] == 0
+    assert health["idle"] == health["created"]
+
+
+class StubClientPool(GeminiClientPool):
+    """Pool of placeholder clients, for bookkeeping tests that make no calls."""
+
+    def _create_client(self):
+        return object()
+
+
+def test_stream_closed_early_is_not_an_error():
+    pool = StubClientPool(api_key="test", size=1)
+
+    def stream():
+        with pool.client():
+            yield "first"
+            yield "second"
+
+    chunks = stream()
+    next(chunks)
+    chunks.close()
+    health = pool.health()
+    assert health["errors"] == 0 and health["status"] == "ok"
+    assert health["in_use"] == 0 and health["idle"] == 1
+
+
+def test_cancelled_waiter_returns_its_client():
+    async def main():
+        pool = StubClientPool(api_key="test", size=1, acquire_timeout=5)
+        held = pool._acquire()
+
+        async def wait_for_client():
+            async with pool.async_client():
+                pass
+
+        waiter = asyncio.create_task(wait_for_client())
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        # The abandoned executor wait now takes this client; it must come back to the pool
+        pool._available.put(held)
+        await asyncio.sleep(0.2)
+        return pool.health()
+
+    health = asyncio.run(main())
+    print(f"Pool health after cancelled wait: {health}")
+    assert health["idle"] == 1 and health["in_use"] == 0 and health["errors"] == 0
+
+
+if __name__ == "__main__":
+    test_pool_reuses_connections()
+    test_streaming_through_pool()
+    test_pool_reports_errors()
+    test_stream_closed_early_is_not_an_error()
+    test_cancelled_waiter_returns_its_client()
+    print("✅ Gemini client pool tests passed")
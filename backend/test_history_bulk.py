@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk conversation inserts (ConversationHistory.add_conversations_bulk).
+Uses a fake embedding model and vector store, so no model download or Chroma is needed.
+"""
+
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.database.conversation_history import ConversationHistory
+from ems_copilot.infrastructure.database.embedding_cache import EmbeddingCache
+
+
+class BatchingModel:
+    """Fake SentenceTransformer that records each forward pass of up to batch_size texts."""
+
+    def __init__(self):
+        self.calls = []
+        self.forward_passes = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append((len(texts), batch_size))
+        for start in range(0, len(texts), batch_size):
+            self.forward_passes.append(list(texts[start:start + batch_size]))
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+class RecordingCollection:
+    """Fake collection that records every add() chunk."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def add(self, embeddings, documents, metadatas, ids):
+        assert len(embeddings) == len(documents) == len(metadatas) == len(ids)
+        self.chunks.append(list(ids))
+
+    def get(self, **kwargs):
+        return {"ids": [], "embeddings": [], "documents": [], "metadatas": []}
+
+
+class RecordingStore:
+    def __init__(self):
+        self.collections = {}
+
+    def get_or_create_collection(self, name, metadata=None):
+        return self.collections.setdefault(name, RecordingCollection())
+
+    def list_collections(self):
+        return list(self.collections)
+
+    def get_max_batch_size(self):
+        return None
+
+
+def make_history(partition_by_session=False):
+    model = BatchingModel()
+    history = ConversationHistory(
+        embedding_model=model,
+        embedding_cache=EmbeddingCache(max_entries=1000),
+        write_behind=False,
+        partition_by_session=partition_by_session
+    )
+    history._store = RecordingStore()
+    return history, model
+
+
+def exchanges(count):
+    return [(f"HR {60 + i} for patient {i}", f"Heart rate {60 + i} recorded.") for i in range(count)]
+
+
+def test_embeds_in_batches_and_inserts_in_chunks():
+    history, model = make_history()
+    ids = history.add_conversations_bulk(exchanges(150), batch_size=64, chunk_size=40)
+
+    # One model call; one forward pass per batch_size texts
+    assert model.calls == [(150, 64)]
+    assert [len(batch) for batch in model.forward_passes] == [64, 64, 22]
+    chunks = history.store.collections["conversation_history"].chunks
+    assert [len(chunk) for chunk in chunks] == [40, 40, 40, 30]
+    print(f"✅ 150 exchanges: {len(model.forward_passes)} forward passes, {len(chunks)} inserts")
+
+
+def test_ids_are_returned_in_input_order():
+    history, model = make_history()
+    pairs = exchanges(10)
+    ids = history.add_conversations_bulk(pairs, batch_size=4, chunk_size=3)
+
+    assert len(ids) == len(set(ids)) == 10
+    inserted = [record_id for chunk in history.store.collections["conversation_history"].chunks for record_id in chunk]
+    assert inserted == ids
+    # Forward passes see the exchanges in input order too
+    documents = [text for batch in model.forward_passes for text in batch]
+    assert documents == [f"User: {query}\nAgent: {response}" for query, response in pairs]
+    print("✅ IDs come back in input order")
+
+
+def test_cached_texts_skip_the_model_and_sessions_are_mirrored():
+    history, model = make_history(partition_by_session=True)
+    history.add_conversations_bulk(exchanges(5), batch_size=2, chunk_size=10, session_id="medic-1")
+    model.forward_passes.clear()
+    history.add_conversations_bulk(exchanges(5), batch_size=2, chunk_size=10, session_id="medic-1")
+
+    assert model.forward_passes == []
+    partitions = [name for name in history.store.collections if name != "conversation_history"]
+    assert len(partitions) == 1
+    assert sum(len(chunk) for chunk in history.store.collections[partitions[0]].chunks) == 10
+    print("✅ Repeated exchanges are served from the embedding cache and mirrored to the session partition")
+
+
+if __name__ == "__main__":
+    test_embeds_in_batches_and_inserts_in_chunks()
+    test_ids_are_returned_in_input_order()
+    test_cached_texts_skip_the_model_and_sessions_are_mirrored()
+    print("\n✅ History bulk insert tests passed")
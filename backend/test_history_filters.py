@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script for the metadata filters used by scoped conversation history searches.
+"""
+
+import os
+import sys
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.database.history_filters import (
+    PARTITION_PREFIX, build_where, normalize_patient, partition_name
+)
+
+
+def test_unfiltered_search_has_no_where():
+    assert build_where() is None
+    assert build_where(session_id="", patient_name="  ") is None
+    print("✅ Unscoped searches send no where clause")
+
+
+def test_single_and_combined_filters():
+    assert build_where(session_id="medic-7") == {"session_id": {"$eq": "medic-7"}}
+    assert build_where(patient_name="Hank  Smith") == {"patient": {"$eq": "hank smith"}}
+
+    since = datetime(2025, 1, 1, 12, 0)
+    where = build_where("medic-7", "Hank Smith", since=since, until=since.timestamp() + 3600)
+    assert where == {"$and": [
+        {"session_id": {"$eq": "medic-7"}},
+        {"patient": {"$eq": "hank smith"}},
+        {"created_at": {"$gte": since.timestamp()}},
+        {"created_at": {"$lte": since.timestamp() + 3600}},
+    ]}
+    print(f"✅ Combined filters: {where}")
+
+
+def test_patient_names_normalize():
+    assert normalize_patient(" HANK\tSmith ") == normalize_patient("hank smith") == "hank smith"
+    assert normalize_patient(None) is None
+    print("✅ Patient names normalize to one key")
+
+
+def test_partition_names():
+    name = partition_name("ws-3f2a/unit 12")
+    assert name.startswith(PARTITION_PREFIX) and name == partition_name("ws-3f2a/unit 12")
+    assert name != partition_name("ws-3f2a/unit 13")
+    assert len(name) <= 63 and name.replace("_", "").isalnum()
+    print(f"✅ Partition names are stable and Chroma-safe: {name}")
+
+
+if __name__ == "__main__":
+    test_unfiltered_search_has_no_where()
+    test_single_and_combined_filters()
+    test_patient_names_normalize()
+    test_partition_names()
+    print("\n✅ History filter tests passed")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for conversation history retention, compaction and archival.
+Uses an in-memory history store, so Chroma is not needed.
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.database.history_retention import (
+    SUMMARY_KIND, HistoryRetention, RetentionPolicy
+)
+
+DAY = 86400
+NOW = time.time()
+
+
+class MemoryHistory:
+    """The slice of the ConversationHistory interface the retention job uses."""
+
+    def __init__(self):
+        self.records = {}
+        self.searches = 0
+        self.created = 0
+        self.idle_sweeps = 0
+        self.scans = []
+
+    def add(self, record_id, days_old, session_id=None, patient=None, user_query="q", kind=None):
+        metadata = {"created_at": NOW - days_old * DAY, "timestamp": "", "user_query": user_query,
+                    "agent_response": f"answer to {user_query}"}
+        for key, value in (("session_id", session_id), ("patient", patient), ("kind", kind)):
+            if value:
+                metadata[key] = value
+        self.records[record_id] = {"id": record_id, "metadata": metadata, "document": f"User: {user_query}"}
+
+    def new_record(self, user_query, agent_response, session_id=None, patient_name=None):
+        self.created += 1
+        return {"id": f"summary-{self.created}", "user_query": user_query,
+                "agent_response": agent_response, "session_id": session_id}
+
+    def write_records(self, records):
+        for record in records:
+            metadata = {key: record[key] for key in ("created_at", "timestamp", "user_query", "agent_response",
+                                                     "session_id", "patient", "kind") if record.get(key)}
+            self.records[record["id"]] = {"id": record["id"], "metadata": metadata, "document": ""}
+
+    def scan(self, where=None):
+        self.scans.append(where)
+        records = [{"id": r["id"], "metadata": r["metadata"]} for r in self.records.values()]
+        if where is not None:
+            cutoff = where["created_at"]["$lt"]
+            records = [r for r in records if r["metadata"].get("created_at", cutoff) < cutoff]
+        return iter(records)
+
+    def get_records(self, ids):
+        return [self.records[record_id] for record_id in ids]
+
+    def delete_records(self, records):
+        for record in records:
+            del self.records[record["id"]]
+
+    def count(self):
+        return len(self.records)
+
+    def flush_pending(self):
+        return True
+
+    def drop_idle_partitions(self, idle_seconds, now=None):
+        self.idle_sweeps += 1
+        return 0
+
+    def disk_bytes(self):
+        return 1000 * len(self.records)
+
+    def search_conversations(self, query, n_results=5):
+        self.searches += 1
+        return []
+
+
+def test_policy_selects_old_then_oldest():
+    history = MemoryHistory()
+    for i in range(10):
+        history.add(f"r{i}", days_old=i * 10)
+    history.add("s0", days_old=100, kind=SUMMARY_KIND)
+
+    expired = RetentionPolicy(max_age_days=45, max_exchanges=None).select_expired(history.records.values(), NOW)
+    assert [r["id"] for r in expired] == ["r9", "r8", "r7", "r6", "r5"]
+
+    expired = RetentionPolicy(max_age_days=None, max_exchanges=4).select_expired(history.records.values(), NOW)
+    assert [r["id"] for r in expired] == ["r9", "r8", "r7", "r6", "r5", "r4", "r3"]
+    print("✅ Age and size limits pick the oldest exchanges, summaries last")
+
+
+def test_run_archives_and_compacts_per_session():
+    history = MemoryHistory()
+    for i in range(6):
+        history.add(f"old-a{i}", days_old=40 + i, session_id="medic-1", patient="hank smith", user_query=f"a{i}")
+    for i in range(3):
+        history.add(f"old-b{i}", days_old=50 + i, session_id="medic-2", user_query=f"b{i}")
+    history.add("recent", days_old=1, session_id="medic-1")
+
+    with tempfile.TemporaryDirectory() as archive_dir:
+        retention = HistoryRetention(history, RetentionPolicy(max_age_days=30), archive_dir=archive_dir)
+        report = retention.run_once(NOW)
+
+        assert report["archived"] == 9 and report["summaries"] == 2
+        with gzip.open(report["archive_path"], "rt") as f:
+            archived = [json.loads(line) for line in f]
+        assert {row["id"] for row in archived} == {f"old-a{i}" for i in range(6)} | {f"old-b{i}" for i in range(3)}
+        assert archived[0]["session_id"] and archived[0]["document"].startswith("User:")
+
+    summaries = [r for r in history.records.values() if r["metadata"].get("kind") == SUMMARY_KIND]
+    assert len(summaries) == 2 and set(history.records) == {"recent"} | {r["id"] for r in summaries}
+    medic_1 = next(r for r in summaries if r["metadata"]["session_id"] == "medic-1")
+    text = medic_1["metadata"]["agent_response"]
+    assert "6 earlier exchanges" in text and "hank smith" in text and medic_1["metadata"]["patient"] == "hank smith"
+    assert report["bytes_reclaimed"] == 7000 and history.searches == 1 and history.idle_sweeps == 1
+    print(f"✅ Run archived 9 exchanges into 2 summaries:\n{text}")
+
+    report = HistoryRetention(history, RetentionPolicy(max_age_days=30)).run_once(NOW)
+    assert report["archived"] == 0 and report["archive_path"] is None
+    print("✅ A second run is a no-op; summaries are kept")
+
+
+def test_run_pages_only_expired_records():
+    history = MemoryHistory()
+    for i in range(20):
+        history.add(f"r{i}", days_old=i * 5)
+    retention = HistoryRetention(history, RetentionPolicy(max_age_days=60, max_exchanges=100,
+                                                          summary_max_age_days=365))
+    expired = retention.select_expired(NOW)
+    assert [r["id"] for r in expired] == [f"r{i}" for i in range(19, 12, -1)]
+    # Under the size limit only the store-side age filter is read
+    assert history.scans == [{"created_at": {"$lt": NOW - 60 * DAY}}]
+
+    history.scans.clear()
+    retention.policy.max_exchanges = 10
+    expired = retention.select_expired(NOW)
+    assert [r["id"] for r in expired] == [f"r{i}" for i in range(19, 9, -1)]
+    assert history.scans == [{"created_at": {"$lt": NOW - 60 * DAY}}, None]
+    print("✅ Retention reads expired records through a where filter and streams only when over the limit")
+
+
+def test_background_job_reports_stats():
+    history = MemoryHistory()
+    history.add("old", days_old=90)
+    with tempfile.TemporaryDirectory() as archive_dir:
+        retention = HistoryRetention(history, RetentionPolicy(max_age_days=30), archive_dir=archive_dir)
+        retention.start(0.05)
+        deadline = time.time() + 5
+        while retention.stats()["runs"] == 0 and time.time() < deadline:
+            time.sleep(0.02)
+        retention.close()
+    stats = retention.stats()
+    assert stats["runs"] >= 1 and stats["total_archived"] == 1 and not stats["running"]
+    print(f"✅ Background job ran: {stats['runs']} runs, {stats['total_archived']} archived")
+
+
+if __name__ == "__main__":
+    test_policy_selects_old_then_oldest()
+    test_run_archives_and_compacts_per_session()
+    test_run_pages_only_expired_records()
+    test_background_job_reports_stats()
+    print("\n✅ History retention tests passed")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the conversation history write-behind queue.
+Uses an in-memory fake writer, so no Chroma or embedding model is needed.
+"""
+
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.database.history_write_queue import HistoryWriteQueue
+
+
+class SlowStore:
+    """Fake persistence layer that takes a while per batch."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.records = []
+        self.batches = 0
+        self.lock = threading.Lock()
+
+    def write_batch(self, records):
+        time.sleep(self.delay)
+        with self.lock:
+            self.records.extend(records)
+            self.batches += 1
+
+    def ids(self, session_id=None):
+        with self.lock:
+            return [r["id"] for r in self.records if session_id is None or r["session_id"] == session_id]
+
+
+def test_submit_does_not_wait_for_persistence():
+    store = SlowStore(delay=0.2)
+    write_queue = HistoryWriteQueue(store.write_batch, flush_interval=0.01)
+    started = time.perf_counter()
+    write_queue.submit({"id": "a", "session_id": "medic-1"})
+    assert time.perf_counter() - started < 0.05
+    write_queue.close()
+    assert store.ids() == ["a"]
+
+
+def test_read_your_writes_per_session():
+    store = SlowStore()
+    write_queue = HistoryWriteQueue(store.write_batch, batch_size=4, flush_interval=0.01)
+    for i in range(10):
+        write_queue.submit({"id": f"unit-{i}", "session_id": f"medic-{i % 2}"})
+
+    assert write_queue.wait_for("medic-1", timeout=5)
+    assert {f"unit-{i}" for i in range(1, 10, 2)} <= set(store.ids("medic-1"))
+    assert write_queue.flush(timeout=5)
+    assert len(store.ids()) == 10
+    print(f"Queue stats: {write_queue.stats()}")
+    assert store.batches < 10
+    write_queue.close()
+
+
+def test_close_drains_queue():
+    store = SlowStore(delay=0.01)
+    write_queue = HistoryWriteQueue(store.write_batch, max_pending=50, batch_size=8)
+    for i in range(40):
+        write_queue.submit({"id": str(i), "session_id": None})
+    write_queue.close()
+    assert store.ids() == [str(i) for i in range(40)]
+    assert write_queue.pending() == 0
+
+
+if __name__ == "__main__":
+    test_submit_does_not_wait_for_persistence()
+    test_read_your_writes_per_session()
+    test_close_drains_queue()
+    print("✅ History write queue tests passed")
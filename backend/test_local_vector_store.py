@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process vector store backend and ConversationHistory on top of it.
+Uses random vectors and a hashing encoder, so no model download is needed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import zlib
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+
+from ems_copilot.infrastructure.database.conversation_history import ConversationHistory
+from ems_copilot.infrastructure.database.embedding_cache import EmbeddingCache
+from ems_copilot.infrastructure.database.local_vector_store import LocalVectorStore, matches_where
+
+
+class HashingEncoder:
+    def encode(self, texts, batch_size=32):
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode()) % 64] += 1.0
+        return vectors
+
+
+def random_vectors(count, dimensions=32, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_where_clauses():
+    metadata = {"session_id": "a", "patient": "hank smith", "created_at": 100.0}
+    assert matches_where(metadata, {"session_id": "a"})
+    assert matches_where(metadata, {"$and": [{"patient": {"$eq": "hank smith"}}, {"created_at": {"$gte": 50}}]})
+    assert not matches_where(metadata, {"$and": [{"session_id": "a"}, {"created_at": {"$lt": 50}}]})
+    assert matches_where(metadata, {"$or": [{"session_id": "b"}, {"patient": {"$in": ["hank smith"]}}]})
+    assert not matches_where({}, {"created_at": {"$gte": 0}})
+    print("✅ Where clauses evaluate like Chroma's")
+
+
+def test_brute_force_query_and_persistence():
+    vectors = random_vectors(500)
+    with tempfile.TemporaryDirectory() as directory:
+        store = LocalVectorStore(directory)
+        collection = store.get_or_create_collection("history")
+        collection.add(ids=[f"id{i}" for i in range(500)], embeddings=vectors,
+                       documents=[f"doc {i}" for i in range(500)],
+                       metadatas=[{"session_id": f"s{i % 5}"} for i in range(500)])
+        result = collection.query(query_embeddings=[vectors[42]], n_results=3)
+        assert result["ids"][0][0] == "id42" and abs(result["distances"][0][0]) < 1e-5
+
+        expected = np.argsort(-(vectors @ vectors[7]))[:10]
+        assert collection.query(query_embeddings=[vectors[7]], n_results=10)["ids"][0] == [f"id{i}" for i in expected]
+
+        filtered = collection.query(query_embeddings=[vectors[42]], n_results=5, where={"session_id": "s1"})
+        assert all(metadata["session_id"] == "s1" for metadata in filtered["metadatas"][0])
+
+        collection.delete(ids=["id42", "id43"])
+        assert collection.count() == 498 and "id42" not in collection.query(query_embeddings=[vectors[42]], n_results=3)["ids"][0]
+        collection.add(ids=["new"], embeddings=vectors[42:43], documents=["replacement"])
+        store.close()
+
+        reopened = LocalVectorStore(directory).get_or_create_collection("history")
+        assert reopened.count() == 499
+        assert reopened.query(query_embeddings=[vectors[42]], n_results=1)["documents"][0] == ["replacement"]
+        page = reopened.get(where={"session_id": "s2"}, limit=10, offset=5, include=["metadatas"])
+        assert len(page["ids"]) == 10 and page["documents"] is None
+    print("✅ Brute-force queries are exact, deletes reuse rows and data survives reopening")
+
+
+def test_hnsw_above_threshold():
+    vectors = random_vectors(3000, seed=1)
+    with tempfile.TemporaryDirectory() as directory:
+        store = LocalVectorStore(directory, hnsw_threshold=2000)
+        collection = store.get_or_create_collection("history")
+        for start in range(0, 3000, 500):
+            collection.add(ids=[f"id{i}" for i in range(start, start + 500)], embeddings=vectors[start:start + 500],
+                           metadatas=[{"group": i % 2} for i in range(start, start + 500)])
+        assert collection.uses_hnsw()
+
+        recalled = 0
+        for i in range(0, 3000, 60):
+            expected = {f"id{j}" for j in np.argsort(-(vectors @ vectors[i]))[:10]}
+            recalled += len(expected & set(collection.query(query_embeddings=[vectors[i]], n_results=10)["ids"][0]))
+        recall = recalled / (50 * 10)
+        assert recall > 0.9, recall
+
+        odd = collection.query(query_embeddings=[vectors[1]], n_results=5, where={"group": 1})
+        assert odd["ids"][0][0] == "id1" and all(m["group"] == 1 for m in odd["metadatas"][0])
+        collection.delete(ids=["id1"])
+        assert "id1" not in collection.query(query_embeddings=[vectors[1]], n_results=5)["ids"][0]
+        store.close()
+
+        reopened = LocalVectorStore(directory, hnsw_threshold=2000).get_or_create_collection("history")
+        assert reopened.uses_hnsw() and reopened.count() == 2999
+    print(f"✅ HNSW index above the threshold: recall@10 {recall:.2f}, saved and reloaded")
+
+
+def test_conversation_history_on_local_backend():
+    with tempfile.TemporaryDirectory() as directory:
+        history = ConversationHistory(directory, embedding_model=HashingEncoder(),
+                                      embedding_cache=EmbeddingCache(max_entries=100),
+                                      write_behind=False, vector_backend="local")
+        history.add_conversation("Hank Smith heart rate 110", "Recorded.", session_id="medic-1", patient_name="Hank Smith")
+        history.add_conversation("Jane Doe heart rate 90", "Recorded.", session_id="medic-2", patient_name="Jane Doe")
+        history.add_conversation("weather downtown", "Sunny.")
+
+        assert history.count() == 3
+        scoped = history.search_conversations("heart rate", session_id="medic-1")
+        assert [c["metadata"]["patient"] for c in scoped] == ["hank smith"]
+        assert len(history.search_conversations("heart rate", patient_name="jane doe")) == 1
+        assert len(history.search_conversations("heart rate")) == 3
+
+        history.delete_records(scoped)
+        assert history.count() == 2 and history.search_conversations("heart rate", session_id="medic-1") == []
+        history.close()
+    print("✅ ConversationHistory runs on the local backend without Chroma")
+
+
+def test_session_partitions_are_cleaned_up():
+    with tempfile.TemporaryDirectory() as directory:
+        history = ConversationHistory(directory, embedding_model=HashingEncoder(),
+                                      embedding_cache=EmbeddingCache(max_entries=100),
+                                      write_behind=False, partition_by_session=True, vector_backend="local")
+        for session_id in ("ws-1", "ws-2", "medic-1"):
+            history.add_conversation(f"heart rate for {session_id}", "Recorded.", session_id=session_id)
+        assert len(history.partition_names()) == 3
+
+        # An ended session's partition goes; its exchanges stay in the full history
+        assert history.drop_partition("ws-1") and not history.drop_partition("ws-1")
+        assert len(history.store.list_collections()) == 3 and history.count() == 3
+
+        # A session that comes back gets its partition rebuilt from the full history
+        history.add_conversation("heart rate again", "Recorded.", session_id="ws-1")
+        assert len(history.search_conversations("heart rate", session_id="ws-1")) == 2
+
+        # Idle partitions are dropped; recently active ones are kept
+        assert history.drop_idle_partitions(3600) == 0
+        assert history.drop_idle_partitions(3600, now=time.time() + 7200) == 3
+        assert history.partition_names() == set() and history.store.list_collections() == ["conversation_history"]
+        assert len(history.search_conversations("heart rate", session_id="medic-1")) == 1
+
+        # Deleting a session's last exchange drops its partition too
+        history.delete_records(history.search_conversations("heart rate", session_id="medic-1"))
+        assert history.partition_names() == set()
+        history.close()
+    print("✅ Session partitions are dropped when sessions end or go idle and rebuilt on return")
+
+
+if __name__ == "__main__":
+    test_where_clauses()
+    test_brute_force_query_and_persistence()
+    test_hnsw_above_threshold()
+    test_conversation_history_on_local_backend()
+    test_session_partitions_are_cleaned_up()
+    print("\n✅ Local vector store tests passed")
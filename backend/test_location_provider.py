@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached location provider used by the GPS agent.
+Uses static and failing stand-in providers, so no Maps key is needed.
+"""
+
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.domain.services.gps_agent import GPSAgent
+from ems_copilot.infrastructure.utils.location_provider import CachedLocationProvider, StaticLocationProvider
+
+
+class FailingProvider:
+    def __init__(self):
+        self.calls = 0
+
+    def locate(self):
+        self.calls += 1
+        raise Exception("Error: geolocation unavailable")
+
+
+def test_lookups_are_reused_within_ttl():
+    static = StaticLocationProvider(40.7128, -74.006)
+    provider = CachedLocationProvider(static, ttl_seconds=60)
+    first = provider.locate()
+    for _ in range(10):
+        assert provider.locate() is first
+    assert static.calls == 1
+    assert str(first) == "Latitude: 40.7128, Longitude: -74.006"
+    stats = provider.stats()
+    assert stats["lookups"] == 1 and stats["hits"] == 10
+    print(f"✅ One lookup serves repeated questions: {stats}")
+
+
+def test_expired_fix_is_looked_up_again():
+    static = StaticLocationProvider(40.7128, -74.006)
+    provider = CachedLocationProvider(static, ttl_seconds=0.05)
+    provider.locate()
+    time.sleep(0.1)
+    provider.locate()
+    assert static.calls == 2
+    print("✅ Expired fixes are refreshed")
+
+
+def test_pushed_coordinates_win_while_fresh():
+    static = StaticLocationProvider(40.7128, -74.006)
+    provider = CachedLocationProvider(static, ttl_seconds=0, push_ttl_seconds=60)
+    provider.push(41.0, -73.5, accuracy_m=8)
+    location = asyncio.run(provider.locate_async())
+    assert (location.latitude, location.longitude, location.source) == (41.0, -73.5, "device")
+    assert static.calls == 0
+    print("✅ Device-pushed coordinates skip the lookup")
+
+
+def test_failed_lookup_falls_back_to_recent_fix():
+    failing = FailingProvider()
+    provider = CachedLocationProvider(failing, ttl_seconds=0, push_ttl_seconds=0, max_stale_seconds=60)
+    try:
+        provider.locate()
+        assert False, "expected the lookup error without a known fix"
+    except Exception as e:
+        assert "geolocation unavailable" in str(e)
+
+    provider.push(41.0, -73.5)
+    assert provider.locate().source == "device"
+    assert provider.stats()["failures"] == 2
+    print("✅ Failed lookups fall back to the last known fix")
+
+
+def test_pushed_fixes_stay_with_their_session():
+    static = StaticLocationProvider(40.7128, -74.006)
+    provider = CachedLocationProvider(static, ttl_seconds=60, push_ttl_seconds=60)
+    provider.push(41.0, -73.5, session_id="medic-1")
+    provider.push(42.0, -71.0, session_id="medic-2")
+
+    assert (provider.locate("medic-1").latitude, provider.locate("medic-2").latitude) == (41.0, 42.0)
+    # A unit that never pushed gets the lookup, not another unit's fix
+    assert provider.locate("engine-7").source == "static"
+    assert provider.locate().source == "static"
+
+    # GPS answers are cached per grid cell, so each unit gets its own cell
+    gps_agent = object.__new__(GPSAgent)
+    gps_agent.location_provider = provider
+    cell_1, location_1 = gps_agent.location_context("medic-1")
+    cell_2, location_2 = asyncio.run(gps_agent.location_context_async("medic-2"))
+    assert (cell_1, cell_2) == ("41.00,-73.50", "42.00,-71.00")
+    assert location_1 == "Latitude: 41.0, Longitude: -73.5"
+
+    assert provider.forget("medic-1")
+    assert provider.locate("medic-1").source == "static"
+    assert provider.locate("medic-2").source == "device"
+    print("✅ Each session's pushed fix only answers that session's questions")
+
+
+def test_stale_and_excess_pushes_are_dropped():
+    provider = CachedLocationProvider(StaticLocationProvider(40.7128, -74.006), max_stale_seconds=60, max_sessions=2)
+    for unit in range(5):
+        provider.push(41.0 + unit, -73.5, session_id=f"medic-{unit}")
+    assert provider.stats()["pushed_sessions"] == 2
+    assert provider.locate("medic-4").latitude == 45.0
+    assert provider.locate("medic-0").source == "static"
+    print("✅ Pushed fixes are bounded by max_sessions")
+
+
+if __name__ == "__main__":
+    test_lookups_are_reused_within_ttl()
+    test_expired_fix_is_looked_up_again()
+    test_pushed_coordinates_win_while_fresh()
+    test_failed_lookup_falls_back_to_recent_fix()
+    test_pushed_fixes_stay_with_their_session()
+    test_stale_and_excess_pushes_are_dropped()
+    print("\n✅ Location provider tests passed")
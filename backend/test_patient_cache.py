@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-patient read-through cache used by FirestoreDB.
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.database.firestore_db import FirestoreDB
+from ems_copilot.infrastructure.database.patient_cache import PatientRecordCache
+
+
+def vitals(name, value, timestamp):
+    return {"vitals_name": name, "vitals_value": value, "patient_name": "Hank Smith", "timestamp": timestamp}
+
+
+def test_records_are_time_ordered_and_written_through():
+    cache = PatientRecordCache()
+    assert cache.get("vitals", "Hank Smith") is None
+
+    cache.put("vitals", "Hank Smith", [vitals("hr", "110", "2024-01-01T10:05:00"), vitals("o2", "93", "2024-01-01T10:00:00")])
+    cache.append("vitals", "Hank Smith", vitals("bp", "140/90", "2024-01-01T10:02:00"))
+    # Writes for patients that are not cached are ignored until the next full load
+    cache.append("vitals", "Jane Doe", vitals("hr", "80", "2024-01-01T10:00:00"))
+
+    records = cache.get("vitals", "Hank Smith")
+    assert [record["vitals_name"] for record in records] == ["o2", "bp", "hr"]
+    assert cache.get("vitals", "Jane Doe") is None
+    stats = cache.stats()
+    print(f"Stats: {stats}")
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_ttl_and_size_bounds_release_listeners():
+    released = []
+    cache = PatientRecordCache(ttl_seconds=0.05, max_patients=2)
+    for name in ["A", "B", "C"]:
+        cache.put("vitals", name, [])
+        cache.set_listener("vitals", name, lambda name=name: released.append(name))
+
+    # "A" was least recently used and is evicted along with its listener
+    assert released == ["A"]
+    assert cache.get("vitals", "A") is None
+
+    time.sleep(0.1)
+    assert cache.get("vitals", "B") is None
+    assert released == ["A", "B"]
+    assert cache.stats()["listeners"] == 1
+
+
+class RacingQuery:
+    """Firestore query double whose stream lets a write land part-way through."""
+
+    def __init__(self, docs, during_stream):
+        self.docs = docs
+        self.during_stream = during_stream
+
+    def where(self, *args):
+        return self
+
+    def stream(self):
+        for doc in self.docs:
+            self.during_stream()
+            yield type("Doc", (), {"to_dict": lambda self, doc=doc: dict(doc)})()
+
+
+def test_load_racing_a_write_is_not_cached():
+    cache = PatientRecordCache()
+    version = cache.version("vitals", "Hank Smith")
+    # A write lands between the query and the put
+    cache.append("vitals", "Hank Smith", vitals("hr", "90", "2024-01-01T10:10:00"))
+    stale = [vitals("hr", "120", "2024-01-01T10:00:00")]
+    assert cache.put("vitals", "Hank Smith", stale, version=version) == stale
+    assert cache.get("vitals", "Hank Smith") is None
+    assert cache.put("vitals", "Hank Smith", stale, version=cache.version("vitals", "Hank Smith")) == stale
+    assert cache.get("vitals", "Hank Smith") == stale
+
+    db = object.__new__(FirestoreDB)
+    db.patient_cache = PatientRecordCache()
+    db.listen = False
+    write = lambda: db.patient_cache.append("vitals", "Jane Doe", vitals("o2", "95", "2024-01-01T10:10:00"))
+    db.db = type("FakeClient", (), {"collection": lambda self, name: RacingQuery([vitals("o2", "88", "t")], write)})()
+    db.get_patient_records("vitals", "Jane Doe")
+    assert db.patient_cache.get("vitals", "Jane Doe") is None
+    print("✅ A load that raced with a write is returned but not cached")
+
+
+def test_versions_are_bounded_by_cached_patients():
+    cache = PatientRecordCache(max_patients=2)
+    for i in range(50):
+        cache.append("vitals", f"Uncached {i}", vitals("hr", "80", "t"))
+        cache.put("vitals", f"Patient {i}", [])
+        cache.append("vitals", f"Patient {i}", vitals("hr", "90", "t"))
+    assert set(cache._versions) == set(cache._entries) and len(cache._versions) == 2
+
+    # A load that read a version before a write is still rejected once the entry is evicted
+    version = cache.version("vitals", "Patient 49")
+    cache.append("vitals", "Patient 49", vitals("hr", "100", "t"))
+    cache.put("vitals", "Other A", [])
+    cache.put("vitals", "Other B", [])
+    assert cache.get("vitals", "Patient 49") is None
+    cache.put("vitals", "Patient 49", [vitals("hr", "90", "t")], version=version)
+    assert cache.get("vitals", "Patient 49") is None
+
+    cache.invalidate("vitals", "Other A")
+    cache.clear()
+    assert cache._versions == {}
+    print("✅ Versions are only kept for cached patients")
+
+
+if __name__ == "__main__":
+    test_records_are_time_ordered_and_written_through()
+    test_ttl_and_size_bounds_release_listeners()
+    test_load_racing_a_write_is_not_cached()
+    test_versions_are_bounded_by_cached_patients()
+    print("✅ Patient cache tests passed")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the local fast-path query router.
+Checks routing decisions against the labeled corpus in dev/data.
+"""
+
+import json
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.domain.services.query_router import QueryRouter
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "dev", "data", "router_corpus.jsonl")
+
+
+def test_obvious_queries_skip_gemini():
+    router = QueryRouter()
+    cases = {
+        "BP 140/90 for John": ("vitals_agent", {"input": "BP 140/90 for John"}),
+        "how far to Mercy hospital": ("gps_agent", {"question": "how far to Mercy hospital"}),
+        "assess this patient": ("triage_agent", {"user_query": "assess this patient"}),
+    }
+    for query, (agent, parameters) in cases.items():
+        decision = router.route(query, known_patients=["John"])
+        print(f"{query!r} -> {decision}")
+        assert decision.agent == agent
+        assert decision.parameters == parameters
+
+
+def test_ambiguous_queries_fall_back_to_gemini():
+    router = QueryRouter()
+    for query in ["", "hello", "what's the weather like", "patient has chest pain"]:
+        decision = router.route(query)
+        assert not decision.is_confident(), f"{query!r} should fall back, got {decision}"
+
+
+def test_clinical_questions_are_not_routed_to_gps_or_vitals():
+    router = QueryRouter()
+    for query in ["how long to wait before giving another dose of nitro", "GCS 8, should we intubate?",
+                  "is his O2 of 85 concerning", "BP 80/50 and patient is unresponsive"]:
+        decision = router.route(query)
+        print(f"{query!r} -> {decision}")
+        assert decision.agent in (None, "triage_agent")
+    # "how long to" is only a navigation question when a destination follows
+    assert router.route("how long to get to Mercy hospital").agent == "gps_agent"
+
+
+def test_readings_with_a_question_or_clause_go_to_gemini():
+    router = QueryRouter()
+    for query in ["HR 40 and dropping, what do I do", "BP 70/40, help", "O2 is 82 what now",
+                  "sugar 40, give D50?", "patient BP 80/50 is he in shock", "pulse 0, starting CPR",
+                  "blood pressure 90/60", "spo2 88 on room air for Jane Doe"]:
+        decision = router.route(query)
+        print(f"{query!r} -> {decision}")
+        assert decision.agent != "vitals_agent"
+    # Plain recordings the parser fully resolves still skip Gemini
+    assert router.route("O2 93, sugar 120, HR 110, BP 140/90 for Hank Smith",
+                        known_patients=["Hank Smith"]).agent == "vitals_agent"
+    assert router.route("glucose 45 for patient Tom Baker").agent == "vitals_agent"
+
+    # The same check applies to classifier picks
+    router = QueryRouter(classifier=lambda query: ("vitals_agent", 0.99))
+    assert router.route("sats dropping, now what").agent is None
+
+
+def test_capitalised_words_are_not_taken_for_a_patient():
+    router = QueryRouter()
+    for query in ["HR 88 for Chest Pain", "HR 60 on Monday", "BP 140/90 for Hank Smith"]:
+        decision = router.route(query)
+        print(f"{query!r} -> {decision}")
+        assert decision.agent != "vitals_agent"
+    # Once the session is working on Hank Smith, his readings skip Gemini
+    assert router.route("BP 140/90 for Hank Smith", known_patients=["hank smith"]).agent == "vitals_agent"
+
+
+def test_classifier_used_only_when_rules_are_unsure():
+    calls = []
+
+    def classifier(query):
+        calls.append(query)
+        return "triage_agent", 0.95
+
+    router = QueryRouter(classifier=classifier)
+    assert router.route("BP 140/90 for John", known_patients=["John"]).source == "rules"
+    decision = router.route("patient has chest pain")
+    assert decision.source == "classifier"
+    assert decision.agent == "triage_agent"
+    assert calls == ["patient has chest pain"]
+
+
+# Patients the crews in the corpus are working on, as a session would know them mid-call
+SESSION_PATIENTS = ["John", "Hank Smith", "Maria Lopez", "Sarah Johnson", "Mike Davis", "Jane Doe",
+                    "Robert King", "Tom", "Lisa Ray"]
+
+
+def test_corpus_precision():
+    router = QueryRouter()
+    with open(CORPUS_PATH) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    for known_patients, floor in [(None, 0.5), (SESSION_PATIENTS, 0.7)]:
+        decisions = [(example, router.route(example["query"], known_patients)) for example in corpus]
+        dispatched = [(example, decision) for example, decision in decisions if decision.is_confident()]
+        correct = sum(decision.agent == example["agent"] for example, decision in dispatched)
+        print(f"Known patients {known_patients}: coverage {len(dispatched)}/{len(corpus)}, "
+              f"precision {correct}/{len(dispatched)}")
+        assert correct == len(dispatched)
+        # Vitals utterances the parser cannot fully resolve, or that name a patient the
+        # session does not know without saying "patient", go to Gemini, so coverage
+        # trades off for safety
+        assert len(dispatched) >= floor * len(corpus)
+
+if __name__ == "__main__":
+    test_obvious_queries_skip_gemini()
+    test_ambiguous_queries_fall_back_to_gemini()
+    test_clinical_questions_are_not_routed_to_gps_or_vitals()
+    test_readings_with_a_question_or_clause_go_to_gemini()
+    test_capitalised_words_are_not_taken_for_a_patient()
+    test_classifier_used_only_when_rules_are_unsure()
+    test_corpus_precision()
+    print("✅ Query router tests passed")
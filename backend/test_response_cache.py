@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for the agent response cache.
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.domain.services.orchestrator_agent import OrchestratorAgent
+from ems_copilot.domain.services.triage_agent import TriageAgent
+from ems_copilot.domain.services.vitals_parser import VitalsParser
+from ems_copilot.infrastructure.database.session_store import SessionStore
+from ems_copilot.infrastructure.utils.response_cache import ResponseCache, parse_ttls
+
+
+ANSWER = "The nearest trauma center is Regional Medical Center, 8 minutes away."
+
+
+def test_repeated_queries_hit_after_normalization():
+    cache = ResponseCache()
+    assert cache.put("gps_agent", "Nearest trauma center?", ANSWER, context="40.71,-74.01")
+    assert cache.get("gps_agent", "  nearest   TRAUMA center ", context="40.71,-74.01") == ANSWER
+    assert cache.get("gps_agent", "nearest trauma center", context="40.80,-74.01") is None
+    assert cache.get("triage_agent", "nearest trauma center", context="40.71,-74.01") is None
+    stats = cache.stats()
+    assert stats["agents"]["gps_agent"]["hits"] == 1 and stats["agents"]["gps_agent"]["misses"] == 1
+    print(f"✅ Normalized repeats hit, other context or agent misses: {stats}")
+
+
+def test_uncached_agents_and_errors_are_not_stored():
+    cache = ResponseCache()
+    assert not cache.put("vitals_agent", "hr 110 for hank", "Heart rate recorded successfully.")
+    assert not cache.put("gps_agent", "nearest hospital", "Error calling Gemini API: 503")
+    assert not cache.put("gps_agent", "nearest hospital", "Go north on Main. Error calling Gemini API: timeout")
+    assert not cache.put("triage_agent", "assess", "Sorry, I encountered an error processing your request: x")
+    assert not cache.put("triage_agent", "assess", "")
+    assert cache.stats()["entries"] == 0
+    print("✅ Write agents and error answers are never cached")
+
+
+def test_ttl_expiry_per_agent():
+    cache = ResponseCache(ttls={"gps_agent": 60, "triage_agent": 0.05})
+    cache.put("gps_agent", "nearest hospital", ANSWER)
+    cache.put("triage_agent", "assess patient", "Priority: URGENT")
+    time.sleep(0.1)
+    assert cache.get("gps_agent", "nearest hospital") == ANSWER
+    assert cache.get("triage_agent", "assess patient") is None
+    print("✅ TTLs apply per agent")
+
+
+def test_invalidation_drops_entries_and_rejects_in_flight_answers():
+    cache = ResponseCache()
+    cache.put("triage_agent", "assess patient", "Priority: DELAYED")
+    cache.put("gps_agent", "nearest hospital", ANSWER)
+
+    in_flight = cache.generation("triage_agent")
+    assert cache.invalidate(["triage_agent"]) == 1
+    assert cache.get("triage_agent", "assess patient") is None
+    assert cache.get("gps_agent", "nearest hospital") == ANSWER
+
+    # An answer computed before the vitals write must not be cached afterwards
+    assert not cache.put("triage_agent", "assess patient", "Priority: DELAYED", generation=in_flight)
+    assert cache.put("triage_agent", "assess patient", "Priority: URGENT",
+                     generation=cache.generation("triage_agent"))
+    assert cache.get("triage_agent", "assess patient") == "Priority: URGENT"
+    print(f"✅ Invalidation drops entries and stale in-flight answers: {cache.stats()['agents']['triage_agent']}")
+
+
+def test_entry_bound_and_ttl_parsing():
+    cache = ResponseCache(max_entries=2)
+    for query in ("a", "b", "c"):
+        cache.put("gps_agent", query, ANSWER)
+    assert cache.stats()["entries"] == 2 and cache.get("gps_agent", "a") is None
+    assert parse_ttls("gps_agent=120, triage_agent=0") == {"gps_agent": 120.0, "triage_agent": 0.0}
+    assert not ResponseCache(ttls=parse_ttls("triage_agent=0")).caches("triage_agent")
+    print("✅ Entry count is bounded and TTL overrides parse")
+
+
+def test_patient_scoped_invalidation():
+    cache = ResponseCache()
+    cache.put("triage_agent", "assess patient", "Hank: URGENT", context="medic-1", scope="hank smith")
+    cache.put("triage_agent", "assess patient", "Jane: MINOR", context="medic-2", scope="jane doe")
+    in_flight = cache.generation("triage_agent", "hank smith")
+
+    assert cache.invalidate(["triage_agent"], scope="hank smith") == 1
+    assert cache.get("triage_agent", "assess patient", context="medic-1", scope="hank smith") is None
+    assert cache.get("triage_agent", "assess patient", context="medic-2", scope="jane doe") == "Jane: MINOR"
+    assert not cache.put("triage_agent", "assess patient", "Hank: URGENT", context="medic-1",
+                         generation=in_flight, scope="hank smith")
+    print("✅ A vitals write for one patient only expires that patient's answers")
+
+
+def test_scope_generations_are_bounded_by_entries():
+    cache = ResponseCache(max_entries=3)
+    for i in range(100):
+        patient = f"patient {i}"
+        cache.put("triage_agent", "assess patient", f"{i}: URGENT", context=patient, scope=patient)
+        if i % 2:
+            cache.invalidate(["triage_agent"], scope=patient)
+    stats = cache.stats()
+    assert stats["scopes"] <= stats["entries"] <= 3, stats
+
+    # Invalidating a scope with no entries still rejects an answer generated before it
+    in_flight = cache.generation("triage_agent", "hank smith")
+    cache.invalidate(["triage_agent"], scope="hank smith")
+    assert not cache.put("triage_agent", "assess patient", "Hank: URGENT", context="medic-1",
+                         generation=in_flight, scope="hank smith")
+
+    # ...as does invalidating one whose last entry is dropped with it
+    cache.put("triage_agent", "assess patient", "Hank: URGENT", context="medic-1", scope="hank smith")
+    in_flight = cache.generation("triage_agent", "hank smith")
+    assert cache.invalidate(["triage_agent"], scope="hank smith") == 1
+    assert not cache.put("triage_agent", "assess patient", "Hank: URGENT", context="medic-1",
+                         generation=in_flight, scope="hank smith")
+
+    # Other scopes' entries stay reachable when the floor moves
+    cache.clear()
+    cache.put("triage_agent", "assess patient", "Jane: MINOR", context="medic-2", scope="jane doe")
+    cache.invalidate(["triage_agent"], scope="hank smith")
+    assert cache.get("triage_agent", "assess patient", context="medic-2", scope="jane doe") == "Jane: MINOR"
+    assert cache.stats()["scopes"] == 1
+    print(f"✅ Scope generations are only kept for scopes with entries: {stats}")
+
+
+def test_triage_answers_do_not_cross_sessions():
+    sessions = SessionStore()
+    triage_agent = object.__new__(TriageAgent)
+    triage_agent.vitals_parser = VitalsParser()
+    triage_agent.sessions = sessions
+    calls = []
+
+    def call_triage_agent(user_query, session_id=None):
+        calls.append(session_id)
+        return f"Triage of {sessions.current_patient(session_id)}: URGENT"
+
+    triage_agent.call_triage_agent = call_triage_agent
+    orchestrator = object.__new__(OrchestratorAgent)
+    orchestrator.response_cache = ResponseCache()
+    orchestrator.triage_agent = triage_agent
+
+    def ask(session_id):
+        query = "What's wrong with the patient?"
+        return orchestrator.dispatch_cached(query, "triage_agent", {"user_query": query}, session_id)
+
+    sessions.remember_patient("medic-1", "Hank Smith")
+    sessions.remember_patient("medic-2", "Jane Doe")
+    assert ask("medic-1") == "Triage of Hank Smith: URGENT"
+    # Same words from another crew about another patient must not reuse medic-1's answer
+    assert ask("medic-2") == "Triage of Jane Doe: URGENT"
+    assert ask("medic-1") == "Triage of Hank Smith: URGENT"
+    assert calls == ["medic-1", "medic-2"]
+
+    # New vitals for Jane expire medic-2's answer only
+    orchestrator.response_cache.invalidate(["triage_agent"], scope="jane doe")
+    ask("medic-1")
+    ask("medic-2")
+    assert calls == ["medic-1", "medic-2", "medic-2"]
+    print("✅ Triage answers are cached per session and patient")
+
+
+if __name__ == "__main__":
+    test_repeated_queries_hit_after_normalization()
+    test_uncached_agents_and_errors_are_not_stored()
+    test_ttl_expiry_per_agent()
+    test_invalidation_drops_entries_and_rejects_in_flight_answers()
+    test_entry_bound_and_ttl_parsing()
+    test_patient_scoped_invalidation()
+    test_scope_generations_are_bounded_by_entries()
+    test_triage_answers_do_not_cross_sessions()
+    print("\n✅ Response cache tests passed")
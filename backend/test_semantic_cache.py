@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the semantic (paraphrase) tier of the response cache.
+Uses fixed fake embeddings, so no model download is needed.
+"""
+
+import asyncio
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.domain.services.orchestrator_agent import OrchestratorAgent
+from ems_copilot.infrastructure.utils.response_cache import ResponseCache
+from ems_copilot.infrastructure.utils.semantic_cache import SemanticCache
+
+
+VECTORS = {
+    "how far to mercy": [1.0, 0.0, 0.0],
+    "eta to mercy hospital": [0.95, 0.31, 0.0],
+    "how far to st. joseph": [0.6, 0.0, 0.8],
+    "how far is exit 12": [0.0, 1.0, 0.0],
+    "how far is exit 14": [0.0, 0.99, 0.14],
+    "assess chest pain": [0.0, 0.0, 1.0],
+    "assess chest pain please": [0.0, 0.1, 0.99],
+    "nearest hospital": [0.7, 0.7, 0.14],
+    "closest hospital": [0.71, 0.69, 0.14],
+    "nearest stroke center": [0.69, 0.7, 0.2],
+    "nearest level 1 trauma center": [0.7, 0.69, 0.18],
+}
+
+
+def fake_embed(texts):
+    return [VECTORS[text.lower()] for text in texts]
+
+
+def test_paraphrase_hits_and_distinct_places_miss():
+    semantic = SemanticCache(fake_embed, threshold=0.85)
+    semantic.add("gps_agent", "how far to Mercy", "Mercy is 8 minutes away.", context="40.71,-74.01")
+    answer, similarity = semantic.lookup("gps_agent", "ETA to Mercy hospital", context="40.71,-74.01")
+    assert answer == "Mercy is 8 minutes away." and similarity > 0.9
+    assert semantic.lookup("gps_agent", "how far to St. Joseph", context="40.71,-74.01") is None
+    assert semantic.lookup("gps_agent", "ETA to Mercy hospital", context="40.80,-74.01") is None
+    print(f"✅ Paraphrases hit, other destinations and locations miss: {semantic.stats()}")
+
+
+def test_numbers_must_match():
+    semantic = SemanticCache(fake_embed, threshold=0.85)
+    semantic.add("gps_agent", "how far is exit 12", "Exit 12 is 3 miles ahead.")
+    assert semantic.lookup("gps_agent", "how far is exit 14") is None
+    print("✅ Questions with different numbers never share an answer")
+
+
+def test_only_eligible_agents_are_cached():
+    semantic = SemanticCache(fake_embed, threshold=0.85)
+    semantic.add("triage_agent", "assess chest pain", "Priority: URGENT")
+    assert semantic.lookup("triage_agent", "assess chest pain please") is None
+    assert semantic.stats()["size"] == 0
+    print("✅ Safety-critical agents are not answered from paraphrases")
+
+
+def test_bounded_size_and_invalidation():
+    semantic = SemanticCache(fake_embed, threshold=0.85, max_entries=2)
+    semantic.add("gps_agent", "how far to Mercy", "Mercy")
+    semantic.add("gps_agent", "how far to St. Joseph", "St. Joseph")
+    semantic.add("gps_agent", "how far is exit 12", "Exit 12")
+    stats = semantic.stats()
+    assert stats["size"] == 2 and stats["evictions"] == 1
+    assert semantic.lookup("gps_agent", "ETA to Mercy hospital") is None
+    assert semantic.invalidate(["gps_agent"]) == 2 and semantic.stats()["size"] == 0
+    print("✅ Size is bounded and invalidation empties the tier")
+
+
+def test_response_cache_falls_back_to_semantic_tier():
+    cache = ResponseCache(semantic=SemanticCache(fake_embed, threshold=0.85))
+    assert cache.get("gps_agent", "how far to Mercy") is None
+    cache.put("gps_agent", "how far to Mercy", "Mercy is 8 minutes away.")
+    assert asyncio.run(cache.get_async("gps_agent", "ETA to Mercy hospital")) == "Mercy is 8 minutes away."
+    stats = cache.stats()
+    assert stats["agents"]["gps_agent"]["semantic_hits"] == 1
+    assert stats["agents"]["gps_agent"]["misses"] == 1
+    assert stats["semantic"]["size"] == 1
+    print(f"✅ Exact misses fall back to the semantic tier: {stats['agents']['gps_agent']}")
+
+
+class FixedLocationGPS:
+    def __init__(self):
+        self.questions = []
+
+    def location_context(self, session_id=None):
+        return "40.71,-74.01", {"lat": 40.712, "lon": -74.006}
+
+    def call_gps(self, question, current_location=None, session_id=None):
+        self.questions.append(question)
+        return f"Answer to: {question}"
+
+
+def test_facility_requests_with_different_capabilities_miss():
+    orchestrator = object.__new__(OrchestratorAgent)
+    orchestrator.response_cache = ResponseCache(semantic=SemanticCache(fake_embed, threshold=0.85))
+    orchestrator.gps_agent = FixedLocationGPS()
+
+    def ask(question):
+        return orchestrator.dispatch_cached(question, "gps_agent", {"question": question})
+
+    ask("nearest hospital")
+    # A paraphrase asking for the same facility is served from the semantic tier...
+    assert ask("closest hospital") == "Answer to: nearest hospital"
+    # ...but one asking for a different capability or trauma level is not
+    assert ask("nearest stroke center") == "Answer to: nearest stroke center"
+    assert ask("nearest level 1 trauma center") == "Answer to: nearest level 1 trauma center"
+    assert orchestrator.gps_agent.questions == [
+        "nearest hospital", "nearest stroke center", "nearest level 1 trauma center"]
+    print("✅ Facility paraphrases only share answers when they ask for the same capabilities")
+
+
+if __name__ == "__main__":
+    test_paraphrase_hits_and_distinct_places_miss()
+    test_numbers_must_match()
+    test_only_eligible_agents_are_cached()
+    test_bounded_size_and_invalidation()
+    test_response_cache_falls_back_to_semantic_tier()
+    test_facility_requests_with_different_capabilities_miss()
+    print("\n✅ Semantic cache tests passed")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for per-session bounded conversation state.
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.database.session_store import SessionStore
+
+
+def test_sessions_are_isolated_ring_buffers():
+    store = SessionStore(max_turns=4)
+    for i in range(10):
+        store.append("medic-1", "user", f"medic 1 message {i}")
+    store.append("medic-2", "user", "medic 2 message")
+    history = store.history("medic-1")
+    assert [turn["content"] for turn in history] == [f"medic 1 message {i}" for i in range(6, 10)]
+    assert [turn["content"] for turn in store.history("medic-2")] == ["medic 2 message"]
+    assert store.history(None) == []
+    print(f"✅ Sessions keep their own last turns: {store.stats()}")
+
+
+def test_idle_sessions_are_evicted():
+    store = SessionStore(idle_seconds=0.05)
+    store.append("medic-1", "user", "hello")
+    time.sleep(0.1)
+    store.append("medic-2", "user", "hello")
+    assert store.history("medic-1") == [] and store.stats()["idle_evictions"] == 1
+    print("✅ Idle sessions are dropped")
+
+
+def test_memory_stays_flat_under_budget():
+    store = SessionStore(max_turns=20, max_bytes=20_000, max_sessions=50)
+    message = "x" * 200
+    for i in range(5000):
+        store.append(f"unit-{i % 300}", "user", message)
+        store.append(f"unit-{i % 300}", "agent", message)
+    stats = store.stats()
+    assert stats["bytes"] <= 20_000 and stats["sessions"] <= 50
+    assert stats["budget_evictions"] > 0
+    print(f"✅ Memory budget holds over 10k turns: {stats}")
+
+
+def test_single_session_over_budget_trims_itself():
+    store = SessionStore(max_turns=100, max_bytes=2_000)
+    for i in range(50):
+        store.append("unit-1", "user", "y" * 100)
+    assert store.stats()["bytes"] <= 2_000 and len(store.history("unit-1")) < 50
+    assert store.end("unit-1") and store.stats() == {**store.stats(), "sessions": 0, "bytes": 0}
+    print("✅ A single large session trims its oldest turns and can be ended")
+
+
+def test_current_patient_is_per_session():
+    store = SessionStore()
+    store.remember_patient("medic-1", "Hank Smith")
+    store.remember_patient("medic-2", "Jane Doe")
+    store.remember_patient("medic-1", None)
+    assert store.current_patient("medic-1") == "Hank Smith"
+    assert store.current_patient("medic-2") == "Jane Doe"
+    # A crew that has named no patient gets none, not whoever was written last
+    assert store.current_patient("medic-3") is None
+    store.end("medic-1")
+    assert store.current_patient("medic-1") is None
+    print("✅ Each session remembers its own current patient")
+
+
+if __name__ == "__main__":
+    test_sessions_are_isolated_ring_buffers()
+    test_idle_sessions_are_evicted()
+    test_memory_stays_flat_under_budget()
+    test_single_session_over_budget_trims_itself()
+    test_current_patient_is_per_session()
+    print("\n✅ Session store tests passed")
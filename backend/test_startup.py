@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy imports and background warm-up at API startup.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.utils.startup import HEAVY_MODULES, StartupWarmup, loaded_heavy_modules
+
+
+def test_agent_modules_do_not_import_heavy_sdks():
+    # The modules the API imports, plus the agents it builds in the lifespan hook
+    code = (
+        "import json\n"
+        "import ems_copilot.infrastructure.utils.gemini_client_pool\n"
+        "import ems_copilot.infrastructure.database.conversation_history\n"
+        "import ems_copilot.infrastructure.database.history_retention\n"
+        "import ems_copilot.infrastructure.utils.tts_clients\n"
+        "import ems_copilot.infrastructure.utils.tts_pipeline\n"
+        "import ems_copilot.domain.services.orchestrator_agent\n"
+        "from ems_copilot.infrastructure.utils.startup import loaded_heavy_modules\n"
+        "print(json.dumps(loaded_heavy_modules()))\n"
+    )
+    src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                               env={**os.environ, "PYTHONPATH": src_dir})
+    assert completed.returncode == 0, completed.stderr
+    heavy = json.loads(completed.stdout.strip().splitlines()[-1])
+    print(f"Heavy modules after import: {heavy}")
+    assert heavy == []
+
+
+def test_loaded_heavy_modules():
+    assert loaded_heavy_modules({"json": None, "torch": None, "google.genai": None}) == ["torch", "google.genai"]
+    assert "chromadb" in HEAVY_MODULES
+
+
+def test_warmup_runs_steps_off_the_event_loop():
+    threads = []
+
+    async def main():
+        warmup = StartupWarmup([("model", lambda: threads.append(threading.current_thread().name))])
+        warmup.start()
+        assert warmup.status == "idle"  # start() returns before any step runs
+        await warmup._task
+        return warmup.stats()
+
+    stats = asyncio.run(main())
+    print(f"Warm-up stats: {stats}")
+    assert stats["status"] == "done"
+    assert stats["steps"]["model"]["error"] is None
+    assert threads[0] != threading.main_thread().name
+
+
+def test_failed_step_does_not_stop_warmup():
+    ran = []
+
+    def fail():
+        raise RuntimeError("no credentials")
+
+    warmup = StartupWarmup([("gemini_client", fail), ("facility_index", lambda: ran.append(True))])
+    stats = asyncio.run(warmup.run())
+    assert stats["status"] == "degraded"
+    assert stats["steps"]["gemini_client"]["error"] == "no credentials"
+    assert ran == [True]
+
+
+def test_close_cancels_running_warmup():
+    release = threading.Event()
+
+    async def main():
+        warmup = StartupWarmup([("slow", lambda: release.wait(5)), ("never", lambda: None)])
+        warmup.start()
+        await asyncio.sleep(0.05)
+        await warmup.close()
+        release.set()
+        return warmup.stats()
+
+    stats = asyncio.run(main())
+    assert stats["status"] == "cancelled"
+    assert "never" not in stats["steps"]
+
+
+if __name__ == "__main__":
+    test_agent_modules_do_not_import_heavy_sdks()
+    test_loaded_heavy_modules()
+    test_warmup_runs_steps_off_the_event_loop()
+    test_failed_step_does_not_stop_warmup()
+    test_close_cancels_running_warmup()
+    print("\n✅ Startup tests passed")
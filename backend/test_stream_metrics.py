@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for time-to-first-token measurement of streamed responses.
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.utils.stream_metrics import StreamMetrics
+
+
+def test_ttft_is_time_to_first_non_empty_chunk():
+    metrics = StreamMetrics()
+    timer = metrics.timer("TriageAgent")
+    timer.mark("")
+    time.sleep(0.02)
+    timer.mark("Priority: ")
+    time.sleep(0.02)
+    timer.mark("URGENT")
+    measurement = timer.finish()
+
+    print(f"Measurement: {measurement}")
+    assert measurement["chunks"] == 2
+    assert 20 <= measurement["ttft_ms"] < measurement["total_ms"]
+
+
+def test_stats_per_stream_name():
+    metrics = StreamMetrics(window=10)
+    for ttft in [10, 20, 30, 40]:
+        metrics.record("GPSAgent", {"ttft_ms": ttft, "total_ms": ttft * 5, "chunks": 3, "error": False})
+    metrics.record("GPSAgent", {"ttft_ms": None, "total_ms": 5, "chunks": 0, "error": True})
+
+    stats = metrics.stats()["GPSAgent"]
+    print(f"Stats: {stats}")
+    assert stats["streams"] == 5 and stats["errors"] == 1
+    assert stats["ttft_p50_ms"] == 30
+    assert stats["ttft_p95_ms"] == 40
+
+
+if __name__ == "__main__":
+    test_ttft_is_time_to_first_non_empty_chunk()
+    test_stats_per_stream_name()
+    print("✅ Stream metrics tests passed")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the app-lifetime Text-to-Speech client pool.
+Uses fake clients, so no Google credentials are needed.
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.utils.tts_clients import TTSClientPool
+
+
+class FakeAsyncClient:
+    """Counts list_voices calls and records whether its channel was closed."""
+
+    def __init__(self):
+        self.calls = 0
+        self.closed = False
+        self.transport = SimpleNamespace(close=self._close)
+
+    async def _close(self):
+        self.closed = True
+
+    async def list_voices(self, language_code):
+        self.calls += 1
+        voice = SimpleNamespace(
+            name=f"{language_code}-Standard-A",
+            language_codes=[language_code],
+            ssml_gender=SimpleNamespace(name="FEMALE"),
+            natural_sample_rate_hertz=24000
+        )
+        return SimpleNamespace(voices=[voice])
+
+
+def test_voices_are_cached_per_language():
+    client = FakeAsyncClient()
+    pool = TTSClientPool(async_client=client)
+
+    async def fetch():
+        first = await pool.list_voices_async("en-US")
+        second = await pool.list_voices_async("en-US")
+        other = await pool.list_voices_async("es-US")
+        return first, second, other
+
+    first, second, other = asyncio.run(fetch())
+    assert first == second and first[0]["name"] == "en-US-Standard-A"
+    assert other[0]["language_codes"] == ["es-US"]
+    assert client.calls == 2
+    stats = pool.stats()
+    assert stats["voices_hits"] == 1 and stats["voices_misses"] == 2
+    print(f"✅ Voice listings cached per language: {stats}")
+
+
+def test_expired_voices_are_refetched():
+    client = FakeAsyncClient()
+    pool = TTSClientPool(voices_ttl_seconds=0, async_client=client)
+
+    async def fetch():
+        await pool.list_voices_async()
+        await pool.list_voices_async()
+
+    asyncio.run(fetch())
+    assert client.calls == 2
+    print("✅ Expired voice listings are refetched")
+
+
+def test_close_releases_clients():
+    client = FakeAsyncClient()
+    pool = TTSClientPool(async_client=client)
+    asyncio.run(pool.close())
+    assert client.closed and pool.async_client is None
+    print("✅ Close releases the async client")
+
+
+if __name__ == "__main__":
+    test_voices_are_cached_per_language()
+    test_expired_voices_are_refetched()
+    test_close_releases_clients()
+    print("\n✅ TTS client pool tests passed")
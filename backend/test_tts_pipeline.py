@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental (sentence-chunked) text-to-speech pipeline.
+Uses a fake TTS backend, so no Google credentials are needed.
+"""
+
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.utils.tts_pipeline import SentenceChunker, TTSPipeline, VoiceSettings
+
+
+class FakeTTSBackend:
+    """Returns the text as bytes after a delay; later calls finish sooner, to scramble completion order."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+
+    async def synthesize_async(self, text, voice):
+        self.calls.append(text)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay * 3 / len(self.calls))
+            return f"<{voice.voice_name}:{text}>".encode()
+        finally:
+            self.active -= 1
+
+
+def test_chunker_splits_at_sentence_boundaries():
+    chunker = SentenceChunker(min_chars=10)
+    chunks = []
+    for token in ["Priority is URG", "ENT. Give O2 at 15 L/min via NRB. Temp ", "is 98.6 F. See Dr. Smith", " on arrival."]:
+        chunks.extend(chunker.feed(token))
+    chunks.extend(chunker.flush())
+    print(f"Chunks: {chunks}")
+    assert chunks == [
+        "Priority is URGENT.",
+        "Give O2 at 15 L/min via NRB.",
+        "Temp is 98.6 F.",
+        "See Dr. Smith on arrival.",
+    ]
+
+
+def test_chunker_merges_short_sentences_and_caps_long_ones():
+    chunker = SentenceChunker(min_chars=20, max_chars=40)
+    assert chunker.feed("Yes. Go now. ") == []
+    assert chunker.feed("Head to the nearest trauma center, then call ahead, and prep") == [
+        "Yes. Go now. Head to the nearest trauma",
+    ]
+
+
+def test_segments_are_ordered_and_synthesized_concurrently():
+    async def tokens():
+        for token in ["Patient is stable for now. ", "Monitor SpO2 every five minutes. ",
+                      "Reassess blood pressure en route. ", "Notify the receiving hospital."]:
+            yield token
+
+    backend = FakeTTSBackend()
+    pipeline = TTSPipeline(backend, max_concurrency=4, min_chars=10)
+    voice = VoiceSettings(voice_name="fake-voice")
+
+    async def collect():
+        return [segment async for segment in pipeline.stream(tokens(), voice)]
+
+    segments = asyncio.run(collect())
+    for segment in segments:
+        print(segment)
+    assert [segment.index for segment in segments] == [0, 1, 2, 3]
+    assert segments[0].audio == b"<fake-voice:Patient is stable for now.>"
+    assert segments[-1].text == "Notify the receiving hospital."
+    assert backend.max_active > 1
+
+
+def test_first_audio_arrives_before_text_finishes():
+    async def slow_tokens():
+        yield "The first sentence is ready right away. "
+        await asyncio.sleep(0.3)
+        yield "The second one takes a while to generate."
+
+    pipeline = TTSPipeline(FakeTTSBackend(delay=0.01), min_chars=10)
+
+    async def first_segment_latency():
+        started = time.perf_counter()
+        async for segment in pipeline.stream(slow_tokens()):
+            return time.perf_counter() - started
+
+    latency = asyncio.run(first_segment_latency())
+    print(f"First audio after {latency * 1000:.0f} ms")
+    assert latency < 0.2
+
+
+if __name__ == "__main__":
+    test_chunker_splits_at_sentence_boundaries()
+    test_chunker_merges_short_sentences_and_caps_long_ones()
+    test_segments_are_ordered_and_synthesized_concurrently()
+    test_first_audio_arrives_before_text_finishes()
+    print("✅ TTS pipeline tests passed")
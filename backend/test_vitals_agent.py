@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for VitalsAgent write handling.
+Uses fake Firestore and response cache objects, so no credentials are needed.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.domain.services.vitals_agent import VitalsAgent
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.batches = []
+
+    def write_vitals(self, collection_name, vitals_data):
+        self.batches.append([vitals_data])
+
+    def write_vitals_batch(self, collection_name, vitals_entries):
+        self.batches.append(list(vitals_entries))
+        return [f"doc-{i}" for i in range(len(vitals_entries))]
+
+
+class RecordingCache:
+    def __init__(self):
+        self.invalidations = []
+
+    def invalidate(self, agents, scope=None):
+        self.invalidations.append((tuple(agents), scope))
+
+
+def make_agent():
+    agent = object.__new__(VitalsAgent)
+    agent.firestore_db = FakeFirestore()
+    agent.response_cache = RecordingCache()
+    return agent
+
+
+def gemini_response(*calls):
+    parts = [SimpleNamespace(function_call=SimpleNamespace(name=name, args=args)) for name, args in calls]
+    return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=parts))])
+
+
+def test_response_without_writes_reports_zero_recorded():
+    agent = make_agent()
+    result = agent.handle_response(gemini_response(("get_vitals", {"patient_name": "Hank Smith"})))
+    assert result is not None and result.is_success()
+    assert result.data["total_recorded"] == 0
+    assert agent.firestore_db.batches == []
+    assert agent.response_cache.invalidations == []
+    assert agent.aggregate_write_results([]).data["total_recorded"] == 0
+    print(f"✅ No writes: {result.text}")
+
+
+def test_nothing_written_invalidates_nothing():
+    agent = make_agent()
+    assert agent.write_vitals_batch([]) == []
+    agent.invalidate_cached_answers([])
+    assert agent.response_cache.invalidations == []
+
+    agent.invalidate_cached_answers([{"patient_name": "Hank Smith"}])
+    agent.invalidate_cached_answers([{"patient_name": None}])
+    assert agent.response_cache.invalidations == [(("triage_agent",), "hank smith"), (("triage_agent",), None)]
+    print("✅ Only actual writes invalidate cached triage answers")
+
+
+def test_batch_write_results_are_aggregated():
+    agent = make_agent()
+    result = agent.handle_response(gemini_response(
+        ("write_multiple_vitals", {"vitals_name": "heart rate", "vitals_value": "110", "patient_name": "Hank Smith"}),
+        ("write_multiple_vitals", {"vitals_name": "o2", "vitals_value": "93", "patient_name": "Hank Smith"}),
+    ))
+    assert result.is_success() and result.data["total_recorded"] == 2
+    assert len(agent.firestore_db.batches) == 1
+    print(f"✅ Batch: {result.text}")
+
+
+if __name__ == "__main__":
+    test_response_without_writes_reports_zero_recorded()
+    test_nothing_written_invalidates_nothing()
+    test_batch_write_results_are_aggregated()
+    print("\n✅ Vitals agent tests passed")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the local vitals extraction engine.
+Checks the parser against the golden corpus in dev/data.
+"""
+
+import json
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.domain.services.vitals_parser import VitalsParser
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "dev", "data", "vitals_golden.jsonl")
+
+
+def test_entries_match_write_multiple_vitals_arguments():
+    result = VitalsParser().parse("O2 93, sugar 120, HR 110, BP 140/90 for Hank Smith", timestamp="2024-01-01T00:00:00",
+                                  known_patients=["Hank Smith"])
+    assert result.fully_resolved
+    assert result.entries[0] == {
+        "vitals_name": "o2",
+        "vitals_value": "93",
+        "patient_name": "Hank Smith",
+        "timestamp": "2024-01-01T00:00:00",
+    }
+    assert [entry["vitals_name"] for entry in result.entries] == ["o2", "glucose", "heart rate", "blood pressure"]
+
+
+def test_ambiguous_input_is_not_resolved():
+    parser = VitalsParser()
+    # No patient name, implausible value, and a free-text note
+    for text in ["BP 140/90", "heart rate 900 for John Smith", "HR 110 for John Smith, he is complaining of chest pain"]:
+        result = parser.parse(text)
+        print(f"{text!r} -> {result}")
+        assert not result.fully_resolved
+
+
+def test_unattributed_numbers_and_repeated_vitals_are_not_resolved():
+    parser = VitalsParser()
+    # "now 90" is a newer value the parser did not attribute; recording 120 would be stale
+    result = parser.parse("Hank Smith HR was 120 now 90")
+    assert result.leftover == ["90"] and not result.fully_resolved
+    result = parser.parse("HR 120, HR 90 for Hank Smith", known_patients=["Hank Smith"])
+    assert len(result.entries) == 2 and not result.fully_resolved
+    print("✅ Leftover numbers and repeated vitals fall back to Gemini")
+
+
+def test_leading_prepositions_and_questions_are_not_names():
+    parser = VitalsParser()
+    result = parser.parse("For Jane Doe HR 72 BP 120/80", known_patients=["Jane Doe"])
+    assert result.patient_name == "Jane Doe" and result.fully_resolved
+    assert parser.parse("What's wrong with the patient?").patient_name is None
+    assert parser.parse("Should we intubate Hank Smith").patient_name is None
+    print("✅ Leading prepositions and question words are not taken as names")
+
+
+def test_names_found_by_position_need_a_known_patient():
+    parser = VitalsParser()
+    for text in ["HR 88 for Chest Pain", "HR 60 on Monday", "Hank Smith HR 110"]:
+        result = parser.parse(text, known_patients=["Jane Doe"])
+        print(f"{text!r} -> {result}")
+        assert result.entries and not result.name_confirmed and not result.fully_resolved
+    # Named as a patient, or the session's current patient
+    assert parser.parse("HR 88 for patient Hank Smith").fully_resolved
+    assert parser.parse("patient's name is Hank Smith HR 88").fully_resolved
+    assert parser.parse("Hank Smith HR 110", known_patients=[None, "hank  smith"]).fully_resolved
+    print("✅ Capitalised words after 'for' or 'on' are not taken for an unknown patient")
+
+
+def test_golden_corpus():
+    parser = VitalsParser()
+    with open(GOLDEN_PATH) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    # Utterances are parsed as if mid-call, with the session already on their patient
+    known_patients = [example["patient_name"] for example in corpus if example["patient_name"]]
+    for example in corpus:
+        result = parser.parse(example["input"], known_patients=known_patients)
+        if example["entries"] is None:
+            assert not result.fully_resolved, f"{example['input']!r} should fall back to Gemini, got {result}"
+            continue
+        assert result.fully_resolved, f"{example['input']!r} was not resolved: {result}"
+        assert result.patient_name == example["patient_name"]
+        assert [[entry["vitals_name"], entry["vitals_value"]] for entry in result.entries] == example["entries"]
+    print(f"{len(corpus)} golden utterances matched")
+
+
+if __name__ == "__main__":
+    test_entries_match_write_multiple_vitals_arguments()
+    test_ambiguous_input_is_not_resolved()
+    test_unattributed_numbers_and_repeated_vitals_are_not_resolved()
+    test_leading_prepositions_and_questions_are_not_names()
+    test_names_found_by_position_need_a_known_patient()
+    test_golden_corpus()
+    print("✅ Vitals parser tests passed")
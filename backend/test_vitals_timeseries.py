@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the array-backed vitals time-series store.
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from ems_copilot.infrastructure.database.vitals_timeseries import VitalsTimeSeriesStore, parse_timestamp, parse_vital
+
+
+def vitals(name, value, minute):
+    return {"vitals_name": name, "vitals_value": value, "patient_name": "Hank Smith",
+            "timestamp": f"2024-01-01T10:{minute:02d}:00"}
+
+
+def times_at(minute):
+    return parse_timestamp(f"2024-01-01T10:{minute:02d}:00")
+
+
+def test_parse_vital_normalizes_names_and_units():
+    assert parse_vital("BP", "140/90") == [("bp_systolic", 140.0), ("bp_diastolic", 90.0)]
+    assert parse_vital("sugar", "6.0 mmol/L") == [("glucose", 108.0)]
+    assert parse_vital("temp", "37 C") == [("temperature", 98.6)]
+    assert parse_vital("o2", "93%") == [("spo2", 93.0)]
+    assert parse_vital("note", "head trauma") == []
+
+
+def test_trends_and_range_queries():
+    store = VitalsTimeSeriesStore()
+    store.load_patient("Hank Smith", [vitals("hr", "100", 0), vitals("hr", "110", 5), vitals("o2", "95", 0)])
+    # Write-through, including a late arrival that must be kept in time order
+    store.add_record(vitals("hr", "120", 10))
+    store.add_record(vitals("hr", "105", 3))
+    store.add_record(vitals("o2", "91", 10))
+
+    trends = store.trends("hank smith")
+    heart_rate = trends["heart_rate"]
+    assert heart_rate["count"] == 4
+    assert heart_rate["first"] == 100 and heart_rate["last"] == 120
+    assert heart_rate["min"] == 100 and heart_rate["max"] == 120
+    assert abs(heart_rate["slope_per_min"] - 107.5 / 53) < 1e-9
+    assert trends["spo2"]["delta"] == -4
+
+    times, values = store.series("Hank Smith", "heart_rate").range(start=times_at(4), end=times_at(10))
+    assert list(values) == [110.0, 120.0]
+
+    # Only the last 5 minutes of data
+    assert store.trends("Hank Smith", window_minutes=5)["heart_rate"]["count"] == 2
+
+    text = store.trend_summary_text("Hank Smith")
+    print(text)
+    assert "Heart rate: 120" in text
+    assert store.most_recent_patient() == "Hank Smith"
+
+
+def test_unloaded_patients_are_not_written_through():
+    store = VitalsTimeSeriesStore()
+    store.add_record(vitals("hr", "100", 0))
+    assert not store.is_loaded("Hank Smith")
+    assert store.trends("Hank Smith") == {}
+
+
+if __name__ == "__main__":
+    test_parse_vital_normalizes_names_and_units()
+    test_trends_and_range_queries()
+    test_unloaded_patients_are_not_written_through()
+    print("✅ Vitals time-series tests passed")